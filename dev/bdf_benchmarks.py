@@ -0,0 +1,379 @@
+"""
+Times the fast/vectorized BDF methods against the card by card methods
+that they replace.  The results of the methods are checked by the unit
+tests, so this script only reports the times.
+
+Usage:
+  python dev/bdf_benchmarks.py [NAME ...]
+
+  NAME is the name of a benchmark (e.g., fast_cards); by default, all
+  the benchmarks are run.
+"""
+from __future__ import print_function
+import sys
+import time
+from collections import OrderedDict
+
+from pyNastran.bdf.bdf import BDF
+from pyNastran.bdf.bdf_interface.fast_cards import fast_card_object
+from pyNastran.bdf.bdf_interface.write_blocks import write_cards
+from pyNastran.bdf.bdf_interface.test.test_fast_cards import _build_card, _get_card_lines
+from pyNastran.bdf.bdf_interface.test.test_bulk_xref import _cross_reference_by_card
+from pyNastran.bdf.bdf_interface.test.test_coord_transforms import (
+    _build_model as _build_coord_model)
+from pyNastran.bdf.bdf_interface.test.test_write_blocks import _write_by_card
+from pyNastran.bdf.bdf_interface.test.test_topology import (
+    _get_node_id_to_element_ids_map, _get_edge_maps)
+from pyNastran.bdf.mesh_utils.bdf_renumber import bdf_renumber
+from pyNastran.bdf.mesh_utils.free_edges import free_edges
+from pyNastran.bdf.mesh_utils.loads import sum_forces_moments, sum_forces_moments_vectorized
+from pyNastran.bdf.mesh_utils.skin_solid_elements import get_solid_skin_faces
+from pyNastran.bdf.mesh_utils.test.test_sum_loads import _build_load_model
+from pyNastran.bdf.mesh_utils.test.test_skin_solid import (
+    _build_model as _build_skin_model, _get_solid_skin_faces_by_face)
+from pyNastran.bdf.mesh_utils.test.test_renumber import (
+    _build_model as _build_renumber_model, _renumber_by_card)
+from pyNastran.bdf.cards.test.test_card_memory import (
+    _build_model as _build_memory_model, _add_cards)
+
+
+def _print_times(label1, dt1, label2, dt2, name=''):
+    """prints the times of the old/new methods and the speedup"""
+    prefix = '%-6s ' % name if name else ''
+    print('%s%s=%.3f sec %s=%.3f sec speedup=%.1fx' % (
+        prefix, label1, dt1, label2, dt2, dt1 / max(dt2, 1e-9)))
+
+
+def benchmark_fast_cards(ncards=20000):
+    """
+    Compares the time to build the cards with the fast parsers and the
+    standard reader
+
+    Parameters
+    ----------
+    ncards : int; default=20000
+        the number of cards of each type to build
+    """
+    card_fields = {
+        'GRID' : (['1', '0', '1.', '2.', '3.'], 8, False),
+        'CQUAD4' : (['1', '1', '1', '2', '3', '4'], 8, False),
+        'CTRIA3' : (['1', '1', '1', '2', '3', '', '0.1'], 8, True),
+        'CTETRA' : (['1', '1', '1', '2', '3', '4', '5', '6', '7', '8', '9', '10'], 8, False),
+        'CPENTA' : (['1', '1', '1', '2', '3', '4', '5', '6'], 8, False),
+        'CHEXA' : (['1', '1', '1', '2', '3', '4', '5', '6', '7', '8'], 16, False),
+        'CBAR' : (['1', '1', '1', '2', '0.', '1.', '0.'], 8, False),
+        'CBUSH' : (['1', '1', '1', '2', '', '', '', '0'], 8, False),
+        'FORCE' : (['1', '1', '', '100.', '0.', '0.', '1.'], 8, False),
+        'PLOAD4' : (['1', '1', '10.'], 8, False),
+    }
+    model = BDF(debug=None)
+    for card_name, (fields, size, is_csv) in sorted(card_fields.items()):
+        card_lines = _get_card_lines(card_name, fields, size, is_csv)
+        time0 = time.time()
+        for unused_i in range(ncards):
+            _build_card(model, card_name, card_lines)
+        dt_standard = time.time() - time0
+
+        time0 = time.time()
+        for unused_i in range(ncards):
+            fast_card_object(card_name, card_lines)
+        dt_fast = time.time() - time0
+        _print_times('standard', dt_standard, 'fast', dt_fast, name=card_name)
+
+
+class _DictCard(object):
+    """a card that stores its attributes in a __dict__ (the layout before __slots__)"""
+    def __init__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+def benchmark_card_memory(ncards=100000, card_names=None):
+    """
+    Measures the memory used by the cards after they're cross-referenced
+
+    The bytes per card with a per-instance ``__dict__`` (before) is the
+    measured bytes per card (after) with the memory of the ``__slots__``
+    instance replaced by the memory of an instance that stores the same
+    attributes in a ``__dict__``.
+
+    Parameters
+    ----------
+    ncards : int; default=100000
+        the number of cards of each type
+    card_names : List[str]; default=None -> all
+        the cards to measure
+    """
+    import tracemalloc
+    if card_names is None:
+        card_names = ['GRID', 'CQUAD4', 'CTRIA3', 'CTETRA', 'CPENTA', 'CHEXA', 'CBAR']
+
+    for card_name in card_names:
+        model = _build_memory_model()
+        cards_dict = model.nodes if card_name == 'GRID' else model.elements
+        nids0 = set(cards_dict)
+        tracemalloc.start()
+        try:
+            memory0 = tracemalloc.get_traced_memory()[0]
+            _add_cards(model, card_name, ncards)
+            model.cross_reference()
+            nbytes = tracemalloc.get_traced_memory()[0] - memory0
+
+            # the memory of the instances (the attributes are shared)
+            cards = [card for key, card in cards_dict.items() if key not in nids0]
+            states = [card.__getstate__() for card in cards]
+            memory0 = tracemalloc.get_traced_memory()[0]
+            slot_cards = []
+            for card, state in zip(cards, states):
+                slot_card = card.__class__.__new__(card.__class__)
+                slot_card.__setstate__(state)
+                slot_cards.append(slot_card)
+            nbytes_slots = tracemalloc.get_traced_memory()[0] - memory0
+            del slot_cards
+
+            # a new class, so the instances share the keys of their __dict__
+            dict_class = type(str('Dict%s' % card_name), (_DictCard, ), {})
+            memory0 = tracemalloc.get_traced_memory()[0]
+            dict_cards = [dict_class(state) for state in states]
+            nbytes_dict = tracemalloc.get_traced_memory()[0] - memory0
+            del dict_cards
+        finally:
+            tracemalloc.stop()
+        nbytes_after = nbytes // ncards
+        nbytes_before = (nbytes - nbytes_slots + nbytes_dict) // ncards
+        print('%-6s __dict__=%i bytes/card __slots__=%i bytes/card (%.0f%% less)' % (
+            card_name, nbytes_before, nbytes_after,
+            100. * (nbytes_before - nbytes_after) / nbytes_before))
+
+
+def benchmark_bulk_xref(nquads=100000):
+    """
+    Compares the time to cross-reference the elements/properties and to
+    link the nodes to the elements in bulk and with the per-card methods
+
+    Parameters
+    ----------
+    nquads : int; default=100000
+        the number of CQUAD4s (and nodes)
+    """
+    model = BDF(debug=None)
+    nx = 1000
+    for nid in range(1, nquads + 1):
+        model.add_grid(nid, [nid % nx, nid // nx, 0.])
+    model.add_grid(nquads + 1, [0., 0., 1.])
+    model.add_mat1(1, 3.0e7, None, 0.3)
+    model.add_pshell(1, mid1=1, t=0.1)
+    for eid in range(1, nquads + 1):
+        nid1 = eid
+        nid2 = eid % nquads + 1
+        nids = [nid1, nid2, (nid2 + nx - 1) % nquads + 1, (nid1 + nx - 1) % nquads + 1]
+        model.add_cquad4(eid, 1, nids)
+
+    time0 = time.time()
+    _cross_reference_by_card(model)
+    dt_by_card = time.time() - time0
+
+    model.uncross_reference()
+    time0 = time.time()
+    model._cross_reference_nodes()
+    model._cross_reference_coordinates()
+    model._cross_reference_elements()
+    model._cross_reference_properties()
+    model._cross_reference_materials()
+    model._cross_reference_nodes_with_elements()
+    dt_bulk = time.time() - time0
+    _print_times('by_card', dt_by_card, 'bulk', dt_bulk)
+
+
+def benchmark_coord_transforms(nnodes=100000):
+    """
+    Compares the time to get the node locations in a cylindrical frame
+    with GRID.get_position_wrt and with BDF.get_xyz_in_coord
+
+    Parameters
+    ----------
+    nnodes : int; default=100000
+        the number of nodes
+    """
+    model = _build_coord_model(nnodes=nnodes)
+    model.cross_reference()
+    nodes = [model.nodes[nid] for nid in sorted(model.nodes)]
+
+    time0 = time.time()
+    unused_xyz_by_node = [node.get_position_wrt(model, 2) for node in nodes]
+    dt_by_node = time.time() - time0
+
+    time0 = time.time()
+    unused_xyz = model.get_xyz_in_coord(cid=2)
+    dt_batched = time.time() - time0
+    _print_times('by_node', dt_by_node, 'batched', dt_batched)
+
+
+def benchmark_write_blocks(nquads=100000):
+    """
+    Compares the time to write the GRIDs and CQUAD4s with the write_card
+    methods and in blocks
+
+    Parameters
+    ----------
+    nquads : int; default=100000
+        the number of CQUAD4s (and nodes)
+    """
+    model = BDF(debug=None)
+    nx = 1000
+    for nid in range(1, nquads + 1):
+        model.add_grid(nid, [0.1 * (nid % nx), 0.37 * (nid // nx), 0.])
+    for eid in range(1, nquads + 1):
+        nid1 = eid
+        nid2 = eid % nquads + 1
+        nids = [nid1, nid2, (nid2 + nx - 1) % nquads + 1, (nid1 + nx - 1) % nquads + 1]
+        model.add_cquad4(eid, 1, nids)
+    cards = list(model.nodes.values()) + list(model.elements.values())
+
+    time0 = time.time()
+    _write_by_card(cards, 8, False, False)
+    dt_by_card = time.time() - time0
+
+    time0 = time.time()
+    write_cards(cards)
+    dt_blocks = time.time() - time0
+    _print_times('by_card', dt_by_card, 'blocks', dt_blocks)
+
+
+def benchmark_sum_loads(nforces=2000, ncases=20):
+    """
+    Compares the time to sum the loads of a plate with the vectorized
+    method and with one call of sum_forces_moments per load case
+
+    Parameters
+    ----------
+    nforces : int; default=2000
+        the number of FORCE/MOMENT cards in each load case
+    ncases : int; default=20
+        the number of LOAD combinations
+    """
+    model = _build_load_model(nforces=nforces, ncases=ncases)
+    load_ids = sorted(model.load_combinations) + [1, 2, 3, 4]
+    p0 = 3
+    xyz_cid0 = {nid : node.get_position() for nid, node in model.nodes.items()}
+    time0 = time.time()
+    sum_forces_moments_vectorized(
+        model, p0, load_ids, include_grav=True, xyz_cid0=xyz_cid0)
+    dt_vectorized = time.time() - time0
+
+    time0 = time.time()
+    for load_id in load_ids:
+        sum_forces_moments(model, p0, load_id, include_grav=True)
+    dt_scalar = time.time() - time0
+    _print_times('scalar', dt_scalar, 'vectorized', dt_vectorized)
+
+
+def benchmark_topology(nquads=100000):
+    """
+    Compares the time to build the node/edge maps with the per-element
+    loops and with the topology
+
+    Parameters
+    ----------
+    nquads : int; default=100000
+        the number of CQUAD4s
+    """
+    model = BDF(debug=None)
+    nx = 1000
+    for nid in range(1, nquads + nx + 2):
+        model.add_grid(nid, [0.1 * (nid % nx), 0.37 * (nid // nx), 0.])
+    for eid in range(1, nquads + 1):
+        nids = [eid, eid + 1, eid + nx + 1, eid + nx]
+        model.add_cquad4(eid, 1, nids)
+
+    time0 = time.time()
+    _get_node_id_to_element_ids_map(model)
+    unused_free_edges = [edge for edge, eids in _get_edge_maps(model, ['CQUAD4'])[0].items()
+                         if len(eids) == 1]
+    dt_by_element = time.time() - time0
+
+    time0 = time.time()
+    model.get_node_id_to_element_ids_map()
+    free_edges(model)
+    dt_topology = time.time() - time0
+    _print_times('by_element', dt_by_element, 'topology', dt_topology)
+
+
+def benchmark_skin_solid(nx=40):
+    """
+    Compares the time to skin a block of nx^3 CHEXAs with the per-face
+    loop and with the face arrays
+
+    Parameters
+    ----------
+    nx : int; default=40
+        the number of CHEXAs in each direction
+    """
+    model = _build_skin_model(nx, nx, nx)
+
+    time0 = time.time()
+    _get_solid_skin_faces_by_face(model)
+    dt_by_face = time.time() - time0
+
+    time0 = time.time()
+    get_solid_skin_faces(model)
+    dt_array = time.time() - time0
+    _print_times('by_face', dt_by_face, 'array', dt_array)
+
+
+def benchmark_renumber(nx=40, nspoints=1000):
+    """
+    Compares the time to renumber the nodes/elements of a block of nx^3
+    CHEXAs with a per-card loop and with bdf_renumber
+
+    Parameters
+    ----------
+    nx : int; default=40
+        the number of CHEXAs in each direction
+    nspoints : int; default=1000
+        the number of SPOINTs, which the nodes skip over
+    """
+    model = _build_renumber_model(nx, nspoints)
+    model.cross_reference()
+
+    time0 = time.time()
+    _renumber_by_card(model)
+    dt_by_card = time.time() - time0
+
+    starting_id_dict = {key : None for key in [
+        'cid', 'pid', 'mid', 'spc_id', 'mpc_id', 'load_id', 'dload_id', 'table_id', 'tf_id']}
+    time0 = time.time()
+    bdf_renumber(model, None, starting_id_dict=starting_id_dict)
+    dt_array = time.time() - time0
+    _print_times('by_card', dt_by_card, 'array', dt_array)
+
+
+#: name -> benchmark function
+BENCHMARKS = OrderedDict([
+    ('fast_cards', benchmark_fast_cards),
+    ('card_memory', benchmark_card_memory),
+    ('bulk_xref', benchmark_bulk_xref),
+    ('coord_transforms', benchmark_coord_transforms),
+    ('write_blocks', benchmark_write_blocks),
+    ('sum_loads', benchmark_sum_loads),
+    ('topology', benchmark_topology),
+    ('skin_solid', benchmark_skin_solid),
+    ('renumber', benchmark_renumber),
+])
+
+
+def main(argv=None):
+    """runs the benchmarks"""
+    if argv is None:
+        argv = sys.argv
+    names = argv[1:] if len(argv) > 1 else list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise SystemExit('name=%r; allowed=%s' % (name, list(BENCHMARKS)))
+    for name in names:
+        print('---%s---' % name)
+        BENCHMARKS[name]()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -13,11 +13,11 @@ import sys
 import io
 import traceback
 from codecs import open as codec_open
-from collections import defaultdict
+from collections import defaultdict, deque
 
 from typing import List, Dict, Optional, Union, Set, Any, cast
 from six import string_types, iteritems, itervalues, iterkeys, StringIO
-from six.moves.cPickle import load, dump  # type: ignore
+from six.moves.cPickle import load, dump, dumps  # type: ignore
 #from pickle import load, dump
 
 import numpy as np  # type: ignore
@@ -140,17 +140,52 @@ from pyNastran.bdf.bdf_methods import BDFMethods
 from pyNastran.bdf.bdf_interface.get_card import GetCard
 from pyNastran.bdf.bdf_interface.add_card import AddCards
 from pyNastran.bdf.bdf_interface.bdf_card import BDFCard
+from pyNastran.bdf.bdf_interface.parse_parallel import (
+    get_parallel_card_chunks, parse_card_chunks, SERIAL_CARDS)
+from pyNastran.bdf.bdf_interface.lazy_cards import LazyCard, LazyCardDict
+from pyNastran.bdf.bdf_interface.node_array import NodeArrayDict
+from pyNastran.bdf.bdf_interface.coord_transforms import CoordTransforms
+from pyNastran.bdf.bdf_interface.topology import MeshTopology
+from pyNastran.bdf.bdf_interface.spatial_index import SpatialIndex
+from pyNastran.bdf.bdf_interface.fast_cards import FAST_CARDS, fast_card_object
+from pyNastran.bdf.bdf_interface.bulk_xref import get_node_elements
+from pyNastran.bdf.bdf_interface.model_cache import (
+    get_cache_key, get_cache_filename, get_file_stat, get_file_fingerprints,
+    load_model_cache, save_model_cache, evict_model_cache)
+from pyNastran.bdf.bdf_interface.include_tracker import (
+    IncludeTracker, get_card_key, get_include_blocks, get_include_subtree,
+    get_refresh_roots, get_card_sources, get_comment_lines, get_xref_groups,
+    get_group_slots, iter_slot_cards, references_cards)
 from pyNastran.bdf.bdf_interface.write_mesh import WriteMesh
 from pyNastran.bdf.bdf_interface.uncross_reference import UnXrefMesh
 from pyNastran.bdf.errors import (CrossReferenceError, DuplicateIDsError,
                                   CardParseSyntaxError, MissingDeckSections)
 from pyNastran.bdf.pybdf import (BDFInputPy, _clean_comment, _lines_to_decks,
+                                 _stream_lines_to_decks,
                                  _break_system_lines, _check_valid_deck, _show_bad_file)
 
+#: the number of recent lines that are kept for the crash dumps
+#: when reading with streaming=True
+STREAMING_HISTORY_LINES = 1000
+
+#: the first character of a continuation line that always has data; the
+#: lines of the cards that aren't in ``read_bdf(card_types=...)`` are
+#: skipped without splitting them
+SKIPPED_CONTINUATION_CHARS = ('+', '*', ',')
+
+#: the reader options that are kept when ``BDF.refresh`` re-reads the model
+REREAD_OPTIONS = [
+    'cards_to_read', 'dict_of_vars', '_is_dynamic_syntax', '_is_cards_dict',
+    '_nparse_errors', '_stop_on_parsing_error', '_nxref_errors', '_stop_on_xref_error',
+    '_stop_on_duplicate_error', 'force_echo_off', 'dumplines',
+    '_card_parser', '_card_parser_prepare',
+]
+
 def read_bdf(bdf_filename=None, validate=True, xref=True, punch=False,
              skip_cards=None, read_cards=None,
-             encoding=None, log=None, debug=True, mode='msc'):
-    # type: (Union[str, None], bool, bool, bool, Union[List[str], None], Union[str, None], Union[SimpleLogger, None], Optional[bool], str) -> BDF
+             encoding=None, log=None, debug=True, mode='msc', nprocs=1, streaming=False,
+             lazy=False, cache_dir=None, card_types=None, node_arrays=False, lazy_xref=False):
+    # type: (Union[str, None], bool, bool, bool, Union[List[str], None], Union[str, None], Union[SimpleLogger, None], Optional[bool], str, int, bool, bool, Optional[str], Optional[List[str]], bool, bool) -> BDF
     """
     Creates the BDF object
 
@@ -183,6 +218,26 @@ def read_bdf(bdf_filename=None, validate=True, xref=True, punch=False,
     mode : str; default='msc'
         the type of Nastran
         valid_modes = {'msc', 'nx'}
+    nprocs : int; default=1
+        the number of processes used to parse the bulk data cards
+    streaming : bool; default=False
+        stream the lines from the files to the cards without storing
+        the text of the deck (see ``BDF.read_bdf``)
+    lazy : bool; default=False
+        store the text of the common cards and build the card objects
+        when they're accessed (see ``BDF.read_bdf``)
+    cache_dir : str; default=None
+        load the parsed model from this cache directory if the BDF and
+        its INCLUDE files haven't changed (see ``BDF.read_bdf``)
+    card_types : List[str]; default=None
+        None : tokenize all cards
+        the only cards that are tokenized; the lines of the other cards
+        are skipped (see ``BDF.read_bdf``)
+    node_arrays : bool; default=False
+        store the GRIDs in a NodeArrayDict (see ``BDF.set_node_arrays``)
+    lazy_xref : bool; default=False
+        cross-reference the cards the first time they're accessed
+        instead of when the model is read (see ``BDF.read_bdf``)
 
     Returns
     -------
@@ -218,7 +273,9 @@ def read_bdf(bdf_filename=None, validate=True, xref=True, punch=False,
     elif read_cards:
         model.set_cards(read_cards)
     model.read_bdf(bdf_filename=bdf_filename, validate=validate,
-                   xref=xref, punch=punch, read_includes=True, encoding=encoding)
+                   xref=xref, punch=punch, read_includes=True, encoding=encoding,
+                   nprocs=nprocs, streaming=streaming, lazy=lazy, cache_dir=cache_dir,
+                   card_types=card_types, node_arrays=node_arrays, lazy_xref=lazy_xref)
 
     #if 0:
         ### TODO: remove all the extra methods
@@ -315,6 +372,22 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         self.include_dir = ''
         self.dumplines = False
 
+        # the INCLUDE files that each file references and the
+        # [start, stop) line ranges of the merged deck that each file defines
+        self.include_tree = {}  # type: Dict[Optional[str], List[str]]
+        self.include_line_ranges = {}  # type: Dict[Optional[str], List[Any]]
+
+        # the (mtime, size) of each file when it was opened
+        self._file_stats = {}  # type: Dict[str, Any]
+
+        # the file fingerprints and the cards from each INCLUDE file and
+        # the read_bdf arguments; used by refresh
+        self._include_tracker = None  # type: Optional[IncludeTracker]
+        self._read_bdf_kwargs = {}  # type: Dict[str, Any]
+
+        # the only cards that are tokenized (see read_bdf)
+        self._card_types = None  # type: Optional[Set[str]]
+
         # this flag will be flipped to True someday (and then removed), but
         # doesn't support 100% of cards yet.  It enables a new method for card
         # parsing.
@@ -344,6 +417,22 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         # flag that allows for OpenMDAO-style optimization syntax to be used
         self._is_dynamic_syntax = False
 
+        # card_name -> attribute name for the cards that are stored as
+        # LazyCards; set by read_bdf(..., lazy=True)
+        self._lazy_cards = {}  # type: Dict[str, str]
+
+        # the cached transforms of the coordinate systems; rebuilt when the
+        # coordinate systems change (see get_coord_transforms)
+        self._coord_transforms = None  # type: Optional[CoordTransforms]
+
+        # the cached connectivity of the elements; rebuilt when elements
+        # are added/removed/changed (see get_topology)
+        self._topology = None  # type: Optional[MeshTopology]
+
+        # the cached KD-tree of the nodes/AABB tree of the elements; rebuilt
+        # when the elements/nodes are added/removed/moved (see spatial_index)
+        self._spatial_index = None  # type: Optional[SpatialIndex]
+
         # lines that were rejected b/c they were for a card that isnt supported
         self.reject_lines = []  # type: List[List[str]]
 
@@ -625,6 +714,9 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         state = self.__dict__.copy()
         # Remove the unpicklable entries.
         del state['_card_parser'], state['log']
+        state['_coord_transforms'] = None
+        state['_topology'] = None
+        state['_spatial_index'] = None
         if hasattr(self, '_card_parser_b'):
             del state['_card_parser_b']
         if hasattr(self, '_card_parser_prepare'):
@@ -1124,7 +1216,9 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         return all_lines
 
     def read_bdf(self, bdf_filename=None,
-                 validate=True, xref=True, punch=False, read_includes=True, encoding=None):
+                 validate=True, xref=True, punch=False, read_includes=True, encoding=None,
+                 nprocs=1, streaming=False, lazy=False, cache_dir=None, card_types=None,
+                 node_arrays=False, lazy_xref=False):
         """
         Read method for the bdf files
 
@@ -1142,6 +1236,52 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
             indicates whether INCLUDE files should be read
         encoding : str; default=None -> system default
             the unicode encoding
+        nprocs : int; default=1
+            the number of processes used to parse the bulk data cards;
+            the cards are split into chunks by card type and the card
+            objects are added to the model in the original card order
+        streaming : bool; default=False
+            the lines are read from the files, grouped into cards and
+            added to the model one card at a time, so the text of the
+            deck is never stored; nprocs is not used
+        lazy : bool; default=False
+            the nodes, elements, properties, materials, masses, rigid
+            elements and loads are stored as unparsed LazyCards in a
+            LazyCardDict and the card objects are built the first time
+            they're accessed; cards that are never accessed are written
+            by ``write_bdf`` using their original text (if it's in the
+            same field size); nprocs is not used
+            and parsing errors are raised when the card is built.
+            Cross-referencing (xref=True) or validate=True builds all
+            the cards, so it's only useful with xref=False (or
+            lazy_xref=True) and validate=False.
+        cache_dir : str; default=None
+            a directory for the parsed model cache.  The main BDF and every
+            INCLUDE file are fingerprinted (mtime, size, sha1) and the
+            parsed model is loaded from the cache if none of the files
+            have changed.  The least recently used cache files are deleted
+            when the directory is larger than
+            ``model_cache.MAX_CACHE_SIZE``.  With lazy=True, the
+            unparsed lines of the lazy cards are cached, so a model
+            loaded from the cache is also lazy.
+        card_types : List[str]; Set[str]; default=None
+            the only cards that are read (e.g., ['GRID', 'CQUAD4']).
+            Unlike ``set_cards``, only the card name of each line is
+            checked and the lines of the other cards (and their comments)
+            are skipped, so they are never stored as card_lines or
+            rejects.  The other cards are not in card_count, so
+            cross-referencing requires the referenced cards
+            (e.g., the properties) to be in card_types.
+        node_arrays : bool; default=False
+            store the GRIDs in a NodeArrayDict, which stores the nodes in
+            arrays and supports vectorized queries (see
+            ``set_node_arrays``); the GRIDs are not lazy
+        lazy_xref : bool; default=False
+            with xref=True, the nodes, elements, properties, materials,
+            masses, loads and aero cards are cross-referenced the first
+            time they're accessed (see ``lazy_cross_reference``), so
+            reading the model costs about the same as with xref=False;
+            cross-reference errors are raised when the card is accessed
 
         .. code-block:: python
 
@@ -1161,12 +1301,58 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         """
         self._read_bdf_helper(bdf_filename, encoding, punch, read_includes)
         self.log.debug('---starting BDF.read_bdf of %s---' % self.bdf_filename)
+        if card_types is None:
+            self._card_types = None
+        elif isinstance(card_types, string_types):
+            self._card_types = set([card_types.upper()])
+        else:
+            self._card_types = set(card_type.upper() for card_type in card_types)
+
+        if node_arrays:
+            self.set_node_arrays()
+
+        cache_key = None
+        if cache_dir is not None and isinstance(self.bdf_filename, string_types):
+            cache_key = self._get_model_cache_key(lazy)
+        if cache_key is None or not self._load_model_cache(cache_dir, cache_key):
+            self._parse_bdf(bdf_filename, nprocs, streaming, lazy)
+            if cache_key is not None:
+                self._save_model_cache(cache_dir, cache_key)
+        self._read_bdf_kwargs = {
+            'validate' : validate, 'xref' : xref, 'punch' : punch,
+            'read_includes' : read_includes, 'encoding' : encoding, 'nprocs' : nprocs,
+            'streaming' : streaming, 'lazy' : lazy, 'cache_dir' : cache_dir,
+            'card_types' : card_types, 'node_arrays' : node_arrays, 'lazy_xref' : lazy_xref,
+        }
+
+        if validate:
+            self.validate()
+
+        if xref and lazy_xref:
+            self.lazy_cross_reference()
+        else:
+            self.cross_reference(xref=xref)
+        self._xref = xref
+
+        self.log.debug('---finished BDF.read_bdf of %s---' % self.bdf_filename)
+        self.pop_xref_errors()
+
+    def _parse_bdf(self, bdf_filename, nprocs, streaming, lazy):
+        """reads the lines and creates the cards; see ``read_bdf``"""
+        if lazy:
+            self._setup_lazy_cards()
+            nprocs = 1
+        self._include_tracker = None
+        self._file_stats = {}
         self._parse_primary_file_header(bdf_filename)
 
         if 0: # pragma: no cover
             obj = BDFInputPy(self.read_includes, self.dumplines, self._encoding,
                              log=self.log, debug=self.debug)
             out = obj._get_lines(bdf_filename, punch=self.punch)
+        elif streaming:
+            history = [] if self.dumplines else deque(maxlen=STREAMING_HISTORY_LINES)
+            out = self._get_lines_streaming(bdf_filename, history, punch=self.punch)
         else:
             out = self._get_lines(bdf_filename, punch=self.punch)
         system_lines, executive_control_lines, case_control_lines, bulk_data_lines = out
@@ -1183,7 +1369,11 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         self.case_control_deck.rsolmap_to_str = self.rsolmap_to_str
 
         #self._is_cards_dict = True
-        if self._is_cards_dict:
+        card_sources = None
+        if streaming:
+            card_count = defaultdict(int)
+            cards = self._stream_bdf_cards(bulk_data_lines, card_count)
+        elif self._is_cards_dict:
             cards, card_count = self.get_bdf_cards_dict(bulk_data_lines)
             #if 0:
                 #with open('dump.bdf', 'w') as bdf_file_obj:
@@ -1195,10 +1385,19 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
                             #bdf_file_obj.write('\n'.join(cardlines) + '\n')
                         #bdf_file_obj.write('\n')
         else:
-            cards, card_count = self.get_bdf_cards(bulk_data_lines)
+            card_ilines = []
+            cards, card_count = self.get_bdf_cards(bulk_data_lines, card_ilines)
             #for card in cards:
                 #print(card)
-        self._parse_cards(cards, card_count)
+            if nprocs == 1 and not lazy:
+                card_sources = self._track_include_cards(bulk_data_lines, cards, card_ilines)
+        self._parse_cards(cards, card_count, nprocs=nprocs, card_sources=card_sources)
+        if streaming:
+            # read the lines after the ENDDATA, so the include files are closed
+            for unused_line in bulk_data_lines:
+                pass
+        if streaming and self.dumplines:
+            self._dump_file('pyNastran_dump.bdf', history, None)
 
         if self.values_to_skip:
             for key, values in iteritems(self.values_to_skip):
@@ -1212,15 +1411,571 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
 
         self.pop_parse_errors()
         self.fill_dmigs()
+        self._fingerprint_include_files()
+
+    def _track_include_cards(self, bulk_data_lines, cards, card_ilines):
+        # type: (List[str], List[Any], List[int]) -> Optional[List[Optional[str]]]
+        """
+        Finds the INCLUDE file that defines each card, so the card objects
+        can be removed by ``refresh``
+
+        Parameters
+        ----------
+        bulk_data_lines : List[str]
+            the bulk data lines
+        cards : List[card_name, comment, card_lines]
+            the cards from ``get_bdf_cards``
+        card_ilines : List[int]
+            the index of the first line of each card (and the ENDDATA)
+
+        Returns
+        -------
+        card_sources : List[str/None] / None
+            the INCLUDE file of each card (None for the main file);
+            None if there are no INCLUDE files or they can't be tracked
+        """
+        main_filename = self._get_main_include_key()
+        if main_filename is None or len(self.include_tree) == 1 or self.values_to_skip:
+            return None
+
+        nlines = sum(iend - istart for line_ranges in itervalues(self.include_line_ranges)
+                     for istart, iend in line_ranges)
+        iline0 = nlines - len(bulk_data_lines)
+        ienddata = iline0 + card_ilines[-1] if len(card_ilines) > len(cards) else None
+
+        self._include_tracker = IncludeTracker(is_tracked=True)
+        blocks = get_include_blocks(self.include_tree, self.include_line_ranges, main_filename)
+        self._include_tracker.add_blocks(bulk_data_lines, iline0, blocks, ienddata)
+        return get_card_sources(card_ilines[:len(cards)], iline0,
+                                self.include_line_ranges, main_filename)
+
+    def _fingerprint_include_files(self):
+        # type: () -> None
+        """
+        stores the fingerprint of the files when they were opened, so
+        ``refresh`` can find the files that changed (including while the
+        model was read)
+        """
+        if not isinstance(self.bdf_filename, string_types):
+            return
+        if self._include_tracker is None:
+            self._include_tracker = IncludeTracker(is_tracked=False)
+        self._include_tracker.fingerprints = get_file_fingerprints(
+            [filename for filename in self.include_tree if filename is not None],
+            sha1=False, file_stats=self._file_stats)
+
+    def refresh(self, validate=None):
+        # type: (Optional[bool]) -> List[str]
+        """
+        Re-reads the files that changed since the model was read
+
+        Only the changed INCLUDE files (and the files they include) are
+        read again.  The cards from those files are removed, the new cards
+        are added and only the objects that may reference the changed
+        cards (e.g., the loads) are cross-referenced again.  The result
+        is the same as calling ``read_bdf``.
+
+        The entire model is re-read if:
+          - the main file changed
+          - the model was read with streaming=True, lazy=True,
+            lazy_xref=True or nprocs > 1
+          - a changed file has a card that doesn't create a single object
+            (e.g., a CORD1R with 2 coordinate systems, a DMIG, a
+            duplicate card), a card that continues into the next file or
+            an ENDDATA
+
+        Parameters
+        ----------
+        validate : bool; default=None -> the read_bdf value
+            runs various checks on the new cards
+
+        Returns
+        -------
+        changed_filenames : List[str]
+            the files that changed
+
+        .. code-block:: python
+
+          >>> model = read_bdf(bdf_filename)
+          >>> # edit loads.inc
+          >>> model.refresh()
+          ['/path/to/loads.inc']
+        """
+        if self._include_tracker is None:
+            raise RuntimeError('refresh requires a model that was read from a file')
+        changed_filenames = self._include_tracker.get_changed_files()
+        if not changed_filenames:
+            return changed_filenames
+
+        if validate is None:
+            validate = self._read_bdf_kwargs['validate']
+        roots = get_refresh_roots(changed_filenames, self.include_tree,
+                                  self._get_main_include_key())
+        if roots is not None and self._refresh_includes(roots, validate):
+            self.log.debug('refreshed %s' % roots)
+        else:
+            self.log.debug('re-reading %s' % self.bdf_filename)
+            self._reread_bdf()
+        return changed_filenames
+
+    def _reread_bdf(self):
+        # type: () -> None
+        """re-reads the model with the same options; see ``refresh``"""
+        bdf_filename = self.bdf_filename
+        kwargs = self._read_bdf_kwargs
+        options = {key: getattr(self, key) for key in REREAD_OPTIONS if hasattr(self, key)}
+        self.__init__(debug=self.debug, log=self.log, mode=self._nastran_format)
+        self.__dict__.update(options)
+        self.read_bdf(bdf_filename, **kwargs)
+
+    def _refresh_includes(self, roots, validate):
+        # type: (List[str], bool) -> bool
+        """
+        Re-reads the changed INCLUDE files; see ``refresh``
+
+        Parameters
+        ----------
+        roots : List[str]
+            the changed files that aren't included by another changed file
+        validate : bool
+            runs various checks on the new cards
+
+        Returns
+        -------
+        is_refreshed : bool
+            False : the model must be re-read
+        """
+        if self._is_lazy_xref:
+            return False
+        tracker = self._include_tracker
+        main_filename = self._get_main_include_key()
+        old_filenames = [filename for root in roots
+                         for filename in get_include_subtree(self.include_tree, root)]
+        if not tracker.is_tracked(old_filenames):
+            return False
+        card_records = [card_record for filename in old_filenames
+                        for card_record in tracker.cards[filename]]
+        list_indices = self._get_card_list_indices(card_records)
+        if list_indices is None:
+            return False
+
+        # read the files before the model is changed
+        blocks = get_include_blocks(self.include_tree, self.include_line_ranges, main_filename)
+        decks = []
+        for root in sorted(roots, key=lambda root: blocks[root][0]):
+            incoming_lines, trailing_lines = tracker.comments[root]
+            deck = self._read_include_deck(root, incoming_lines)
+            if deck is None or deck['tracker'].comments[root][1] != trailing_lines:
+                # the comments at the end of the file are part of the
+                # comment of the next card, which isn't re-read
+                return False
+            decks.append(deck)
+
+        rslot_map = self.get_rslot_map()
+        slot_names = set(card_record[1] for card_record in card_records)
+        for deck in decks:
+            slot_names.update('rejects' if self.is_reject(card[0]) else rslot_map.get(card[0])
+                              for card in deck['cards'])
+        # a GRDSET changes every GRID and the nodes in a NodeArrayDict aren't
+        # the tracked objects, so those changes cross-reference the model
+        is_full_xref = self._xref and (
+            'grdset' in slot_names or
+            isinstance(self.nodes, NodeArrayDict) and bool(slot_names & set(['nodes', 'coords'])))
+        if is_full_xref:
+            self.uncross_reference()
+
+        # replace the cards
+        self._remove_card_records(card_records, list_indices)
+        tracker.remove_files(old_filenames)
+        for deck in reversed(decks):
+            self._replace_include_lines(deck, blocks[deck['root']])
+        new_filenames = []
+        for deck in decks:
+            new_filenames.extend(deck['tracker'].cards)
+            tracker.cards.update(deck['tracker'].cards)
+            tracker.comments.update(deck['tracker'].comments)
+        for deck in decks:
+            self._parse_tracked_cards(deck['cards'], deck['card_sources'])
+        if not tracker.is_tracked(new_filenames):
+            return False
+        new_card_records = [card_record for filename in new_filenames
+                            for card_record in tracker.cards[filename]]
+        if not self._move_card_list_records(new_card_records, list_indices):
+            return False
+        tracker.fingerprints = sorted(tracker.fingerprints + get_file_fingerprints(
+            new_filenames, sha1=False, file_stats=self._file_stats))
 
         if validate:
-            self.validate()
+            for unused_card_name, slot_name, unused_key, card in new_card_records:
+                if slot_name != 'rejects':
+                    card.validate()
+        if is_full_xref:
+            self.cross_reference()
+        elif self._xref:
+            self._refresh_cross_reference(card_records, new_card_records, slot_names)
+            self.pop_xref_errors()
+        return True
 
-        self.cross_reference(xref=xref)
-        self._xref = xref
+    def _refresh_cross_reference(self, old_card_records, new_card_records, slot_names):
+        # type: (List[Any], List[Any], Set[str]) -> None
+        """
+        Links the cards of the refreshed INCLUDE files and links the cards
+        that referenced the replaced cards again; see ``refresh``
 
-        self.log.debug('---finished BDF.read_bdf of %s---' % self.bdf_filename)
-        self.pop_xref_errors()
+        The cards that may reference the replaced cards (see
+        ``get_xref_groups``) are checked, but only the cards that reference
+        one of them are uncross-referenced/cross-referenced.
+        """
+        old_card_ids = set(id(card_record[3]) for card_record in old_card_records)
+        xref_slots = set(get_group_slots(None))
+        cards = [(slot_name, card) for unused_card_name, slot_name, unused_key, card
+                 in new_card_records if slot_name in xref_slots]
+        for slot_name in get_group_slots(get_xref_groups(slot_names)):
+            for card in iter_slot_cards(getattr(self, slot_name)):
+                if references_cards(card, old_card_ids):
+                    card.uncross_reference()
+                    cards.append((slot_name, card))
+
+        self._cross_reference_cards(cards)
+        for slot_name, card in cards:
+            if slot_name == 'coords':
+                card.setup()
+        if slot_names & set(['nodes', 'elements']):
+            self._refresh_node_elements(old_card_records, new_card_records)
+
+    def _refresh_node_elements(self, old_card_records, new_card_records):
+        # type: (List[Any], List[Any]) -> None
+        """
+        Updates GRID.elements_ref (see ``_cross_reference_nodes_with_elements``)
+        for the nodes of the replaced/new elements and the replaced/new nodes
+        """
+        old_nodes = {}
+        old_element_ids = set()
+        nids = set()
+        for unused_card_name, slot_name, unused_key, card in old_card_records:
+            if slot_name == 'nodes':
+                old_nodes[card.nid] = card
+                nids.add(card.nid)
+            elif slot_name == 'elements':
+                old_element_ids.add(id(card))
+                nids.update(card.node_ids)
+
+        new_elements = []
+        for unused_card_name, slot_name, unused_key, card in new_card_records:
+            if slot_name == 'nodes':
+                nids.add(card.nid)
+            elif slot_name == 'elements':
+                new_elements.append(card)
+        node_elements = get_node_elements(new_elements)
+        nids.update(node_elements)
+
+        for nid in nids:
+            node = self.nodes.get(nid)
+            if node is None:
+                continue
+            elements_ref = getattr(old_nodes.get(nid, node), 'elements_ref', None) or []
+            node.elements_ref = [elem for elem in elements_ref
+                                 if id(elem) not in old_element_ids] + node_elements.get(nid, [])
+
+    def _read_include_deck(self, root, comment_lines):
+        # type: (str, List[str]) -> Optional[Dict[str, Any]]
+        """
+        Reads an INCLUDE file (and the files it includes) and splits it
+        into cards
+
+        Parameters
+        ----------
+        root : str
+            the INCLUDE file
+        comment_lines : List[str]
+            the comment lines before the file; they're part of the comment
+            of the first card
+
+        Returns
+        -------
+        deck : Dict[str, varies] / None
+            the cards, the card_sources, the include tree/line ranges
+            relative to the start of the file and an IncludeTracker
+            None : the cards in the file can't be tracked
+        """
+        old_filenames = set(get_include_subtree(self.include_tree, root))
+        self.active_filenames = [filename for filename in self.active_filenames
+                                 if os.path.abspath(filename) not in old_filenames]
+        include_tree = self.include_tree
+        include_line_ranges = self.include_line_ranges
+        lines = []  # type: List[str]
+        try:
+            bdf_file = self._open_file(root, basename=False)
+            for unused_line in self._stream_deck_lines(bdf_file, lines, main_file=bdf_file,
+                                                       main_filename=root):
+                pass
+            deck_include_tree = self.include_tree
+            deck_line_ranges = self.include_line_ranges
+        finally:
+            self.include_tree = include_tree
+            self.include_line_ranges = include_line_ranges
+
+        # the ENDDATA is added, so the comments at the end of the file aren't
+        # part of the last card, which is what happens in the full deck
+        ncomment_lines = len(comment_lines)
+        bulk_data_lines = comment_lines + [line.rstrip() for line in lines] + ['ENDDATA']
+        ienddata = len(bulk_data_lines) - 1
+        is_enddata = 'ENDDATA' in self.card_count
+        card_ilines = []  # type: List[int]
+        cards = self.get_bdf_cards(bulk_data_lines, card_ilines)[0]
+        if not is_enddata:
+            del self.card_count['ENDDATA']
+        if len(card_ilines) != len(cards) + 1 or card_ilines[-1] != ienddata:
+            return None
+
+        tracker = IncludeTracker(is_tracked=True)
+        blocks = get_include_blocks(deck_include_tree, deck_line_ranges, root)
+        blocks[root] = (0, len(lines))
+        tracker.add_blocks(bulk_data_lines, -ncomment_lines, blocks,
+                           ienddata - ncomment_lines)
+        if tracker.untracked:
+            return None
+        card_sources = get_card_sources(card_ilines[:-1], -ncomment_lines,
+                                        deck_line_ranges, None)
+        deck = {
+            'root' : root,
+            'cards' : cards,
+            'card_sources' : card_sources,
+            'include_tree' : deck_include_tree,
+            'include_line_ranges' : deck_line_ranges,
+            'nlines' : len(lines),
+            'tracker' : tracker,
+        }
+        return deck
+
+    def _get_card_list(self, slot_name, key):
+        # type: (str, Any) -> List[Any]
+        """gets the list that stores a card (e.g., model.loads[key])"""
+        if slot_name == 'rejects':
+            return self.rejects
+        return getattr(self, slot_name)[key]
+
+    def _get_card_list_indices(self, card_records):
+        # type: (List[Any]) -> Optional[Dict[Any, Any]]
+        """
+        Checks that the cards are still in the model and finds the cards
+        that are stored in a list (e.g., the loads)
+
+        Parameters
+        ----------
+        card_records : List[(card_name, slot_name, key, card)]
+            the cards from the IncludeTracker
+
+        Returns
+        -------
+        list_indices : Dict[(slot_name, key), (i0, ncards)] / None
+            the location of the cards in each list; the cards from an
+            INCLUDE file are consecutive
+            None : a card was removed/replaced after the model was read
+        """
+        list_cards = defaultdict(list)
+        for unused_card_name, slot_name, key, card in card_records:
+            if slot_name != 'rejects':
+                value = getattr(self, slot_name).get(key)
+                if value is card:
+                    continue
+                if not isinstance(value, list):
+                    return None
+            list_cards[(slot_name, key)].append(card)
+
+        list_indices = {}
+        for slot_key, cards in iteritems(list_cards):
+            card_ids = set(id(card) for card in cards)
+            indices = [i for i, card in enumerate(self._get_card_list(*slot_key))
+                       if id(card) in card_ids]
+            ncards = len(cards)
+            if len(indices) != ncards or indices[-1] - indices[0] + 1 != ncards:
+                return None
+            list_indices[slot_key] = (indices[0], ncards)
+        return list_indices
+
+    def _remove_card_records(self, card_records, list_indices):
+        # type: (List[Any], Dict[Any, Any]) -> None
+        """
+        Removes the cards from the model
+
+        Parameters
+        ----------
+        card_records : List[(card_name, slot_name, key, card)]
+            the cards from the IncludeTracker
+        list_indices : Dict[(slot_name, key), (i0, ncards)]
+            see ``_get_card_list_indices``
+        """
+        removed_keys = defaultdict(set)
+        list_card_types = defaultdict(set)
+        for card_name, slot_name, key, card in card_records:
+            self.card_count[card_name] -= 1
+            if self.card_count[card_name] == 0:
+                del self.card_count[card_name]
+            if (slot_name, key) in list_indices:
+                list_card_types[(slot_name, key)].add(getattr(card, 'type', card_name))
+            else:
+                del getattr(self, slot_name)[key]
+                removed_keys[card.type].add(key)
+
+        for (slot_name, key), (i0, ncards) in iteritems(list_indices):
+            cards = self._get_card_list(slot_name, key)
+            del cards[i0:i0 + ncards]
+            if not cards and slot_name != 'rejects':
+                del getattr(self, slot_name)[key]
+                for card_type in list_card_types[(slot_name, key)]:
+                    removed_keys[card_type].add(key)
+
+        for card_type, keys in iteritems(removed_keys):
+            if card_type in self._type_to_id_map:
+                self._type_to_id_map[card_type] = [
+                    key for key in self._type_to_id_map[card_type] if key not in keys]
+
+    def _move_card_list_records(self, card_records, list_indices):
+        # type: (List[Any], Dict[Any, Any]) -> bool
+        """
+        Moves the new cards in each list (e.g., the loads) from the end of
+        the list to where the old cards were
+
+        Parameters
+        ----------
+        card_records : List[(card_name, slot_name, key, card)]
+            the new cards
+        list_indices : Dict[(slot_name, key), (i0, ncards)]
+            the location of the old cards (see ``_get_card_list_indices``)
+
+        Returns
+        -------
+        is_moved : bool
+            False : the location of the new cards is unknown
+        """
+        ncards_by_list = defaultdict(int)
+        for unused_card_name, slot_name, key, unused_card in card_records:
+            if slot_name == 'rejects' or isinstance(getattr(self, slot_name)[key], list):
+                ncards_by_list[(slot_name, key)] += 1
+
+        for slot_key, ncards in iteritems(ncards_by_list):
+            cards = self._get_card_list(*slot_key)
+            if len(cards) == ncards:
+                continue
+            if slot_key not in list_indices:
+                return False
+            i0 = list_indices[slot_key][0]
+            new_cards = cards[-ncards:]
+            del cards[-ncards:]
+            cards[i0:i0] = new_cards
+        return True
+
+    def _replace_include_lines(self, deck, block):
+        # type: (Dict[str, Any], Any) -> None
+        """
+        Replaces the include_tree and include_line_ranges of an INCLUDE
+        file that was read again
+
+        Parameters
+        ----------
+        deck : Dict[str, varies]
+            see ``_read_include_deck``
+        block : (istart, iend)
+            the old lines of the file (see ``get_include_blocks``)
+        """
+        istart0, iend0 = block
+        root = deck['root']
+        delta = deck['nlines'] - (iend0 - istart0)
+        old_filenames = get_include_subtree(self.include_tree, root)
+        for filename in old_filenames:
+            del self.include_tree[filename]
+            del self.include_line_ranges[filename]
+
+        for filename, line_ranges in iteritems(self.include_line_ranges):
+            self.include_line_ranges[filename] = [
+                (istart + delta, iend + delta) if istart >= iend0 else (istart, iend)
+                for istart, iend in line_ranges]
+        self.include_tree.update(deck['include_tree'])
+        for filename, line_ranges in iteritems(deck['include_line_ranges']):
+            self.include_line_ranges[filename] = [
+                (istart + istart0, iend + istart0) for istart, iend in line_ranges]
+
+    def _get_model_cache_key(self, lazy=False):
+        # type: (bool) -> str
+        """gets the model cache key from the filename and reader options"""
+        options = [
+            self.punch, self.read_includes, self._encoding, self._nastran_format,
+            self.include_dir, sorted(self.cards_to_read),
+            sorted(self.dict_of_vars.items()) if self._is_dynamic_syntax else None,
+            sorted((key, sorted(values)) for key, values in iteritems(self.values_to_skip)),
+            self._nparse_errors, self._stop_on_parsing_error,
+            self._stop_on_duplicate_error, self.force_echo_off, self._is_cards_dict,
+            None if self._card_types is None else sorted(self._card_types),
+            isinstance(self.nodes, NodeArrayDict), lazy,
+        ]
+        return get_cache_key(self.bdf_filename, options)
+
+    def _load_model_cache(self, cache_dir, cache_key):
+        # type: (str, str) -> bool
+        """
+        Loads the parsed model from the cache
+
+        Returns
+        -------
+        is_loaded : bool
+            False : the cache file doesn't exist or one of the files changed
+        """
+        cache_filename = get_cache_filename(cache_dir, cache_key)
+        state = load_model_cache(cache_filename, cache_key)
+        if state is None:
+            return False
+
+        lazy_card_dicts = state.pop('_lazy_card_dicts')
+        self.__dict__.update(state)
+        for attr, (is_list, card_dict) in iteritems(lazy_card_dicts):
+            lazy_dict = LazyCardDict(self._build_lazy_card, is_list=is_list)
+            lazy_dict.update_raw(card_dict)
+            setattr(self, attr, lazy_dict)
+        self.case_control_deck = CaseControlDeck(self.case_control_lines, self.log)
+        self.case_control_deck.solmap_to_value = self._solmap_to_value
+        self.case_control_deck.rsolmap_to_str = self.rsolmap_to_str
+        self.log.debug('loaded the model cache %s' % cache_filename)
+        return True
+
+    def _save_model_cache(self, cache_dir, cache_key):
+        # type: (str, str) -> None
+        """Saves the parsed model to the cache and evicts old cache files"""
+        keys_to_skip = [
+            'log', 'case_control_deck', '_lazy_cards',
+            '_card_parser', '_card_parser_b', '_card_parser_prepare',
+        ]
+        state = {key: value for key, value in iteritems(self.__dict__)
+                 if key not in keys_to_skip}
+
+        # pickling a LazyCardDict builds the cards, so the LazyCards are
+        # pickled instead
+        state['_lazy_card_dicts'] = lazy_card_dicts = {}
+        for key, value in iteritems(self.__dict__):
+            if isinstance(value, LazyCardDict):
+                lazy_card_dicts[key] = (value.is_list, dict(value.raw_items()))
+                del state[key]
+
+        cache_filename = get_cache_filename(cache_dir, cache_key)
+        fingerprints = get_file_fingerprints(
+            [filename for filename in self.include_tree if filename is not None],
+            file_stats=self._file_stats)
+        if fingerprints is None:
+            # the cards may be from the old file
+            self.log.warning('a file changed while the model was read; '
+                             'the model cache %s was not saved' % cache_filename)
+            return
+        try:
+            save_model_cache(cache_filename, cache_key, fingerprints, state)
+        except Exception as error:
+            # the model can't be pickled (e.g., a card with a function)
+            # or the cache directory isn't writeable; the model is fine
+            self.log.warning('unable to save the model cache %s\n%s' % (
+                cache_filename, str(error)))
+            return
+        deleted_filenames = evict_model_cache(cache_dir, keep=cache_filename)
+        self.log.debug('saved the model cache %s; deleted %i old cache files' % (
+            cache_filename, len(deleted_filenames)))
 
     def _read_bdf_helper(self, bdf_filename, encoding, punch, read_includes):
         """creates the file loading if bdf_filename is None"""
@@ -1408,18 +2163,51 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
                 if is_error and self._stop_on_xref_error:
                     raise CrossReferenceError(msg.rstrip())
 
-    def get_bdf_cards(self, bulk_data_lines):
+    def get_bdf_cards(self, bulk_data_lines, card_ilines=None):
         """Parses the BDF lines into a list of card_lines"""
-        cards = []
-        #cards = defaultdict(list)
         card_count = defaultdict(int)
+        cards = list(self._stream_bdf_cards(bulk_data_lines, card_count,
+                                            nlines=len(bulk_data_lines),
+                                            card_ilines=card_ilines))
+        return cards, card_count
+
+    def _stream_bdf_cards(self, bulk_data_lines, card_count, nlines=None, card_ilines=None):
+        """
+        Parses the BDF lines into card_lines one card at a time
+
+        Parameters
+        ----------
+        bulk_data_lines : List[str] / iterator
+            the bulk data lines
+        card_count : Dict[str, int]
+            the number of each card type; updated as cards are found
+        nlines : int; default=None
+            the number of bulk data lines (used to report the number of
+            lines after the ENDDATA); None for an iterator
+        card_ilines : List[int]; default=None
+            the index of the first line of each card (and the ENDDATA)
+            is appended to this list
+
+        Cards that aren't in ``self._card_types`` are skipped.
+
+        Yields
+        ------
+        card : [card_name, comment, card_lines]
+            the data needed to create the card
+        """
+        #cards = defaultdict(list)
         full_comment = ''
         card_lines = []
         old_card_name = None
         backup_comment = ''
-        nlines = len(bulk_data_lines)
+        card_types = self._card_types
+        is_skipped = False
 
         for i, line in enumerate(bulk_data_lines):
+            if is_skipped and line[:1] in SKIPPED_CONTINUATION_CHARS:
+                # the continuation line of a skipped card
+                backup_comment = ''
+                continue
             #print('    backup=%r' % backup_comment)
             comment = ''
             if '$' in line:
@@ -1437,9 +2225,9 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
                     # new list version
                     #if full_comment:
                         #print('full_comment = ', full_comment)
-                    cards.append([old_card_name, _prep_comment(full_comment), card_lines])
-
                     card_count[old_card_name] += 1
+                    yield [old_card_name, _prep_comment(full_comment), card_lines]
+
                     card_lines = []
                     full_comment = ''
 
@@ -1448,16 +2236,34 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
                     elif old_card_name == 'ECHOOFF':
                         self.echo = False
                 old_card_name = card_name.rstrip(' *')
+                is_skipped = (card_types is not None and old_card_name not in card_types and
+                              old_card_name != 'ENDDATA')
+                if is_skipped:
+                    # the comments before the skipped card are part of its comment
+                    old_card_name = None
+                    backup_comment = ''
+                    continue
+                if card_ilines is not None:
+                    card_ilines.append(i)
                 if old_card_name == 'ENDDATA':
                     self.card_count['ENDDATA'] = 1
-                    if nlines - i > 1:
+                    if nlines is None:
+                        self.log.debug('exiting due to ENDDATA found')
+                    elif nlines - i > 1:
                         nleftover = nlines - i - 1
                         msg = 'exiting due to ENDDATA found with %i lines left' % nleftover
                         self.log.debug(msg)
-                    return cards, card_count
+                    return
                 #print("card_name = %s" % card_name)
 
             comment = _clean_comment(comment)
+            if is_skipped:
+                if line.rstrip():
+                    backup_comment = ''
+                elif comment:
+                    backup_comment += comment + '\n'
+                continue
+
             if line.rstrip():
                 card_lines.append(line)
                 if backup_comment:
@@ -1487,10 +2293,9 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
             # new list version
             #if backup_comment + full_comment:
                 #print('backup_comment + full_comment = ', backup_comment + full_comment)
-            cards.append([old_card_name, _prep_comment(backup_comment + full_comment), card_lines])
             card_count[old_card_name] += 1
+            yield [old_card_name, _prep_comment(backup_comment + full_comment), card_lines]
         self.echo = False
-        return cards, card_count
 
     def get_bdf_cards_dict(self, bulk_data_lines):
         """Parses the BDF lines into a list of card_lines"""
@@ -2844,21 +3649,119 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         #return self.get_displacement_index_xyz_cp_cd(cid=cid, fdtype=dtype)[2]
         npoints, nids, all_nodes = self._get_npoints_nids_allnids()
         xyz_cid0 = np.zeros((npoints, 3), dtype=fdtype)
-        if cid == 0:
-            for i, nid in enumerate(nids):
-                node = self.nodes[nid]
-                xyz = node.get_position()
-                xyz_cid0[i, :] = xyz
-        else:
-            for i, nid in enumerate(nids):
-                node = self.nodes[nid]
-                xyz = node.get_position_wrt(self, cid)
-                xyz_cid0[i, :] = xyz
+        if isinstance(self.nodes, NodeArrayDict):
+            # the nodes are in the same order as self.node_ids
+            xyz_cid0[:len(nids), :] = self.nodes.get_xyz_in_coord(self, cid=cid, fdtype=fdtype)
+        elif len(nids):
+            nodes = [self.nodes[nid] for nid in nids]
+            xyz_cp = np.array([node.xyz for node in nodes], dtype='float64')
+            cps = np.array([node.Cp() for node in nodes], dtype='int32')
+            xyz_cid0[:len(nids), :] = self.get_coord_transforms().xyz_cp_to_xyz_cid(
+                xyz_cp, cps, cid=cid)
         if sort_ids:
             isort = np.argsort(all_nodes)
             xyz_cid0 = xyz_cid0[isort, :]
         return xyz_cid0
 
+    def get_coord_transforms(self):
+        # type: () -> CoordTransforms
+        """
+        Gets the origins and transformation matrices of the coordinate
+        systems, which are used to transform the points/vectors of many
+        nodes at once.  The transforms are cached and are rebuilt when
+        the coordinate systems change.
+
+        Returns
+        -------
+        coord_transforms : CoordTransforms()
+            the transforms (see ``CoordTransforms.xyz_cp_to_xyz_cid``,
+            ``CoordTransforms.cd_to_global``)
+
+        .. note:: the model doesn't need to be cross-referenced
+
+        Examples
+        --------
+        >>> transforms = model.get_coord_transforms()
+        >>> xyz_cid0 = transforms.xyz_cp_to_global(xyz_cp, cps)
+        >>> xyz_cid = transforms.global_to_xyz_cid(xyz_cid0, cid=10)
+        """
+        coord_transforms = self._coord_transforms
+        if coord_transforms is None or not coord_transforms.is_valid(self):
+            coord_transforms = CoordTransforms(self)
+            self._coord_transforms = coord_transforms
+        return coord_transforms
+
+    def get_topology(self):
+        # type: () -> MeshTopology
+        """
+        Gets the node -> element, element -> node, edge -> element and
+        face -> element connectivity of the elements as CSR arrays.  The
+        topology is cached and is rebuilt when elements are added, removed
+        or replaced or when the nodes of an element are changed.
+
+        Returns
+        -------
+        topology : MeshTopology()
+            the connectivity (see ``MeshTopology.nids``,
+            ``MeshTopology.edges``, ``MeshTopology.faces``)
+
+        .. note:: the model doesn't need to be cross-referenced
+
+        Examples
+        --------
+        >>> topology = model.get_topology()
+        >>> free_edges = topology.get_free_edges()
+        """
+        topology = self._topology
+        if topology is None or not topology.is_valid(self):
+            topology = MeshTopology(self)
+            self._topology = topology
+        return topology
+
+    def spatial_index(self):
+        # type: () -> SpatialIndex
+        """
+        Gets the spatial index of the nodes (a KD-tree) and the elements
+        (a bounding volume hierarchy of the element bounding boxes), which
+        is used for bulk proximity queries.  The index is cached and is
+        rebuilt when the elements, the nodes or the coordinate systems are
+        added/removed/replaced or when a node is moved.  The trees are
+        built when they're first used.
+
+        Returns
+        -------
+        spatial_index : SpatialIndex()
+            the index (see ``SpatialIndex.get_closest_nodes``,
+            ``SpatialIndex.get_elements_in_box``,
+            ``SpatialIndex.get_elements_in_radius``,
+            ``SpatialIndex.get_elements_containing_points``,
+            ``SpatialIndex.get_elements_intersecting_planes``)
+
+        .. note:: the model doesn't need to be cross-referenced
+
+        Examples
+        --------
+        >>> index = model.spatial_index()
+        >>> nids, distances = index.get_closest_nodes([[0., 0., 0.], [1., 0., 0.]])
+        >>> ipoints, eids = index.get_elements_containing_points(xyz, tol=1e-3)
+        """
+        spatial_index = self._spatial_index
+        if spatial_index is None or not spatial_index.is_valid(self):
+            spatial_index = SpatialIndex(self)
+            self._spatial_index = spatial_index
+        return spatial_index
+
+    def clear_mesh_caches(self):
+        # type: () -> None
+        """
+        Clears the cached topology (see ``get_topology``) and spatial
+        index (see ``spatial_index``), so they're rebuilt the next time
+        that they're used.  The caches are checked each time that they're
+        used, so this only frees the memory.
+        """
+        self._topology = None
+        self._spatial_index = None
+
     def _add_card_helper(self, card_obj, card, card_name, comment=''):
         # type: (BDFCard, List[str], str, str) -> None
         """
@@ -2907,13 +3810,7 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
                 #tpl/cc451.bdf
                 #raise
                 # NameErrors should be caught
-                self._iparse_errors += 1
-                #self.log.error(card_obj)
-                var = traceback.format_exception_only(type(exception), exception)
-                self._stored_parse_errors.append((card, var))
-                if self._iparse_errors > self._nparse_errors:
-                    self.pop_parse_errors()
-                #raise
+                self._store_parse_error(card, exception)
             #except AssertionError as exception:
                 #self.log.error(card_obj)
 
@@ -2940,6 +3837,15 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
             #raise RuntimeError(card_obj)
             self.reject_cards.append(card_obj)
 
+    def _store_parse_error(self, card, exception):
+        """stores a card parsing error; must be called from an except block"""
+        self._iparse_errors += 1
+        #self.log.error(card_obj)
+        var = traceback.format_exception_only(type(exception), exception)
+        self._stored_parse_errors.append((card, var))
+        if self._iparse_errors > self._nparse_errors:
+            self.pop_parse_errors()
+
     def get_bdf_stats(self, return_type='string'):
         # type: (str) -> Union[str, List[str]]
         """
@@ -3264,14 +4170,30 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         i = 0
         xyz_cp = np.zeros((nnodes + nspoints + nepoints, 3), dtype=fdtype)
         nid_cp_cd = np.zeros((nnodes + nspoints + nepoints, 3), dtype=idtype)
-        for nid, node in sorted(iteritems(self.nodes)):
-            cd = node.Cd()
-            cp = node.Cp()
-            nids_cp_transform[cp].append(nid)
-            nids_cd_transform[cd].append(nid)
-            nid_cp_cd[i, :] = [nid, cp, cd]
-            xyz_cp[i, :] = node.xyz
-            i += 1
+        if isinstance(self.nodes, NodeArrayDict):
+            nodes = self.nodes
+            isort = np.argsort(nodes.node_ids, kind='mergesort')
+            nids = nodes.node_ids[isort]
+            cps = nodes.cp[isort]
+            cds = nodes.cd[isort]
+            for cp in np.unique(cps).tolist():
+                nids_cp_transform[cp] = nids[cps == cp]
+            for cd in np.unique(cds).tolist():
+                nids_cd_transform[cd] = nids[cds == cd]
+            nid_cp_cd[:nnodes, 0] = nids
+            nid_cp_cd[:nnodes, 1] = cps
+            nid_cp_cd[:nnodes, 2] = cds
+            xyz_cp[:nnodes, :] = nodes.xyz[isort, :]
+            i = nnodes
+        else:
+            for nid, node in sorted(iteritems(self.nodes)):
+                cd = node.Cd()
+                cp = node.Cp()
+                nids_cp_transform[cp].append(nid)
+                nids_cd_transform[cd].append(nid)
+                nid_cp_cd[i, :] = [nid, cp, cd]
+                xyz_cp[i, :] = node.xyz
+                i += 1
         if nspoints:
             for nid in sorted(spoints):
                 nid_cp_cd[i, 0] = nid
@@ -3297,13 +4219,13 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
             if cd in [0, -1]:
                 continue
             nids = np.array(nids)
-            icd_transform[cd] = np.where(np.in1d(nids_all, nids))[0]
+            icd_transform[cd] = np.where(np.isin(nids_all, nids))[0]
 
         for cp, nids in sorted(iteritems(nids_cp_transform)):
             if cp in [-1]:
                 continue
             nids = np.array(nids)
-            icp_transform[cp] = np.where(np.in1d(nids_all, nids))[0]
+            icp_transform[cp] = np.where(np.isin(nids_all, nids))[0]
         return icd_transform, icp_transform, xyz_cp, nid_cp_cd
 
     def transform_xyzcp_to_xyz_cid(self, xyz_cp, nids, icp_transform,
@@ -3336,6 +4258,11 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
 
         F:\work\pyNastran\examples\femap_examples\Support\nast\tpl\heli112em7.dat
         """
+        if not self.is_bdf_vectorized:
+            # the coordinate systems are resolved once (see get_coord_transforms)
+            return self.get_coord_transforms().icp_transform_to_xyz_cid(
+                xyz_cp, icp_transform, cid=cid, in_place=in_place)
+
         if self.is_bdf_vectorized:
             # this is used when xref=False (only for vectorized=True)
             # we now require nids, where the other approach
@@ -3755,6 +4682,44 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         system_lines, executive_control_lines, case_control_lines, bulk_data_lines = out
         return system_lines, executive_control_lines, case_control_lines, bulk_data_lines
 
+    def _get_lines_streaming(self, bdf_filename, history, punch=False):
+        """
+        Opens the bdf and splits the lines by group without storing
+        the bulk data lines
+
+        Parameters
+        ----------
+        bdf_filename : str
+            the main bdf_filename
+        history : List[str] / deque
+            stores the recent lines for the crash dumps
+        punch : bool; default=False
+            is this a punch file
+            True : no executive/case control decks
+            False : executive/case control decks exist
+
+        Returns
+        -------
+        system_lines : List[str]
+            the system control lines (typically empty; used for alters)
+        executive_control_lines : List[str]
+            the executive control lines (stores SOL 101)
+        case_control_lines : List[str]
+            the case control lines (stores subcases)
+        bulk_data_lines : iterator
+            the bulk data lines (stores geometry, boundary conditions, loads, etc.)
+        """
+        if hasattr(bdf_filename, 'read') and hasattr(bdf_filename, 'write'):
+            main_lines = cast(StringIO, bdf_filename)
+            main_file = None
+        else:
+            # the directory of the 1st BDF (include BDFs are relative to this one)
+            self.include_dir = os.path.dirname(os.path.abspath(bdf_filename))
+            main_file = self._open_file(bdf_filename, basename=True)
+            main_lines = main_file
+        all_lines = self._stream_deck_lines(main_lines, history, main_file=main_file)
+        return _stream_lines_to_decks(all_lines, punch)
+
     def _get_main_lines(self, bdf_filename):
         # type: (Union[str, StringIO], bool) -> List[str]
         """
@@ -3795,6 +4760,12 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         """
         Merges the includes into the main deck.
 
+        The INCLUDE files are walked as a stack of open file iterators, so
+        each line is only copied once, regardless of the number of INCLUDEs.
+        The source of each line is stored in ``self.include_line_ranges``
+        and the parent-child relationship of the files in
+        ``self.include_tree``.
+
         Parameters
         ----------
         lines : List[str]
@@ -3805,76 +4776,154 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
         active_lines : List[str]
             all the active lines in the deck
         """
-        nlines = len(lines)
+        all_lines = []  # type: List[str]
+        for unused_line in self._stream_deck_lines(lines, all_lines):
+            pass
 
-        i = 0
-        while i < nlines:
-            try:
-                line = lines[i].rstrip('\r\n\t')
-            except IndexError:
-                break
-            uline = line.upper()
-            if uline.startswith('INCLUDE'):
-                j, include_lines = self._get_include_lines(lines, line, i, nlines)
+        if self.dumplines:
+            self._dump_file('pyNastran_dump.bdf', all_lines, None)
+        return all_lines
+
+    def _stream_deck_lines(self, lines, history, main_file=None, main_filename=None):
+        """
+        Yields the lines of the main deck with the includes merged in.
+
+        Parameters
+        ----------
+        lines : List[str] / file
+            the lines from the main BDF
+        history : List[str] / deque
+            the lines that have been yielded are appended to this object;
+            used for the crash dumps
+        main_file : file; default=None
+            the main BDF file object, which will be closed once it's
+            exhausted
+        main_filename : str; default=None
+            the key of the main file in ``include_tree``; None for the
+            main BDF (used to re-read an INCLUDE file)
+
+        Yields
+        ------
+        line : str
+            the next active line in the deck
+        """
+        nlines = 0
+        if main_filename is None:
+            main_filename = self._get_main_include_key()
+        self.include_tree = {main_filename: []}  # type: Dict[Optional[str], List[str]]
+        self.include_line_ranges = {main_filename: []}  # type: Dict[Optional[str], List[Any]]
+
+        # the stack of [filename, line_iterator, file_object, iline_start]
+        stack = [[main_filename, iter(lines), main_file, 0]]
+        try:
+            while stack:
+                frame = stack[-1]
+                filename, line_iter = frame[:2]
+                try:
+                    line = self._next_include_line(line_iter, filename)
+                except StopIteration:
+                    self._close_include_frame(stack.pop(), nlines)
+                    if stack:
+                        stack[-1][3] = nlines
+                    continue
+
+                uline = line.rstrip('\r\n\t').upper()
+                if not uline.startswith('INCLUDE'):
+                    history.append(line)
+                    nlines += 1
+                    yield line
+                    continue
+
+                include_lines = self._get_include_lines(
+                    line.rstrip('\r\n\t'), line_iter, filename, history)
                 bdf_filename2 = get_include_filename(include_lines, include_dir=self.include_dir)
-                if self.read_includes:
-                    try:
-                        self._open_file_checks(bdf_filename2)
-                    except IOError:
-                        crash_name = 'pyNastran_crash.bdf'
-                        self._dump_file(crash_name, lines, j)
-                        msg = 'There was an invalid filename found while parsing.\n'
-                        msg += 'Check the end of %r\n' % crash_name
-                        msg += 'bdf_filename2 = %r\n' % bdf_filename2
-                        msg += 'abs_filename2 = %r\n' % os.path.abspath(bdf_filename2)
-                        #msg += 'len(bdf_filename2) = %s' % len(bdf_filename2)
-                        print(msg)
-                        raise
-                        #raise IOError(msg)
-
-                    with self._open_file(bdf_filename2, basename=False) as bdf_file:
-                        #print('bdf_file.name = %s' % bdf_file.name)
-                        try:
-                            lines2 = bdf_file.readlines()
-                        except UnicodeDecodeError:
-                            msg = 'Invalid Encoding: encoding=%r.  Fix it by:\n' % self._encoding
-                            msg += '  1.  try a different encoding (e.g., latin1)\n'
-                            msg += "  2.  call read_bdf(...) with `encoding`'\n"
-                            msg += ("  3.  Add '$ pyNastran : encoding=latin1"
-                                    ' (or other encoding) to the top of the main file\n')
-                            raise RuntimeError(msg)
-
-                    #print('lines2 = %s' % lines2)
-                    nlines += len(lines2)
-
-                    #line2 = lines[j].split('$')
-                    #if not line2[0].isalpha():
-                        #print('** %s' % line2)
-
-                    include_comment = '\n$ INCLUDE processed:  %s\n' % bdf_filename2
-                    #for line in lines2:
-                        #print("  ?%s" % line.rstrip())
-                    lines = lines[:i] + [include_comment] + lines2 + lines[j:]
-                    #for line in lines:
-                        #print("  *%s" % line.rstrip())
-                else:
-                    lines = lines[:i] + lines[j:]
+                if not self.read_includes:
                     self.reject_lines.append(include_lines)
                     #self.reject_lines.append(write_include(bdf_filename2))
-            i += 1
+                    continue
 
-        if self.dumplines:
-            self._dump_file('pyNastran_dump.bdf', lines, i)
-        return lines
+                try:
+                    self._open_file_checks(bdf_filename2)
+                except IOError:
+                    crash_name = 'pyNastran_crash.bdf'
+                    self._dump_file(crash_name, list(history) + [
+                        include_line + '\n' for include_line in include_lines], None)
+                    msg = 'There was an invalid filename found while parsing.\n'
+                    msg += 'Check the end of %r\n' % crash_name
+                    msg += 'bdf_filename2 = %r\n' % bdf_filename2
+                    msg += 'abs_filename2 = %r\n' % os.path.abspath(bdf_filename2)
+                    #msg += 'len(bdf_filename2) = %s' % len(bdf_filename2)
+                    print(msg)
+                    raise
+                    #raise IOError(msg)
+
+                include_comment = '\n$ INCLUDE processed:  %s\n' % bdf_filename2
+                history.append(include_comment)
+                nlines += 1
+                yield include_comment
+                self._close_include_range(frame, nlines)
+
+                bdf_file2 = self._open_file(bdf_filename2, basename=False)
+                include_filename = os.path.abspath(os.path.join(self.include_dir, bdf_filename2))
+                self.include_tree[filename].append(include_filename)
+                self.include_tree.setdefault(include_filename, [])
+                self.include_line_ranges.setdefault(include_filename, [])
+                stack.append([include_filename, iter(bdf_file2), bdf_file2, nlines])
+        finally:
+            # only non-empty after a crash or if the generator is closed early
+            self._close_include_files(stack)
+
+    def _get_main_include_key(self):
+        # type: () -> Optional[str]
+        """gets the key of the main file in the include tree"""
+        bdf_filename = getattr(self, 'bdf_filename', None)
+        if isinstance(bdf_filename, string_types):
+            return os.path.abspath(bdf_filename)
+        return None
+
+    def _next_include_line(self, line_iter, filename):
+        # type: (Any, Optional[str]) -> str
+        """gets the next line from a file in the INCLUDE stack"""
+        try:
+            return next(line_iter)
+        except UnicodeDecodeError:
+            msg = 'Invalid Encoding: encoding=%r.  Fix it by:\n' % self._encoding
+            msg += '  1.  try a different encoding (e.g., latin1)\n'
+            msg += "  2.  call read_bdf(...) with `encoding`'\n"
+            msg += ("  3.  Add '$ pyNastran : encoding=latin1"
+                    ' (or other encoding) to the top of the main file\n')
+            msg += 'filename = %r' % filename
+            raise RuntimeError(msg)
 
-    def _get_include_lines(self, lines, line, i, nlines):
+    def _close_include_range(self, frame, iline_end):
+        # type: (List[Any], int) -> None
+        """stores the range of deck lines that came from the file in the frame"""
+        filename, iline_start = frame[0], frame[3]
+        if iline_end > iline_start:
+            self.include_line_ranges[filename].append((iline_start, iline_end))
+
+    def _close_include_frame(self, frame, iline_end):
+        # type: (List[Any], int) -> None
+        """the file in the frame is exhausted, so store the range and close it"""
+        self._close_include_range(frame, iline_end)
+        bdf_file = frame[2]
+        if bdf_file is not None:
+            bdf_file.close()
+
+    def _close_include_files(self, stack):
+        # type: (List[Any]) -> None
+        """closes all the open INCLUDE files (e.g., after a crash)"""
+        for frame in stack:
+            if frame[2] is not None:
+                frame[2].close()
+
+    def _get_include_lines(self, line, line_iter, filename, history):
         """
         gets the lines for the include file
 
         INCLUDE 'Satellite_V02_INCLUDE:Satellite_V02_Panneau_Externe.dat'
         INCLUDE '../../BULK/COORDS/satellite_V02_Coord.blk'
         """
-        j = i + 1
         line_base = line.split('$')[0]
         include_lines = [line_base.strip()]
         if "'" not in line_base:
@@ -3886,14 +4935,13 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
             if line_base.startswith("'") and line_base.endswith("'"):
                 pass
             else:
-                while not line.split('$')[0].endswith("'") and j < nlines:
-                    #print('j=%s nlines=%s less?=%s'  % (j, nlines, j < nlines))
+                while not line.split('$')[0].endswith("'"):
                     try:
-                        line = lines[j].split('$')[0].strip()
-                    except IndexError:
+                        line = self._next_include_line(line_iter, filename).split('$')[0].strip()
+                    except StopIteration:
                         #print('bdf_filename=%r' % bdf_filename)
                         crash_name = 'pyNastran_crash.bdf'
-                        self._dump_file(crash_name, lines, i+1)
+                        self._dump_file(crash_name, list(history) + [include_lines[0] + '\n'], None)
                         msg = 'There was an invalid filename found while parsing (index).\n'
                         msg += 'Check the end of %r\n' % crash_name
                         #msg += 'bdf_filename2 = %r\n' % bdf_filename
@@ -3902,14 +4950,30 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
                      #print('endswith_quote=%s; %r' % (
                          #line.split('$')[0].strip().endswith(""), line.strip()))
                     include_lines.append(line.strip())
-                    j += 1
-                #print('j=%s nlines=%s less?=%s'  % (j, nlines, j < nlines))
-
-                #print('*** %s' % line)
-                #bdf_filename2 = line[7:].strip(" '")
-                #include_lines = [line] + lines[i+1:j]
         #print(include_lines)
-        return j, include_lines
+        return include_lines
+
+    def get_include_filename_by_line(self, iline):
+        # type: (int) -> Optional[str]
+        """
+        Gets the file that a line of the merged deck came from
+
+        Parameters
+        ----------
+        iline : int
+            the 0-based index of the line in the merged deck
+            (see ``include_line_ranges``)
+
+        Returns
+        -------
+        filename : str / None
+            the absolute path to the file (None for a StringIO main file)
+        """
+        for filename, line_ranges in iteritems(self.include_line_ranges):
+            for iline_start, iline_end in line_ranges:
+                if iline_start <= iline < iline_end:
+                    return filename
+        raise IndexError('iline=%s is not in the deck' % iline)
 
     def _dump_file(self, bdf_dump_filename, lines, i):
         # type: (str, List[str], int) -> None
@@ -3922,8 +4986,8 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
             the bdf filename to dump
         lines : List[str]
             the entire list of lines
-        i : int
-            the last index to write
+        i : int / None
+            the last index to write (None -> write all the lines)
         """
         with codec_open(_filename(bdf_dump_filename),
                         'w', encoding=self._encoding) as crash_file:
@@ -4016,6 +5080,8 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
 
         self.log.debug('opening %r' % bdf_filename_inc)
         self.active_filenames.append(bdf_filename_inc)
+        self._file_stats[os.path.abspath(bdf_filename_inc)] = get_file_stat(
+            _filename(bdf_filename_inc))
 
         #print('ENCODING - _open_file=%r' % self._encoding)
         bdf_file = codec_open(_filename(bdf_filename_inc), 'r', encoding=self._encoding)
@@ -4062,11 +5128,18 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
             elif not os.path.isfile(_filename(bdf_filename)):
                 raise IOError('Not a file: bdf_filename=%r' % bdf_filename)
 
-    def _parse_cards(self, cards, card_count):
+    def _parse_cards(self, cards, card_count, nprocs=1, card_sources=None):
         """creates card objects and adds the parsed cards to the deck"""
         #print('card_count = %s' % card_count)
 
         self.echo = False
+        if card_sources is not None:
+            self._parse_tracked_cards(cards, card_sources)
+            return
+        if nprocs > 1 and isinstance(cards, list) and self._can_parse_parallel(card_count):
+            self._parse_cards_parallel(cards, nprocs)
+            return
+
         if isinstance(cards, dict): # self._is_cards_dict = True
             for card_name, card in sorted(iteritems(cards)):
                 if self.is_reject(card_name):
@@ -4080,6 +5153,8 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
                                       is_list=False, has_none=False)
         else:
             # this is the block that actually runs
+            lazy_cards = self._lazy_cards
+            fast_cards = self._get_fast_cards()
             for card in cards:
                 card_name, comment, card_lines = card
                 if card_name is None:
@@ -4088,10 +5163,322 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
                     raise RuntimeError(msg)
                 if self.is_reject(card_name):
                     self.reject_card_lines(card_name, card_lines, comment)
+                elif card_name in lazy_cards and self._add_lazy_card(card_name, comment,
+                                                                     card_lines):
+                    pass
+                elif card_name in fast_cards and self._add_fast_card(
+                        card_name, comment, card_lines, fast_cards[card_name]):
+                    pass
                 else:
                     self.add_card(card_lines, card_name, comment=comment,
                                   is_list=False, has_none=False)
 
+    def _parse_tracked_cards(self, cards, card_sources):
+        """
+        Creates the card objects and stores the objects that were created
+        from each INCLUDE file in the ``_include_tracker``
+
+        Parameters
+        ----------
+        cards : List[card_name, comment, card_lines]
+            the cards from ``get_bdf_cards``
+        card_sources : List[str/None]
+            the INCLUDE file of each card; None for the main file
+        """
+        fast_cards = self._get_fast_cards()
+        rslot_map = self.get_rslot_map()
+        tracker = self._include_tracker
+        for card, filename in zip(cards, card_sources):
+            card_name, comment, card_lines = card
+            if card_name is None:
+                msg = 'card_name = %r\n' % card_name
+                msg += 'card_lines = %s' % card_lines
+                raise RuntimeError(msg)
+            if filename is None or filename in tracker.untracked:
+                self._add_card_lines(card_name, comment, card_lines, fast_cards)
+                continue
+
+            card_record = self._add_tracked_card(card_name, comment, card_lines,
+                                                 fast_cards, rslot_map)
+            if card_record is None:
+                tracker.untracked.add(filename)
+            else:
+                tracker.cards[filename].append(card_record)
+
+    def _add_card_lines(self, card_name, comment, card_lines, fast_cards):
+        # type: (str, str, List[str], Dict[str, Any]) -> None
+        """rejects the card or adds it with the fast parser/``add_card``"""
+        if self.is_reject(card_name):
+            self.reject_card_lines(card_name, card_lines, comment)
+        elif card_name in fast_cards and self._add_fast_card(
+                card_name, comment, card_lines, fast_cards[card_name]):
+            pass
+        else:
+            self.add_card(card_lines, card_name, comment=comment,
+                          is_list=False, has_none=False)
+
+    def _add_tracked_card(self, card_name, comment, card_lines, fast_cards, rslot_map):
+        # type: (str, str, List[str], Dict[str, Any], Dict[str, str]) -> Optional[Any]
+        """
+        Adds a card and finds the object that was created
+
+        Returns
+        -------
+        card_record : (card_name, slot_name, key, card) / None
+            card_name : str
+                the name of the card
+            slot_name : str
+                the dictionary the card was added to (e.g., 'elements');
+                'rejects' for rejected cards
+            key : int / str / None
+                the key of the card in the dictionary
+            card : varies
+                the card object
+            None : the card didn't create a single object with the 1st
+                   field as the key (e.g., a duplicate card or a card
+                   with multiple objects)
+        """
+        if self.is_reject(card_name):
+            self.reject_card_lines(card_name, card_lines, comment)
+            return card_name, 'rejects', None, self.rejects[-1]
+
+        slot_name = rslot_map.get(card_name)
+        slot = getattr(self, slot_name, None) if slot_name is not None else None
+        key = get_card_key(card_name, card_lines) if isinstance(slot, dict) else None
+        if key is None:
+            self._add_card_lines(card_name, comment, card_lines, fast_cards)
+            return None
+
+        nkeys = len(slot)
+        value = slot.get(key)
+        nvalues = len(value) if isinstance(value, list) else 0
+        self._add_card_lines(card_name, comment, card_lines, fast_cards)
+
+        value2 = slot.get(key)
+        if isinstance(value2, list):
+            if len(value2) == nvalues + 1 and len(slot) == nkeys + (value is None):
+                return card_name, slot_name, key, value2[-1]
+        elif value is None and value2 is not None and len(slot) == nkeys + 1:
+            return card_name, slot_name, key, value2
+        return None
+
+    def _get_fast_cards(self):
+        # type: () -> Dict[str, Any]
+        """
+        Gets the cards that may be created with the fast parsers.  A card
+        that was replaced in the ``_card_parser`` is parsed with the
+        standard reader.
+
+        Returns
+        -------
+        fast_cards : Dict[str, function]
+            card_name -> add_card_function
+        """
+        fast_cards = {}
+        if self._is_dynamic_syntax:
+            return fast_cards
+
+        for card_name, (card_class, unused_fast_parser) in iteritems(FAST_CARDS):
+            if card_name not in self.cards_to_read:
+                continue
+            if card_class is None:
+                prepare_function = self._card_parser_prepare.get(card_name)
+                prepare_name = '_prepare_%s' % card_name.lower()
+                if getattr(prepare_function, '__name__', None) == prepare_name:
+                    fast_cards[card_name] = self._add_element_object
+            elif card_name in self._card_parser:
+                card_class2, add_card_function = self._card_parser[card_name]
+                if card_class2 is card_class:
+                    fast_cards[card_name] = add_card_function
+        return fast_cards
+
+    def _add_fast_card(self, card_name, comment, card_lines, add_card_function):
+        # type: (str, str, List[str], Any) -> bool
+        """
+        Creates a card with the fast parser and adds it to the model
+
+        Returns
+        -------
+        is_added : bool
+            False : the card must be added with ``add_card``
+        """
+        if self.echo:
+            return False
+        class_instance = fast_card_object(card_name, card_lines, comment)
+        if class_instance is None:
+            return False
+
+        # same as add_card -> _add_card_helper
+        self.increase_card_count(card_name)
+        try:
+            add_card_function(class_instance)
+        except (SyntaxError, AssertionError, KeyError, ValueError) as exception:
+            self._store_parse_error(card_name, exception)
+        return True
+
+    def set_node_arrays(self):
+        # type: () -> NodeArrayDict
+        """
+        Replaces the dictionary of GRIDs (``self.nodes``) with a
+        NodeArrayDict, which stores the nodes in arrays (nid, cp, xyz, cd,
+        ps, seid) and behaves like a dictionary of GRIDs.
+
+        Accessing a node returns a GRIDProxy, so the GRID methods still
+        work, while bulk queries are vectorized:
+
+        .. code-block:: python
+
+          >>> model = BDF()
+          >>> model.read_bdf(bdf_filename, node_arrays=True)
+          >>> xyz_cid0 = model.nodes.get_xyz_in_coord(model, cid=0, nids=nids)
+
+        Returns
+        -------
+        nodes : NodeArrayDict
+            the nodes
+        """
+        if not isinstance(self.nodes, NodeArrayDict):
+            self.nodes = NodeArrayDict(self.nodes)
+        return self.nodes
+
+    def _setup_lazy_cards(self):
+        """
+        Replaces the card dictionaries that support lazy cards with
+        LazyCardDicts and finds the cards that may be stored lazily
+        """
+        add_function_to_attr = {
+            '_add_node_object' : 'nodes',
+            '_add_element_object' : 'elements',
+            '_add_damper_object' : 'elements',
+            '_add_property_object' : 'properties',
+            '_add_structural_material_object' : 'materials',
+            '_add_mass_object' : 'masses',
+            '_add_rigid_element_object' : 'rigid_elements',
+            '_add_load_object' : 'loads',
+        }
+        list_attrs = ['loads']
+
+        if self._is_dynamic_syntax:
+            return
+        for attr in set(itervalues(add_function_to_attr)):
+            card_dict = getattr(self, attr)
+            if isinstance(card_dict, NodeArrayDict):
+                # the GRIDs are stored in the arrays
+                continue
+            if card_dict:
+                msg = 'lazy=True requires an empty model; len(model.%s)=%s' % (
+                    attr, len(card_dict))
+                raise RuntimeError(msg)
+            lazy_dict = LazyCardDict(self._build_lazy_card, is_list=attr in list_attrs)
+            setattr(self, attr, lazy_dict)
+
+        self._lazy_cards = {}
+        for card_name, (card_class, add_card_function) in iteritems(self._card_parser):
+            if add_card_function is None or card_name in SERIAL_CARDS:
+                continue
+            attr = add_function_to_attr.get(add_card_function.__name__)
+            if attr is None or not isinstance(getattr(self, attr), LazyCardDict):
+                continue
+            if getattr(card_class, 'type', None) == card_name:
+                self._lazy_cards[card_name] = attr
+
+    def _add_lazy_card(self, card_name, comment, card_lines):
+        # type: (str, str, List[str]) -> bool
+        """
+        Stores the card as a LazyCard
+
+        Returns
+        -------
+        is_added : bool
+            False : the card must be added with add_card because the ID
+                    is invalid or is a duplicate
+        """
+        line0 = card_lines[0]
+        try:
+            if ',' in line0 or '\t' in line0 or '*' in line0[:8]:
+                key = int(to_fields(card_lines[:1], card_name)[1])
+            else:
+                # small field
+                key = int(line0[8:16])
+        except (IndexError, ValueError):
+            return False
+        if key <= 0:
+            return False
+        card_dict = getattr(self, self._lazy_cards[card_name])
+        if not card_dict.is_list and key in card_dict:
+            return False
+
+        if card_dict.add_lazy_card(key, LazyCard(card_name, comment, card_lines)):
+            self._type_to_id_map[card_name].append(key)
+        self.increase_card_count(card_name)
+        return True
+
+    def _build_lazy_card(self, lazy_card):
+        """creates the card object from a LazyCard"""
+        card_name = lazy_card.type
+        card_class = self._card_parser[card_name][0]
+        if card_name in FAST_CARDS and FAST_CARDS[card_name][0] is card_class:
+            card = fast_card_object(card_name, lazy_card.card_lines, lazy_card.comment)
+            if card is not None:
+                return card
+        fields = to_fields(lazy_card.card_lines, card_name)
+        card = wipe_empty_fields(fields)
+        card_obj = BDFCard(card, has_none=False)
+        return card_class.add_card(card_obj, comment=lazy_card.comment)
+
+    def _can_parse_parallel(self, card_count):
+        """
+        The cards are parsed serially if the echo or OpenMDAO dynamic
+        syntax flags could change the way a card is parsed.
+        """
+        if self._is_dynamic_syntax:
+            return False
+        is_echo = 'ECHOON' in card_count and not self.force_echo_off
+        return not is_echo
+
+    def _parse_cards_parallel(self, cards, nprocs):
+        """
+        Creates the card objects for the most common cards in a process
+        pool and adds them to the deck in the original card order.  Cards
+        that can't be sent to a worker (rejected cards, cards that require
+        a _prepare method, DEQATN, etc.) are parsed in this process.
+        """
+        card_classes = {
+            card_name: card_class
+            for card_name, (card_class, unused_add_card_function) in iteritems(self._card_parser)
+            if card_name in self.cards_to_read
+        }
+        chunks = get_parallel_card_chunks(cards, card_classes, nprocs)
+        self.log.debug('parsing %i card chunks with nprocs=%i' % (len(chunks), nprocs))
+        parsed_cards = parse_card_chunks(chunks, nprocs, card_classes)
+
+        for icard, (card_name, comment, card_lines) in enumerate(cards):
+            if card_name is None:
+                msg = 'card_name = %r\n' % card_name
+                msg += 'card_lines = %s' % card_lines
+                raise RuntimeError(msg)
+
+            if icard not in parsed_cards:
+                if self.is_reject(card_name):
+                    self.reject_card_lines(card_name, card_lines, comment)
+                else:
+                    self.add_card(card_lines, card_name, comment=comment,
+                                  is_list=False, has_none=False)
+                continue
+
+            # same as add_card -> _add_card_helper
+            class_instance = parsed_cards.pop(icard)
+            self.increase_card_count(card_name)
+            add_card_function = self._card_parser[card_name][1]
+            try:
+                if isinstance(class_instance, Exception):
+                    raise class_instance
+                add_card_function(class_instance)
+            except TypeError:
+                pass
+            except (SyntaxError, AssertionError, KeyError, ValueError) as exception:
+                self._store_parse_error(card_name, exception)
+
     def _parse_dynamic_syntax(self, key):
         """
         Applies the dynamic syntax for %varName
@@ -0,0 +1,419 @@
+# coding: utf-8
+"""
+Defines the vectorized cross-referencing used by ``BDF.cross_reference``:
+  - IdTable
+  - bulk_cross_reference_elements(model, elements)
+  - bulk_cross_reference_properties(model, properties)
+  - get_node_elements(elements)
+
+The ids that are referenced by the cards of a type (e.g., the nodes and
+properties of the CQUAD4s) are collected into arrays and checked in one
+pass against sorted arrays of the ids in the model.  The ``*_ref``
+attributes of the valid cards are then set in a tight loop.  A card with a
+missing reference (or an unsupported card type) is returned, so it can be
+cross-referenced with its ``cross_reference`` method, which creates the
+standard error message.
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+from collections import defaultdict
+from six import iteritems, itervalues
+import numpy as np
+
+from pyNastran.utils import integer_types
+from pyNastran.bdf.bdf_interface.node_array import NodeArrayDict
+from pyNastran.bdf.cards.elements.shell import CTRIA3, CQUAD4
+from pyNastran.bdf.cards.elements.solid import (
+    CTETRA4, CTETRA10, CPENTA6, CPENTA15, CHEXA8, CHEXA20, CPYRAM5, CPYRAM13)
+from pyNastran.bdf.cards.elements.bars import CBAR
+from pyNastran.bdf.cards.properties.shell import PSHELL, PSHEAR
+from pyNastran.bdf.cards.properties.solid import PSOLID
+from pyNastran.bdf.cards.properties.bars import PBAR
+from pyNastran.bdf.cards.properties.beam import PBEAM
+from pyNastran.bdf.cards.properties.rods import PROD
+
+#: the elements with nodes_ref/pid_ref -> are blank nodes allowed
+NODE_PID_ELEMENTS = {
+    CTRIA3 : False,
+    CQUAD4 : False,
+    CTETRA4 : False,
+    CPENTA6 : False,
+    CHEXA8 : False,
+    CTETRA10 : True,
+    CPENTA15 : True,
+    CHEXA20 : True,
+    CPYRAM5 : True,
+    CPYRAM13 : True,
+}
+
+#: the elements with a theta_mcid_ref
+THETA_MCID_ELEMENTS = (CTRIA3, CQUAD4)
+
+#: the properties with a mid_ref
+MID_PROPERTIES = (PSOLID, PSHEAR, PBAR, PBEAM, PROD)
+
+#: the material fields of a PSHELL
+PSHELL_MIDS = ('mid1', 'mid2', 'mid3', 'mid4')
+
+
+class IdTable(object):
+    """
+    The sorted ids of a series of card dictionaries (e.g., the nodes,
+    SPOINTs and EPOINTs) and their objects
+    """
+    def __init__(self, card_dicts):
+        # type: (List[Dict[int, Any]]) -> None
+        """
+        Creates an IdTable
+
+        Parameters
+        ----------
+        card_dicts : List[Dict[int, card]]
+            the card dictionaries; an id in an earlier dictionary takes
+            precedence (like ``BDF.Node``)
+        """
+        ids = []
+        objects = []
+        for card_dict in card_dicts:
+            if isinstance(card_dict, NodeArrayDict):
+                ids.extend(card_dict.node_ids.tolist())
+            else:
+                ids.extend(card_dict.keys())
+            objects.extend(itervalues(card_dict))
+
+        ids = _get_id_array(ids) if ids else np.zeros(0, dtype='int64')
+
+        #: are the keys integers
+        self.is_valid = ids is not None and ids.ndim == 1
+        if not self.is_valid:
+            ids = np.zeros(0, dtype='int64')
+            objects = []
+
+        # the first occurrence of each id
+        self.ids, ifirst = np.unique(ids, return_index=True)
+
+        # the last object is for blank ids
+        nids = len(self.ids)
+        self.objects = np.empty(nids + 1, dtype='object')
+        for i, iobject in enumerate(ifirst.tolist()):
+            self.objects[i] = objects[iobject]
+        self.iblank = nids
+
+    def lookup(self, ids, allow_blank=False):
+        # type: (np.ndarray, bool) -> Tuple[np.ndarray, np.ndarray]
+        """
+        Finds a series of ids
+
+        Parameters
+        ----------
+        ids : (n, ...) int ndarray
+            the ids
+        allow_blank : bool; default=False
+            an id of 0 is blank (the object is None)
+
+        Returns
+        -------
+        index : (n, ...) int ndarray
+            the index into objects
+        is_valid : (n, ...) bool ndarray
+            does the id exist (or is it blank)
+        """
+        nids = len(self.ids)
+        if nids:
+            index = np.minimum(np.searchsorted(self.ids, ids), nids - 1)
+            is_valid = self.ids[index] == ids
+        else:
+            index = np.zeros(ids.shape, dtype='int64')
+            is_valid = np.zeros(ids.shape, dtype='bool')
+        if allow_blank:
+            is_blank = ids == 0
+            index[is_blank] = self.iblank
+            is_valid |= is_blank
+        index[~is_valid] = self.iblank
+        return index, is_valid
+
+
+def _get_id_array(values, allow_blank=False):
+    # type: (List[Any], bool) -> Optional[np.ndarray]
+    """
+    Converts a list of ids (or lists of ids) to an int array
+
+    Returns
+    -------
+    ids : int ndarray / None
+        None : a value isn't an integer (or a list has a different length)
+    """
+    try:
+        if allow_blank:
+            # None -> nan -> 0
+            ids = np.array(values, dtype='float64')
+            ids[np.isnan(ids)] = 0.
+            if ids.size and not np.array_equal(ids, np.floor(ids)):
+                return None
+            return ids.astype('int64')
+        ids = np.array(values)
+    except (TypeError, ValueError):
+        return None
+    if ids.dtype.kind not in 'iu':
+        return None
+    return ids
+
+
+def _get_id_columns(cards, names, allow_blank=False):
+    # type: (List[Any], List[str], bool) -> Optional[np.ndarray]
+    """
+    Gets the (ncards, nnames) ids of a series of attributes of the cards
+
+    The ids are filled into the array one attribute at a time, so a list
+    isn't created for each card.
+
+    Returns
+    -------
+    ids : (ncards, nnames) int ndarray / None
+        None : an id isn't an integer
+    """
+    ids = np.zeros((len(cards), len(names)), dtype='int64')
+    for i, name in enumerate(names):
+        idsi = _get_id_array([getattr(card, name) for card in cards], allow_blank=allow_blank)
+        if idsi is None or idsi.ndim != 1:
+            return None
+        ids[:, i] = idsi
+    return ids
+
+
+def _group_cards(cards, supported_classes):
+    # type: (Any, Any) -> Tuple[Dict[type, List[Any]], List[Any]]
+    """groups the cards by class; the other cards are unsupported"""
+    groups = defaultdict(list)  # type: Dict[type, List[Any]]
+    unsupported = []
+    for card in cards:
+        card_class = card.__class__
+        if card_class in supported_classes:
+            groups[card_class].append(card)
+        else:
+            unsupported.append(card)
+    return groups, unsupported
+
+
+def _get_element_node_ids(card_class, elements):
+    # type: (type, List[Any]) -> Optional[np.ndarray]
+    """gets the (nelements, nnodes) node ids of a group of elements"""
+    if card_class is CBAR:
+        return _get_id_columns(elements, ['ga', 'gb'])
+    return _get_id_array([elem.nodes for elem in elements],
+                         allow_blank=NODE_PID_ELEMENTS[card_class])
+
+
+def bulk_cross_reference_elements(model, elements):
+    # type: (Any, Any) -> List[Any]
+    """
+    Cross-references the nodes/property of the CQUAD4, CTRIA3, solid and
+    CBAR elements
+
+    Parameters
+    ----------
+    model : BDF()
+        the BDF object
+    elements : List[Element]
+        the elements
+
+    Returns
+    -------
+    elements : List[Element]
+        the elements that weren't cross-referenced (an unsupported type or
+        a missing reference)
+    """
+    supported_classes = set(NODE_PID_ELEMENTS)
+    supported_classes.add(CBAR)
+    groups, unsupported = _group_cards(elements, supported_classes)
+    if not groups:
+        return unsupported
+
+    node_table = IdTable([model.nodes, model.spoints, model.epoints])
+    property_table = IdTable([model.properties])
+    if not node_table.is_valid or not property_table.is_valid:
+        return list(elements)
+
+    coords = model.coords
+    for card_class, elems in sorted(iteritems(groups), key=lambda item: item[0].__name__):
+        allow_blank = NODE_PID_ELEMENTS.get(card_class, False)
+        nids = _get_element_node_ids(card_class, elems)
+        pids = _get_id_array([elem.pid for elem in elems])
+        if nids is None or pids is None or nids.ndim != 2 or pids.ndim != 1:
+            unsupported.extend(elems)
+            continue
+
+        inode, is_valid_node = node_table.lookup(nids, allow_blank=allow_blank)
+        iprop, is_valid = property_table.lookup(pids)
+        is_valid &= is_valid_node.all(axis=1)
+        if card_class is CBAR and model.is_nx:
+            is_valid &= np.array([elem.offt == 'GGG' for elem in elems])
+
+        ivalid = np.where(is_valid)[0]
+        unsupported.extend(elems[i] for i in np.where(~is_valid)[0])
+        nodes_ref = node_table.objects[inode[ivalid, :]].tolist()
+        properties_ref = property_table.objects[iprop[ivalid]].tolist()
+        valid_elements = [elems[i] for i in ivalid]
+
+        if card_class is CBAR:
+            for elem, (ga_ref, gb_ref), pid_ref in zip(valid_elements, nodes_ref,
+                                                       properties_ref):
+                elem.ga_ref = ga_ref
+                elem.gb_ref = gb_ref
+                elem.pid_ref = pid_ref
+        elif card_class in THETA_MCID_ELEMENTS:
+            for elem, node_ref, pid_ref in zip(valid_elements, nodes_ref, properties_ref):
+                theta_mcid = elem.theta_mcid
+                if isinstance(theta_mcid, integer_types):
+                    if theta_mcid not in coords:
+                        unsupported.append(elem)
+                        continue
+                    elem.theta_mcid_ref = coords[theta_mcid]
+                elem.nodes_ref = node_ref
+                elem.pid_ref = pid_ref
+        else:
+            for elem, node_ref, pid_ref in zip(valid_elements, nodes_ref, properties_ref):
+                elem.nodes_ref = node_ref
+                elem.pid_ref = pid_ref
+    return unsupported
+
+
+def bulk_cross_reference_properties(model, properties):
+    # type: (Any, Any) -> List[Any]
+    """
+    Cross-references the materials of the PSHELL, PSOLID, PSHEAR, PBAR,
+    PBEAM and PROD properties
+
+    Parameters
+    ----------
+    model : BDF()
+        the BDF object
+    properties : List[Property]
+        the properties
+
+    Returns
+    -------
+    properties : List[Property]
+        the properties that weren't cross-referenced (an unsupported type
+        or a missing reference)
+    """
+    supported_classes = set(MID_PROPERTIES)
+    supported_classes.add(PSHELL)
+    groups, unsupported = _group_cards(properties, supported_classes)
+    if not groups:
+        return unsupported
+
+    material_table = IdTable([model.materials, model.thermal_materials])
+    if not material_table.is_valid:
+        return list(properties)
+
+    for card_class, props in sorted(iteritems(groups), key=lambda item: item[0].__name__):
+        if card_class is PSHELL:
+            # blank/0 materials (and mid2=-1) aren't referenced
+            mids = _get_id_columns(props, PSHELL_MIDS, allow_blank=True)
+            if mids is not None:
+                mids[:, 1][mids[:, 1] == -1] = 0
+        else:
+            mids = _get_id_columns(props, ['mid'])
+        if mids is None:
+            unsupported.extend(props)
+            continue
+
+        imid, is_valid = material_table.lookup(mids, allow_blank=card_class is PSHELL)
+        is_valid = is_valid.all(axis=1)
+        ivalid = np.where(is_valid)[0]
+        unsupported.extend(props[i] for i in np.where(~is_valid)[0])
+        mids_ref = material_table.objects[imid[ivalid, :]].tolist()
+        if card_class is PSHELL:
+            is_mids = (mids[ivalid, :] != 0).tolist()
+            for i, mids_refi, is_mid in zip(ivalid.tolist(), mids_ref, is_mids):
+                prop = props[i]
+                for mid_name, mid_ref, is_midi in zip(PSHELL_MIDS, mids_refi, is_mid):
+                    if is_midi:
+                        setattr(prop, mid_name + '_ref', mid_ref)
+                prop.check_z_offsets(model.log)
+        else:
+            for i, (mid_ref, ) in zip(ivalid.tolist(), mids_ref):
+                props[i].mid_ref = mid_ref
+    return unsupported
+
+
+def get_node_elements(elements):
+    # type: (Any) -> Dict[int, List[Any]]
+    """
+    Gets the elements that reference each node
+
+    Parameters
+    ----------
+    elements : List[Element]
+        the elements
+
+    Returns
+    -------
+    node_elements : Dict[int, List[Element]]
+        node id -> the elements (in the order of elements; an element is
+        repeated if it references the node more than once)
+    """
+    elements = list(elements)
+    supported_classes = set(NODE_PID_ELEMENTS)
+    supported_classes.add(CBAR)
+
+    all_nids = []
+    all_ielements = []
+    other_nids = []
+    other_ielements = []
+    groups = defaultdict(list)  # type: Dict[type, List[int]]
+    for ielement, element in enumerate(elements):
+        card_class = element.__class__
+        if card_class in supported_classes:
+            groups[card_class].append(ielement)
+        elif element.nodes is not None:
+            for nid in element.node_ids:
+                if nid is not None:
+                    other_nids.append(nid)
+                    other_ielements.append(ielement)
+
+    for card_class, ielements in iteritems(groups):
+        nids = _get_element_node_ids(card_class, [elements[i] for i in ielements])
+        if nids is None or nids.ndim != 2:
+            for ielement in ielements:
+                for nid in elements[ielement].node_ids:
+                    if nid is not None:
+                        other_nids.append(nid)
+                        other_ielements.append(ielement)
+            continue
+        ielements = np.repeat(ielements, nids.shape[1])
+        nids = nids.ravel()
+        is_node = nids != 0
+        all_nids.append(nids[is_node])
+        all_ielements.append(ielements[is_node])
+
+    node_elements = {}  # type: Dict[int, List[Any]]
+    if other_nids:
+        if not all(isinstance(nid, integer_types) for nid in other_nids):
+            # the standard method
+            node_elements = defaultdict(list)
+            for nid, ielement in zip(other_nids, other_ielements):
+                node_elements[nid].append(elements[ielement])
+            for nids, ielements in zip(all_nids, all_ielements):
+                for nid, ielement in zip(nids.tolist(), ielements.tolist()):
+                    node_elements[nid].append(elements[ielement])
+            for nid, node_elementsi in iteritems(node_elements):
+                node_elementsi.sort(key=lambda element: elements.index(element))
+            return dict(node_elements)
+        all_nids.append(np.array(other_nids, dtype='int64'))
+        all_ielements.append(np.array(other_ielements, dtype='int64'))
+    if not all_nids:
+        return node_elements
+
+    nids = np.hstack(all_nids)
+    ielements = np.hstack(all_ielements)
+    isort = np.lexsort((ielements, nids))
+    nids = nids[isort]
+    sorted_elements = [elements[ielement] for ielement in ielements[isort].tolist()]
+
+    unique_nids, istart = np.unique(nids, return_index=True)
+    iend = np.hstack([istart[1:], len(nids)])
+    for nid, istarti, iendi in zip(unique_nids.tolist(), istart.tolist(), iend.tolist()):
+        node_elements[nid] = sorted_elements[istarti:iendi]
+    return node_elements
@@ -0,0 +1,535 @@
+# coding: utf-8
+"""
+Defines the coordinate system transforms used by ``BDF.get_coord_transforms()``:
+  - CoordTransforms(model)
+
+A CoordTransforms stores the origin and the local to global transformation
+matrix (beta) of every coordinate system in a model.  The RID chains (and
+the nodes of the CORD1x coordinate systems) are resolved once, so the
+points/vectors of many nodes are transformed with a few vectorized
+operations per coordinate system.
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+from six import iteritems
+import numpy as np
+
+from pyNastran.bdf.cards.coordinate_systems import (
+    RectangularCoord, CylindricalCoord, SphericalCoord)
+
+#: the coordinate system type -> the class with the
+#: coord_to_xyz_array/xyz_to_coord_array methods
+COORD_CLASSES = {
+    'R' : RectangularCoord,
+    'C' : CylindricalCoord,
+    'S' : SphericalCoord,
+}
+CORD1_TYPES = ('CORD1R', 'CORD1C', 'CORD1S')
+CORD2_TYPES = ('CORD2R', 'CORD2C', 'CORD2S')
+
+
+class CoordTransforms(object):
+    """
+    The origins and transformation matrices of the coordinate systems
+    in a model.
+
+    Attributes
+    ----------
+    cids : (ncoords, ) int ndarray
+        the sorted coordinate ids
+    coord_types : List[str]
+        the type of each coordinate system ('R', 'C', 'S')
+    origins : (ncoords, 3) float ndarray
+        the origins in the global frame
+    betas : (ncoords, 3, 3) float ndarray
+        the local to global transformation matrices; the rows are the
+        i, j, k axes of the coordinate system in the global frame
+    errors : Dict[int cid] = str
+        the coordinate systems that could not be resolved
+
+    The coordinate systems that have been setup (cross-referenced) are
+    used as is.  The others are resolved using the RID chain (CORD2x) or
+    the nodes (CORD1x), so the model doesn't need to be cross-referenced.
+    """
+    def __init__(self, model):
+        # type: (Any) -> None
+        """
+        Creates a CoordTransforms
+
+        Parameters
+        ----------
+        model : BDF()
+            the BDF object with the coordinate systems (and the nodes
+            of the CORD1x coordinate systems)
+        """
+        self._signature = _get_signature(model)
+        coords = model.coords
+        cids = sorted(coords)
+        ncoords = len(cids)
+        self.cids = np.array(cids, dtype='int32')
+        self.coord_types = [coords[cid].type[-1] for cid in cids]
+        self.origins = np.full((ncoords, 3), np.nan, dtype='float64')
+        self.betas = np.full((ncoords, 3, 3), np.nan, dtype='float64')
+        self.errors = {}  # type: Dict[int, str]
+
+        self._is_resolved = np.zeros(ncoords, dtype='bool')
+        for i, cid in enumerate(cids):
+            try:
+                self._resolve(model, cid, i, [])
+            except (RuntimeError, KeyError, ValueError) as error:
+                self.errors[cid] = str(error)
+        del self._is_resolved
+
+    def is_valid(self, model):
+        # type: (Any) -> bool
+        """are the transforms up to date with the coordinate systems of the model"""
+        refs0, values0 = self._signature
+        refs, values = _get_signature(model)
+        return (
+            len(refs) == len(refs0) and values == values0 and
+            all(ref is ref0 for ref, ref0 in zip(refs, refs0)))
+
+    def _resolve(self, model, cid, i, stack):
+        # type: (Any, int, int, List[int]) -> None
+        """sets the origin/beta of a coordinate system (and its references)"""
+        coord = model.coords[cid]
+        if coord.origin is not None and coord.i is not None:
+            self.origins[i, :] = coord.origin
+            self.betas[i, :, :] = coord.beta()
+            self._is_resolved[i] = True
+            return
+
+        if cid in stack:
+            raise RuntimeError('cid=%s has a cyclic reference; cids=%s' % (cid, stack))
+        stack.append(cid)
+        if coord.type in CORD2_TYPES:
+            e123 = np.array([coord.e1, coord.e2, coord.e3], dtype='float64')
+            e123 = self._get_global_xyz(model, e123, coord.rid, stack)
+        elif coord.type in CORD1_TYPES:
+            e123 = np.zeros((3, 3), dtype='float64')
+            for j, nid in enumerate(coord.node_ids):
+                node = model.nodes[nid]
+                e123[j, :] = self._get_global_xyz(
+                    model, node.xyz.reshape(1, 3), node.Cp(), stack)
+        else:
+            raise RuntimeError('%s cid=%s cannot be resolved' % (coord.type, cid))
+        stack.pop()
+
+        self.origins[i, :] = e123[0, :]
+        self.betas[i, :, :] = _get_beta(coord, e123)
+        self._is_resolved[i] = True
+
+    def _get_global_xyz(self, model, xyz, cid, stack):
+        # type: (Any, np.ndarray, int, List[int]) -> np.ndarray
+        """transforms points from a coordinate system that may not be resolved"""
+        i = self._get_index(cid)
+        if not self._is_resolved[i]:
+            self._resolve(model, cid, i, stack)
+        return self._to_global(xyz, i)
+
+    def _get_index(self, cid):
+        # type: (int) -> int
+        """gets the index of a coordinate system"""
+        i = np.searchsorted(self.cids, cid)
+        if i == len(self.cids) or self.cids[i] != cid:
+            raise KeyError('cid=%s not found.  Allowed Cids=%s' % (cid, self.cids.tolist()))
+        if cid in self.errors:
+            raise RuntimeError(self.errors[cid])
+        return i
+
+    def get_origin_beta(self, cid):
+        # type: (int) -> Tuple[np.ndarray, np.ndarray]
+        """
+        Gets the origin and the local to global transformation matrix
+
+        Parameters
+        ----------
+        cid : int
+            the coordinate system
+
+        Returns
+        -------
+        origin : (3, ) float ndarray
+            the origin in the global frame
+        beta : (3, 3) float ndarray
+            the local to global transformation matrix
+        """
+        i = self._get_index(cid)
+        return self.origins[i, :].copy(), self.betas[i, :, :].copy()
+
+    def _to_global(self, xyz, i):
+        # type: (np.ndarray, int) -> np.ndarray
+        """transforms points from the i-th coordinate system to the global frame"""
+        if self.cids[i] == 0:
+            return xyz
+        xyz_local = COORD_CLASSES[self.coord_types[i]].coord_to_xyz_array(xyz)
+        return xyz_local.dot(self.betas[i, :, :]) + self.origins[i, :]
+
+    def _to_local(self, xyz, i):
+        # type: (np.ndarray, int) -> np.ndarray
+        """transforms points from the global frame to the i-th coordinate system"""
+        if self.cids[i] == 0:
+            return xyz
+        xyz_local = (xyz - self.origins[i, :]).dot(self.betas[i, :, :].T)
+        return COORD_CLASSES[self.coord_types[i]].xyz_to_coord_array(xyz_local)
+
+    def xyz_cp_to_global(self, xyz_cp, cps, fdtype='float64'):
+        # type: (np.ndarray, np.ndarray, str) -> np.ndarray
+        """
+        Transforms points from their CP coordinate systems to the global frame
+
+        Parameters
+        ----------
+        xyz_cp : (n, 3) float ndarray
+            the points in the CP coordinate systems
+        cps : (n, ) int ndarray
+            the coordinate system of each point
+        fdtype : str; default='float64'
+            the data type of the output
+
+        Returns
+        -------
+        xyz_cid0 : (n, 3) float ndarray
+            the points in the global frame
+        """
+        xyz_cid0 = np.array(xyz_cp, dtype=fdtype)
+        icp_transform = get_coord_groups(cps)
+        return self.icp_transform_to_global(xyz_cp, icp_transform, xyz_cid0)
+
+    def icp_transform_to_global(self, xyz_cp, icp_transform, xyz_cid0):
+        # type: (np.ndarray, Dict[int, np.ndarray], np.ndarray) -> np.ndarray
+        """
+        Transforms points from their CP coordinate systems to the global frame
+
+        Parameters
+        ----------
+        xyz_cp : (n, 3) float ndarray
+            the points in the CP coordinate systems
+        icp_transform : dict{int cp : (n,) int ndarray}
+            Dictionary from coordinate id to the index of the points
+            that are in that coordinate system (see
+            ``BDF.get_displacement_index_xyz_cp_cd``)
+        xyz_cid0 : (n, 3) float ndarray
+            the array to fill; the points that aren't in icp_transform
+            are not changed (may be xyz_cp)
+
+        Returns
+        -------
+        xyz_cid0 : (n, 3) float ndarray
+            the points in the global frame
+        """
+        for cp, inode in iteritems(icp_transform):
+            if cp in [-1, 0]:
+                continue
+            xyz_cid0[inode, :] = self._to_global(xyz_cp[inode, :], self._get_index(cp))
+        return xyz_cid0
+
+    def icp_transform_to_xyz_cid(self, xyz_cp, icp_transform, cid=0, in_place=False):
+        # type: (np.ndarray, Dict[int, np.ndarray], int, bool) -> np.ndarray
+        """
+        Transforms points from their CP coordinate systems to a
+        coordinate system
+
+        Parameters
+        ----------
+        xyz_cp : (n, 3) float ndarray
+            the points in the CP coordinate systems
+        icp_transform : dict{int cp : (n,) int ndarray}
+            Dictionary from coordinate id to the index of the points
+            that are in that coordinate system
+        cid : int; default=0
+            the coordinate system to get xyz in
+        in_place : bool; default=False
+            xyz_cp is overwritten with the points in the global frame
+
+        Returns
+        -------
+        xyz_cid : (n, 3) float ndarray
+            the points in the cid coordinate system
+        """
+        xyz_cid0 = xyz_cp if in_place else np.copy(xyz_cp)
+        if cid == 0:
+            return self.icp_transform_to_global(xyz_cp, icp_transform, xyz_cid0)
+
+        # the points that are already in the cid frame aren't changed
+        icid = icp_transform.get(cid)
+        if icid is not None:
+            xyz_cp_cid = xyz_cp[icid, :]
+        self.icp_transform_to_global(xyz_cp, icp_transform, xyz_cid0)
+        xyz_cid = self.global_to_xyz_cid(xyz_cid0, cid)
+        if icid is not None:
+            xyz_cid[icid, :] = xyz_cp_cid
+        return xyz_cid
+
+    def global_to_xyz_cid(self, xyz_cid0, cid=0):
+        # type: (np.ndarray, int) -> np.ndarray
+        """
+        Transforms points from the global frame to a coordinate system
+
+        Parameters
+        ----------
+        xyz_cid0 : (n, 3) float ndarray
+            the points in the global frame
+        cid : int; default=0
+            the coordinate system to get xyz in
+
+        Returns
+        -------
+        xyz_cid : (n, 3) float ndarray
+            the points in the cid coordinate system
+        """
+        if cid == 0:
+            return xyz_cid0
+        xyz_cid = self._to_local(xyz_cid0, self._get_index(cid))
+        return xyz_cid.astype(xyz_cid0.dtype, copy=False)
+
+    def xyz_cp_to_xyz_cid(self, xyz_cp, cps, cid=0, fdtype='float64'):
+        # type: (np.ndarray, np.ndarray, int, str) -> np.ndarray
+        """
+        Transforms points from their CP coordinate systems to a
+        coordinate system (see ``xyz_cp_to_global``)
+        """
+        cps = np.asarray(cps)
+        is_cid = cps == cid
+        if is_cid.all():
+            return np.array(xyz_cp, dtype=fdtype)
+        xyz_cid0 = self.xyz_cp_to_global(xyz_cp, cps, fdtype=fdtype)
+        xyz_cid = self.global_to_xyz_cid(xyz_cid0, cid)
+
+        # the points that are already in the cid frame aren't changed
+        xyz_cid[is_cid, :] = xyz_cp[is_cid, :]
+        return xyz_cid
+
+    def get_cd_betas(self, cds, xyz_cid0):
+        # type: (np.ndarray, np.ndarray) -> np.ndarray
+        """
+        Gets the local (CD) to global transformation matrices at a series
+        of points.  For cylindrical/spherical coordinate systems, the
+        axes are the R-theta-z/R-theta-phi directions at the point.
+
+        Parameters
+        ----------
+        cds : (n, ) int ndarray
+            the output coordinate system of each point
+        xyz_cid0 : (n, 3) float ndarray
+            the points in the global frame
+
+        Returns
+        -------
+        betas : (n, 3, 3) float ndarray
+            the local to global transformation matrices
+        """
+        nnodes = len(cds)
+        betas = np.zeros((nnodes, 3, 3), dtype='float64')
+        betas[:, 0, 0] = betas[:, 1, 1] = betas[:, 2, 2] = 1.
+        for cd, inode in iteritems(get_coord_groups(cds)):
+            if cd in [-1, 0]:
+                continue
+            i = self._get_index(cd)
+            beta = self.betas[i, :, :]
+            coord_type = self.coord_types[i]
+            if coord_type == 'R':
+                betas[inode, :, :] = beta
+                continue
+
+            xyz_coord = self._to_local(xyz_cid0[inode, :], i)
+            axes = _get_curvilinear_axes(coord_type, xyz_coord)
+            betas[inode, :, :] = np.einsum('nij,jk->nik', axes, beta)
+        return betas
+
+    def cd_to_global(self, vectors, cds, xyz_cid0=None):
+        # type: (np.ndarray, np.ndarray, Optional[np.ndarray]) -> np.ndarray
+        """
+        Transforms vectors (e.g., displacements) from their output (CD)
+        coordinate systems to the global frame
+
+        Parameters
+        ----------
+        vectors : (..., n, 3) float ndarray
+            the vectors in the CD coordinate systems (e.g., a (ntimes, n, 3)
+            array of translations)
+        cds : (n, ) int ndarray
+            the output coordinate system of each point
+        xyz_cid0 : (n, 3) float ndarray; default=None
+            the points in the global frame; required for the
+            cylindrical/spherical coordinate systems
+
+        Returns
+        -------
+        vectors_cid0 : (..., n, 3) float ndarray
+            the vectors in the global frame
+        """
+        vectors = np.asarray(vectors)
+        vectors_cid0 = vectors.copy()
+        for cd, inode in iteritems(get_coord_groups(cds)):
+            if cd in [-1, 0]:
+                continue
+            i = self._get_index(cd)
+            if self.coord_types[i] == 'R':
+                vectors_cid0[..., inode, :] = vectors[..., inode, :].dot(self.betas[i, :, :])
+                continue
+            if xyz_cid0 is None:
+                raise RuntimeError('xyz_cid0 is required for cylindrical/spherical '
+                                   'coordinate transforms; cd=%s' % cd)
+            betas = self.get_cd_betas(np.full(len(inode), cd), xyz_cid0[inode, :])
+            vectors_cid0[..., inode, :] = np.einsum('...ni,nij->...nj',
+                                                    vectors[..., inode, :], betas)
+        return vectors_cid0
+
+    def transform_vectors_to_global(self, vectors, cids):
+        # type: (np.ndarray, np.ndarray) -> np.ndarray
+        """
+        Transforms generalized vectors (e.g., the FORCE/MOMENT vectors)
+        from their coordinate systems to the global frame (see
+        ``Coord.transform_vector_to_global``)
+
+        Parameters
+        ----------
+        vectors : (n, 3) float ndarray
+            the vectors in the local frames
+        cids : (n, ) int ndarray
+            the coordinate system of each vector
+
+        Returns
+        -------
+        vectors_cid0 : (n, 3) float ndarray
+            the vectors in the global frame
+        """
+        vectors = np.asarray(vectors, dtype='float64')
+        vectors_cid0 = vectors.copy()
+        for cid, ivector in iteritems(get_coord_groups(cids)):
+            if cid == 0:
+                continue
+            i = self._get_index(cid)
+            vectors_local = COORD_CLASSES[self.coord_types[i]].coord_to_xyz_array(
+                vectors[ivector, :])
+            vectors_cid0[ivector, :] = vectors_local.dot(self.betas[i, :, :])
+        return vectors_cid0
+
+
+def get_coord_groups(cids):
+    # type: (np.ndarray) -> Dict[int, np.ndarray]
+    """
+    Groups the points by coordinate system
+
+    Parameters
+    ----------
+    cids : (n, ) int ndarray
+        the coordinate system of each point
+
+    Returns
+    -------
+    icid_transform : dict{int cid : (n,) int ndarray}
+        Dictionary from coordinate id to the index of the points that
+        are in that coordinate system
+    """
+    cids = np.asarray(cids)
+    if len(cids) == 0:
+        return {}
+    isort = np.argsort(cids, kind='mergesort')
+    cids_sorted = cids[isort]
+    ucids, istart = np.unique(cids_sorted, return_index=True)
+    iend = np.hstack([istart[1:], len(cids)])
+    return {
+        cid : isort[i0:i1]
+        for cid, i0, i1 in zip(ucids.tolist(), istart, iend)}
+
+
+def _get_signature(model):
+    # type: (Any) -> Tuple[List[Any], List[Any]]
+    """
+    Gets the objects (compared by identity) and the values (compared by
+    value) that define the coordinate systems of a model
+    """
+    refs = []
+    values = []
+    for cid, coord in sorted(iteritems(model.coords)):
+        refs.append(coord)
+        if coord.origin is not None and coord.i is not None:
+            # the axes of a coordinate system may be recalculated (with
+            # the same values) when it's used, so they're compared by value
+            values.append((cid, coord.origin.tobytes(), coord.i.tobytes(),
+                           coord.j.tobytes(), coord.k.tobytes()))
+            continue
+        if coord.type in CORD2_TYPES:
+            values.append((cid, coord.rid, np.asarray(coord.e1).tobytes(),
+                           np.asarray(coord.e2).tobytes(), np.asarray(coord.e3).tobytes()))
+        elif coord.type in CORD1_TYPES:
+            for nid in coord.node_ids:
+                node = model.nodes.get(nid)
+                if node is None:
+                    values.append((cid, nid))
+                else:
+                    values.append((cid, nid, node.Cp(), tuple(node.xyz)))
+    return refs, values
+
+
+def _get_beta(coord, e123):
+    # type: (Any, np.ndarray) -> np.ndarray
+    """
+    Gets the local to global transformation matrix from the origin (e1),
+    a point on the z-axis (e2), and a point on the xz-plane (e3), which
+    are in the global frame (see ``Coord.setup``)
+    """
+    e1, e2, e3 = e123
+    e12 = e2 - e1
+    e13 = e3 - e1
+    k = _normalize(coord, e12)
+    j = _normalize(coord, np.cross(k, e13))
+    i = np.cross(j, k)
+    return np.vstack([i, j, k])
+
+
+def _normalize(coord, vector):
+    # type: (Any, np.ndarray) -> np.ndarray
+    """normalizes an axis of a coordinate system"""
+    norm = np.linalg.norm(vector)
+    if norm == 0.:
+        raise RuntimeError('Invalid unit vector for %s cid=%s; e1=%s e2=%s e3=%s' % (
+            coord.type, coord.cid, coord.e1, coord.e2, coord.e3))
+    return vector / norm
+
+
+def _get_curvilinear_axes(coord_type, xyz_coord):
+    # type: (str, np.ndarray) -> np.ndarray
+    """
+    Gets the R-theta-z (cylindrical) or R-theta-phi (spherical) axes in
+    the rectangular frame of a coordinate system
+
+    Parameters
+    ----------
+    coord_type : str
+        'C' or 'S'
+    xyz_coord : (n, 3) float ndarray
+        the points in the coordinate system
+
+    Returns
+    -------
+    axes : (n, 3, 3) float ndarray
+        the axes at each point (one axis per row)
+    """
+    nnodes = xyz_coord.shape[0]
+    axes = np.zeros((nnodes, 3, 3), dtype='float64')
+    if coord_type == 'C':
+        theta = np.radians(xyz_coord[:, 1])
+        cos_theta = np.cos(theta)
+        sin_theta = np.sin(theta)
+        axes[:, 0, 0] = cos_theta
+        axes[:, 0, 1] = sin_theta
+        axes[:, 1, 0] = -sin_theta
+        axes[:, 1, 1] = cos_theta
+        axes[:, 2, 2] = 1.
+    elif coord_type == 'S':
+        theta = np.radians(xyz_coord[:, 1])
+        phi = np.radians(xyz_coord[:, 2])
+        cos_theta = np.cos(theta)
+        sin_theta = np.sin(theta)
+        cos_phi = np.cos(phi)
+        sin_phi = np.sin(phi)
+        axes[:, 0, :] = np.column_stack([sin_theta * cos_phi, sin_theta * sin_phi, cos_theta])
+        axes[:, 1, :] = np.column_stack([cos_theta * cos_phi, cos_theta * sin_phi, -sin_theta])
+        axes[:, 2, 0] = -sin_phi
+        axes[:, 2, 1] = cos_phi
+    else:  # pragma: no cover
+        raise NotImplementedError(coord_type)
+    return axes
@@ -65,11 +65,28 @@ around the idea of cross-referencing, so it's recommended that you use it.
 from __future__ import print_function
 from typing import List, Dict, Any
 from six import iteritems, itervalues
-from collections import defaultdict
 import traceback
 
 from numpy import zeros, argsort, arange, array_equal
 from pyNastran.bdf.bdf_interface.attributes import BDFAttributes
+from pyNastran.bdf.bdf_interface.bulk_xref import (
+    bulk_cross_reference_elements, bulk_cross_reference_properties, get_node_elements)
+from pyNastran.bdf.bdf_interface.lazy_cards import LazyCardDict
+from pyNastran.bdf.bdf_interface.node_array import NodeArrayDict
+from pyNastran.bdf.errors import CrossReferenceError
+
+#: the card dictionaries that are cross-referenced when a card is accessed
+#: by ``lazy_cross_reference``
+LAZY_XREF_ATTRS = [
+    'nodes', 'elements', 'rigid_elements', 'plotels', 'masses', 'properties',
+    'properties_mass', 'materials', 'thermal_materials',
+    'caeros', 'paeros', 'trims', 'csschds', 'splines', 'aecomps', 'aelists',
+    'aeparams', 'aesurf', 'aesurfs', 'flutters',
+]
+
+#: the card dictionaries (with lists of cards) that are cross-referenced when
+#: a card is accessed by ``lazy_cross_reference``
+LAZY_XREF_LIST_ATTRS = ['load_combinations', 'loads', 'dloads', 'dload_entries']
 
 class XrefMesh(BDFAttributes):
     """
@@ -84,6 +101,7 @@ class XrefMesh(BDFAttributes):
         self._nxref_errors = 100
         self._stop_on_xref_error = True
         self._stored_xref_errors = []
+        self._is_lazy_xref = False
 
     # def geom_check(self):
         # """
@@ -148,6 +166,7 @@ class XrefMesh(BDFAttributes):
         """
         if not xref:
             return
+        self._stop_lazy_cross_reference()
         self.log.debug("Cross Referencing...")
         if xref_nodes:
             self._cross_reference_nodes()
@@ -176,6 +195,129 @@ class XrefMesh(BDFAttributes):
             self._cross_reference_nodes_with_elements()
         #self.case_control_deck.cross_reference(self)
 
+    def lazy_cross_reference(self):
+        # type: () -> None
+        """
+        Links up the cards the first time they're accessed
+
+        The nodes, elements, properties, materials, masses, loads and aero
+        cards (see ``LAZY_XREF_ATTRS``) are stored in LazyCardDicts that
+        cross-reference a card the first time it's accessed (e.g.,
+        ``model.elements[eid]``, ``model.Node(nid)``, iterating over
+        ``model.elements.values()``).  The cross_reference methods access
+        the referenced cards through the model, so ``elem.pid_ref.mid_ref``
+        is linked as well.  The other cards (e.g., coordinate systems,
+        constraints, sets) are cross-referenced now.
+
+        A cross-reference error is raised as a CrossReferenceError when the
+        card is accessed.  ``cross_reference`` and ``uncross_reference``
+        turn off the lazy cross-referencing.
+
+        .. note:: GRID.elements_ref is not set; use
+                  ``get_node_id_to_element_ids_map``
+        .. note:: a NodeArrayDict (see ``set_node_arrays``) is
+                  cross-referenced now
+        """
+        self._stop_lazy_cross_reference()
+        self.log.debug("Lazy Cross Referencing...")
+        self._is_lazy_xref = True
+
+        grdset = self.grdset
+        def xref_nodes(nodes):
+            """links the GRIDs to the coordinate systems"""
+            self._lazy_cross_reference_cards(nodes, grdset)
+
+        def xref_elements(elements):
+            """links the elements; a dictionary that's iterated is linked in bulk"""
+            if len(elements) > 1:
+                elements = bulk_cross_reference_elements(self, elements)
+            self._lazy_cross_reference_cards(elements)
+
+        def xref_properties(properties):
+            """links the properties; a dictionary that's iterated is linked in bulk"""
+            if len(properties) > 1:
+                properties = bulk_cross_reference_properties(self, properties)
+            self._lazy_cross_reference_cards(properties)
+
+        xref_functions = {
+            'nodes' : xref_nodes,
+            'elements' : xref_elements,
+            'properties' : xref_properties,
+        }
+        for attr in LAZY_XREF_ATTRS + LAZY_XREF_LIST_ATTRS:
+            card_dict = getattr(self, attr)
+            if isinstance(card_dict, NodeArrayDict):
+                self._cross_reference_nodes()
+                continue
+            if not isinstance(card_dict, LazyCardDict):
+                lazy_dict = LazyCardDict(self._build_lazy_card,
+                                         is_list=attr in LAZY_XREF_LIST_ATTRS)
+                dict.update(lazy_dict, card_dict)
+                setattr(self, attr, lazy_dict)
+                card_dict = lazy_dict
+            card_dict.set_xref_cards(xref_functions.get(attr, self._lazy_cross_reference_cards))
+
+        self._cross_reference_coordinates()
+
+        data = [self.MATS1, self.MATS3, self.MATS8,
+                self.MATT1, self.MATT2, self.MATT3, self.MATT4, self.MATT5,
+                self.MATT8, self.MATT9, self.dareas, self.tics, self.dphases]
+        for material_deps in data:
+            self._lazy_cross_reference_cards(itervalues(material_deps))
+        if self.aero:
+            self.aero.cross_reference(self)
+        if self.aeros:
+            self.aeros.cross_reference(self)
+
+        self._cross_reference_constraints()
+        self._cross_reference_sets()
+        self._cross_reference_optimization()
+
+    def _lazy_cross_reference_cards(self, cards, *args):
+        # type: (List[Any], Any) -> None
+        """
+        Links up cards for ``lazy_cross_reference``; the first error is
+        raised as a CrossReferenceError
+        """
+        for card in cards:
+            try:
+                card.cross_reference(self, *args)
+            except (SyntaxError, RuntimeError, AssertionError, KeyError, ValueError) as e:
+                var = traceback.format_exception_only(type(e), e)
+                msg = 'There are cross-reference errors.\n\n%scard=%s' % (var[0], card)
+                raise CrossReferenceError(msg.rstrip())
+
+    def _cross_reference_cards(self, cards):
+        # type: (List[Tuple[str, Any]]) -> None
+        """
+        Links up a list of (slot_name, card) for ``BDF.refresh``; the
+        errors are stored like ``cross_reference``
+        """
+        grdset = self.grdset
+        for slot_name, card in cards:
+            try:
+                if slot_name == 'nodes':
+                    card.cross_reference(self, grdset)
+                else:
+                    card.cross_reference(self)
+            except (SyntaxError, RuntimeError, AssertionError, KeyError, ValueError) as e:
+                self._ixref_errors += 1
+                var = traceback.format_exception_only(type(e), e)
+                self._stored_xref_errors.append((card, var))
+                if self._ixref_errors > self._nxref_errors:
+                    self.pop_xref_errors()
+
+    def _stop_lazy_cross_reference(self):
+        # type: () -> None
+        """turns off the lazy cross-referencing; see ``lazy_cross_reference``"""
+        if not self._is_lazy_xref:
+            return
+        for attr in LAZY_XREF_ATTRS + LAZY_XREF_LIST_ATTRS:
+            card_dict = getattr(self, attr)
+            if isinstance(card_dict, LazyCardDict):
+                card_dict.set_xref_cards(None)
+        self._is_lazy_xref = False
+
     def _cross_reference_constraints(self):
         # type: () -> None
         """
@@ -324,8 +466,13 @@ class XrefMesh(BDFAttributes):
         """
         Links the elements to nodes, properties (and materials depending on
         the card).
+
+        The nodes/property of the common elements are checked and linked
+        in bulk; the other elements and the elements with a missing
+        reference use the card's cross_reference method.
         """
-        for elem in itervalues(self.elements):
+        elements = bulk_cross_reference_elements(self, list(itervalues(self.elements)))
+        for elem in elements:
             try:
                 elem.cross_reference(self)
             except (SyntaxError, RuntimeError, AssertionError, KeyError, ValueError) as e:
@@ -360,22 +507,9 @@ class XrefMesh(BDFAttributes):
         """
         Links the nodes to all connected elements
         """
-        nodes = defaultdict(list)  # type: Dict[int, List[Any]]
-        for element in itervalues(self.elements):
-            #if element.type in ['CONM2']:
-            #    pass
-            #else:
-            if element.nodes is not None:
-                for nid in element.node_ids:
-                    if nid is None:
-                        continue
-                    nodes[nid].append(element)
-                    #except AttributeError:
-                        #print(element)
-                        #print('node = %s' % str(node))
-                        #raise
+        node_elements = get_node_elements(itervalues(self.elements))
         for node in itervalues(self.nodes):
-            node.elements_ref = nodes[node.nid]
+            node.elements_ref = node_elements.get(node.nid, [])
 
     def _cross_reference_masses(self):
         # type: () -> None
@@ -408,7 +542,8 @@ class XrefMesh(BDFAttributes):
         """
         Links the properties to materials
         """
-        for prop in itervalues(self.properties):
+        properties = bulk_cross_reference_properties(self, list(itervalues(self.properties)))
+        for prop in properties:
             try:
                 prop.cross_reference(self)
             except (SyntaxError, RuntimeError, AssertionError, KeyError, ValueError) as e:
@@ -0,0 +1,428 @@
+# coding: utf-8
+"""
+Defines fast parsers for the most common bulk data cards:
+  - fast_card_object(card_name, card_lines, comment='')
+  - split_fields(card_lines)
+
+The standard reader builds a card with:
+  to_fields -> wipe_empty_fields -> BDFCard -> card_class.add_card
+
+which calls an ``assign_type`` function for each field.  For GRID,
+CQUAD4, CTRIA3, CHEXA, CTETRA, CPENTA, CBAR, CBUSH, FORCE and PLOAD4,
+the functions in this file split the small field, large field and CSV
+layouts directly into stripped fields and decode the entire card at once.
+
+The fast parsers only handle well-formed cards.  If a field has an
+unusual value (e.g., ``1.0-3``, ``1.0D-3``, ``THRU``, a blank required
+field) or the card is invalid, the fast parser gives up and the card is
+parsed using the standard reader, so the card object and error message
+are identical.
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+import numpy as np
+from numpy.linalg import norm  # type: ignore
+
+from pyNastran.utils import integer_types
+from pyNastran.bdf.cards.nodes import GRID
+from pyNastran.bdf.cards.elements.shell import CQUAD4, CTRIA3
+from pyNastran.bdf.cards.elements.solid import (
+    CTETRA4, CTETRA10, CPENTA6, CPENTA15, CHEXA8, CHEXA20)
+from pyNastran.bdf.cards.elements.bars import CBAR
+from pyNastran.bdf.cards.elements.bush import CBUSH
+from pyNastran.bdf.cards.loads.static_loads import FORCE, PLOAD4
+
+#: the fields are padded, so a card parser may access the fields beyond
+#: the last non-blank field
+_NFIELDS_MIN = 24
+
+
+class FastParseError(ValueError):
+    """the card can't be parsed with the fast parser"""
+    pass
+
+
+def split_fields(card_lines):
+    # type: (List[str]) -> (List[str], int)
+    """
+    Splits the lines of a card into stripped fields.  This is equivalent
+    to ``wipe_empty_fields(to_fields(card_lines, card_name))`` for the
+    cards that have a fast parser.
+
+    Parameters
+    ----------
+    card_lines : List[str]
+        the lines of the card
+
+    Returns
+    -------
+    fields : List[str]
+        the stripped fields; blank fields are '' and the list is padded
+        with blank fields
+    nfields : int
+        the number of fields up to the last non-blank field (same as
+        ``len(card)`` in the standard reader)
+    """
+    fields = []
+    i0 = 0
+    for line in card_lines:
+        if '=' in line:
+            raise FastParseError('equal signs are not supported')
+        if '\t' in line:
+            line = line.expandtabs()
+            if ',' in line:
+                raise FastParseError('tabs and commas in the same line are not supported')
+
+        if '*' in line:  # large field
+            if ',' in line:  # csv
+                new_fields = line.split(',')[i0:5]
+                new_fields += [''] * (5 - i0 - len(new_fields))
+            else:  # standard
+                new_fields = [line[8:24], line[24:40], line[40:56], line[56:72]]
+                if i0 == 0:
+                    new_fields.insert(0, line[0:8])
+        else:  # small field
+            if ',' in line:  # csv
+                new_fields = line.split(',')[i0:9]
+                new_fields += [''] * (9 - i0 - len(new_fields))
+            else:  # standard
+                new_fields = [line[8:16], line[16:24], line[24:32], line[32:40],
+                              line[40:48], line[48:56], line[56:64], line[64:72]]
+                if i0 == 0:
+                    new_fields.insert(0, line[0:8])
+        fields += [field.strip() for field in new_fields]
+        i0 = 1
+
+    nfields = len(fields)
+    while nfields > 1 and not fields[nfields - 1]:
+        nfields -= 1
+    if nfields < _NFIELDS_MIN:
+        fields += [''] * (_NFIELDS_MIN - len(fields))
+    return fields, nfields
+
+
+def _integer(svalue):
+    # type: (str) -> int
+    """an integer field; same as ``int(svalue)`` in ``assign_type.integer``"""
+    return int(svalue)
+
+def _integer_or_blank(svalue, default=None):
+    # type: (str, Optional[int]) -> Optional[int]
+    """an integer/blank field"""
+    if not svalue:
+        return default
+    return int(svalue)
+
+def _double(svalue):
+    # type: (str) -> float
+    """
+    a float field that Python can parse (e.g., 1.0, 1.2e-3); the Nastran
+    forms (e.g., 1.2-3, 1.2D-3) are parsed by ``assign_type.double``
+    """
+    if svalue.isdigit():
+        raise FastParseError(svalue)
+    return float(svalue)
+
+def _double_or_blank(svalue, default=None):
+    # type: (str, Optional[float]) -> Optional[float]
+    """a float/blank field; see ``_double``"""
+    if not svalue:
+        return default
+    if svalue.isdigit():
+        raise FastParseError(svalue)
+    return float(svalue)
+
+def _integer_double_or_blank(svalue, default=None):
+    # type: (str, Optional[Union[int, float]]) -> Optional[Union[int, float]]
+    """an integer/float/blank field"""
+    if not svalue:
+        return default
+    if '.' in svalue:
+        return float(svalue)
+    if '-' in svalue[1:] or '+' in svalue[1:]:
+        raise FastParseError(svalue)
+    return int(svalue)
+
+def _blank(svalue):
+    # type: (str) -> None
+    """a blank field"""
+    if svalue:
+        raise FastParseError(svalue)
+
+def _components_or_blank(svalue, default=None):
+    # type: (str, Optional[str]) -> Optional[str]
+    """a component/blank field (e.g., 123456)"""
+    if not svalue:
+        return default
+    if not svalue.isdigit():
+        raise FastParseError(svalue)
+    value = int(svalue)
+    if value > 0 and '0' in svalue:
+        raise FastParseError(svalue)
+    components = ''.join(sorted(str(value)))
+    for i, component in enumerate(components):
+        if component not in '0123456' or component in components[i + 1:]:
+            raise FastParseError(svalue)
+    return components
+
+
+def _grid(fields, nfields, comment):
+    """GRID; see ``GRID.add_card``"""
+    nid = _integer(fields[1])
+    cp = _integer_or_blank(fields[2], 0)
+    xyz = [
+        _double_or_blank(fields[3], 0.),
+        _double_or_blank(fields[4], 0.),
+        _double_or_blank(fields[5], 0.)]
+    if nfields > 6:
+        cd = _integer_or_blank(fields[6], 0)
+        ps = _components_or_blank(fields[7], '')
+        seid = _integer_or_blank(fields[8], 0)
+        if nfields > 9:
+            raise FastParseError('nfields=%s' % nfields)
+    else:
+        cd = 0
+        ps = ''
+        seid = 0
+    return GRID(nid, xyz, cp, cd, ps, seid, comment=comment)
+
+def _cquad4(fields, nfields, comment):
+    """CQUAD4; see ``CQUAD4.add_card``"""
+    eid = _integer(fields[1])
+    pid = _integer_or_blank(fields[2], eid)
+    nids = [_integer(fields[3]), _integer(fields[4]),
+            _integer(fields[5]), _integer(fields[6])]
+    if nfields > 6:
+        theta_mcid = _integer_double_or_blank(fields[7], 0.0)
+        zoffset = _double_or_blank(fields[8], 0.0)
+        _blank(fields[9])
+        tflag = _integer_or_blank(fields[10], 0)
+        T1 = _double_or_blank(fields[11])
+        T2 = _double_or_blank(fields[12])
+        T3 = _double_or_blank(fields[13])
+        T4 = _double_or_blank(fields[14])
+        if nfields > 15:
+            raise FastParseError('nfields=%s' % nfields)
+    else:
+        theta_mcid = 0.0
+        zoffset = 0.0
+        tflag = 0
+        T1 = 1.0
+        T2 = 1.0
+        T3 = 1.0
+        T4 = 1.0
+    return CQUAD4(eid, pid, nids, theta_mcid, zoffset,
+                  tflag, T1, T2, T3, T4, comment=comment)
+
+def _ctria3(fields, nfields, comment):
+    """CTRIA3; see ``CTRIA3.add_card``"""
+    eid = _integer(fields[1])
+    pid = _integer_or_blank(fields[2], eid)
+    nids = [_integer(fields[3]), _integer(fields[4]), _integer(fields[5])]
+    if nfields > 5:
+        theta_mcid = _integer_double_or_blank(fields[6], 0.0)
+        zoffset = _double_or_blank(fields[7], 0.0)
+        _blank(fields[8])
+        _blank(fields[9])
+        tflag = _integer_or_blank(fields[10], 0)
+        T1 = _double_or_blank(fields[11])
+        T2 = _double_or_blank(fields[12])
+        T3 = _double_or_blank(fields[13])
+        if nfields > 14:
+            raise FastParseError('nfields=%s' % nfields)
+    else:
+        theta_mcid = 0.0
+        zoffset = 0.0
+        tflag = 0
+        T1 = 1.0
+        T2 = 1.0
+        T3 = 1.0
+    return CTRIA3(eid, pid, nids, zoffset=zoffset, theta_mcid=theta_mcid,
+                  tflag=tflag, T1=T1, T2=T2, T3=T3, comment=comment)
+
+def _solid(fields, nfields, comment, nnodes_linear, nnodes_quadratic,
+           linear_class, quadratic_class):
+    """
+    CTETRA/CPENTA/CHEXA; see ``BDF._prepare_ctetra`` and the
+    ``add_card`` methods of the linear/quadratic classes
+    """
+    eid = _integer(fields[1])
+    if eid <= 0:
+        # the standard reader logs the BDFCard for this error
+        raise FastParseError('eid=%s' % eid)
+    pid = _integer(fields[2])
+    nids = [int(nid) for nid in fields[3:3 + nnodes_linear]]
+    if nfields == 3 + nnodes_linear:
+        return linear_class(eid, pid, nids, comment=comment)
+
+    if nfields > 3 + nnodes_quadratic:
+        raise FastParseError('nfields=%s' % nfields)
+    nids += [int(nid) if nid else None
+             for nid in fields[3 + nnodes_linear:3 + nnodes_quadratic]]
+    return quadratic_class(eid, pid, nids, comment=comment)
+
+def _ctetra(fields, nfields, comment):
+    """CTETRA; see ``BDF._prepare_ctetra``"""
+    return _solid(fields, nfields, comment, 4, 10, CTETRA4, CTETRA10)
+
+def _cpenta(fields, nfields, comment):
+    """CPENTA; see ``BDF._prepare_cpenta``"""
+    return _solid(fields, nfields, comment, 6, 15, CPENTA6, CPENTA15)
+
+def _chexa(fields, nfields, comment):
+    """CHEXA; see ``BDF._prepare_chexa``"""
+    return _solid(fields, nfields, comment, 8, 20, CHEXA8, CHEXA20)
+
+def _cbar(fields, nfields, comment):
+    """CBAR; see ``CBAR.add_card``"""
+    eid = _integer(fields[1])
+    pid = _integer_or_blank(fields[2], eid)
+    ga = _integer(fields[3])
+    gb = _integer(fields[4])
+
+    field5 = _integer_double_or_blank(fields[5], 0.0)
+    if isinstance(field5, integer_types):
+        g0 = field5
+        x = None
+    else:
+        g0 = None
+        x = np.array([field5,
+                      _double_or_blank(fields[6], 0.0),
+                      _double_or_blank(fields[7], 0.0)], dtype='float64')
+        if norm(x) == 0.0:
+            raise FastParseError('x=%s' % x)
+
+    offt = fields[8]
+    if not offt:
+        offt = 'GGG'
+    elif offt.isalpha() and not offt.upper().strip('BGOE'):
+        offt = str(offt.upper())
+    else:
+        raise FastParseError(offt)
+
+    pa = _integer_or_blank(fields[9], 0)
+    pb = _integer_or_blank(fields[10], 0)
+    wa = np.array([_double_or_blank(fields[11], 0.0),
+                   _double_or_blank(fields[12], 0.0),
+                   _double_or_blank(fields[13], 0.0)], dtype='float64')
+    wb = np.array([_double_or_blank(fields[14], 0.0),
+                   _double_or_blank(fields[15], 0.0),
+                   _double_or_blank(fields[16], 0.0)], dtype='float64')
+    if nfields > 17:
+        raise FastParseError('nfields=%s' % nfields)
+    return CBAR(eid, pid, [ga, gb], x, g0,
+                offt, pa, pb, wa, wb, comment=comment)
+
+def _cbush(fields, nfields, comment):
+    """CBUSH; see ``CBUSH.add_card``"""
+    eid = _integer(fields[1])
+    pid = _integer_or_blank(fields[2], eid)
+    ga = _integer(fields[3])
+    gb = _integer_or_blank(fields[4])
+    cid = _integer_or_blank(fields[8])
+
+    x1_g0 = _integer_double_or_blank(fields[5])
+    if isinstance(x1_g0, integer_types):
+        g0 = x1_g0
+        x = None
+    elif isinstance(x1_g0, float):
+        g0 = None
+        x = [x1_g0,
+             _double_or_blank(fields[6], 0.0),
+             _double_or_blank(fields[7], 0.0)]
+        if cid is None and max(x) == min(x):
+            raise FastParseError('x=%s' % x)
+    else:
+        g0 = None
+        x = [None, None, None]
+
+    s = _double_or_blank(fields[9], 0.5)
+    ocid = _integer_or_blank(fields[10], -1)
+    si = [_double_or_blank(fields[11]),
+          _double_or_blank(fields[12]),
+          _double_or_blank(fields[13])]
+    if nfields > 14:
+        raise FastParseError('nfields=%s' % nfields)
+    return CBUSH(eid, pid, [ga, gb], x, g0, cid=cid, s=s, ocid=ocid, si=si, comment=comment)
+
+def _force(fields, nfields, comment):
+    """FORCE; see ``Load0.add_card``"""
+    sid = _integer(fields[1])
+    node = _integer(fields[2])
+    cid = _integer_or_blank(fields[3], 0)
+    mag = _double(fields[4])
+    xyz = np.array([_double_or_blank(fields[5], 0.0),
+                    _double_or_blank(fields[6], 0.0),
+                    _double_or_blank(fields[7], 0.0)])
+    if nfields > 8:
+        raise FastParseError('nfields=%s' % nfields)
+    return FORCE(sid, node, mag, xyz, cid=cid, comment=comment)
+
+def _pload4(fields, nfields, comment):
+    """PLOAD4 (not the THRU form); see ``PLOAD4.add_card``"""
+    sid = _integer(fields[1])
+    eid = _integer(fields[2])
+    p1 = _double_or_blank(fields[3], 0.0)
+    pressures = [
+        p1,
+        _double_or_blank(fields[4], p1),
+        _double_or_blank(fields[5], p1),
+        _double_or_blank(fields[6], p1)]
+
+    g1 = _integer_or_blank(fields[7])
+    g34 = _integer_or_blank(fields[8])
+    cid = _integer_or_blank(fields[9], 0)
+    nvector = np.array([_double_or_blank(fields[10], 0.0),
+                        _double_or_blank(fields[11], 0.0),
+                        _double_or_blank(fields[12], 0.0)])
+    _blank(fields[13])  # sorl
+    _blank(fields[14])  # ldir
+    if nfields > 15:
+        raise FastParseError('nfields=%s' % nfields)
+    return PLOAD4(sid, [eid], pressures, g1, g34, cid, nvector,
+                  'SURF', 'NORM', comment=comment)
+
+
+#: card_name -> (card_class, fast_parser)
+#: card_class is None for cards that are added with a _prepare method
+FAST_CARDS = {
+    'GRID' : (GRID, _grid),
+    'CQUAD4' : (CQUAD4, _cquad4),
+    'CTRIA3' : (CTRIA3, _ctria3),
+    'CTETRA' : (None, _ctetra),
+    'CPENTA' : (None, _cpenta),
+    'CHEXA' : (None, _chexa),
+    'CBAR' : (CBAR, _cbar),
+    'CBUSH' : (CBUSH, _cbush),
+    'FORCE' : (FORCE, _force),
+    'PLOAD4' : (PLOAD4, _pload4),
+}
+
+
+def fast_card_object(card_name, card_lines, comment=''):
+    # type: (str, List[str], str) -> Any
+    """
+    Creates a card object using the fast parser
+
+    Parameters
+    ----------
+    card_name : str
+        the name of the card (e.g., 'GRID'); must be in FAST_CARDS
+    card_lines : List[str]
+        the lines of the card; not modified
+    comment : str; default=''
+        the comment for the card
+
+    Returns
+    -------
+    card : BaseCard / None
+        BaseCard : the card object (e.g., a GRID)
+        None : the card must be parsed with the standard reader
+    """
+    fast_parser = FAST_CARDS[card_name][1]
+    try:
+        fields, nfields = split_fields(card_lines)
+        return fast_parser(fields, nfields, comment)
+    except Exception:
+        # the standard reader raises the real error
+        return None
@@ -1508,19 +1508,6 @@ class GetCard(GetMethods):
                 msg = 'name=%s; allowed=%s' % (name, sorted(allowed_maps.keys()))
                 raise RuntimeError(msg)
 
-        eid_to_edge_map = {}
-        eid_to_nid_map = {}
-
-        edge_to_eid_map = defaultdict(set)
-        #edge_to_nid_map = {}  # unnecessary
-
-        nid_to_edge_map = defaultdict(set)  #set([]) ???
-        nid_to_eid_map = defaultdict(list)
-
-
-        if eids is None:
-            eids = iterkeys(self.elements)
-
         types_to_consider = []
         if consider_0d:
             types_to_consider += []
@@ -1535,27 +1522,50 @@ class GetCard(GetMethods):
         if consider_3d:
             types_to_consider += ['CTETRA', 'CPENTA', 'CPYRAM', 'CHEXA']
 
-        for eid in eids:
-            elem = self.elements[eid]
-            if elem.type not in types_to_consider:
-                continue
-            node_ids = elem.node_ids
-            edges = elem.get_edge_ids()
-            eid_to_edge_map[eid] = edges
-            eid_to_nid_map[eid] = node_ids
-
-            for nid in node_ids:
-                nid_to_eid_map[nid].append(eid)
-            for edge in edges:
-                assert not isinstance(edge, integer_types), 'edge=%s elem=\n%s' % (edge, elem)
-                assert edge[0] < edge[1], 'edge=%s elem=\n%s' % (edge, elem)
-                try:
-                    edge_to_eid_map[edge].add(eid)
-                except TypeError:
-                    print(elem)
-                    raise
-                for nid in edge:
-                    nid_to_edge_map[nid].add(tuple(edge))
+        # the maps are views of the cached topology (see get_topology)
+        topology = self.get_topology()
+        if eids is None:
+            ielements = np.arange(len(topology.eids))
+        else:
+            ielements = topology.get_element_index(list(eids))
+        ielements = ielements[np.isin(topology.etypes[ielements], types_to_consider)]
+
+        # the (element, edge) pairs in the order of element.get_edge_ids()
+        offsets = topology.element_edge_offsets
+        nedges = offsets[ielements + 1] - offsets[ielements]
+        pair_offsets = np.hstack([0, np.cumsum(nedges)])
+        ipairs = np.repeat(offsets[ielements] - pair_offsets[:-1], nedges) + np.arange(
+            pair_offsets[-1])
+        iedges = topology.element_edges[ipairs]
+        pair_eids = np.repeat(topology.eids[ielements], nedges)
+        edges = [tuple(edge) for edge in topology.edges.tolist()]
+        eid_to_edge_map = _get_csr_map(topology.eids[ielements], pair_offsets,
+                                       [edges[iedge] for iedge in iedges.tolist()])
+
+        # the elements of each edge; the keys are in the order that the
+        # edges are first used by the elements (like a loop over the elements)
+        isort = np.argsort(iedges, kind='mergesort')
+        iedges_used, ifirst, nelements = np.unique(
+            iedges, return_index=True, return_counts=True)
+        edge_eids = pair_eids[isort].tolist()
+        edge_offsets = np.hstack([0, np.cumsum(nelements)]).tolist()
+        iedges_used_list = iedges_used.tolist()
+        edge_to_eid_map = defaultdict(set, [
+            (edges[iedges_used_list[i]], set(edge_eids[edge_offsets[i]:edge_offsets[i + 1]]))
+            for i in np.argsort(ifirst, kind='mergesort').tolist()])
+
+        # the edges of each node; the keys are in the order that the nodes
+        # are first used by the edges
+        edge_nids = topology.edges[iedges_used, :].ravel()
+        isort = np.argsort(edge_nids, kind='mergesort')
+        nids, nedges = np.unique(edge_nids, return_counts=True)
+        unused_nids, ifirst = np.unique(topology.edges[iedges, :].ravel(), return_index=True)
+        node_edges = [edges[iedge] for iedge in np.repeat(iedges_used, 2)[isort].tolist()]
+        node_offsets = np.hstack([0, np.cumsum(nedges)]).tolist()
+        nids = nids.tolist()
+        nid_to_edge_map = defaultdict(set, [
+            (nids[i], set(node_edges[node_offsets[i]:node_offsets[i + 1]]))
+            for i in np.argsort(ifirst, kind='mergesort').tolist()])
         out = (
             edge_to_eid_map,
             eid_to_edge_map,
@@ -2036,6 +2046,7 @@ class GetCard(GetMethods):
         """
         Returns a dictionary that maps node IDs to a list of elemnent IDs
 
+        .. note:: the map is a view of the cached topology (see get_topology)
         .. todo:: support 0d or 1d elements
         .. todo:: support elements with missing nodes
                   (e.g. CQUAD8 with missing nodes)
@@ -2048,23 +2059,16 @@ class GetCard(GetMethods):
             for nid in sorted(self.spoints):  # SPOINTs
                 nid_to_eids_map[nid] = []
 
-        for (eid, element) in iteritems(self.elements):  # load the mapper
-            try:
-                # not supported for 0-D and 1-D elements
-                nids = element.node_ids
-            except AttributeError:
-                print(element.type)
-            else:
-                for nid in nids:  # (e.g. CQUAD8 with missing node)
-                    if nid:
-                        nid_to_eids_map[nid].append(eid)
-
+        topology = self.get_topology()
+        eids = topology.eids[topology.node_elements].tolist()
+        nid_to_eids_map.update(_get_csr_map(topology.nids, topology.node_element_offsets, eids))
         return nid_to_eids_map
 
     def get_node_id_to_elements_map(self):
         """
         Returns a dictionary that maps node IDs to a list of elemnents
 
+        .. note:: the map is a view of the cached topology (see get_topology)
         .. todo:: support 0d or 1d elements
         .. todo:: support elements with missing nodes
                   (e.g. CQUAD8 with missing nodes)
@@ -2078,17 +2082,11 @@ class GetCard(GetMethods):
         for nid in self.epoints:
             nid_to_elements_map[nid] = []
 
-        for (eid, element) in iteritems(self.elements):  # load the mapper
-            try:
-                # not supported for 0-D and 1-D elements
-                nids = element.node_ids
-            except AttributeError:
-                print(element.type)
-            else:
-                for nid in nids:  # (e.g. CQUAD8 with missing node)
-                    if nid:
-                        nid_to_elements_map[nid].append(element)
-
+        topology = self.get_topology()
+        elements = list(self.elements.values())
+        elements = [elements[ielement] for ielement in topology.node_elements.tolist()]
+        nid_to_elements_map.update(_get_csr_map(topology.nids, topology.node_element_offsets,
+                                                elements))
         return nid_to_elements_map
 
     def get_property_id_to_element_ids_map(self, msg=''):
@@ -2428,3 +2426,21 @@ class GetCard(GetMethods):
                 self.log.warning('not considering:\n%s' % str(mpc))
                 #raise NotImplementedError(mpc.type)
         return nids, comps
+
+
+def _get_csr_map(keys, offsets, values):
+    """
+    Gets a dictionary of key -> list of values from a set of CSR arrays
+
+    Parameters
+    ----------
+    keys : (nkeys, ) int ndarray
+        the keys (e.g., the node ids)
+    offsets : (nkeys+1, ) int ndarray
+        the start of the values of each key
+    values : List[Any]
+        the values (e.g., the element ids)
+    """
+    offsets = offsets.tolist()
+    return {key : values[i0:i1]
+            for key, i0, i1 in zip(keys.tolist(), offsets[:-1], offsets[1:])}
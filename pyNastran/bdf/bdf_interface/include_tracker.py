@@ -0,0 +1,451 @@
+# coding: utf-8
+"""
+Defines the data used by ``BDF.refresh()`` to re-read the INCLUDE files
+that changed since the model was read:
+  - IncludeTracker
+  - get_card_key(card_name, card_lines)
+  - get_include_blocks(include_tree, include_line_ranges, main_filename)
+  - get_include_subtree(include_tree, filename)
+  - get_refresh_roots(changed_filenames, include_tree, main_filename)
+  - get_card_sources(card_ilines, iline0, include_line_ranges, main_filename)
+  - get_comment_lines(lines, iline)
+  - get_xref_groups(slot_names)
+  - get_group_slots(groups)
+  - iter_slot_cards(slot)
+  - references_cards(card, card_ids)
+
+The cards from the main file are not tracked, so a change to the main file
+re-reads the entire model.  An INCLUDE file is also re-read with the rest
+of the model if one of its cards can't be tracked (e.g., a card that
+creates multiple objects, like a CORD1R with 2 coordinate systems).
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+from bisect import bisect_right
+from six import iteritems, itervalues, string_types
+
+from pyNastran.bdf.utils import to_fields
+from pyNastran.bdf.bdf_interface.model_cache import get_changed_files
+
+#: the slots that are cross-referenced by a group of
+#: ``_cross_reference_*``/``_uncross_reference_*`` methods
+XREF_GROUP_SLOTS = {
+    'nodes' : ['nodes', 'coords'],
+    'elements' : ['elements', 'rigid_elements', 'plotels'],
+    'loads' : ['loads', 'dloads', 'dload_entries', 'load_combinations', 'dareas', 'dphases'],
+    'constraints' : ['spcs', 'spcadds', 'spcoffs', 'mpcs', 'mpcadds',
+                     'suport', 'suport1', 'se_suport'],
+    'properties' : ['properties'],
+    'materials' : ['materials', 'thermal_materials', 'MATS1', 'MATS3', 'MATS8',
+                   'MATT1', 'MATT2', 'MATT3', 'MATT4', 'MATT5', 'MATT8', 'MATT9'],
+    'masses' : ['masses', 'properties_mass'],
+    'aero' : ['caeros', 'paeros', 'trims', 'csschds', 'splines', 'aecomps', 'aelists',
+              'aeparams', 'aesurf', 'aesurfs', 'flutters', 'aero', 'aeros'],
+    'sets' : ['asets', 'bsets', 'csets', 'qsets', 'usets',
+              'se_sets', 'se_bsets', 'se_csets', 'se_qsets', 'se_usets'],
+    'optimization' : ['desvars', 'dresps', 'dconstrs', 'dvcrels', 'dvmrels', 'dvprels',
+                      'dequations'],
+}
+
+#: the groups that may reference an object in the group (the group
+#: included); the objects in the other groups may be referenced by any group
+XREF_GROUP_DEPENDENTS = {
+    'loads' : ['loads'],
+    'constraints' : ['constraints'],
+    'properties' : ['elements', 'properties', 'masses', 'aero', 'optimization'],
+    'materials' : ['elements', 'properties', 'materials', 'optimization'],
+    'masses' : ['masses', 'optimization'],
+    'optimization' : ['optimization'],
+}
+
+#: the slots that aren't cross-referenced
+NO_XREF_SLOTS = ['params', 'rejects']
+
+
+class IncludeTracker(object):
+    """
+    Stores the fingerprint of the files of a model and the card objects
+    that were created from each INCLUDE file
+    """
+    def __init__(self, is_tracked=False):
+        # type: (bool) -> None
+        """
+        Creates an IncludeTracker
+
+        Parameters
+        ----------
+        is_tracked : bool; default=False
+            are the card objects tracked
+        """
+        #: the (filename, mtime, size, sha1) of the main BDF and
+        #: the INCLUDE files (see ``model_cache.get_file_fingerprints``)
+        self.fingerprints = []  # type: List[Any]
+
+        #: filename -> [(card_name, slot_name, key, card), ...];
+        #: None if the cards aren't tracked
+        self.cards = {} if is_tracked else None  # type: Optional[Dict[str, List[Any]]]
+
+        #: filename -> (the comment lines before the file, the comment
+        #: lines at the end of the file); the comment lines before a
+        #: card are part of the card's comment
+        self.comments = {}  # type: Dict[str, Any]
+
+        #: the INCLUDE files that must be re-read with the model
+        self.untracked = set()  # type: Set[str]
+
+    def get_changed_files(self):
+        # type: () -> List[str]
+        """gets the files that changed since the model was read"""
+        return get_changed_files(self.fingerprints)
+
+    def is_tracked(self, filenames):
+        # type: (List[str]) -> bool
+        """are the cards from all the files tracked"""
+        if self.cards is None:
+            return False
+        for filename in filenames:
+            if filename in self.untracked or filename not in self.comments:
+                return False
+        return True
+
+    def add_blocks(self, lines, iline0, blocks, ienddata):
+        # type: (List[str], int, Dict[str, Any], Optional[int]) -> None
+        """
+        Stores the comments at the boundaries of the INCLUDE files and
+        finds the files that can't be tracked
+
+        Parameters
+        ----------
+        lines : List[str]
+            the bulk data lines
+        iline0 : int
+            the line number of lines[0] in the merged deck
+        blocks : Dict[str, (istart, iend)]
+            see ``get_include_blocks``
+        ienddata : int / None
+            the line number of the ENDDATA in the merged deck
+        """
+        nlines = len(lines)
+        for filename, (istart, iend) in iteritems(blocks):
+            if istart < iline0:
+                # the file is in the executive/case control deck
+                continue
+            istart -= iline0
+            iend -= iline0
+            self.cards[filename] = []
+            self.comments[filename] = (
+                get_comment_lines(lines, istart), get_comment_lines(lines, iend))
+
+            # a card must not continue into/out of the file and the
+            # comments at the end of the file must belong to the next card
+            first_line = _get_first_data_line(lines, istart, iend)
+            next_line = _get_first_data_line(lines, iend, nlines)
+            if ienddata is None or iend > ienddata - iline0:
+                self.untracked.add(filename)
+            elif first_line is not None and not _is_card_start(first_line):
+                self.untracked.add(filename)
+            elif next_line is None or not _is_card_start(next_line):
+                self.untracked.add(filename)
+
+    def remove_files(self, filenames):
+        # type: (List[str]) -> None
+        """removes the data for the files"""
+        for filename in filenames:
+            self.cards.pop(filename, None)
+            self.comments.pop(filename, None)
+            self.untracked.discard(filename)
+        filenames_set = set(filenames)
+        self.fingerprints = [fingerprint for fingerprint in self.fingerprints
+                             if fingerprint[0] not in filenames_set]
+
+
+def get_card_key(card_name, card_lines):
+    # type: (str, List[str]) -> Optional[Union[int, str]]
+    """
+    Gets the key of a card (e.g., the element id); the 1st field of the card
+
+    Parameters
+    ----------
+    card_name : str
+        the name of the card (e.g., 'CQUAD4')
+    card_lines : List[str]
+        the lines of the card
+
+    Returns
+    -------
+    key : int / str / None
+        int : an integer key (e.g., the element id)
+        str : a string key (e.g., the name of a PARAM)
+        None : the field is blank
+    """
+    line0 = card_lines[0]
+    if ',' in line0 or '\t' in line0 or '*' in line0[:8]:
+        fields = to_fields(card_lines[:1], card_name)
+        field = fields[1] if len(fields) > 1 else ''
+    else:
+        # small field
+        field = line0[8:16]
+    field = field.strip().upper()
+    if not field:
+        return None
+    try:
+        return int(field)
+    except ValueError:
+        return field
+
+
+def get_include_blocks(include_tree, include_line_ranges, main_filename):
+    # type: (Dict[str, List[str]], Dict[str, List[Any]], str) -> Dict[str, Any]
+    """
+    Gets the lines of the merged deck that each INCLUDE file (and the files
+    it includes) defines.  The INCLUDE statement of the k-th INCLUDE file
+    is the last line of the k-th line range of the parent file.
+
+    Parameters
+    ----------
+    include_tree : Dict[str, List[str]]
+        see ``BDF.include_tree``
+    include_line_ranges : Dict[str, List[(istart, iend)]]
+        see ``BDF.include_line_ranges``
+    main_filename : str
+        the file at the top of the tree
+
+    Returns
+    -------
+    blocks : Dict[str, (istart, iend)]
+        the [istart, iend) lines of each INCLUDE file
+    """
+    nlines = {}
+    for filename in reversed(get_include_subtree(include_tree, main_filename)):
+        nlines[filename] = sum(iend - istart for istart, iend
+                               in include_line_ranges.get(filename, [])) + sum(
+                                   nlines[child] for child in include_tree.get(filename, []))
+
+    blocks = {}
+    parents = [main_filename]
+    while parents:
+        parent = parents.pop()
+        line_ranges = include_line_ranges.get(parent, [])
+        for i, filename in enumerate(include_tree.get(parent, [])):
+            istart = line_ranges[i][1]
+            blocks[filename] = (istart, istart + nlines[filename])
+            parents.append(filename)
+    return blocks
+
+
+def get_include_subtree(include_tree, filename):
+    # type: (Dict[str, List[str]], str) -> List[str]
+    """gets the file and the files it includes (parents before children)"""
+    filenames = []
+    stack = [filename]
+    while stack:
+        filename = stack.pop()
+        filenames.append(filename)
+        stack.extend(reversed(include_tree.get(filename, [])))
+    return filenames
+
+
+def get_refresh_roots(changed_filenames, include_tree, main_filename):
+    # type: (List[str], Dict[str, List[str]], str) -> Optional[List[str]]
+    """
+    Gets the changed files that aren't included by another changed file
+
+    Returns
+    -------
+    roots : List[str] / None
+        None : the main file changed
+    """
+    changed = set(changed_filenames)
+    if main_filename in changed:
+        return None
+    parents = {}
+    for parent, filenames in iteritems(include_tree):
+        for filename in filenames:
+            parents[filename] = parent
+
+    roots = []
+    for filename in sorted(changed):
+        if filename not in parents:
+            return None
+        parent = parents[filename]
+        while parent in parents and parent not in changed:
+            parent = parents[parent]
+        if parent not in changed:
+            roots.append(filename)
+    return roots
+
+
+def get_card_sources(card_ilines, iline0, include_line_ranges, main_filename):
+    # type: (List[int], int, Dict[str, List[Any]], Optional[str]) -> List[Optional[str]]
+    """
+    Gets the INCLUDE file that defines each card
+
+    Parameters
+    ----------
+    card_ilines : List[int]
+        the index of the first line of each card in the bulk data lines
+    iline0 : int
+        the line number of the first bulk data line in the merged deck
+    include_line_ranges : Dict[str, List[(istart, iend)]]
+        see ``BDF.include_line_ranges``
+    main_filename : str / None
+        the main file; the cards from the main file aren't tracked
+
+    Returns
+    -------
+    card_sources : List[str/None]
+        the INCLUDE file of each card; None for the main file
+    """
+    line_ranges = sorted(
+        (istart, iend, filename)
+        for filename, ranges in iteritems(include_line_ranges)
+        for istart, iend in ranges)
+    istarts = [line_range[0] for line_range in line_ranges]
+
+    card_sources = []
+    for iline in card_ilines:
+        iline += iline0
+        i = bisect_right(istarts, iline) - 1
+        filename = None
+        if i >= 0 and iline < line_ranges[i][1]:
+            filename = line_ranges[i][2]
+        card_sources.append(None if filename == main_filename else filename)
+    return card_sources
+
+
+def get_comment_lines(lines, iline):
+    # type: (List[str], int) -> List[str]
+    """gets the comment/blank lines before lines[iline]"""
+    i = iline
+    while i > 0 and not lines[i - 1].split('$', 1)[0].strip():
+        i -= 1
+    return lines[i:iline]
+
+
+def get_xref_groups(slot_names):
+    # type: (Iterable[str]) -> Optional[Set[str]]
+    """
+    Gets the groups of objects that may reference the objects in the slots
+
+    Returns
+    -------
+    groups : Set[str] / None
+        the groups (e.g., 'loads', 'properties'); None for all the groups
+    """
+    slot_to_group = {}
+    for group, group_slot_names in iteritems(XREF_GROUP_SLOTS):
+        for slot_name in group_slot_names:
+            slot_to_group[slot_name] = group
+
+    groups = set()
+    for slot_name in slot_names:
+        if slot_name in NO_XREF_SLOTS:
+            continue
+        group = slot_to_group.get(slot_name)
+        if group not in XREF_GROUP_DEPENDENTS:
+            return None
+        groups.update(XREF_GROUP_DEPENDENTS[group])
+    return groups
+
+
+def get_group_slots(groups):
+    # type: (Optional[Iterable[str]]) -> List[str]
+    """gets the slots of the groups (see ``get_xref_groups``); None for all the groups"""
+    if groups is None:
+        groups = XREF_GROUP_SLOTS
+    return [slot_name for group in sorted(groups)
+            for slot_name in XREF_GROUP_SLOTS[group]]
+
+
+def iter_slot_cards(slot):
+    # type: (Any) -> Iterator[Any]
+    """
+    Iterates over the cards in a slot (e.g., ``model.loads``); a slot is a
+    dictionary of cards/lists of cards, a list of cards or a single card
+    """
+    if slot is None:
+        return
+    if isinstance(slot, dict):
+        values = itervalues(slot)
+    elif isinstance(slot, list):
+        values = slot
+    else:
+        yield slot
+        return
+    for value in values:
+        if isinstance(value, list):
+            for card in value:
+                yield card
+        else:
+            yield value
+
+
+def references_cards(card, card_ids):
+    # type: (Any, Set[int]) -> bool
+    """
+    Does the card reference one of the cards (by identity)?
+
+    Parameters
+    ----------
+    card : BaseCard
+        the card
+    card_ids : Set[int]
+        the id() of the cards
+
+    The references are the ``*_ref`` attributes of the card (a card or
+    nested lists of cards).  GRID.elements_ref (the elements that reference
+    the node) is skipped.
+    """
+    for name in _get_ref_names(card):
+        if name != 'elements_ref' and _has_card(getattr(card, name, None), card_ids):
+            return True
+    return False
+
+
+#: class -> the ``*_ref`` slots of the class
+_SLOT_REF_NAMES = {}  # type: Dict[type, Tuple[str, ...]]
+
+def _get_ref_names(card):
+    # type: (Any) -> List[str]
+    """gets the ``*_ref`` attributes of a card (including the __slots__)"""
+    card_class = type(card)
+    slot_ref_names = _SLOT_REF_NAMES.get(card_class)
+    if slot_ref_names is None:
+        names = []
+        for base_class in card_class.__mro__:
+            slots = base_class.__dict__.get('__slots__', ())
+            if isinstance(slots, string_types):
+                slots = [slots]
+            names.extend(name for name in slots if name.endswith('_ref'))
+        slot_ref_names = _SLOT_REF_NAMES[card_class] = tuple(names)
+
+    ref_names = list(slot_ref_names)
+    card_dict = getattr(card, '__dict__', None)
+    if card_dict:
+        ref_names.extend(name for name in card_dict if name.endswith('_ref'))
+    return ref_names
+
+
+def _has_card(value, card_ids):
+    # type: (Any, Set[int]) -> bool
+    """is the value (or an item of nested lists) one of the cards"""
+    if isinstance(value, (list, tuple)):
+        return any(_has_card(item, card_ids) for item in value)
+    return id(value) in card_ids
+
+
+def _get_first_data_line(lines, istart, iend):
+    # type: (List[str], int, int) -> Optional[str]
+    """gets the first line in lines[istart:iend] that isn't a comment"""
+    for i in range(istart, iend):
+        line = lines[i]
+        if line.split('$', 1)[0].strip():
+            return line
+    return None
+
+
+def _is_card_start(line):
+    # type: (str) -> bool
+    """is the line the first line of a card (and not a continuation line)"""
+    card_name = line.split('$', 1)[0].split(',', 1)[0].split('\t', 1)[0][:8].rstrip()
+    return bool(card_name) and card_name[0] not in ['+', '*']
@@ -0,0 +1,316 @@
+# coding: utf-8
+"""
+Defines the containers used by ``read_bdf(..., lazy=True)`` and
+``read_bdf(..., lazy_xref=True)``:
+  - LazyCard
+  - LazyCardDict
+  - raw_items(card_dict)
+
+A LazyCardDict stores the unparsed lines of a card and calls the card's
+``add_card`` method the first time the card is accessed.  The writer uses
+``raw_items``, so cards that were never accessed are written out using
+their original text.  The cards that weren't written in the field size
+of the output are built first (see ``build_other_formats``).
+
+A LazyCardDict may also cross-reference the cards the first time they are
+accessed (see ``BDF.lazy_cross_reference``).
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+from six import iteritems
+
+from pyNastran.bdf.cards.base_card import _format_comment
+
+
+class LazyCard(object):
+    """stores the unparsed data of a card"""
+    __slots__ = ['type', 'comment', 'card_lines']
+
+    def __init__(self, card_name, comment, card_lines):
+        # type: (str, str, List[str]) -> None
+        """
+        Creates a LazyCard
+
+        Parameters
+        ----------
+        card_name : str
+            the name of the card (e.g., 'CQUAD4')
+        comment : str
+            the comment for the card
+        card_lines : List[str]
+            the lines of the card
+        """
+        self.type = card_name
+        self.comment = comment
+        self.card_lines = card_lines
+
+    def write_card(self, size=8, is_double=False):
+        # type: (int, bool) -> str
+        """
+        writes the card using the original text; size and is_double are
+        ignored (see ``has_format``)
+        """
+        return _format_comment(self.comment) + ''.join(
+            '%s\n' % line.rstrip() for line in self.card_lines)
+
+    def has_format(self, size=8, is_double=False):
+        # type: (int, bool) -> bool
+        """
+        Can the original text be written as a card with the field size
+        and precision?  The original text is small field (size=8) or
+        large field (size=16) and is never considered to be double
+        precision.
+        """
+        if size == 16 and is_double:
+            return False
+        line0 = self.card_lines[0]
+        card_name_field = line0.split(',', 1)[0] if ',' in line0 else line0[:8]
+        original_size = 16 if '*' in card_name_field else 8
+        return size == original_size
+
+    def write_card_16(self, is_double=False):
+        # type: (bool) -> str
+        """writes the card using the original text"""
+        return self.write_card(16, is_double)
+
+    def __repr__(self):
+        return 'LazyCard(%r, %r)' % (self.type, self.card_lines)
+
+
+class LazyCardDict(dict):
+    """
+    A dictionary of cards that may be stored as LazyCards.  The card
+    objects are built when they are accessed.
+
+    Parameters
+    ----------
+    build_card : function
+        a function that takes a LazyCard and returns the card object
+    is_list : bool; default=False
+        True : the values are lists of cards (e.g., loads)
+        False : the values are cards (e.g., elements)
+    """
+    def __init__(self, build_card, is_list=False):
+        dict.__init__(self)
+        self.build_card = build_card
+        self.is_list = is_list
+
+        #: a function that cross-references a list of cards; None if the
+        #: cards aren't cross-referenced when they're accessed
+        self.xref_cards = None
+
+        #: key -> the number of cross-referenced cards
+        self._nxref = {}  # type: Dict[Any, int]
+
+        #: are there LazyCards that haven't been built
+        self._has_lazy_cards = False
+
+    def set_xref_cards(self, xref_cards):
+        # type: (Optional[Callable[[List[Any]], None]]) -> None
+        """
+        Sets the function that cross-references the cards the first time
+        they're accessed
+
+        Parameters
+        ----------
+        xref_cards : function / None
+            a function that takes a list of cards;
+            None : the cards aren't cross-referenced
+        """
+        self.xref_cards = xref_cards
+        self._nxref = {}
+
+    def _xref_keys(self, keys):
+        # type: (List[Any]) -> None
+        """cross-references the cards of the keys that haven't been cross-referenced"""
+        # the keys are flagged before the cards are cross-referenced, so a
+        # card that references a card in the same dictionary doesn't recurse
+        nxref = self._nxref
+        if self.is_list:
+            cards = []
+            keys_nxref = []
+            for key in keys:
+                value = dict.__getitem__(self, key)
+                nxrefi = nxref.get(key, 0)
+                if nxrefi < len(value):
+                    cards.extend(value[nxrefi:])
+                    keys_nxref.append((key, nxrefi))
+                    nxref[key] = len(value)
+        else:
+            keys_nxref = [(key, 0) for key in keys if key not in nxref]
+            cards = [dict.__getitem__(self, key) for key, unused_nxrefi in keys_nxref]
+            nxref.update(keys_nxref)
+        if not cards:
+            return
+
+        try:
+            self.xref_cards(cards)
+        except Exception:
+            for key, nxrefi in keys_nxref:
+                if nxrefi:
+                    nxref[key] = nxrefi
+                else:
+                    del nxref[key]
+            raise
+
+    def add_lazy_card(self, key, lazy_card):
+        # type: (Any, LazyCard) -> bool
+        """
+        Adds a LazyCard to the dictionary
+
+        Returns
+        -------
+        is_new_key : bool
+            was the key added
+        """
+        self._has_lazy_cards = True
+        if self.is_list:
+            if dict.__contains__(self, key):
+                dict.__getitem__(self, key).append(lazy_card)
+                return False
+            dict.__setitem__(self, key, [lazy_card])
+            return True
+        self[key] = lazy_card
+        return True
+
+    def is_built(self, key):
+        # type: (Any) -> bool
+        """has the card object been built"""
+        value = dict.__getitem__(self, key)
+        if self.is_list:
+            return not any(isinstance(card, LazyCard) for card in value)
+        return not isinstance(value, LazyCard)
+
+    @property
+    def nlazy(self):
+        # type: () -> int
+        """the number of keys with LazyCards"""
+        return sum(1 for key in self if not self.is_built(key))
+
+    def raw_items(self):
+        """iterates over the (key, card/LazyCard) pairs without building the cards"""
+        return dict.items(self)
+
+    def update_raw(self, card_dict):
+        # type: (Dict[Any, Any]) -> None
+        """adds the (key, card/LazyCard) pairs of ``raw_items`` without building the cards"""
+        dict.update(self, card_dict)
+        self._has_lazy_cards = True
+
+    def build_other_formats(self, size=8, is_double=False):
+        # type: (int, bool) -> None
+        """
+        Builds the LazyCards that can't be written in the field size and
+        precision using their original text (see ``LazyCard.has_format``)
+        """
+        if not self._has_lazy_cards:
+            return
+        for key, value in list(dict.items(self)):
+            cards = value if self.is_list else [value]
+            if any(isinstance(card, LazyCard) and not card.has_format(size, is_double)
+                   for card in cards):
+                self._build_key(key)
+
+    def build(self):
+        """builds (and cross-references) all the card objects"""
+        if self._has_lazy_cards:
+            for key in list(self):
+                self._build_key(key)
+            self._has_lazy_cards = False
+        if self.xref_cards is not None and (self.is_list or len(self._nxref) < len(self)):
+            self._xref_keys(list(self))
+
+    def _build_key(self, key):
+        """builds the card objects of a key"""
+        value = dict.__getitem__(self, key)
+        if self.is_list:
+            for i, card in enumerate(value):
+                if isinstance(card, LazyCard):
+                    value[i] = self.build_card(card)
+        elif isinstance(value, LazyCard):
+            value = self.build_card(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __getitem__(self, key):
+        value = self._build_key(key)
+        if self.xref_cards is not None:
+            self._xref_keys([key])
+        return value
+
+    def __setitem__(self, key, value):
+        self._nxref.pop(key, None)
+        if isinstance(value, LazyCard):
+            self._has_lazy_cards = True
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._nxref.pop(key, None)
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key):
+            return self[key]
+        return default
+
+    def items(self):
+        self.build()
+        return dict.items(self)
+
+    def values(self):
+        self.build()
+        return dict.values(self)
+
+    def pop(self, key, *default):
+        if dict.__contains__(self, key):
+            value = self[key]
+            del self[key]
+            return value
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key = next(iter(self))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        if dict.__contains__(self, key):
+            return self[key]
+        self[key] = default
+        return default
+
+    def clear(self):
+        dict.clear(self)
+        self._nxref = {}
+
+    def update(self, *args, **kwargs):
+        for key, value in iteritems(dict(*args, **kwargs)):
+            self[key] = value
+
+    def copy(self):
+        return dict(self.items())
+
+    def __reduce__(self):
+        """
+        pickles the dictionary as a dict of built cards (the model cache
+        pickles the LazyCards; see ``raw_items``)
+        """
+        return (dict, (dict(self.items()),))
+
+    if hasattr(dict, 'iteritems'):  # pragma: no cover
+        def iteritems(self):
+            self.build()
+            return dict.iteritems(self)
+
+        def itervalues(self):
+            self.build()
+            return dict.itervalues(self)
+
+
+def raw_items(card_dict):
+    """
+    Iterates over the (key, card) pairs of a card dictionary.  Unbuilt
+    cards in a LazyCardDict are returned as LazyCards.
+    """
+    if isinstance(card_dict, LazyCardDict):
+        return card_dict.raw_items()
+    return iteritems(card_dict)
@@ -0,0 +1,374 @@
+# coding: utf-8
+"""
+Defines the persistent model cache used by ``read_bdf(..., cache_dir=...)``:
+  - get_cache_key(bdf_filename, options)
+  - get_cache_filename(cache_dir, cache_key)
+  - get_file_stat(filename)
+  - get_file_fingerprints(filenames, sha1=True, file_stats=None)
+  - get_changed_files(fingerprints)
+  - is_valid_fingerprint(fingerprints)
+  - load_model_cache(cache_filename, cache_key)
+  - save_model_cache(cache_filename, cache_key, fingerprints, state)
+  - evict_model_cache(cache_dir, max_size=None, keep=None)
+
+A cache file stores two pickles:
+  1. the header, which has the cache version and the fingerprint
+     (filename, mtime, size, sha1) of the main BDF and every INCLUDE file
+  2. the state of the model after the cards were parsed (before
+     validation/cross-referencing)
+
+The header is read first, so an outdated cache file is rejected without
+loading the model.  A file with a new mtime, but the same size and sha1
+(e.g., it was touched) is still valid and the new mtime is written to the
+header, so the sha1 isn't recalculated the next time the cache is loaded.
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+import os
+import sys
+import shutil
+import hashlib
+from six.moves.cPickle import load, dump, HIGHEST_PROTOCOL  # type: ignore
+
+import pyNastran
+
+#: the version of the cache file format; bump it if the layout changes
+CACHE_FORMAT_VERSION = 2
+
+#: the cache version; a cache file with a different version is rejected
+CACHE_VERSION = (CACHE_FORMAT_VERSION, pyNastran.__version__, tuple(sys.version_info[:2]))
+
+#: the default size of the cache directory before the least recently
+#: used files are deleted (4 GB)
+MAX_CACHE_SIZE = 4 * 1024 ** 3
+
+#: the prefix/suffix of the cache files
+CACHE_PREFIX = 'bdf_cache_'
+CACHE_SUFFIX = '.pkl'
+
+
+def get_cache_key(bdf_filename, options):
+    # type: (str, List[Any]) -> str
+    """
+    Gets the key of the cache file
+
+    Parameters
+    ----------
+    bdf_filename : str
+        the main BDF filename
+    options : List[varies]
+        the reader options that change the model (e.g., punch, encoding,
+        the cards to read); must have a stable repr
+
+    Returns
+    -------
+    cache_key : str
+        the sha1 of the absolute path of the BDF and the options
+    """
+    data = repr([os.path.abspath(bdf_filename), options])
+    return hashlib.sha1(data.encode('utf8')).hexdigest()
+
+
+def get_cache_filename(cache_dir, cache_key):
+    # type: (str, str) -> str
+    """gets the path to a cache file"""
+    return os.path.join(cache_dir, CACHE_PREFIX + cache_key + CACHE_SUFFIX)
+
+
+def _get_sha1(filename, block_size=2 ** 20):
+    # type: (str, int) -> str
+    """gets the sha1 of a file"""
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as file_obj:
+        while True:
+            data = file_obj.read(block_size)
+            if not data:
+                break
+            sha1.update(data)
+    return sha1.hexdigest()
+
+
+def get_file_stat(filename):
+    # type: (str) -> Tuple[float, int]
+    """gets the (mtime, size) of a file"""
+    stat = os.stat(filename)
+    return stat.st_mtime, stat.st_size
+
+
+def get_file_fingerprints(filenames, sha1=True, file_stats=None):
+    # type: (List[str], bool, Optional[Dict[str, Any]]) -> Optional[List[Any]]
+    """
+    Gets the fingerprint of the files
+
+    Parameters
+    ----------
+    filenames : List[str]
+        the main BDF and the INCLUDE files
+    sha1 : bool; default=True
+        calculate the sha1 of the files; if False, a file with a new
+        mtime is considered to be changed
+    file_stats : Dict[str, (mtime, size)]; default=None
+        the (mtime, size) of the files when they were opened (see
+        ``get_file_stat``), so a file that changed while the model was
+        read isn't fingerprinted as the new file
+
+    Returns
+    -------
+    fingerprints : List[(filename, mtime, size, sha1)] / None
+        the absolute path, modification time, size (bytes) and sha1
+        (or None) of each file; with sha1=False, the mtime/size are
+        from file_stats
+        None : sha1=True and a file in file_stats changed after it was
+               opened
+    """
+    fingerprints = []
+    for filename in sorted(set(os.path.abspath(filename) for filename in filenames)):
+        mtime, size = get_file_stat(filename)
+        file_stat = None if file_stats is None else file_stats.get(filename)
+        sha1i = None
+        if sha1:
+            if file_stat is not None and file_stat != (mtime, size):
+                return None
+            sha1i = _get_sha1(filename)
+            if file_stat is not None and get_file_stat(filename) != file_stat:
+                # the file changed while the sha1 was calculated
+                return None
+        elif file_stat is not None:
+            mtime, size = file_stat
+        fingerprints.append((filename, mtime, size, sha1i))
+    return fingerprints
+
+
+def get_changed_files(fingerprints):
+    # type: (List[Any]) -> List[str]
+    """
+    Gets the files that were deleted or changed
+
+    Parameters
+    ----------
+    fingerprints : List[(filename, mtime, size, sha1)]
+        see ``get_file_fingerprints``
+
+    Returns
+    -------
+    changed_filenames : List[str]
+        the files that changed; the sha1 is only checked if the mtime
+        changed
+    """
+    changed_filenames, unused_fingerprints = _check_fingerprints(fingerprints)
+    return changed_filenames
+
+
+def _check_fingerprints(fingerprints):
+    # type: (List[Any]) -> Tuple[List[str], List[Any]]
+    """
+    Gets the files that were deleted or changed and the updated
+    fingerprints
+
+    Returns
+    -------
+    changed_filenames : List[str]
+        see ``get_changed_files``
+    new_fingerprints : List[(filename, mtime, size, sha1)]
+        the fingerprints with the new mtime of the files that have the
+        same sha1 (e.g., they were touched)
+    """
+    changed_filenames = []
+    new_fingerprints = []
+    for filename, mtime, size, sha1 in fingerprints:
+        if not os.path.exists(filename):
+            changed_filenames.append(filename)
+            continue
+        stat = os.stat(filename)
+        if stat.st_size != size:
+            changed_filenames.append(filename)
+        elif stat.st_mtime != mtime:
+            if sha1 is None or _get_sha1(filename) != sha1:
+                changed_filenames.append(filename)
+            else:
+                mtime = stat.st_mtime
+        new_fingerprints.append((filename, mtime, size, sha1))
+    return changed_filenames, new_fingerprints
+
+
+def is_valid_fingerprint(fingerprints):
+    # type: (List[Any]) -> bool
+    """
+    Checks that none of the files have changed
+
+    Parameters
+    ----------
+    fingerprints : List[(filename, mtime, size, sha1)]
+        see ``get_file_fingerprints``
+
+    Returns
+    -------
+    is_valid : bool
+        True : the files are unchanged
+        False : a file is missing or changed
+    """
+    return not get_changed_files(fingerprints)
+
+
+def load_model_cache(cache_filename, cache_key):
+    # type: (str, str) -> Optional[Dict[str, Any]]
+    """
+    Loads the state of a model from a cache file
+
+    Parameters
+    ----------
+    cache_filename : str
+        the path to the cache file
+    cache_key : str
+        the expected key of the cache file
+
+    Returns
+    -------
+    state : Dict[str, varies] / None
+        dict : the attributes of the model
+        None : the cache file doesn't exist, is outdated or is corrupt
+    """
+    if not os.path.exists(cache_filename):
+        return None
+
+    try:
+        with open(cache_filename, 'rb') as cache_file:
+            header = load(cache_file)
+            if header.get('version') != CACHE_VERSION or header.get('key') != cache_key:
+                return None
+            changed_filenames, fingerprints = _check_fingerprints(header['fingerprints'])
+            if changed_filenames:
+                return None
+            istate = cache_file.tell()
+            state = load(cache_file)
+    except Exception:
+        # corrupt/partially written file or a model from an older version
+        return None
+
+    try:
+        if fingerprints != header['fingerprints']:
+            # a file was touched, so the new mtimes are saved; the state
+            # is copied without being pickled again
+            header['fingerprints'] = fingerprints
+            _write_cache_file(cache_filename, header,
+                              lambda cache_file: _copy_state(cache_filename, istate, cache_file))
+        else:
+            # the access time is used to find the least recently used files
+            os.utime(cache_filename, None)
+    except (IOError, OSError):  # pragma: no cover
+        pass
+    return state
+
+
+def _copy_state(cache_filename, istate, cache_file):
+    # type: (str, int, Any) -> None
+    """copies the pickled state of a cache file that starts at istate"""
+    with open(cache_filename, 'rb') as old_cache_file:
+        old_cache_file.seek(istate)
+        shutil.copyfileobj(old_cache_file, cache_file)
+
+
+def save_model_cache(cache_filename, cache_key, fingerprints, state):
+    # type: (str, str, List[Any], Dict[str, Any]) -> None
+    """
+    Saves the state of a model to a cache file
+
+    The file is written to a temporary file and then renamed, so another
+    process never reads a partially written file.
+
+    Parameters
+    ----------
+    cache_filename : str
+        the path to the cache file
+    cache_key : str
+        the key of the cache file
+    fingerprints : List[(filename, mtime, size, sha1)]
+        see ``get_file_fingerprints``
+    state : Dict[str, varies]
+        the attributes of the model
+    """
+    cache_dir = os.path.dirname(cache_filename)
+    if cache_dir and not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+
+    header = {
+        'version' : CACHE_VERSION,
+        'key' : cache_key,
+        'fingerprints' : fingerprints,
+    }
+    _write_cache_file(cache_filename, header,
+                      lambda cache_file: dump(state, cache_file, HIGHEST_PROTOCOL))
+
+
+def _write_cache_file(cache_filename, header, write_state):
+    # type: (str, Dict[str, Any], Callable[[Any], None]) -> None
+    """
+    Writes the header and the state (using write_state) to a temporary
+    file and renames it to cache_filename
+    """
+    tmp_filename = '%s.%i.tmp' % (cache_filename, os.getpid())
+    try:
+        with open(tmp_filename, 'wb') as cache_file:
+            dump(header, cache_file, HIGHEST_PROTOCOL)
+            write_state(cache_file)
+        if os.path.exists(cache_filename) and not hasattr(os, 'replace'):  # pragma: no cover
+            os.remove(cache_filename)
+        getattr(os, 'replace', os.rename)(tmp_filename, cache_filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+
+def evict_model_cache(cache_dir, max_size=None, keep=None):
+    # type: (str, Optional[int], Optional[str]) -> List[str]
+    """
+    Deletes the least recently used cache files until the cache directory
+    is smaller than max_size
+
+    Parameters
+    ----------
+    cache_dir : str
+        the cache directory
+    max_size : int; default=None -> MAX_CACHE_SIZE
+        the maximum size of the cache files (bytes)
+    keep : str; default=None
+        a cache file that should not be deleted (e.g., the file that
+        was just written)
+
+    Returns
+    -------
+    deleted_filenames : List[str]
+        the cache files that were deleted
+    """
+    if max_size is None:
+        max_size = MAX_CACHE_SIZE
+    if not os.path.isdir(cache_dir):
+        return []
+
+    cache_files = []
+    total_size = 0
+    for basename in os.listdir(cache_dir):
+        if not (basename.startswith(CACHE_PREFIX) and basename.endswith(CACHE_SUFFIX)):
+            continue
+        cache_filename = os.path.join(cache_dir, basename)
+        try:
+            stat = os.stat(cache_filename)
+        except OSError:  # pragma: no cover
+            # deleted by another process
+            continue
+        total_size += stat.st_size
+        cache_files.append((stat.st_mtime, stat.st_size, cache_filename))
+
+    deleted_filenames = []
+    for unused_mtime, size, cache_filename in sorted(cache_files):
+        if total_size <= max_size:
+            break
+        if keep is not None and os.path.abspath(cache_filename) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(cache_filename)
+        except OSError:  # pragma: no cover
+            continue
+        total_size -= size
+        deleted_filenames.append(cache_filename)
+    return deleted_filenames
@@ -0,0 +1,659 @@
+# coding: utf-8
+"""
+Defines the array-backed node container used by ``BDF.set_node_arrays()``:
+  - NodeArrayDict
+  - GRIDProxy
+
+A NodeArrayDict stores the GRIDs in contiguous arrays (nid, cp, xyz, cd,
+ps, seid) and behaves like the standard dictionary of GRIDs.  Accessing a
+node returns a GRIDProxy, which is a GRID that reads/writes its row of
+the arrays, so the GRID methods (e.g., get_position, write_card,
+cross_reference) work unchanged.  Bulk queries (e.g., the xyz of a set
+of nodes in a coordinate system) are vectorized.
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+try:
+    from collections.abc import MutableMapping, ItemsView, ValuesView
+except ImportError:  # pragma: no cover
+    from collections import MutableMapping, ItemsView, ValuesView
+import numpy as np
+
+from pyNastran.utils import integer_types
+from pyNastran.bdf.cards.nodes import GRID
+
+#: the smallest capacity of the arrays
+MIN_CAPACITY = 64
+
+#: the number of ids that are added before the sorted index is rebuilt
+#: is max(MIN_PENDING, nsorted // 4)
+MIN_PENDING = 1024
+
+#: the maximum length of the ps field (e.g., '123456')
+PS_DTYPE = 'S6'
+
+#: the range of the node ids
+MIN_ID = np.iinfo('int32').min
+MAX_ID = np.iinfo('int32').max
+
+#: the arrays with one value per node
+ARRAY_NAMES = ['_key', '_nid', '_cp', '_xyz', '_cd', '_ps', '_seid']
+
+#: the object arrays that are allocated when a node is cross-referenced
+REF_ARRAY_NAMES = ['_cp_ref', '_cd_ref']
+
+
+class NodeArrayDict(MutableMapping):
+    """
+    A dictionary of GRIDs that stores the nodes in contiguous arrays
+
+    The arrays are in insertion order (like a dict) and a sorted index of
+    the ids is used to find the row of a node.  Accessing a node returns a
+    new GRIDProxy, so ``nodes[1] is nodes[1]`` is False.  Replacing a node
+    copies the data of the GRID into the arrays and ``pop`` returns a
+    standalone GRID.
+
+    Parameters
+    ----------
+    nodes : Dict[int, GRID]; default=None
+        the initial nodes
+    """
+    def __init__(self, nodes=None):
+        self._n = 0
+        self._key = np.zeros(0, dtype='int32')
+        self._nid = np.zeros(0, dtype='int32')
+        self._cp = np.zeros(0, dtype='int32')
+        self._xyz = np.zeros((0, 3), dtype='float64')
+        self._cd = np.zeros(0, dtype='int32')
+        self._ps = np.zeros(0, dtype=PS_DTYPE)
+        self._seid = np.zeros(0, dtype='int32')
+
+        # the cross-referenced coordinate systems; allocated on first use
+        self._cp_ref = None
+        self._cd_ref = None
+
+        #: key -> comment
+        self._comments = {}  # type: Dict[int, str]
+        #: key -> {'elements_ref'/'ps_ref'/'seid_ref' : value}
+        self._extras = {}  # type: Dict[int, Dict[str, Any]]
+
+        # the sorted index covers the first _nsorted rows; the rows that
+        # were added after the index was built are in _pending
+        self._nsorted = 0
+        self._sorted_keys = np.zeros(0, dtype='int32')
+        self._sorted_rows = np.zeros(0, dtype='int32')
+        self._pending = {}  # type: Dict[int, int]
+
+        #: incremented when the rows move (e.g., a node is deleted)
+        self._version = 0
+        if nodes:
+            self.update(nodes)
+
+    #---------------------------------------------------------------------
+    # arrays
+    @property
+    def node_ids(self):
+        # type: () -> np.ndarray
+        """the keys of the nodes (in insertion order)"""
+        return self._key[:self._n]
+
+    @property
+    def nid(self):
+        # type: () -> np.ndarray
+        """the ids of the nodes (in insertion order)"""
+        return self._nid[:self._n]
+
+    @property
+    def cp(self):
+        # type: () -> np.ndarray
+        """the input coordinate systems (in insertion order)"""
+        return self._cp[:self._n]
+
+    @property
+    def xyz(self):
+        # type: () -> np.ndarray
+        """the locations of the nodes in the cp frame (in insertion order)"""
+        return self._xyz[:self._n]
+
+    @property
+    def cd(self):
+        # type: () -> np.ndarray
+        """the output coordinate systems (in insertion order)"""
+        return self._cd[:self._n]
+
+    @property
+    def ps(self):
+        # type: () -> np.ndarray
+        """the permanent SPCs as bytes (in insertion order)"""
+        return self._ps[:self._n]
+
+    @property
+    def seid(self):
+        # type: () -> np.ndarray
+        """the superelement ids (in insertion order)"""
+        return self._seid[:self._n]
+
+    def _grow(self, n):
+        # type: (int) -> None
+        """increases the capacity of the arrays to hold n nodes"""
+        capacity = len(self._key)
+        if n <= capacity:
+            return
+        capacity = max(MIN_CAPACITY, 2 * capacity, n)
+        for name in ARRAY_NAMES + REF_ARRAY_NAMES:
+            array = getattr(self, name)
+            if array is None:
+                continue
+            new_array = np.zeros((capacity, ) + array.shape[1:], dtype=array.dtype)
+            new_array[:self._n] = array[:self._n]
+            setattr(self, name, new_array)
+
+    def _get_ref_array(self, name):
+        # type: (str) -> np.ndarray
+        """gets the cp_ref/cd_ref array and allocates it if necessary"""
+        array = getattr(self, name)
+        if array is None:
+            array = np.full(len(self._key), None, dtype='object')
+            setattr(self, name, array)
+        return array
+
+    #---------------------------------------------------------------------
+    # index
+    def _get_row(self, key):
+        # type: (int) -> int
+        """gets the row of a node; raises a KeyError if it doesn't exist"""
+        row = self._pending.get(key)
+        if row is not None:
+            return row
+        if not isinstance(key, integer_types) or not MIN_ID <= key <= MAX_ID:
+            raise KeyError(key)
+        sorted_keys = self._sorted_keys
+        # a Python int would cast the array to int64
+        i = sorted_keys.searchsorted(np.int32(key))
+        if i < len(sorted_keys) and sorted_keys[i] == key:
+            return int(self._sorted_rows[i])
+        raise KeyError(key)
+
+    def _build_index(self):
+        # type: () -> None
+        """sorts the ids of all the nodes"""
+        keys = self._key[:self._n]
+        self._sorted_rows = np.argsort(keys, kind='mergesort').astype('int32')
+        self._sorted_keys = keys[self._sorted_rows]
+        self._nsorted = self._n
+        self._pending = {}
+
+    def get_index(self, nids):
+        # type: (Any) -> np.ndarray
+        """
+        Gets the rows of the arrays for a series of nodes
+
+        Parameters
+        ----------
+        nids : (n, ) int ndarray
+            the node ids
+
+        Returns
+        -------
+        rows : (n, ) int ndarray
+            the index into node_ids, xyz, cp, etc.
+        """
+        if self._pending or self._nsorted != self._n:
+            self._build_index()
+        nids = np.asarray(nids)
+        sorted_keys = self._sorted_keys
+        if not len(sorted_keys):
+            if nids.size:
+                raise KeyError('nids=%s are missing' % np.unique(nids).tolist())
+            return np.zeros(nids.shape, dtype='int32')
+        i = np.minimum(np.searchsorted(sorted_keys, nids), len(sorted_keys) - 1)
+        is_missing = sorted_keys[i] != nids
+        if is_missing.any():
+            raise KeyError('nids=%s are missing' % np.unique(nids[is_missing]).tolist())
+        return self._sorted_rows[i]
+
+    #---------------------------------------------------------------------
+    # dictionary interface
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        return iter(self._key[:self._n].tolist())
+
+    def __contains__(self, key):
+        try:
+            self._get_row(key)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __getitem__(self, key):
+        # type: (int) -> GRIDProxy
+        row = self._get_row(key)
+        return GRIDProxy(self, int(self._key[row]), row)
+
+    def __setitem__(self, key, node):
+        # type: (int, GRID) -> None
+        if not isinstance(node, GRID):
+            raise TypeError('NodeArrayDict only stores GRIDs; key=%r node=%r' % (key, node))
+        try:
+            row = self._get_row(key)
+        except KeyError:
+            if not isinstance(key, integer_types) or not MIN_ID <= key <= MAX_ID:
+                raise TypeError('the key must be an int32; key=%r' % key)
+            row = None
+
+        # get the data before the arrays change (node may be a proxy)
+        values = (node.nid, node.cp, node.xyz, node.cd, node.ps.encode('ascii'), node.seid)
+        cp_ref = getattr(node, 'cp_ref', None)
+        cd_ref = getattr(node, 'cd_ref', None)
+        comment = getattr(node, '_comment', '')
+        extras = {}
+        for name in ['elements_ref', 'ps_ref', 'seid_ref']:
+            value = getattr(node, name, extras)
+            if value is not extras and not (name == 'elements_ref' and value is None):
+                extras[name] = value
+
+        if row is None:
+            row = self._n
+            self._grow(row + 1)
+            self._n += 1
+            self._key[row] = key
+            self._pending[key] = row
+            if len(self._pending) > max(MIN_PENDING, self._nsorted // 4):
+                self._build_index()
+
+        (self._nid[row], self._cp[row], self._xyz[row, :], self._cd[row],
+         self._ps[row], self._seid[row]) = values
+        key = int(self._key[row])
+        for name, ref in [('_cp_ref', cp_ref), ('_cd_ref', cd_ref)]:
+            if ref is not None:
+                self._get_ref_array(name)[row] = ref
+            elif getattr(self, name) is not None:
+                getattr(self, name)[row] = None
+        if comment:
+            self._comments[key] = comment
+        else:
+            self._comments.pop(key, None)
+        if extras:
+            self._extras[key] = extras
+        else:
+            self._extras.pop(key, None)
+
+    def __delitem__(self, key):
+        # type: (int) -> None
+        if self._pending:
+            self._build_index()
+        row = self._get_row(key)
+        key = int(self._key[row])
+        n = self._n
+        for name in ARRAY_NAMES + REF_ARRAY_NAMES:
+            array = getattr(self, name)
+            if array is not None:
+                array[row:n - 1] = array[row + 1:n]
+                if array.dtype == object:
+                    array[n - 1] = None
+        self._n -= 1
+        self._comments.pop(key, None)
+        self._extras.pop(key, None)
+        self._version += 1
+
+        # the index is updated instead of being sorted again
+        i = self._sorted_keys.searchsorted(key)
+        self._sorted_keys = np.delete(self._sorted_keys, i)
+        self._sorted_rows = np.delete(self._sorted_rows, i)
+        self._sorted_rows[self._sorted_rows > row] -= 1
+        self._nsorted -= 1
+
+    def _iter_items(self):
+        """iterates over the (key, node) pairs without looking up the keys"""
+        version = self._version
+        for row, key in enumerate(self._key[:self._n].tolist()):
+            if self._version != version:
+                raise RuntimeError('NodeArrayDict changed size during iteration')
+            yield key, GRIDProxy(self, key, row)
+
+    def items(self):
+        return _NodeItemsView(self)
+
+    def values(self):
+        return _NodeValuesView(self)
+
+    def get_grid(self, key):
+        # type: (int) -> GRID
+        """gets a standalone GRID (a copy of the data in the arrays)"""
+        return self[key].to_grid()
+
+    def pop(self, key, *default):
+        # type: (int, Any) -> GRID
+        """removes a node and returns it as a standalone GRID"""
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        node = self.get_grid(key)
+        del self[key]
+        return node
+
+    def popitem(self):
+        # type: () -> Tuple[int, GRID]
+        """removes the last node that was added"""
+        if not self._n:
+            raise KeyError('popitem(): dictionary is empty')
+        key = int(self._key[self._n - 1])
+        return key, self.pop(key)
+
+    def clear(self):
+        # type: () -> None
+        """removes all the nodes"""
+        self.__init__()
+
+    def copy(self):
+        # type: () -> Dict[int, GRIDProxy]
+        """a dictionary of the nodes"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return 'NodeArrayDict(nnodes=%i)' % self._n
+
+    def __getstate__(self):
+        """trims the arrays and drops the index for pickling"""
+        state = self.__dict__.copy()
+        for name in ARRAY_NAMES + REF_ARRAY_NAMES:
+            array = state[name]
+            if array is not None:
+                state[name] = array[:self._n].copy()
+        state['_nsorted'] = 0
+        state['_sorted_keys'] = np.zeros(0, dtype='int32')
+        state['_sorted_rows'] = np.zeros(0, dtype='int32')
+        state['_pending'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_index()
+
+    if hasattr(dict, 'iteritems'):  # pragma: no cover
+        def iterkeys(self):
+            return iter(self)
+
+        def itervalues(self):
+            for unused_key, node in self._iter_items():
+                yield node
+
+        def iteritems(self):
+            return self._iter_items()
+
+    #---------------------------------------------------------------------
+    # vectorized queries
+    def _get_rows(self, nids):
+        """gets the rows for a series of nodes; None -> all the nodes"""
+        if nids is None:
+            return slice(0, self._n)
+        return self.get_index(nids)
+
+    def get_xyz(self, nids=None):
+        # type: (Optional[Any]) -> np.ndarray
+        """
+        Gets the locations of the nodes in their cp frames
+
+        Parameters
+        ----------
+        nids : (n, ) int ndarray; default=None -> all
+            the node ids
+
+        Returns
+        -------
+        xyz_cp : (n, 3) float ndarray
+            the locations (a copy)
+        """
+        return self._xyz[self._get_rows(nids)].copy()
+
+    def get_xyz_in_coord(self, model, cid=0, nids=None, fdtype='float64'):
+        # type: (Any, int, Optional[Any], str) -> np.ndarray
+        """
+        Gets the locations of the nodes in a coordinate system (see
+        GRID.get_position_wrt)
+
+        Parameters
+        ----------
+        model : BDF()
+            the BDF object with the coordinate systems
+        cid : int; default=0
+            the desired coordinate system
+        nids : (n, ) int ndarray; default=None -> all (in insertion order)
+            the node ids
+        fdtype : str; default='float64'
+            the data type of the xyz coordinates
+
+        Returns
+        -------
+        xyz_cid : (n, 3) float ndarray
+            the locations in the cid coordinate system
+        """
+        rows = self._get_rows(nids)
+        return model.get_coord_transforms().xyz_cp_to_xyz_cid(
+            self._xyz[rows], self._cp[rows], cid=cid, fdtype=fdtype)
+
+
+class _NodeItemsView(ItemsView):
+    """the items of a NodeArrayDict"""
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
+class _NodeValuesView(ValuesView):
+    """the values of a NodeArrayDict"""
+    def __iter__(self):
+        for unused_key, node in self._mapping._iter_items():
+            yield node
+
+
+def _build_grid(state):
+    # type: (Dict[str, Any]) -> GRID
+    """creates a GRID from its state (used to unpickle a GRIDProxy)"""
+    grid = GRID.__new__(GRID)
+    grid.__setstate__(state)
+    return grid
+
+
+class GRIDProxy(GRID):
+    """
+    A GRID that reads/writes the data of a node in a NodeArrayDict
+
+    Setting nid changes the nid of the node, but not its key (like a GRID
+    in the standard dictionary).  The proxy is invalid once the node is
+    deleted.  A copy of a proxy is a standalone GRID.
+    """
+    __slots__ = ('_store', '_key', '_row', '_row_version')
+
+    def __init__(self, store, key, row):
+        # type: (NodeArrayDict, int, int) -> None
+        """
+        Creates a GRIDProxy
+
+        Parameters
+        ----------
+        store : NodeArrayDict
+            the node container
+        key : int
+            the key of the node
+        row : int
+            the row of the node in the arrays
+        """
+        # GRID.__init__ is not called; the data is in the store
+        self._store = store
+        self._key = key
+        self._row = row
+        self._row_version = store._version
+
+    def _get_index(self):
+        # type: () -> int
+        """gets the row of the node; the rows move when a node is deleted"""
+        store = self._store
+        if self._row_version != store._version:
+            self._row = store._get_row(self._key)
+            self._row_version = store._version
+        return self._row
+
+    def to_grid(self):
+        # type: () -> GRID
+        """creates a standalone GRID"""
+        grid = GRID(self.nid, self.xyz.copy(), cp=self.cp, cd=self.cd, ps=self.ps,
+                    seid=self.seid, comment='')
+        if hasattr(self, '_comment'):
+            grid._comment = self._comment
+        grid.cp_ref = self.cp_ref
+        grid.cd_ref = self.cd_ref
+        grid.elements_ref = self.elements_ref
+        for name in ['ps_ref', 'seid_ref']:
+            if hasattr(self, name):
+                setattr(grid, name, getattr(self, name))
+        return grid
+
+    def __reduce_ex__(self, protocol):
+        """pickles the proxy as a standalone GRID"""
+        return (_build_grid, (self.to_grid().__getstate__(), ))
+
+    def __eq__(self, card):
+        # type: (Any) -> bool
+        """a GRIDProxy is equal to a GRID with the same fields"""
+        if not isinstance(card, GRID):
+            return False
+        return self._is_same_fields(self.raw_fields(), card.raw_fields())
+
+    def __deepcopy__(self, memo):
+        return self.to_grid()
+
+    def __copy__(self):
+        return self.to_grid()
+
+    @property
+    def nid(self):
+        return int(self._store._nid[self._get_index()])
+
+    @nid.setter
+    def nid(self, nid):
+        self._store._nid[self._get_index()] = nid
+
+    @property
+    def cp(self):
+        return int(self._store._cp[self._get_index()])
+
+    @cp.setter
+    def cp(self, cp):
+        self._store._cp[self._get_index()] = cp
+
+    @property
+    def xyz(self):
+        """a view of the row of the xyz array"""
+        return self._store._xyz[self._get_index()]
+
+    @xyz.setter
+    def xyz(self, xyz):
+        self._store._xyz[self._get_index(), :] = xyz
+
+    @property
+    def cd(self):
+        return int(self._store._cd[self._get_index()])
+
+    @cd.setter
+    def cd(self, cd):
+        self._store._cd[self._get_index()] = cd
+
+    @property
+    def ps(self):
+        return self._store._ps[self._get_index()].decode('ascii')
+
+    @ps.setter
+    def ps(self, ps):
+        self._store._ps[self._get_index()] = ps.encode('ascii')
+
+    @property
+    def seid(self):
+        return int(self._store._seid[self._get_index()])
+
+    @seid.setter
+    def seid(self, seid):
+        self._store._seid[self._get_index()] = seid
+
+    def _get_ref(self, name):
+        array = getattr(self._store, name)
+        if array is None:
+            return None
+        return array[self._get_index()]
+
+    def _set_ref(self, name, ref):
+        if ref is None and getattr(self._store, name) is None:
+            return
+        self._store._get_ref_array(name)[self._get_index()] = ref
+
+    @property
+    def cp_ref(self):
+        return self._get_ref('_cp_ref')
+
+    @cp_ref.setter
+    def cp_ref(self, cp_ref):
+        self._set_ref('_cp_ref', cp_ref)
+
+    @property
+    def cd_ref(self):
+        return self._get_ref('_cd_ref')
+
+    @cd_ref.setter
+    def cd_ref(self, cd_ref):
+        self._set_ref('_cd_ref', cd_ref)
+
+    def _get_extra(self, name):
+        self._get_index()
+        try:
+            return self._store._extras[self._key][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def _set_extra(self, name, value):
+        self._get_index()
+        self._store._extras.setdefault(self._key, {})[name] = value
+
+    @property
+    def elements_ref(self):
+        try:
+            return self._get_extra('elements_ref')
+        except AttributeError:
+            return None
+
+    @elements_ref.setter
+    def elements_ref(self, elements_ref):
+        self._set_extra('elements_ref', elements_ref)
+
+    @property
+    def ps_ref(self):
+        return self._get_extra('ps_ref')
+
+    @ps_ref.setter
+    def ps_ref(self, ps_ref):
+        self._set_extra('ps_ref', ps_ref)
+
+    @property
+    def seid_ref(self):
+        return self._get_extra('seid_ref')
+
+    @seid_ref.setter
+    def seid_ref(self, seid_ref):
+        self._set_extra('seid_ref', seid_ref)
+
+    @property
+    def _comment(self):
+        self._get_index()
+        try:
+            return self._store._comments[self._key]
+        except KeyError:
+            raise AttributeError('_comment')
+
+    @_comment.setter
+    def _comment(self, comment):
+        self._get_index()
+        if comment:
+            self._store._comments[self._key] = comment
+        else:
+            self._store._comments.pop(self._key, None)
@@ -0,0 +1,140 @@
+# coding: utf-8
+"""
+Defines the helper methods used to parse bulk data cards in a process pool:
+  - get_parallel_card_chunks(cards, card_names, nprocs)
+  - parse_card_chunks(chunks, nprocs, mode)
+
+The workers only convert ``card_lines`` into card objects.  The objects
+(or the exceptions that occurred while building them) are sent back to the
+main process, which adds them to the model in the original card order, so
+the duplicate ID and error storage checks run exactly as they do in the
+serial reader.
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+from collections import defaultdict
+from multiprocessing import Pool
+
+from pyNastran.bdf.utils import to_fields
+from pyNastran.bdf.cards.utils import wipe_empty_fields
+from pyNastran.bdf.bdf_interface.bdf_card import BDFCard
+from pyNastran.bdf.bdf_interface.fast_cards import FAST_CARDS, fast_card_object
+
+#: the smallest number of cards that is worth sending to a worker
+MIN_CHUNK_SIZE = 1000
+
+#: cards that are not built from a BDFCard, so they're always parsed serially
+SERIAL_CARDS = set(['DEQATN', 'PBRSECT', 'PBMSECT', '/', 'ECHOON', 'ECHOOFF'])
+
+#: the card classes available to a worker process; set by _init_worker
+_CARD_CLASSES = {}
+
+
+def get_parallel_card_chunks(cards, card_names, nprocs, min_chunk_size=MIN_CHUNK_SIZE):
+    """
+    Splits the cards into chunks of a single card type
+
+    Parameters
+    ----------
+    cards : List[card_name, comment, card_lines]
+        the cards from ``get_bdf_cards``
+    card_names : Set[str]
+        the card names that may be parsed in a worker process
+    nprocs : int
+        the number of worker processes
+    min_chunk_size : int; default=MIN_CHUNK_SIZE
+        the smallest chunk size
+
+    Returns
+    -------
+    chunks : List[(card_name, icards, card_comment_lines)]
+        card_name : str
+            the name of the card in the chunk
+        icards : List[int]
+            the index of each card in ``cards``
+        card_comment_lines : List[(comment, card_lines)]
+            the data needed to build the card
+    """
+    icards_by_name = defaultdict(list)
+    for icard, (card_name, unused_comment, unused_card_lines) in enumerate(cards):
+        if card_name in card_names and card_name not in SERIAL_CARDS:
+            icards_by_name[card_name].append(icard)
+
+    chunks = []
+    for card_name, icards in sorted(icards_by_name.items()):
+        ncards = len(icards)
+        chunk_size = max(min_chunk_size, -(-ncards // nprocs))
+        for i0 in range(0, ncards, chunk_size):
+            icards_chunk = icards[i0:i0 + chunk_size]
+            card_comment_lines = [(cards[icard][1], cards[icard][2])
+                                  for icard in icards_chunk]
+            chunks.append((card_name, icards_chunk, card_comment_lines))
+    return chunks
+
+
+def parse_card_chunks(chunks, nprocs, card_classes):
+    """
+    Builds the card objects for each chunk in a process pool
+
+    Parameters
+    ----------
+    chunks : List[(card_name, icards, card_comment_lines)]
+        see ``get_parallel_card_chunks``
+    nprocs : int
+        the number of worker processes
+    card_classes : Dict[str, class]
+        card_name -> card class (e.g., GRID)
+
+    Returns
+    -------
+    parsed_cards : Dict[int, card/Exception]
+        icard -> the card object or the exception that was raised
+        while building it
+    """
+    parsed_cards = {}
+    if not chunks:
+        return parsed_cards
+
+    jobs = [(card_name, card_comment_lines)
+            for (card_name, unused_icards, card_comment_lines) in chunks]
+    pool = Pool(processes=nprocs, initializer=_init_worker, initargs=(card_classes,))
+    try:
+        results = pool.map(_parse_chunk, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    for (unused_card_name, icards, unused_lines), objs in zip(chunks, results):
+        parsed_cards.update(zip(icards, objs))
+    return parsed_cards
+
+
+def _init_worker(card_classes):
+    """stores the card classes on the worker process"""
+    _CARD_CLASSES.clear()
+    _CARD_CLASSES.update(card_classes)
+
+
+def _parse_chunk(job):
+    """builds the cards for a single chunk; runs on the worker process"""
+    card_name, card_comment_lines = job
+    card_class = _CARD_CLASSES[card_name]
+    is_fast_card = card_name in FAST_CARDS and FAST_CARDS[card_name][0] is card_class
+    objs = []
+    for comment, card_lines in card_comment_lines:
+        if is_fast_card:
+            obj = fast_card_object(card_name, card_lines, comment)
+            if obj is not None:
+                objs.append(obj)
+                continue
+
+        # same as BDF.create_card_object(..., is_list=False, has_none=False)
+        fields = to_fields(card_lines, card_name)
+        card = wipe_empty_fields(fields)
+        card_obj = BDFCard(card, has_none=False)
+        try:
+            obj = card_class.add_card(card_obj, comment=comment)
+        except Exception as exception:
+            obj = exception
+        objs.append(obj)
+    return objs
@@ -49,6 +49,7 @@ class SafeXrefMesh(XrefMesh):
         """
         if not xref:
             return
+        self._stop_lazy_cross_reference()
         self.log.debug("Safe Cross Referencing...")
         if xref_nodes:
             self._cross_reference_nodes()
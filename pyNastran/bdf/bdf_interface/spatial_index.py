@@ -0,0 +1,477 @@
+# coding: utf-8
+"""
+Defines the cached spatial index of the nodes and elements of a BDF:
+  - SpatialIndex(model)
+
+The nodes are in a KD-tree (scipy's cKDTree) and the bounding boxes of the
+elements are in a bounding volume hierarchy (AABBTree).  Both trees are
+built the first time that they're used.  The queries are in bulk (e.g., the
+closest node to each of a series of points), so a query is a series of
+array operations.
+
+The index is cached on the model (see ``BDF.spatial_index``) and is rebuilt
+when the elements, the nodes or the coordinate systems are added/removed/
+replaced or when a node is moved.
+"""
+from __future__ import print_function
+from operator import is_
+import numpy as np
+
+from pyNastran.bdf.bdf_interface.node_array import NodeArrayDict
+from pyNastran.bdf.mesh_utils.aabb_tree import AABBTree
+from pyNastran.bdf.mesh_utils.loads import _get_xyz_array
+
+#: the simplices (tetrahedra, triangles, lines) of the corner nodes of each
+#: element that are used to check if an element contains a point
+SIMPLEX_INDICES = {
+    'CTETRA' : [[0, 1, 2, 3]],
+    'CPYRAM' : [[0, 1, 2, 4], [0, 2, 3, 4]],
+    'CPENTA' : [[0, 1, 2, 5], [0, 1, 5, 4], [0, 4, 5, 3]],
+    'CHEXA' : [[0, 1, 2, 6], [0, 2, 3, 6], [0, 3, 7, 6],
+               [0, 7, 4, 6], [0, 4, 5, 6], [0, 5, 1, 6]],
+    'CTRIA3' : [[0, 1, 2]],
+    'CTRIA6' : [[0, 1, 2]],
+    'CTRIAR' : [[0, 1, 2]],
+    'CTRIAX' : [[0, 1, 2]],
+    'CQUAD4' : [[0, 1, 2], [0, 2, 3]],
+    'CQUAD8' : [[0, 1, 2], [0, 2, 3]],
+    'CQUADR' : [[0, 1, 2], [0, 2, 3]],
+    'CQUAD' : [[0, 1, 2], [0, 2, 3]],
+    'CQUADX' : [[0, 1, 2], [0, 2, 3]],
+    'CQUADX8' : [[0, 1, 2], [0, 2, 3]],
+    'CSHEAR' : [[0, 1, 2], [0, 2, 3]],
+    'CROD' : [[0, 1]],
+    'CONROD' : [[0, 1]],
+    'CTUBE' : [[0, 1]],
+    'CBAR' : [[0, 1]],
+    'CBEAM' : [[0, 1]],
+}
+
+
+class SpatialIndex(object):
+    """
+    The spatial index of the nodes and the elements of a model
+
+    Attributes
+    ----------
+    nids : (nnodes, ) int ndarray
+        the sorted node ids (SPOINTs/EPOINTs aren't included)
+    xyz : (nnodes, 3) float ndarray
+        the nodes in the global frame
+    eids : (nelements, ) int ndarray
+        the element ids in the order of the topology
+    element_min / element_max : (nelements, 3) float ndarray
+        the bounding boxes of the elements; an element without nodes
+        has an empty box (inf/-inf)
+    topology : MeshTopology
+        the connectivity of the elements
+    """
+    def __init__(self, model, leaf_size=8):
+        # type: (Any, int) -> None
+        """
+        Gets the positions of the nodes and the bounding boxes of the
+        elements; the trees are built when they're used
+
+        Parameters
+        ----------
+        model : BDF()
+            the model
+        leaf_size : int; default=8
+            the maximum number of elements in a leaf of the element tree
+        """
+        self.topology = model.get_topology()
+        self._coord_transforms = model.get_coord_transforms()
+        self._node_signature = _get_node_signature(model)
+        self.nids, self.xyz = _get_xyz_array(model)
+        self.eids = self.topology.eids
+        self.leaf_size = leaf_size
+        self._node_tree = None
+        self._element_tree = None
+        self._simplices = None
+
+        # the element -> node index pairs of the nodes with a position
+        topology = self.topology
+        nelements = len(self.eids)
+        ielements = np.repeat(np.arange(nelements), np.diff(topology.element_node_offsets))
+        inodes, is_valid = self._get_node_index(topology.element_nodes)
+        self._ielements = ielements[is_valid]
+        self._inodes = inodes[is_valid]
+
+        self.element_min = np.full((nelements, 3), np.inf)
+        self.element_max = np.full((nelements, 3), -np.inf)
+        counts = np.bincount(self._ielements, minlength=nelements)
+        i = np.flatnonzero(counts)
+        if len(i):
+            starts = (np.cumsum(counts) - counts)[i]
+            xyz = self.xyz[self._inodes]
+            self.element_min[i] = np.minimum.reduceat(xyz, starts, axis=0)
+            self.element_max[i] = np.maximum.reduceat(xyz, starts, axis=0)
+        self._element_offsets = np.zeros(nelements + 1, dtype='int64')
+        np.cumsum(counts, out=self._element_offsets[1:])
+
+    def is_valid(self, model):
+        # type: (Any) -> bool
+        """
+        is the index up to date with the elements, the nodes and the
+        coordinate systems of the model
+        """
+        if (model.get_topology() is not self.topology or
+                model.get_coord_transforms() is not self._coord_transforms):
+            return False
+        refs0, ids0, cp0, xyz0 = self._node_signature
+        refs, ids, cp, xyz = _get_node_signature(model)
+        return (len(refs) == len(refs0) and ids == ids0 and all(map(is_, refs, refs0)) and
+                np.array_equal(cp, cp0) and np.array_equal(xyz, xyz0))
+
+    def _get_node_index(self, nids):
+        """gets the index of each node and is the node in the index"""
+        nids = np.asarray(nids, dtype='int64')
+        if len(self.nids) == 0:
+            return np.zeros(len(nids), dtype='int64'), np.zeros(len(nids), dtype='bool')
+        inodes = np.searchsorted(self.nids, nids)
+        inodes[inodes == len(self.nids)] = 0
+        return inodes, self.nids[inodes] == nids
+
+    @property
+    def node_tree(self):
+        """the KD-tree of the nodes (scipy.spatial.cKDTree)"""
+        if self._node_tree is None:
+            from scipy.spatial import cKDTree
+            self._node_tree = cKDTree(self.xyz)
+        return self._node_tree
+
+    @property
+    def element_tree(self):
+        # type: () -> AABBTree
+        """the bounding volume hierarchy of the elements"""
+        if self._element_tree is None:
+            self._element_tree = AABBTree(
+                self.element_min, self.element_max, leaf_size=self.leaf_size)
+        return self._element_tree
+
+    #-------------------------------------------------------------------------
+    # nodes
+    def get_closest_nodes(self, xyz, k=1, max_distance=np.inf):
+        # type: (Any, int, float) -> Tuple[np.ndarray, np.ndarray]
+        """
+        Gets the closest node(s) to each point
+
+        Parameters
+        ----------
+        xyz : (npoints, 3) float ndarray
+            the points in the global frame
+        k : int; default=1
+            the number of nodes to find for each point
+        max_distance : float; default=inf
+            the nodes that are farther away aren't found
+
+        Returns
+        -------
+        nids : (npoints, ) / (npoints, k) int ndarray
+            the closest nodes (sorted by distance)
+            -1 : no node
+        distances : (npoints, ) / (npoints, k) float ndarray
+            the distance to each node
+            inf : no node
+        """
+        xyz = np.asarray(xyz, dtype='float64').reshape(-1, 3)
+        shape = (len(xyz), ) if k == 1 else (len(xyz), k)
+        if len(self.nids) == 0:
+            return np.full(shape, -1, dtype='int64'), np.full(shape, np.inf)
+        distances, inodes = self.node_tree.query(
+            xyz, k=k, distance_upper_bound=max_distance)
+        is_found = inodes < len(self.nids)
+        nids = np.full(inodes.shape, -1, dtype='int64')
+        nids[is_found] = self.nids[inodes[is_found]]
+        return nids.reshape(shape), distances.reshape(shape)
+
+    #-------------------------------------------------------------------------
+    # elements
+    def get_elements_in_box(self, box_min, box_max, is_inside=False):
+        # type: (Any, Any, bool) -> Tuple[np.ndarray, np.ndarray]
+        """
+        Gets the elements in each box
+
+        Parameters
+        ----------
+        box_min / box_max : (nboxes, 3) float ndarray
+            the boxes in the global frame
+        is_inside : bool; default=False
+            False : the bounding box of the element overlaps the box
+            True : the nodes of the element are in the box
+
+        Returns
+        -------
+        iboxes : (npairs, ) int ndarray
+            the index of the box
+        eids : (npairs, ) int ndarray
+            the element in the box
+        """
+        box_min = np.asarray(box_min, dtype='float64').reshape(-1, 3)
+        box_max = np.asarray(box_max, dtype='float64').reshape(-1, 3)
+        iboxes, ielements = self.element_tree.get_box_pairs(box_min, box_max)
+        if is_inside:
+            is_inside = (
+                (self.element_min[ielements] >= box_min[iboxes]) &
+                (self.element_max[ielements] <= box_max[iboxes])).all(axis=1)
+            iboxes = iboxes[is_inside]
+            ielements = ielements[is_inside]
+        return self._sort_pairs(iboxes, ielements)
+
+    def get_elements_in_radius(self, xyz, radius, is_inside=False):
+        # type: (Any, Any, bool) -> Tuple[np.ndarray, np.ndarray]
+        """
+        Gets the elements within a radius of each point
+
+        Parameters
+        ----------
+        xyz : (npoints, 3) float ndarray
+            the centers in the global frame
+        radius : float / (npoints, ) float ndarray
+            the radius of each sphere
+        is_inside : bool; default=False
+            False : the bounding box of the element is within the radius
+            True : the nodes of the element are within the radius
+
+        Returns
+        -------
+        ipoints : (npairs, ) int ndarray
+            the index of the point
+        eids : (npairs, ) int ndarray
+            the element within the radius
+        """
+        xyz = np.asarray(xyz, dtype='float64').reshape(-1, 3)
+        radius = np.broadcast_to(np.asarray(radius, dtype='float64'), (len(xyz), ))
+        ipoints, ielements = self.element_tree.get_sphere_pairs(xyz, radius)
+        if is_inside:
+            ipairs, inodes = self._get_pair_nodes(ielements)
+            distance = np.linalg.norm(self.xyz[inodes] - xyz[ipoints[ipairs]], axis=1)
+            is_outside = np.zeros(len(ipoints), dtype='bool')
+            is_outside[ipairs[distance > radius[ipoints[ipairs]]]] = True
+            ipoints = ipoints[~is_outside]
+            ielements = ielements[~is_outside]
+        return self._sort_pairs(ipoints, ielements)
+
+    def get_elements_intersecting_planes(self, origins, normals):
+        # type: (Any, Any) -> Tuple[np.ndarray, np.ndarray]
+        """
+        Gets the elements that are cut by each plane (the plane is
+        between the nodes of the element)
+
+        Parameters
+        ----------
+        origins : (nplanes, 3) float ndarray
+            a point on each plane in the global frame
+        normals : (nplanes, 3) float ndarray
+            the normal of each plane
+
+        Returns
+        -------
+        iplanes : (npairs, ) int ndarray
+            the index of the plane
+        eids : (npairs, ) int ndarray
+            the element that's cut by the plane
+        """
+        origins = np.asarray(origins, dtype='float64').reshape(-1, 3)
+        normals = np.asarray(normals, dtype='float64').reshape(-1, 3)
+        iplanes, ielements = self.element_tree.get_plane_pairs(origins, normals)
+
+        # the nodes are on both sides of the plane
+        ipairs, inodes = self._get_pair_nodes(ielements)
+        iplanesi = iplanes[ipairs]
+        distance = np.einsum('ij,ij->i', self.xyz[inodes] - origins[iplanesi],
+                             normals[iplanesi])
+        is_below = np.zeros(len(iplanes), dtype='bool')
+        is_above = np.zeros(len(iplanes), dtype='bool')
+        is_below[ipairs[distance <= 0.]] = True
+        is_above[ipairs[distance >= 0.]] = True
+        is_cut = is_below & is_above
+        return self._sort_pairs(iplanes[is_cut], ielements[is_cut])
+
+    def get_elements_containing_points(self, xyz, tol=0.):
+        # type: (Any, float) -> Tuple[np.ndarray, np.ndarray]
+        """
+        Gets the elements that contain each point
+
+        Parameters
+        ----------
+        xyz : (npoints, 3) float ndarray
+            the points in the global frame
+        tol : float; default=0.
+            the distance that a point may be outside of an element
+
+        Returns
+        -------
+        ipoints : (npairs, ) int ndarray
+            the index of the point
+        eids : (npairs, ) int ndarray
+            the element that contains the point
+
+        The elements are split into simplices (see ``SIMPLEX_INDICES``):
+          - solid : the point is in a tetrahedron (a warped face of a
+                    CHEXA/CPENTA/CPYRAM is approximated by 2 triangles)
+          - shell : the point is within tol of a triangle
+          - line : the point is within tol of the line
+        The other elements (e.g., a CONM2) don't contain points.
+        """
+        xyz = np.asarray(xyz, dtype='float64').reshape(-1, 3)
+        ipoints, ielements = self.element_tree.get_box_pairs(xyz - tol, xyz + tol)
+
+        # the simplices of the candidate elements
+        simplex_offsets, simplex_inodes, simplex_nnodes = self._get_simplices()
+        counts = simplex_offsets[ielements + 1] - simplex_offsets[ielements]
+        ipairs = np.repeat(np.arange(len(ipoints)), counts)
+        isimplices = _get_ranges(simplex_offsets[ielements], counts)
+        inodes = simplex_inodes[isimplices]
+        nnodes = simplex_nnodes[isimplices]
+        xyzi = xyz[ipoints[ipairs]]
+
+        is_found = np.zeros(len(ipairs), dtype='bool')
+        for nnodesi, func in [(4, _is_in_tetra), (3, _is_on_triangle), (2, _is_on_line)]:
+            i = np.flatnonzero(nnodes == nnodesi)
+            if len(i):
+                is_found[i] = func(xyzi[i], self.xyz[inodes[i, :nnodesi]], tol)
+        is_contained = np.zeros(len(ipoints), dtype='bool')
+        is_contained[ipairs[is_found]] = True
+        return self._sort_pairs(ipoints[is_contained], ielements[is_contained])
+
+    #-------------------------------------------------------------------------
+    # helpers
+    def _sort_pairs(self, iqueries, ielements):
+        """sorts the (query, element) pairs and gets the element ids"""
+        isort = np.lexsort((ielements, iqueries))
+        return iqueries[isort], self.eids[ielements[isort]]
+
+    def _get_pair_nodes(self, ielements):
+        """gets the (pair, node index) of the nodes of the element of each pair"""
+        offsets = self._element_offsets
+        counts = offsets[ielements + 1] - offsets[ielements]
+        ipairs = np.repeat(np.arange(len(ielements)), counts)
+        return ipairs, self._inodes[_get_ranges(offsets[ielements], counts)]
+
+    def _get_simplices(self):
+        """
+        Gets the simplices of the elements
+
+        Returns
+        -------
+        simplex_offsets : (nelements + 1, ) int ndarray
+            the simplices of the i-th element are
+            simplex_offsets[i]:simplex_offsets[i+1]
+        simplex_inodes : (nsimplices, 4) int ndarray
+            the node indices of each simplex (padded with 0s)
+        simplex_nnodes : (nsimplices, ) int ndarray
+            the number of nodes of each simplex
+        """
+        if self._simplices is not None:
+            return self._simplices
+        topology = self.topology
+        nelements = len(self.eids)
+        offsets = topology.element_node_offsets
+        nnodes = np.diff(offsets)
+        ielements_list = []
+        inodes_list = []
+        nnodes_list = []
+        for etype, simplices in SIMPLEX_INDICES.items():
+            simplices = np.array([simplex + [0] * (4 - len(simplex)) for simplex in simplices])
+            nnodes_simplex = np.array([len(simplex) for simplex in SIMPLEX_INDICES[etype]])
+            ncorners = simplices.max() + 1
+
+            # the element must have the corners and they must have positions
+            ielements = np.flatnonzero((topology.etypes == etype) & (nnodes >= ncorners))
+            if len(ielements) == 0:
+                continue
+            nids = topology.element_nodes[offsets[ielements][:, np.newaxis, np.newaxis] + simplices]
+            inodes, is_valid = self._get_node_index(nids.ravel())
+            inodes = inodes.reshape(nids.shape)
+            is_valid = is_valid.reshape(nids.shape)
+            is_valid |= np.arange(4) >= nnodes_simplex[:, np.newaxis]
+            is_valid = is_valid.all(axis=(1, 2))
+
+            nsimplices = len(simplices)
+            ielements_list.append(np.repeat(ielements[is_valid], nsimplices))
+            inodes_list.append(inodes[is_valid].reshape(-1, 4))
+            nnodes_list.append(np.tile(nnodes_simplex, is_valid.sum()))
+
+        if ielements_list:
+            ielements = np.hstack(ielements_list)
+            isort = np.argsort(ielements, kind='stable')
+            ielements = ielements[isort]
+            simplex_inodes = np.vstack(inodes_list)[isort]
+            simplex_nnodes = np.hstack(nnodes_list)[isort]
+        else:
+            ielements = np.zeros(0, dtype='int64')
+            simplex_inodes = np.zeros((0, 4), dtype='int64')
+            simplex_nnodes = np.zeros(0, dtype='int64')
+        simplex_offsets = np.zeros(nelements + 1, dtype='int64')
+        np.cumsum(np.bincount(ielements, minlength=nelements), out=simplex_offsets[1:])
+        self._simplices = (simplex_offsets, simplex_inodes, simplex_nnodes)
+        return self._simplices
+
+
+def _get_node_signature(model):
+    # type: (Any) -> Tuple[List[Any], List[int], np.ndarray, np.ndarray]
+    """
+    Gets the objects (compared by identity) and the ids, the input
+    coordinate systems and the locations (compared by value) that define
+    the nodes of a model; xyz is an array (not a setter), so a node that
+    is moved in place is found by comparing the locations
+    """
+    nodes = model.nodes
+    if isinstance(nodes, NodeArrayDict):
+        # a NodeArrayDict creates a new GRIDProxy for each access
+        return [nodes], [nodes._version] + nodes.node_ids.tolist(), nodes.cp.copy(), nodes.xyz.copy()
+    refs = list(nodes.values())
+    cp = np.array([node.Cp() for node in refs], dtype='int64')
+    xyz = np.array([node.xyz for node in refs], dtype='float64').reshape(len(refs), 3)
+    return refs, list(nodes.keys()), cp, xyz
+
+
+def _get_ranges(starts, counts):
+    """concatenates np.arange(start, start + count) for each range"""
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(counts.sum(), dtype='int64')
+
+
+def _is_in_tetra(xyz, corners, tol):
+    """
+    is each point within tol of its tetrahedron; a point is inside if it's
+    on the side of each face that has the opposite corner
+    """
+    is_inside = np.ones(len(xyz), dtype='bool')
+    for i, (j, k, l) in enumerate([(1, 2, 3), (0, 2, 3), (0, 1, 3), (0, 1, 2)]):
+        normal = np.cross(corners[:, k] - corners[:, j], corners[:, l] - corners[:, j])
+        height = np.einsum('ij,ij->i', corners[:, i] - corners[:, j], normal)
+        distance = np.einsum('ij,ij->i', xyz - corners[:, j], normal)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance *= np.sign(height) / np.linalg.norm(normal, axis=1)
+        is_inside &= (height != 0.) & (distance >= -tol)
+    return is_inside
+
+
+def _is_on_triangle(xyz, corners, tol):
+    """is each point within tol of its triangle"""
+    normal = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    length = np.linalg.norm(normal, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normal /= length[:, np.newaxis]
+        distance = np.einsum('ij,ij->i', xyz - corners[:, 0], normal)
+        is_on = (length > 0.) & (np.abs(distance) <= tol)
+
+        # the point is on the inside of each edge
+        for i, j in [(0, 1), (1, 2), (2, 0)]:
+            inward = np.cross(normal, corners[:, j] - corners[:, i])
+            inward /= np.linalg.norm(inward, axis=1)[:, np.newaxis]
+            is_on &= np.einsum('ij,ij->i', xyz - corners[:, i], inward) >= -tol
+    return is_on
+
+
+def _is_on_line(xyz, corners, tol):
+    """is each point within tol of its line"""
+    axial = corners[:, 1] - corners[:, 0]
+    length2 = np.einsum('ij,ij->i', axial, axial)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.einsum('ij,ij->i', xyz - corners[:, 0], axial) / length2
+    t = np.where(length2 > 0., np.clip(t, 0., 1.), 0.)
+    distance = np.linalg.norm(xyz - corners[:, 0] - axial * t[:, np.newaxis], axis=1)
+    return distance <= tol
@@ -0,0 +1,194 @@
+"""tests the vectorized cross-referencing"""
+import unittest
+from collections import defaultdict
+
+import numpy as np
+
+from pyNastran.bdf.bdf import BDF
+from pyNastran.bdf.errors import CrossReferenceError
+from pyNastran.bdf.bdf_interface.node_array import NodeArrayDict
+from pyNastran.bdf.bdf_interface.bulk_xref import (
+    IdTable, bulk_cross_reference_elements, bulk_cross_reference_properties,
+    get_node_elements)
+
+#: the attributes that are set by the cross_reference methods
+REF_NAMES = ['nodes_ref', 'pid_ref', 'theta_mcid_ref', 'ga_ref', 'gb_ref',
+             'mid_ref', 'mid1_ref', 'mid2_ref', 'mid3_ref', 'mid4_ref']
+
+
+def _build_model(node_arrays=False):
+    """creates a model with the supported (and some unsupported) cards"""
+    model = BDF(debug=None)
+    if node_arrays:
+        model.set_node_arrays()
+    for nid in range(1, 31):
+        model.add_grid(nid, [float(nid), nid % 3, nid % 5])
+    model.add_spoint([40, 41])
+    model.add_cord2r(1, origin=[0., 0., 0.], zaxis=[0., 0., 1.], xzplane=[1., 0., 0.])
+    model.add_mat1(1, 3.0e7, None, 0.3)
+    model.add_mat1(2, 1.0e7, None, 0.3)
+    model.add_pshell(1, mid1=1, t=0.1)
+    model.add_pshell(2, mid1=1, mid2=-1, mid3=2, t=0.1)
+    model.add_pshell(3, mid1=None, mid2=2, t=0.2)
+    model.add_pcomp(4, [1, 2], [0.1, 0.2])
+    model.add_psolid(5, 1)
+    model.add_pbar(6, 2, A=1.)
+    model.add_prod(7, 1, A=1.)
+
+    model.add_cquad4(1, 1, [1, 2, 3, 4])
+    model.add_cquad4(2, 2, [4, 3, 5, 6], theta_mcid=1)
+    model.add_cquad4(3, 4, [5, 6, 7, 8])
+    model.add_ctria3(4, 3, [7, 8, 9], theta_mcid=0)
+    model.add_ctria3(5, 1, [9, 10, 11], theta_mcid=15.)
+    model.add_ctetra(10, 5, [1, 2, 3, 4])
+    model.add_ctetra(11, 5, [1, 2, 3, 4, 5, 6, None, 8, 0, 10])
+    model.add_cpenta(12, 5, [11, 12, 13, 14, 15, 16])
+    model.add_cpenta(13, 5, [11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25])
+    model.add_chexa(14, 5, [1, 2, 3, 4, 5, 6, 7, 8])
+    model.add_chexa(15, 5, list(range(1, 21)))
+    model.add_cpyram(16, 5, [1, 2, 3, 4, 5])
+    model.add_cpyram(17, 5, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, None, 12, 13])
+    model.add_cbar(20, 6, [26, 27], [0., 1., 0.], None)
+    model.add_cbar(21, 6, [27, 40], [0., 1., 0.], None)
+    model.add_crod(22, 7, [28, 29])
+    model.add_celas2(23, 1000., [40, 41])
+    return model
+
+
+def _cross_reference_by_card(model):
+    """cross-references the model with the per-card methods"""
+    model._cross_reference_nodes()
+    model._cross_reference_coordinates()
+    for elem in model.elements.values():
+        elem.cross_reference(model)
+    for prop in model.properties.values():
+        prop.cross_reference(model)
+    for mat in model.materials.values():
+        mat.cross_reference(model)
+
+    node_elements = defaultdict(list)
+    for element in model.elements.values():
+        if element.nodes is not None:
+            for nid in element.node_ids:
+                if nid is not None:
+                    node_elements[nid].append(element)
+    for node in model.nodes.values():
+        node.elements_ref = node_elements[node.nid]
+
+
+def _get_ref_id(ref):
+    """gets an id for a cross-referenced card"""
+    if ref is None:
+        return None
+    if isinstance(ref, list):
+        return [_get_ref_id(refi) for refi in ref]
+    for name in ['nid', 'eid', 'pid', 'mid', 'cid']:
+        if hasattr(ref, name):
+            return (ref.type, getattr(ref, name))
+    raise NotImplementedError(ref)  # pragma: no cover
+
+
+def _compare_refs(model, model2):
+    """checks that the cards have the same references"""
+    for cards, cards2 in [(model.elements, model2.elements),
+                          (model.properties, model2.properties),
+                          (model.nodes, model2.nodes)]:
+        for key, card in cards.items():
+            card2 = cards2[key]
+            for name in REF_NAMES + ['elements_ref']:
+                if not hasattr(card, name):
+                    continue
+                ref = getattr(card, name)
+                ref2 = getattr(card2, name)
+                assert _get_ref_id(ref) == _get_ref_id(ref2), (key, name, ref, ref2)
+
+
+class TestBulkXref(unittest.TestCase):
+    """tests the vectorized cross-referencing"""
+
+    def test_id_table(self):
+        """ids are found in the first dictionary that has them"""
+        table = IdTable([{3 : 'a', 1 : 'b'}, {1 : 'c', 7 : 'd'}])
+        assert table.is_valid
+        assert np.array_equal(table.ids, [1, 3, 7])
+        assert list(table.objects) == ['b', 'a', 'd', None]
+
+        index, is_valid = table.lookup(np.array([[7, 2], [0, 1]]))
+        assert np.array_equal(is_valid, [[True, False], [False, True]])
+        assert list(table.objects[index].ravel()) == ['d', None, None, 'b']
+        index, is_valid = table.lookup(np.array([0, 8]), allow_blank=True)
+        assert np.array_equal(is_valid, [True, False])
+        assert not IdTable([{'cat' : 1}]).is_valid
+        index, is_valid = IdTable([{}]).lookup(np.array([1, 0]), allow_blank=True)
+        assert np.array_equal(is_valid, [False, True])
+
+    def test_bulk_xref(self):
+        """the bulk cross-referencing matches the per-card methods"""
+        for node_arrays in [False, True]:
+            model = _build_model(node_arrays=node_arrays)
+            _cross_reference_by_card(model)
+
+            model2 = _build_model(node_arrays=node_arrays)
+            model2.cross_reference()
+            _compare_refs(model, model2)
+
+            # the refs are the objects in the model
+            for nid in [1, 11, 27]:
+                for elem in model2.nodes[nid].elements_ref:
+                    if hasattr(elem, 'nodes_ref'):
+                        assert model2.nodes[nid] in elem.nodes_ref
+            assert model2.elements[21].gb_ref is model2.spoints[40]
+            assert model2.elements[11].nodes_ref[6] is None
+            assert model2.elements[11].nodes_ref[8] is None
+            assert model2.elements[2].theta_mcid_ref is model2.coords[1]
+            assert model2.properties[2].mid2_ref is None
+            assert model2.properties[3].mid2_ref is model2.materials[2]
+
+            model2.uncross_reference()
+            model2.cross_reference()
+            _compare_refs(model, model2)
+            if node_arrays:
+                assert isinstance(model2.nodes, NodeArrayDict)
+
+    def test_bulk_xref_unsupported(self):
+        """the cards that can't be cross-referenced in bulk are returned"""
+        model = _build_model()
+        model._cross_reference_nodes()
+        model._cross_reference_coordinates()
+        elements = bulk_cross_reference_elements(model, list(model.elements.values()))
+        assert sorted(elem.eid for elem in elements) == [22, 23], elements
+        properties = bulk_cross_reference_properties(model, list(model.properties.values()))
+        assert [prop.pid for prop in properties] == [4], properties
+
+        model.is_nx = True
+        model.elements[20].offt = 'GGO'
+        elements = bulk_cross_reference_elements(model, [model.elements[20]])
+        assert elements == [model.elements[20]]
+
+        node_elements = get_node_elements([])
+        assert node_elements == {}
+
+    def test_bulk_xref_errors(self):
+        """all the missing references are reported together"""
+        model = _build_model()
+        model.add_cquad4(100, 1, [1, 2, 3, 99])
+        model.add_ctria3(101, 98, [1, 2, 3])
+        model.add_ctria3(102, 1, [1, 2, 3], theta_mcid=97)
+        model.add_chexa(103, 5, [1, 2, 3, 4, 5, 6, 7, 96])
+        model.add_ctetra(104, 5, [1, 2, 3, 4, 5, 6, 7, 8, 9, 95])
+        model.add_cbar(105, 6, [1, 94], [0., 1., 0.], None)
+        model.add_pshell(106, mid1=93, t=0.1)
+        model.cross_reference()
+        with self.assertRaises(CrossReferenceError) as context:
+            model.pop_xref_errors()
+        msg = str(context.exception)
+        for nid in ['99', '96', '95', '94']:
+            assert 'nid=%s ' % nid in msg or 'nids=[%s]' % nid in msg, (nid, msg)
+        for eid in [100, 101, 102, 103, 104, 105]:
+            assert 'required by %s eid=%i' % (model.elements[eid].type, eid) in msg, (eid, msg)
+        assert 'pid=98 not found' in msg, msg
+        assert 'mid=93' in msg, msg
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
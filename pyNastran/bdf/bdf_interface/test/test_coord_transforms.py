@@ -0,0 +1,190 @@
+"""tests the cached coordinate system transforms"""
+import unittest
+
+import numpy as np
+
+from pyNastran.bdf.bdf import BDF
+from pyNastran.bdf.bdf_interface.coord_transforms import CoordTransforms, get_coord_groups
+
+
+def _build_model(nnodes=30, node_arrays=False):
+    """creates a model with chained rectangular/cylindrical/spherical frames"""
+    model = BDF(debug=None)
+    if node_arrays:
+        model.set_node_arrays()
+    model.add_cord2r(1, origin=[1., 2., 3.], zaxis=[1., 3., 4.], xzplane=[2., 2., 3.])
+    model.add_cord2c(2, rid=1, origin=[0., 1., 0.], zaxis=[1., 1., 1.], xzplane=[0., 2., 1.])
+    model.add_cord2s(3, rid=2, origin=[1., 30., 2.], zaxis=[1., 30., 3.], xzplane=[2., 45., 2.])
+    model.add_grid(9000001, [1., 0., 0.], cp=3)
+    model.add_grid(9000002, [2., 0., 0.], cp=3)
+    model.add_grid(9000003, [1., 3., 1.], cp=2)
+    model.add_cord1r(4, 9000001, 9000002, 9000003)
+    model.add_grid(9000004, [0., 0., 0.], cp=4)
+    model.add_grid(9000005, [0., 1., 0.], cp=0)
+    model.add_grid(9000006, [1., 1., 1.], cp=4)
+    model.add_cord1c(5, 9000004, 9000005, 9000006)
+    model.add_cord2r(6, rid=5, origin=[2., 10., 1.], zaxis=[2., 10., 2.], xzplane=[3., 20., 1.])
+    for nid in range(1, nnodes + 1):
+        cp = nid % 7
+        model.add_grid(nid, [1. + 0.1 * nid, 10. + nid, 0.5 * nid], cp=cp, cd=(nid + 2) % 7)
+    model.add_spoint([9900000, 9900001])
+    return model
+
+
+def _assert_allclose(coord, xyz_cid, xyz_cid2):
+    """checks the points in a coordinate system (the angles are arbitrary at r=0)"""
+    xyz = coord.coord_to_xyz_array(xyz_cid)
+    xyz2 = coord.coord_to_xyz_array(xyz_cid2)
+    assert np.allclose(xyz, xyz2, atol=1e-8), (coord.cid, xyz, xyz2)
+
+
+class TestCoordTransforms(unittest.TestCase):
+    """tests the cached coordinate system transforms"""
+
+    def test_transforms(self):
+        """the batched transforms match the per-node methods"""
+        for node_arrays in [False, True]:
+            model = _build_model(node_arrays=node_arrays)
+            transforms_no_xref = CoordTransforms(model)
+            assert transforms_no_xref.errors == {}
+            model.cross_reference()
+            transforms = model.get_coord_transforms()
+            assert np.allclose(transforms.origins, transforms_no_xref.origins)
+            assert np.allclose(transforms.betas, transforms_no_xref.betas)
+            for cid, coord in model.coords.items():
+                origin, beta = transforms.get_origin_beta(cid)
+                assert np.allclose(origin, coord.origin), cid
+                assert np.allclose(beta, coord.beta()), cid
+
+            nids = sorted(model.nodes)
+            nodes = [model.nodes[nid] for nid in nids]
+            xyz_cp = np.array([node.xyz for node in nodes])
+            cps = np.array([node.cp for node in nodes])
+            for cid, coord in sorted(model.coords.items()):
+                xyz_cid = np.array([node.get_position_wrt(model, cid) for node in nodes])
+                xyz_cid2 = transforms.xyz_cp_to_xyz_cid(xyz_cp, cps, cid=cid)
+                _assert_allclose(coord, xyz_cid, xyz_cid2)
+
+                xyz_cid3 = model.get_xyz_in_coord(cid=cid)
+                _assert_allclose(coord, xyz_cid, xyz_cid3[:len(nids), :])
+                assert np.array_equal(xyz_cid3[len(nids):, :], np.zeros((2, 3)))
+
+                out = model.get_displacement_index_xyz_cp_cd()
+                unused_icd_transform, icp_transform, xyz_cp2, nid_cp_cd = out
+                xyz_cid4 = model.transform_xyzcp_to_xyz_cid(
+                    xyz_cp2, nid_cp_cd[:, 0], icp_transform, cid=cid)
+                _assert_allclose(coord, xyz_cid, xyz_cid4[:len(nids), :])
+
+            # the transforms are only built once
+            assert model.get_coord_transforms() is transforms
+
+    def test_transforms_no_xref(self):
+        """the coordinate systems don't need to be cross-referenced"""
+        model = _build_model()
+        out = model.get_displacement_index_xyz_cp_cd()
+        unused_icd_transform, icp_transform, xyz_cp, nid_cp_cd = out
+        xyz_cid0 = model.transform_xyzcp_to_xyz_cid(
+            xyz_cp, nid_cp_cd[:, 0], icp_transform, cid=0)
+        assert model.coords[3].origin is None
+
+        model.cross_reference()
+        assert np.allclose(xyz_cid0, model.get_xyz_in_coord(cid=0))
+
+    def test_cache(self):
+        """the transforms are rebuilt when the coordinate systems change"""
+        model = _build_model()
+        model.cross_reference()
+        transforms = model.get_coord_transforms()
+        assert transforms.is_valid(model)
+
+        model.add_cord2r(7, origin=[1., 0., 0.], zaxis=[1., 0., 1.], xzplane=[2., 0., 0.])
+        transforms2 = model.get_coord_transforms()
+        assert transforms2 is not transforms
+        assert 7 in transforms2.cids
+
+        # the axes are recalculated, but they don't change
+        model.coords[7].setup()
+        assert model.get_coord_transforms() is transforms2
+        model.coords[7].origin += 1.
+        transforms3 = model.get_coord_transforms()
+        assert transforms3 is not transforms2
+        assert np.array_equal(transforms3.get_origin_beta(7)[0], [2., 1., 1.])
+
+        # the CORD1x coordinate systems depend on the nodes if they're not setup
+        model = _build_model()
+        transforms = model.get_coord_transforms()
+        model.nodes[9000006].xyz = np.array([1., 1., 2.])
+        transforms2 = model.get_coord_transforms()
+        assert transforms2 is not transforms
+        assert not np.allclose(transforms.betas, transforms2.betas)
+
+    def test_errors(self):
+        """coordinate systems that can't be resolved are reported when used"""
+        model = BDF(debug=None)
+        zaxis = [0., 0., 1.]
+        xzplane = [1., 1., 0.]
+        model.add_cord2r(1, rid=2, origin=[0., 0., 0.], zaxis=zaxis, xzplane=xzplane)
+        model.add_cord2r(2, rid=1, origin=[0., 0., 0.], zaxis=zaxis, xzplane=xzplane)
+        model.add_cord2r(3, rid=0, origin=[1., 0., 0.], zaxis=zaxis, xzplane=xzplane)
+        model.add_cord1r(4, 1, 2, 3)
+        transforms = model.get_coord_transforms()
+        assert sorted(transforms.errors) == [1, 2, 4], transforms.errors
+        with self.assertRaises(RuntimeError):
+            transforms.get_origin_beta(1)
+        with self.assertRaises(KeyError):
+            transforms.get_origin_beta(10)
+        origin, unused_beta = transforms.get_origin_beta(3)
+        assert np.array_equal(origin, [1., 0., 0.])
+
+    def test_cd_to_global(self):
+        """vectors in rectangular/cylindrical/spherical frames"""
+        model = BDF(debug=None)
+        model.add_cord2r(1, origin=[1., 0., 0.], zaxis=[1., 0., 1.], xzplane=[1., 1., 0.])
+        model.add_cord2c(2, origin=[0., 0., 0.], zaxis=[0., 0., 1.], xzplane=[1., 0., 0.])
+        model.add_cord2s(3, origin=[0., 0., 1.], zaxis=[0., 0., 2.], xzplane=[1., 0., 1.])
+        transforms = model.get_coord_transforms()
+
+        xyz_cid0 = np.array([
+            [5., 5., 5.],
+            [0., 2., 0.],
+            [3., 4., 1.],
+            [0., 0., 3.],
+        ])
+        cds = np.array([1, 2, 2, 3])
+        vectors = np.array([
+            [1., 0., 0.],
+            [1., 0., 0.],
+            [0., 5., 1.],
+            [1., 0., 0.],
+        ])
+        expected = np.array([
+            [0., 1., 0.],
+            [0., 1., 0.],
+            [-4., 3., 1.],
+            [0., 0., 1.],
+        ])
+        vectors_cid0 = transforms.cd_to_global(vectors, cds, xyz_cid0)
+        assert np.allclose(vectors_cid0, expected), vectors_cid0
+
+        # (ntimes, nnodes, 3)
+        vectors_cid0 = transforms.cd_to_global(np.array([vectors, 2. * vectors]), cds, xyz_cid0)
+        assert np.allclose(vectors_cid0[1, :, :], 2. * expected), vectors_cid0
+
+        betas = transforms.get_cd_betas(cds, xyz_cid0)
+        for beta in betas:
+            assert np.allclose(beta.dot(beta.T), np.eye(3))
+        with self.assertRaises(RuntimeError):
+            transforms.cd_to_global(vectors, cds)
+
+    def test_coord_groups(self):
+        """points are grouped by coordinate system"""
+        groups = get_coord_groups(np.array([3, 0, 3, 1, 0]))
+        assert sorted(groups) == [0, 1, 3]
+        assert np.array_equal(groups[0], [1, 4])
+        assert np.array_equal(groups[1], [3])
+        assert np.array_equal(groups[3], [0, 2])
+        assert get_coord_groups([]) == {}
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,180 @@
+"""tests the fast card parsers"""
+from __future__ import print_function
+import random
+import unittest
+
+import numpy as np
+
+from pyNastran.bdf.bdf import BDF
+from pyNastran.bdf.utils import to_fields
+from pyNastran.bdf.cards.utils import wipe_empty_fields
+from pyNastran.bdf.errors import DuplicateIDsError
+from pyNastran.bdf.bdf_interface.bdf_card import BDFCard
+from pyNastran.bdf.cards.elements.solid import CTETRA4, CTETRA10
+from pyNastran.bdf.bdf_interface.fast_cards import (
+    FAST_CARDS, fast_card_object, split_fields)
+
+#: card_name -> (the number of fields after the card name,
+#:               the number of leading integer fields)
+NFIELDS = {
+    'GRID' : (8, 2),
+    'CQUAD4' : (14, 6),
+    'CTRIA3' : (13, 5),
+    'CTETRA' : (12, 6),
+    'CPENTA' : (17, 8),
+    'CHEXA' : (22, 10),
+    'CBAR' : (16, 4),
+    'CBUSH' : (13, 4),
+    'FORCE' : (7, 3),
+    'PLOAD4' : (14, 2),
+}
+
+#: values that are commonly found in a BDF and values that the fast
+#: parsers must send to the standard reader
+VALUES = [
+    '', '', '', '1', '2', '12', '0', '-1', '+3', '1.', '-2.5', '.5', '1.5e3',
+    '1.5E-3', '1.-3', '2.+2', '1D3', '.', 'ABC', 'THRU', 'GGG', 'BOO', 'ggo',
+    '123', '1230', '155', 'SURF',
+]
+
+
+def _build_card(model, card_name, card_lines, comment=''):
+    """builds a card using the standard reader"""
+    fields = to_fields(list(card_lines), card_name)
+    card_obj = BDFCard(wipe_empty_fields(fields), has_none=False)
+    if card_name in model._card_parser:
+        card_class = model._card_parser[card_name][0]
+        return card_class.add_card(card_obj, comment=comment)
+
+    model.elements = {}
+    model._card_parser_prepare[card_name](fields, card_obj, comment=comment)
+    return model.elements[int(card_obj.field(1))]
+
+
+def _get_card_lines(card_name, fields, size, is_csv):
+    """writes the fields in small/large field and fixed/csv format"""
+    nfields_per_line = 8 if size == 8 else 4
+    card_name_field = card_name if size == 8 else card_name + '*'
+    lines = []
+    for i in range(0, len(fields), nfields_per_line):
+        line_fields = fields[i:i + nfields_per_line]
+        first_field = card_name_field if i == 0 else ('' if size == 8 else '*')
+        if is_csv:
+            line = ','.join([first_field] + line_fields)
+        else:
+            line = '%-8s' % first_field + ''.join(
+                '%*s' % (size, field) for field in line_fields)
+        lines.append(line)
+    return lines
+
+
+class TestFastCards(unittest.TestCase):
+    """tests the fast card parsers"""
+
+    def test_split_fields(self):
+        """compares split_fields to to_fields/wipe_empty_fields"""
+        card_lines_list = [
+            ['GRID,1,,1.,2.,3.'],
+            ['GRID           1              1.      2.      3.'],
+            ['GRID*                  1                              1.              2.',
+             '*                     3.'],
+            ['GRID*,1,,1.,2.', '*,3.'],
+            ['GRID\t1\t\t1.\t2.\t3.'],
+            ['CQUAD4,1,2,3,4,5,6', ',,,,,,,'],
+        ]
+        for card_lines in card_lines_list:
+            card = wipe_empty_fields(to_fields(list(card_lines), 'GRID'))
+            fields, nfields = split_fields(card_lines)
+            assert nfields == len(card), 'nfields=%s card=%s' % (nfields, card)
+            expected = [field if field is not None else '' for field in card]
+            assert fields[:nfields] == expected, fields
+            assert not any(fields[nfields:]), fields
+
+    def test_fast_cards_fuzz(self):
+        """the fast parsers create the same card as the standard reader"""
+        model = BDF(debug=None)
+        rand = random.Random(42)
+        for card_name, (nfields, nints) in sorted(NFIELDS.items()):
+            nfast = 0
+            for i in range(1500):
+                fields = [rand.choice(VALUES) for unused_i in range(nfields)]
+                if i % 2:
+                    # valid integer ids, so the cards get built
+                    for ifield in range(nints):
+                        fields[ifield] = str(rand.randint(1, 9))
+                    if i % 4 == 1:
+                        fields[nints:] = [rand.choice(['', '', '1.', '.5', '-2.5e1'])
+                                          for unused_field in fields[nints:]]
+                    fields = fields[:rand.randint(nints, nfields)]
+                size = rand.choice([8, 16])
+                is_csv = rand.choice([False, True])
+                card_lines = _get_card_lines(card_name, fields, size, is_csv)
+
+                card_lines_copy = list(card_lines)
+                fast_card = fast_card_object(card_name, card_lines, comment='$ hi\n')
+                assert card_lines == card_lines_copy, card_lines
+                if fast_card is None:
+                    continue
+
+                nfast += 1
+                try:
+                    card = _build_card(model, card_name, card_lines, comment='$ hi\n')
+                except Exception as error:  # pragma: no cover
+                    msg = 'the fast parser built a card that has an error\n%s\n%s' % (
+                        card_lines, error)
+                    raise AssertionError(msg)
+                _compare_cards(card, fast_card, card_lines)
+            assert nfast > 0, card_name
+
+    def test_fast_cards_read(self):
+        """the fast parsers are used when a BDF is read"""
+        model = BDF(debug=None)
+        model._card_parser['FORCE'] = (FAST_CARDS['FORCE'][0], model._add_load_object)
+        fast_cards = model._get_fast_cards()
+        assert set(fast_cards) == set(FAST_CARDS), sorted(fast_cards)
+
+        # the card was replaced
+        model._card_parser['GRID'] = (BDFCard, model._add_node_object)
+        fast_cards = model._get_fast_cards()
+        assert 'GRID' not in fast_cards
+
+        model = BDF(debug=None)
+        cards = [
+            ['GRID', '', ['GRID,1,,1.,2.,3.']],
+            ['GRID', '', ['GRID,2,,1.-3,2.,3.']],  # standard reader
+            ['CTETRA', '', ['CTETRA,10,1,1,2,3,4']],
+            ['CTETRA', '', ['CTETRA,11,1,1,2,3,4,5,6', ',7,8,9,10']],
+            ['CQUAD4', '', ['CQUAD4,1,1,1,2,3,4']],
+            ['CQUAD4', '', ['CQUAD4,1,1,1,2,3,5']],  # duplicate
+        ]
+        with self.assertRaises(DuplicateIDsError):
+            model._parse_cards(cards, {})
+        assert model.card_count == {'GRID' : 2, 'CTETRA' : 2, 'CQUAD4' : 2}, model.card_count
+        assert np.allclose(model.nodes[2].xyz, [1e-3, 2., 3.])
+        assert isinstance(model.elements[10], CTETRA4)
+        assert isinstance(model.elements[11], CTETRA10)
+        assert len(model._duplicate_elements) == 1
+
+
+def _compare_cards(card, fast_card, card_lines):
+    """checks that the cards are the same"""
+    msg = 'card_lines=%s\ncard=\n%sfast_card=\n%s' % (card_lines, card, fast_card)
+    assert type(card) is type(fast_card), msg
+    assert card.write_card(size=8) == fast_card.write_card(size=8), msg
+    assert card.write_card(size=16) == fast_card.write_card(size=16), msg
+    state = card.__getstate__()
+    fast_state = fast_card.__getstate__()
+    assert sorted(state) == sorted(fast_state), msg
+    for key, value in state.items():
+        fast_value = fast_state[key]
+        if isinstance(value, np.ndarray):
+            assert isinstance(fast_value, np.ndarray), msg
+            assert value.dtype == fast_value.dtype, msg
+            assert np.array_equal(value, fast_value), msg
+        else:
+            assert type(value) is type(fast_value), '%s\nkey=%s' % (msg, key)
+            assert value == fast_value, '%s\nkey=%s' % (msg, key)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
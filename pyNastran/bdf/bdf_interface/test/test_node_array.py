@@ -0,0 +1,208 @@
+"""tests the array-backed node container"""
+from __future__ import print_function
+import copy
+import pickle
+import unittest
+from six import StringIO
+
+import numpy as np
+
+from pyNastran.bdf.bdf import BDF, read_bdf
+from pyNastran.bdf.cards.nodes import GRID
+from pyNastran.bdf.bdf_interface.node_array import NodeArrayDict, GRIDProxy
+
+
+def _get_deck(nnodes=40):
+    """a deck with nodes in rectangular/cylindrical/spherical frames"""
+    lines = [
+        'SOL 101',
+        'CEND',
+        'BEGIN BULK',
+        'CORD2R,1,,0.,0.,1.,0.,0.,2.,',
+        ',1.,0.,1.',
+        'CORD2C,2,1,1.,0.,0.,1.,0.,1.,',
+        ',2.,1.,0.',
+        'CORD2S,3,,0.,1.,0.,0.,1.,1.,',
+        ',1.,1.,0.',
+        'PSHELL,1,1,0.1',
+        'MAT1,1,3.0e7,,0.3',
+    ]
+    for nid in range(nnodes, 0, -1):
+        cp = nid % 4
+        cd = (nid + 1) % 4
+        ps = '123' if nid % 5 == 0 else ''
+        lines.append('GRID,%i,%i,%s,%s,%s,%i,%s' % (
+            nid, cp, 1. + nid, 10. + 2. * nid, 0.5 * nid, cd, ps))
+        if nid % 7 == 0:
+            lines.append('$ node %i' % nid)
+    for eid in range(1, nnodes // 4 + 1):
+        nid1 = 4 * (eid - 1) + 1
+        lines.append('CQUAD4,%i,1,%i,%i,%i,%i' % (eid, nid1, nid1 + 1, nid1 + 2, nid1 + 3))
+    lines.append('ENDDATA')
+    return '\n'.join(lines)
+
+
+def _read_deck(deck, **kwargs):
+    """reads a deck from a string"""
+    bdf_file = StringIO()
+    bdf_file.write(deck)
+    bdf_file.seek(0)
+    return read_bdf(bdf_file, debug=None, **kwargs)
+
+
+class TestNodeArray(unittest.TestCase):
+    """tests the NodeArrayDict"""
+
+    def test_node_array_dict(self):
+        """a NodeArrayDict behaves like a dictionary of GRIDs"""
+        nodes = NodeArrayDict()
+        nodes_dict = {}
+        for nid in [5, 3, 10, 1, 7]:
+            comment = 'node %i' % nid if nid == 3 else ''
+            grid = GRID(nid, [nid, 2. * nid, 3.], cp=nid % 2, cd=1, ps='12', comment=comment)
+            nodes[nid] = grid
+            nodes_dict[nid] = grid
+        assert len(nodes) == 5
+        assert list(nodes) == list(nodes_dict)
+        assert list(nodes.keys()) == [5, 3, 10, 1, 7]
+        assert 3 in nodes and 4 not in nodes and 'cat' not in nodes and None not in nodes
+        for nid, node in nodes.items():
+            assert isinstance(node, GRIDProxy)
+            assert node == nodes_dict[nid] and nodes_dict[nid] == node
+            assert node.write_card() == nodes_dict[nid].write_card()
+            assert node.write_card(size=16, is_double=True) == nodes_dict[nid].write_card(
+                size=16, is_double=True)
+        assert nodes[3].comment == '$node 3\n'
+        assert nodes.get(4) is None
+        assert np.array_equal(nodes.get_index([1, 5, 7]), [3, 0, 4])
+        with self.assertRaises(KeyError):
+            nodes[4]
+        with self.assertRaises(KeyError):
+            nodes.get_index([1, 4])
+        with self.assertRaises(TypeError):
+            nodes[4] = 'GRID'
+
+        # the proxies write to the arrays
+        node = nodes[10]
+        node.xyz[0] = 42.
+        node.ps = '456'
+        node.comment = 'moved'
+        assert nodes[10].xyz[0] == 42.
+        assert nodes.ps[2] == b'456'
+        assert nodes[10].comment == '$moved\n'
+
+        # changing the nid doesn't change the key (like a dict of GRIDs)
+        node.nid = 11
+        assert 10 in nodes and 11 not in nodes
+        assert nodes[10].nid == 11
+        assert np.array_equal(nodes.nid, [5, 3, 11, 1, 7])
+
+        # deleting a node moves the rows of the other nodes
+        node = nodes[7]
+        del nodes[3]
+        assert list(nodes) == [5, 10, 1, 7]
+        assert node.xyz[0] == 7.
+        grid = nodes.pop(5)
+        assert type(grid) is GRID
+        assert grid.write_card() == nodes_dict[5].write_card()
+        assert nodes.pop(5, None) is None
+        assert nodes.popitem()[0] == 7
+        assert 7 not in nodes
+
+        # replacing a node keeps its position
+        nodes[10] = GRID(10, [1., 2., 3.])
+        nodes[20] = GRID(20, [1., 2., 3.])
+        assert list(nodes) == [10, 1, 20]
+        assert np.array_equal(nodes.get_xyz([20, 10]), [[1., 2., 3.], [1., 2., 3.]])
+        assert nodes.setdefault(1).nid == 1
+
+        # copies of a node are standalone GRIDs
+        node = nodes[1]
+        for node2 in [copy.copy(node), copy.deepcopy(node), pickle.loads(pickle.dumps(node))]:
+            assert type(node2) is GRID
+            assert node2.write_card() == node.write_card()
+
+        nodes2 = pickle.loads(pickle.dumps(nodes))
+        assert list(nodes2) == list(nodes)
+        assert nodes2[20].write_card() == nodes[20].write_card()
+        nodes.clear()
+        assert len(nodes) == 0 and list(nodes) == []
+
+    def test_node_array_index(self):
+        """the sorted index is updated when nodes are added/removed"""
+        nodes = NodeArrayDict()
+        nids = np.random.RandomState(42).permutation(np.arange(1, 5001))
+        for nid in nids:
+            nodes[nid] = GRID(nid, [nid, 0., 0.])
+            assert nid in nodes
+        for nid in nids[::3]:
+            del nodes[nid]
+        nids_left = nids[np.arange(len(nids)) % 3 != 0]
+        assert np.array_equal(nodes.node_ids, nids_left)
+        assert np.array_equal(nodes.xyz[nodes.get_index(nids_left), 0], nids_left)
+        assert all(nodes[nid].xyz[0] == nid for nid in nids_left[::97])
+        assert not any(nid in nodes for nid in nids[::3])
+
+    def test_node_arrays_read(self):
+        """a model that uses node arrays matches the standard model"""
+        deck = _get_deck()
+        model = _read_deck(deck)
+        model2 = _read_deck(deck, node_arrays=True)
+        assert isinstance(model2.nodes, NodeArrayDict)
+        assert list(model2.nodes) == list(model.nodes)
+        for nid, node in model.nodes.items():
+            node2 = model2.nodes[nid]
+            assert node2.write_card() == node.write_card()
+            assert node2.Cp() == node.Cp() and node2.cp_ref.cid == node.cp_ref.cid
+            assert np.allclose(node2.get_position(), node.get_position())
+            assert np.allclose(node2.get_position_wrt(model2, 2), node.get_position_wrt(model, 2))
+        for eid, elem in model.elements.items():
+            assert np.allclose(model2.elements[eid].Area(), elem.Area())
+
+        for cid in [0, 1, 2, 3]:
+            xyz = model.get_xyz_in_coord(cid=cid)
+            xyz2 = model2.get_xyz_in_coord(cid=cid)
+            assert np.allclose(xyz, xyz2), cid
+
+        out = model.get_displacement_index_xyz_cp_cd()
+        out2 = model2.get_displacement_index_xyz_cp_cd()
+        for icd_transform, icd_transform2 in zip(out[:2], out2[:2]):
+            assert sorted(icd_transform) == sorted(icd_transform2)
+            for cid, inode in icd_transform.items():
+                assert np.array_equal(inode, icd_transform2[cid])
+        assert np.array_equal(out[2], out2[2])
+        assert np.array_equal(out[3], out2[3])
+
+        nids = [40, 3, 17]
+        xyz = model2.nodes.get_xyz_in_coord(model2, cid=3, nids=nids)
+        expected = [model.nodes[nid].get_position_wrt(model, 3) for nid in nids]
+        assert np.allclose(xyz, expected)
+
+        bdf_file = StringIO()
+        bdf_file2 = StringIO()
+        model.write_bdf(bdf_file, close=False)
+        model2.write_bdf(bdf_file2, close=False)
+        assert bdf_file.getvalue() == bdf_file2.getvalue()
+
+    def test_set_node_arrays(self):
+        """the nodes of an existing model are converted"""
+        model = BDF(debug=None)
+        model.add_grid(2, [1., 2., 3.], comment='two')
+        model.add_grid(1, [4., 5., 6.])
+        nodes = model.set_node_arrays()
+        assert model.nodes is nodes and model.set_node_arrays() is nodes
+        model.add_grid(3, [7., 8., 9.])
+        assert list(model.nodes) == [2, 1, 3]
+        assert model.nodes[2].comment == '$two\n'
+        model.cross_reference()
+        assert np.allclose(model.get_xyz_in_coord(), [[4., 5., 6.], [1., 2., 3.], [7., 8., 9.]])
+
+        deck = _get_deck(nnodes=8)
+        model = _read_deck(deck, xref=False, validate=False, lazy=True, node_arrays=True)
+        assert isinstance(model.nodes, NodeArrayDict)
+        assert 'GRID' not in model._lazy_cards
+        assert model.elements.nlazy == 2
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
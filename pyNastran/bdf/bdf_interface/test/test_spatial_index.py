@@ -0,0 +1,244 @@
+"""tests the cached spatial index of the nodes and elements"""
+from __future__ import print_function
+import unittest
+
+import numpy as np
+
+from pyNastran.bdf.bdf import BDF, GRID
+
+
+def _build_model(nx=4):
+    """
+    creates a block of unit CHEXAs with CQUAD4s on the top, CRODs on an
+    edge and a few elements without positions
+    """
+    model = BDF(debug=None)
+    nids = np.arange(1, (nx + 1) ** 3 + 1).reshape(nx + 1, nx + 1, nx + 1)
+    for k in range(nx + 1):
+        for j in range(nx + 1):
+            for i in range(nx + 1):
+                model.add_grid(int(nids[k, j, i]), [float(i), float(j), float(k)])
+
+    eid = 1
+    for k in range(nx):
+        for j in range(nx):
+            for i in range(nx):
+                model.add_chexa(eid, 1, [
+                    nids[k, j, i], nids[k, j, i + 1], nids[k, j + 1, i + 1], nids[k, j + 1, i],
+                    nids[k + 1, j, i], nids[k + 1, j, i + 1],
+                    nids[k + 1, j + 1, i + 1], nids[k + 1, j + 1, i]])
+                eid += 1
+    for j in range(nx):
+        for i in range(nx):
+            model.add_cquad4(eid, 2, [nids[nx, j, i], nids[nx, j, i + 1],
+                                      nids[nx, j + 1, i + 1], nids[nx, j + 1, i]])
+            eid += 1
+    for i in range(nx):
+        model.add_crod(eid, 3, [nids[0, 0, i], nids[0, 0, i + 1]])
+        eid += 1
+    model.add_spoint([1000, 1001])
+    model.add_celas2(eid, 1.0, [1000, 1001])
+    model.add_conm2(eid + 1, 1, 1.0)
+    return model
+
+
+def _get_element_boxes(model):
+    """gets the bounding box of each element with a per-element loop"""
+    boxes = {}
+    for eid, elem in model.elements.items():
+        xyz = [model.nodes[nid].get_position() for nid in elem.node_ids
+               if nid in model.nodes]
+        if xyz:
+            boxes[eid] = (np.min(xyz, axis=0), np.max(xyz, axis=0), np.array(xyz))
+    return boxes
+
+
+def _to_pairs(iqueries, eids):
+    """the (query, element) pairs as a set"""
+    return set(zip(iqueries.tolist(), eids.tolist()))
+
+
+class TestSpatialIndex(unittest.TestCase):
+    """tests the cached spatial index of the nodes and elements"""
+
+    def test_closest_nodes(self):
+        """the closest nodes are the same as the brute force search"""
+        model = _build_model()
+        index = model.spatial_index()
+        np.random.seed(0)
+        xyz = np.random.uniform(-1., 5., size=(50, 3))
+        nids, distances = index.get_closest_nodes(xyz)
+
+        all_nids = np.array(sorted(model.nodes), dtype='int64')
+        all_xyz = np.array([model.nodes[nid].get_position() for nid in all_nids])
+        distance_matrix = np.linalg.norm(xyz[:, np.newaxis] - all_xyz, axis=2)
+        assert np.allclose(distances, distance_matrix.min(axis=1))
+        assert np.array_equal(nids, all_nids[distance_matrix.argmin(axis=1)])
+
+        nids, distances = index.get_closest_nodes(xyz, k=3, max_distance=0.9)
+        assert nids.shape == distances.shape == (50, 3)
+        assert np.array_equal(nids == -1, distances > 0.9)
+        assert np.array_equal(nids == -1, np.isinf(distances))
+
+    def test_elements_in_box_radius(self):
+        """the elements in boxes/spheres are the same as the brute force search"""
+        model = _build_model()
+        boxes = _get_element_boxes(model)
+        index = model.spatial_index()
+
+        np.random.seed(1)
+        box_min = np.random.uniform(-1., 4., size=(20, 3))
+        box_max = box_min + np.random.uniform(0., 3., size=(20, 3))
+        for is_inside in [False, True]:
+            iboxes, eids = index.get_elements_in_box(box_min, box_max, is_inside=is_inside)
+            expected = set()
+            for ibox, (bmin, bmax) in enumerate(zip(box_min, box_max)):
+                for eid, (emin, emax, unused_xyz) in boxes.items():
+                    if is_inside:
+                        is_found = (emin >= bmin).all() and (emax <= bmax).all()
+                    else:
+                        is_found = (emin <= bmax).all() and (emax >= bmin).all()
+                    if is_found:
+                        expected.add((ibox, eid))
+            assert _to_pairs(iboxes, eids) == expected, is_inside
+            assert len(expected) > 0
+            assert np.all(np.diff(iboxes) >= 0)
+
+        centers = np.random.uniform(-1., 5., size=(20, 3))
+        radius = np.random.uniform(0., 2.5, size=20)
+        for is_inside in [False, True]:
+            icenters, eids = index.get_elements_in_radius(centers, radius, is_inside=is_inside)
+            expected = set()
+            for icenter, (center, radiusi) in enumerate(zip(centers, radius)):
+                for eid, (emin, emax, xyz) in boxes.items():
+                    if is_inside:
+                        is_found = (np.linalg.norm(xyz - center, axis=1) <= radiusi).all()
+                    else:
+                        dxyz = np.maximum(np.maximum(emin - center, center - emax), 0.)
+                        is_found = np.linalg.norm(dxyz) <= radiusi
+                    if is_found:
+                        expected.add((icenter, eid))
+            assert _to_pairs(icenters, eids) == expected, is_inside
+            assert len(expected) > 0
+
+    def test_elements_containing_points(self):
+        """the elements that contain points"""
+        model = _build_model()
+        index = model.spatial_index()
+
+        # points in the CHEXAs that aren't near a face
+        np.random.seed(2)
+        ijk = np.random.randint(0, 4, size=(30, 3))
+        xyz = ijk + np.random.uniform(0.05, 0.95, size=(30, 3))
+        ipoints, eids = index.get_elements_containing_points(xyz)
+        assert np.array_equal(ipoints, np.arange(30)), ipoints
+        assert np.array_equal(eids, 1 + ijk[:, 0] + 4 * ijk[:, 1] + 16 * ijk[:, 2]), eids
+
+        # a point on the top is in a CHEXA and a CQUAD4; a point on the
+        # bottom edge is in 2 CHEXAs and 2 CRODs
+        xyz = [[0.5, 0.5, 4.0], [0.5, 0.5, 4.001], [2., 0., 0.], [-1., 0., 0.]]
+        ipoints, eids = index.get_elements_containing_points(xyz, tol=1e-8)
+        assert _to_pairs(ipoints, eids) == set([
+            (0, 49), (0, 65), (2, 2), (2, 3), (2, 82), (2, 83)]), _to_pairs(ipoints, eids)
+        ipoints, eids = index.get_elements_containing_points(xyz, tol=0.01)
+        assert (1, 65) in _to_pairs(ipoints, eids)
+        assert (1, 49) in _to_pairs(ipoints, eids)
+        assert 3 not in ipoints.tolist()
+
+    def test_elements_intersecting_planes(self):
+        """the elements that are cut by planes"""
+        model = _build_model()
+        boxes = _get_element_boxes(model)
+        index = model.spatial_index()
+
+        np.random.seed(3)
+        origins = np.random.uniform(0., 4., size=(10, 3))
+        normals = np.random.uniform(-1., 1., size=(10, 3))
+        normals[0] = [0., 0., 1.]
+        origins[0] = [0., 0., 4.]
+        iplanes, eids = index.get_elements_intersecting_planes(origins, normals)
+        expected = set()
+        for iplane, (origin, normal) in enumerate(zip(origins, normals)):
+            for eid, (unused_emin, unused_emax, xyz) in boxes.items():
+                distance = (xyz - origin).dot(normal)
+                if distance.min() <= 0. <= distance.max():
+                    expected.add((iplane, eid))
+        assert _to_pairs(iplanes, eids) == expected
+
+        # the top plane cuts the top CHEXAs and the CQUAD4s
+        eids0 = eids[iplanes == 0].tolist()
+        assert eids0 == list(range(49, 81)), eids0
+
+    def test_invalidate(self):
+        """
+        the index is rebuilt when the nodes/elements/coordinate systems
+        change or when the mesh caches are cleared
+        """
+        model = _build_model(nx=2)
+        index = model.spatial_index()
+        assert model.spatial_index() is index
+        nids = index.get_closest_nodes([[0.1, 0., 0.]])[0]
+        assert nids.tolist() == [1], nids
+
+        # moving a node rebuilds the index
+        model.nodes[1].xyz = np.array([10., 0., 0.])
+        index2 = model.spatial_index()
+        assert index2 is not index
+        nids = index2.get_closest_nodes([[0.1, 0., 0.]])[0]
+        assert nids.tolist() == [2], nids
+        assert model.spatial_index() is index2
+
+        # so does moving a node in place
+        model.nodes[1].xyz[0] = 0.
+        index2b = model.spatial_index()
+        assert index2b is not index2
+        nids = index2b.get_closest_nodes([[0.1, 0., 0.]])[0]
+        assert nids.tolist() == [1], nids
+        model.clear_mesh_caches()
+        index2 = model.spatial_index()
+        assert index2 is not index2b
+
+        # a node moves if its coordinate system moves
+        model.add_cord2r(1, origin=[0., 0., 5.], zaxis=[0., 0., 6.], xzplane=[1., 0., 5.])
+        model._cross_reference_coordinates()
+        model.nodes[2].cp = 1
+        model.nodes[2].cp_ref = model.coords[1]
+        index3 = model.spatial_index()
+        assert index3 is not index2
+        nids = index3.get_closest_nodes([[1., 0., 5.]])[0]
+        assert nids.tolist() == [2], nids
+
+        model.add_ctria3(100, 2, [1, 2, 3])
+        index4 = model.spatial_index()
+        assert index4 is not index3
+        assert 100 in index4.eids
+
+        # replacing a node is detected
+        node = GRID(1, [0., 0., 0.])
+        node.cp_ref = model.coords[0]
+        model.nodes[1] = node
+        index5 = model.spatial_index()
+        assert index5 is not index4
+        nids = index5.get_closest_nodes([[0.1, 0., 0.]])[0]
+        assert nids.tolist() == [1], nids
+
+        # the nodes are in arrays
+        model.set_node_arrays()
+        index6 = model.spatial_index()
+        assert model.spatial_index() is index6
+        model.nodes[1].xyz[0] = 10.
+        index7 = model.spatial_index()
+        assert index7 is not index6
+        nids = index7.get_closest_nodes([[0.1, 0., 0.]])[0]
+        assert nids.tolist() == [4], nids
+
+        model = BDF(debug=None)
+        index = model.spatial_index()
+        nids, distances = index.get_closest_nodes([[0., 0., 0.]])
+        assert nids.tolist() == [-1] and np.isinf(distances).all()
+        iboxes, eids = index.get_elements_in_box([[0., 0., 0.]], [[1., 1., 1.]])
+        assert len(iboxes) == 0 and len(eids) == 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
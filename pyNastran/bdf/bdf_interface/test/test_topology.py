@@ -0,0 +1,203 @@
+"""tests the cached element topology"""
+import unittest
+from collections import defaultdict
+
+import numpy as np
+
+from pyNastran.bdf.bdf import BDF
+from pyNastran.bdf.bdf_interface.topology import MeshTopology
+from pyNastran.bdf.mesh_utils.bdf_equivalence import bdf_equivalence_nodes
+from pyNastran.bdf.mesh_utils.free_edges import free_edges
+
+
+def _build_model():
+    """creates a model with line, shell and solid elements"""
+    model = BDF(debug=None)
+    for nid in range(1, 31):
+        model.add_grid(nid, [float(nid % 3), float(nid // 3 % 3), float(nid // 9)])
+    model.add_spoint([100, 101])
+    model.add_cquad4(1, 1, [1, 2, 5, 4])
+    model.add_cquad4(2, 1, [2, 3, 6, 5])
+    model.add_ctria3(3, 1, [4, 5, 7])
+    model.add_cquad8(4, 1, [5, 6, 9, 8, 10, None, 12, None])
+    model.add_ctria6(5, 1, [5, 8, 7, None, None, None])
+    model.add_cquad4(6, 1, [1, 1, 5, 4], comment='collapsed')
+    model.add_chexa(10, 2, [1, 2, 5, 4, 10, 11, 14, 13])
+    model.add_ctetra(11, 2, [2, 3, 5, 11])
+    model.add_cpenta(12, 2, [13, 14, 16, 22, 23, 25])
+    model.add_cpyram(13, 2, [10, 11, 14, 13, 20])
+    model.add_chexa(14, 2, list(range(1, 21)))
+    model.add_cbar(20, 3, [26, 27], [0., 1., 0.], None)
+    model.add_crod(21, 4, [28, 27])
+    model.add_conrod(22, 1, [29, 30], A=1.0)
+    model.add_celas1(23, 5, [30, None], c1=1)
+    model.add_celas2(24, 1.0, [100, 101])
+    model.add_conm2(30, 1, 1.0)
+    return model
+
+
+def _get_node_id_to_element_ids_map(model):
+    """the element ids of each node with a per-element loop"""
+    nid_to_eids_map = {nid : [] for nid in model.nodes}
+    for nid in model.spoints:
+        nid_to_eids_map[nid] = []
+    for eid, element in model.elements.items():
+        for nid in element.node_ids:
+            if nid:
+                nid_to_eids_map[nid].append(eid)
+    return nid_to_eids_map
+
+
+def _get_edge_maps(model, etypes):
+    """the edge maps with a per-element loop"""
+    eid_to_edge_map = {}
+    edge_to_eid_map = defaultdict(set)
+    nid_to_edge_map = defaultdict(set)
+    for eid, elem in model.elements.items():
+        if elem.type not in etypes:
+            continue
+        edges = [tuple(sorted(edge)) for edge in elem.get_edge_ids()]
+        eid_to_edge_map[eid] = edges
+        for edge in edges:
+            edge_to_eid_map[edge].add(eid)
+            for nid in edge:
+                nid_to_edge_map[nid].add(edge)
+    return edge_to_eid_map, eid_to_edge_map, nid_to_edge_map
+
+
+class TestTopology(unittest.TestCase):
+    """tests the cached element topology"""
+
+    def test_maps(self):
+        """the views of the topology match the per-element loops"""
+        model = _build_model()
+        expected = _get_node_id_to_element_ids_map(model)
+        assert model.get_node_id_to_element_ids_map() == expected
+
+        nid_to_elements_map = model.get_node_id_to_elements_map()
+        for nid, eids in expected.items():
+            assert [elem.eid for elem in nid_to_elements_map[nid]] == eids, nid
+
+        etypes = ['CBAR', 'CROD', 'CONROD', 'CQUAD4', 'CTRIA3', 'CQUAD8', 'CTRIA6',
+                  'CHEXA', 'CTETRA', 'CPENTA', 'CPYRAM']
+        maps = model._get_maps()
+        expected_maps = _get_edge_maps(model, etypes)
+        for mapi, expected_map in zip(maps, expected_maps):
+            # the keys are in the same order as the loop
+            assert list(mapi.items()) == list(expected_map.items())
+
+        maps = model._get_maps(eids=[1, 2, 10, 20], consider_1d=False, consider_3d=False)
+        edge_to_eid_map = maps[0]
+        assert set(maps[1].keys()) == set([1, 2]), maps[1]
+        assert edge_to_eid_map[(2, 5)] == set([1, 2]), edge_to_eid_map[(2, 5)]
+        with self.assertRaises(KeyError):
+            model._get_maps(eids=[1, 1000])
+
+    def test_topology(self):
+        """the CSR arrays"""
+        model = _build_model()
+        topology = model.get_topology()
+        assert model.get_topology() is topology
+
+        ielements = topology.get_element_index([4, 1, 24])
+        assert topology.eids[ielements].tolist() == [4, 1, 24]
+        for ielement, nids in zip(ielements, [[5, 6, 9, 8, 10, 12], [1, 2, 5, 4], [100, 101]]):
+            i0, i1 = topology.element_node_offsets[ielement:ielement + 2]
+            assert topology.element_nodes[i0:i1].tolist() == nids, ielement
+        with self.assertRaises(KeyError):
+            topology.get_element_index([1, 1000])
+
+        # a face of the CTETRA
+        iface = np.where((topology.faces == [0, 2, 5, 11]).all(axis=1))[0]
+        assert len(iface) == 1, iface
+        i0, i1 = topology.face_element_offsets[iface[0]:iface[0] + 2]
+        eids = topology.eids[topology.face_elements[i0:i1]].tolist()
+        assert eids == [11], eids
+
+        # a face that's shared by a CQUAD4 and a CHEXA
+        iface = np.where((topology.faces == [1, 2, 4, 5]).all(axis=1))[0]
+        i0, i1 = topology.face_element_offsets[iface[0]:iface[0] + 2]
+        eids = topology.eids[topology.face_elements[i0:i1]].tolist()
+        assert eids == [1, 10], eids
+
+        # the collapsed quad uses edge (1, 1) and edge (1, 4)
+        ielement = topology.get_element_index([6])[0]
+        i0, i1 = topology.element_edge_offsets[ielement:ielement + 2]
+        edges = topology.edges[topology.element_edges[i0:i1]].tolist()
+        assert edges == [[1, 1], [1, 5], [4, 5], [1, 4]], edges
+
+    def test_free_edges(self):
+        """the edges that are only used by one shell"""
+        model = _build_model()
+        del model.elements[6]
+        edges = free_edges(model)
+        edge_to_eid_map = _get_edge_maps(
+            model, ['CQUAD4', 'CTRIA3', 'CQUAD8', 'CTRIA6'])[0]
+        expected = [edge for edge, eids in edge_to_eid_map.items() if len(eids) == 1]
+        assert sorted(edges) == sorted(expected), edges
+
+    def test_invalidate(self):
+        """the topology is rebuilt when the elements change"""
+        model = _build_model()
+        topology = model.get_topology()
+        assert topology.is_valid(model)
+
+        model.add_ctria3(7, 1, [21, 24, 25])
+        topology2 = model.get_topology()
+        assert topology2 is not topology
+        assert 7 in topology2.eids
+        assert model.get_node_id_to_element_ids_map()[25] == [12, 7]
+
+        del model.elements[7]
+        assert 7 not in model.get_topology().eids
+        assert model.get_node_id_to_element_ids_map()[25] == [12]
+        assert model.get_node_id_to_element_ids_map()[21] == []
+
+        # replace an element
+        model.elements[1] = model.elements[2]
+        assert model.get_node_id_to_element_ids_map()[3] == [1, 2, 11, 14]
+
+        # change the nodes of an element
+        assert model.get_node_id_to_element_ids_map()[7] == [3, 5, 14]
+        model.elements[3].nodes = [4, 5, 21]
+        nid_to_eids_map = model.get_node_id_to_element_ids_map()
+        assert nid_to_eids_map[7] == [5, 14], nid_to_eids_map[7]
+        assert nid_to_eids_map[21] == [3], nid_to_eids_map[21]
+        model.elements[3].nodes[2] = 7
+        assert model.get_node_id_to_element_ids_map()[7] == [3, 5, 14]
+        assert 21 not in model.get_topology().nids
+
+        model = BDF(debug=None)
+        topology = MeshTopology(model)
+        assert len(topology.eids) == 0 and len(topology.nids) == 0
+        assert topology.get_free_edges().shape == (0, 2)
+        assert model.get_node_id_to_element_ids_map() == {}
+
+    def test_equivalence(self):
+        """the topology is rebuilt after the nodes are equivalenced in place"""
+        model = BDF(debug=None)
+        model.add_grid(1, [0., 0., 0.])
+        model.add_grid(2, [1., 0., 0.])
+        model.add_grid(3, [0., 1., 0.])
+        model.add_grid(4, [1., 0., 0.])
+        model.add_grid(5, [0., 1., 0.])
+        model.add_grid(6, [1., 1., 0.])
+        model.add_ctria3(1, 1, [1, 2, 3])
+        model.add_ctria3(2, 1, [4, 6, 5])
+        model.add_pshell(1, mid1=1, t=0.1)
+        model.add_mat1(1, 3.0e7, None, 0.3)
+        model.cross_reference()
+        assert len(free_edges(model)) == 6
+        nid_to_eids_map = model.get_node_id_to_element_ids_map()
+        assert nid_to_eids_map[2] == [1] and nid_to_eids_map[4] == [2], nid_to_eids_map
+
+        bdf_equivalence_nodes(model, None, 0.01, xref=False)
+        assert model.elements[2].node_ids == [2, 6, 3], model.elements[2].node_ids
+        edges = free_edges(model)
+        assert sorted(edges) == [(1, 2), (1, 3), (2, 6), (3, 6)], edges
+        nid_to_eids_map = model.get_node_id_to_element_ids_map()
+        assert nid_to_eids_map[2] == [1, 2] and nid_to_eids_map[4] == [], nid_to_eids_map
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
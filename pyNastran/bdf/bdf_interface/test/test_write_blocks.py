@@ -0,0 +1,136 @@
+"""tests the array-based writer"""
+import unittest
+
+import numpy as np
+from six import StringIO
+
+from pyNastran.bdf.bdf import BDF
+from pyNastran.bdf.bdf_interface.lazy_cards import LazyCard
+from pyNastran.bdf.bdf_interface.write_blocks import (
+    write_cards, write_node_arrays, _encode_ints)
+
+#: the (size, is_double, is_long_ids) cases
+WRITE_CASES = [(8, False, False), (16, False, False), (16, True, False),
+               (8, False, True), (16, True, True)]
+
+
+def _build_model(node_arrays=False):
+    """creates a model with the cards that are written in blocks"""
+    model = BDF(debug=None)
+    if node_arrays:
+        model.set_node_arrays()
+    model.add_cord2r(1, origin=[0., 0., 0.], zaxis=[0., 0., 1.], xzplane=[1., 0., 0.])
+    values = [0., -0., 1., -1., 1.5, 1e-9, -3.2e-5, 0.001234, 123456.7, -1234567.,
+              1e12, 3.14159265358979, np.nan, 1e-300]
+    for nid in range(1, 41):
+        xyz = [values[nid % len(values)], values[(3 * nid) % len(values)], 0.1 * nid]
+        model.add_grid(nid, xyz, cp=nid % 2, cd=(nid // 7) % 2,
+                       ps='' if nid % 5 else '123', seid=nid // 30,
+                       comment='node %i' % nid if nid % 9 == 0 else '')
+    model.add_grid(12345678, [1., 2., 3.])
+    model.add_grid(123456789, [1., 2., 3.], cp=1)
+
+    model.add_cquad4(1, 1, [1, 2, 3, 4])
+    model.add_cquad4(2, 2, [4, 3, 5, 6], theta_mcid=1, comment='quad')
+    model.add_cquad4(3, 1, [5, 6, 7, 8], theta_mcid=12.5, zoffset=0.1, tflag=1,
+                     T1=0.5, T2=None, T3=1.0, T4=np.nan)
+    model.add_cquad4(4, 123456789, [5, 6, 7, 8])
+    model.add_ctria3(5, 1, [7, 8, 9])
+    model.add_ctria3(6, 1, [7, 8, 9], theta_mcid=2, zoffset=-0.2, T3=2.0)
+    model.add_chexa(10, 5, [1, 2, 3, 4, 5, 6, 7, 8])
+    model.add_chexa(11, 5, list(range(1, 21)), comment='hexa20')
+    model.add_chexa(12, 5, list(range(1, 9)) + [None] * 6 + [15, 16, 17, None, None, None])
+    model.add_ctetra(13, 5, [1, 2, 3, 4])
+    model.add_ctetra(14, 5, [1, 2, 3, 4, 5, 6, None, 8, None, None])
+    model.add_ctetra(15, 5, [1, 2, 3, 4, None, None, None, None, None, None])
+    model.add_cbar(20, 6, [26, 27], [0., 1., 0.], None)
+    model.add_cbar(21, 6, [27, 28], None, 30, offt='GOG', pa=123, pb=456,
+                   wa=[0., 0.1, 0.], wb=[1., 0., 0.], comment='bar')
+    model.add_cbar(22, 6, [27, 28], [1., 0., 0.], None, wb=[0., 0., 2.])
+    model.add_crod(23, 7, [28, 29])
+    model.add_conm2(30, 1, 1.0)
+    model.add_conm2(31, 2, 2.5, cid=1, X=[0., 0.1, 0.], I=[1., 0., 2., 0., 0., 3.])
+    model.add_conm2(32, 3, 0.1, X=[1., 2., 3.])
+    model.add_conm1(33, 4, np.zeros((6, 6)))
+
+    model.add_force(100, 1, 1.0, [1., 0., 0.])
+    model.add_force(100, 2, -2.5e-5, [0., 1., 1.], cid=1, comment='force')
+    model.add_moment(100, 3, 1.0, [1., 0., 0.])
+    model.add_force(101, 12345678, 1.0e10, [0., 0., -1.])
+    return model
+
+
+def _write_by_card(cards, size, is_double, is_long_ids):
+    """writes the cards with the write_card methods"""
+    if is_long_ids:
+        return ''.join(card.write_card_16(is_double) for card in cards)
+    return ''.join(card.write_card(size, is_double) for card in cards)
+
+
+class TestWriteBlocks(unittest.TestCase):
+    """tests the array-based writer"""
+
+    def test_encode_ints(self):
+        """the integer fields are the same as '%8i'"""
+        values = np.array([0, 1, -1, 9, 10, -10, 99999999, 100000000, -9999999,
+                           -10000000, 12345, -2147483648])
+        for width in [8, 16]:
+            fields, is_valid = _encode_ints(values, width)
+            for value, field, is_validi in zip(values, fields, is_valid):
+                expected = '%*i' % (width, value)
+                assert is_validi == (len(expected) == width), (value, width)
+                if is_validi:
+                    assert field.tobytes().decode('ascii') == expected, (value, width)
+
+    def test_write_cards(self):
+        """the blocks are the same as the write_card methods"""
+        model = _build_model()
+        cards = (
+            [model.nodes[nid] for nid in sorted(model.nodes)] +
+            [model.elements[eid] for eid in sorted(model.elements)] +
+            [model.masses[eid] for eid in sorted(model.masses)] +
+            [load for sid in sorted(model.loads) for load in model.loads[sid]])
+        cards.append(LazyCard('GRID', '$lazy\n', ['GRID,1000']))
+        # the shells don't have a write_card_16 method
+        cards_16 = [card for card in cards if hasattr(card, 'write_card_16')]
+        for is_xref in [False, True]:
+            if is_xref:
+                model.cross_reference()
+            for size, is_double, is_long_ids in WRITE_CASES:
+                cardsi = cards_16 if is_long_ids else cards
+                msg = write_cards(cardsi, size, is_double, is_long_ids)
+                expected = _write_by_card(cardsi, size, is_double, is_long_ids)
+                assert msg == expected, (size, is_double, is_long_ids, is_xref)
+        assert write_cards([]) == ''
+
+    def test_write_node_arrays(self):
+        """the NodeArrayDict is written from its arrays"""
+        model = _build_model()
+        model2 = _build_model(node_arrays=True)
+        for size, is_double, is_long_ids in WRITE_CASES:
+            nodes = [model.nodes[nid] for nid in sorted(model.nodes)]
+            expected = _write_by_card(nodes, size, is_double, is_long_ids)
+            msg = write_node_arrays(model2.nodes, size, is_double, is_long_ids)
+            assert msg == expected, (size, is_double, is_long_ids)
+
+        model2.cross_reference()
+        del model2.nodes[3]
+        model2.nodes[2].comment = 'updated'
+        nodes = [model2.nodes[nid] for nid in sorted(model2.nodes)]
+        assert write_node_arrays(model2.nodes) == _write_by_card(nodes, 8, False, False)
+
+    def test_write_bdf(self):
+        """the BDF is the same as the BDF that's written by card"""
+        for node_arrays in [False, True]:
+            model = _build_model(node_arrays=node_arrays)
+            for size, is_double in [(8, False), (16, False), (16, True)]:
+                bdf_file = StringIO()
+                model.write_bdf(bdf_file, size=size, is_double=is_double, close=False)
+                msg = bdf_file.getvalue()
+                for cards in [model.nodes, model.elements, model.masses]:
+                    for unused_key, card in sorted(cards.items()):
+                        assert card.write_card(size, is_double) in msg
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,358 @@
+# coding: utf-8
+"""
+Defines the node/element/edge/face connectivity used by ``BDF.get_topology()``:
+  - MeshTopology(model)
+
+A MeshTopology stores the connectivity of the elements as CSR (compressed
+sparse row) arrays:
+  - element -> nodes
+  - node -> elements
+  - element -> edges and edge -> elements
+  - element -> faces and face -> elements
+
+The edges and faces are stored as sorted (canonical) node ids, so the edges
+and faces that are shared by multiple elements are only stored once.  The
+node ids of the elements are only gathered once; the maps are built with a
+few sorts, so the node/edge/face maps (e.g., ``get_node_id_to_element_ids_map``)
+are views of a single MeshTopology.
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+from collections import defaultdict
+from six import iteritems
+import numpy as np
+
+TRI_EDGES = [(0, 1), (1, 2), (2, 0)]
+QUAD_EDGES = [(0, 1), (1, 2), (2, 3), (3, 0)]
+LINE_EDGES = [(0, 1)]
+
+#: the element type -> the (corner) edges as indices of element.node_ids;
+#: consistent with element.get_edge_ids()
+EDGE_INDICES = {
+    'CROD' : LINE_EDGES,
+    'CONROD' : LINE_EDGES,
+    'CTUBE' : LINE_EDGES,
+    'CBAR' : LINE_EDGES,
+    'CBEAM' : LINE_EDGES,
+    'CBEAM3' : LINE_EDGES,
+    'CBEND' : LINE_EDGES,
+
+    'CTRIA3' : TRI_EDGES,
+    'CTRIA6' : TRI_EDGES,
+    'CTRIAR' : TRI_EDGES,
+    'CPLSTN3' : TRI_EDGES,
+    'CPLSTN6' : TRI_EDGES,
+    'CPLSTS3' : TRI_EDGES,
+    'CTRAX3' : TRI_EDGES,
+    'CTRAX6' : TRI_EDGES,
+    'CTRIAX' : TRI_EDGES,
+    'CTRIAX6' : [(0, 2), (2, 4), (4, 0)],
+
+    'CQUAD4' : QUAD_EDGES,
+    'CQUAD8' : QUAD_EDGES,
+    'CQUADR' : QUAD_EDGES,
+    'CQUAD' : QUAD_EDGES,
+    'CSHEAR' : QUAD_EDGES,
+    'CPLSTN4' : QUAD_EDGES,
+    'CPLSTN8' : QUAD_EDGES,
+    'CQUADX' : QUAD_EDGES,
+    'CQUADX4' : QUAD_EDGES,
+    'CQUADX8' : QUAD_EDGES,
+
+    'CTETRA' : [(0, 1), (1, 2), (2, 0), (0, 3), (1, 3), (2, 3)],
+    'CPYRAM' : [(0, 1), (1, 2), (2, 3), (3, 0), (0, 4), (1, 4), (2, 4), (3, 4)],
+    'CPENTA' : [(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3),
+                (0, 3), (1, 4), (2, 5)],
+    'CHEXA' : [(0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6), (6, 7), (7, 4),
+               (0, 4), (1, 5), (2, 6), (3, 7)],
+}
+
+#: the element type -> the (corner) faces as indices of element.node_ids;
+#: the solid faces are ordered like the linear element.faces
+FACE_INDICES = {
+    'CTETRA' : [(0, 1, 3), (0, 3, 2), (1, 2, 3), (0, 2, 1)],
+    'CPYRAM' : [(0, 1, 2, 3), (0, 1, 4), (1, 2, 4), (2, 3, 4), (3, 0, 4)],
+    'CPENTA' : [(0, 1, 2), (3, 4, 5), (0, 1, 4, 3), (1, 2, 5, 4), (2, 0, 3, 5)],
+    'CHEXA' : [(0, 1, 2, 3), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6),
+               (3, 0, 4, 7), (4, 5, 6, 7)],
+    'CTRIAX6' : [(0, 2, 4)],
+}
+for _etype, _edges in iteritems(EDGE_INDICES):
+    if len(_edges) in [3, 4] and _etype not in FACE_INDICES:
+        # the shells
+        FACE_INDICES[_etype] = [tuple(i for i, unused_j in _edges)]
+del _etype, _edges
+
+
+class MeshTopology(object):
+    """
+    The connectivity of the elements in a model.
+
+    Attributes
+    ----------
+    eids : (nelements, ) int ndarray
+        the element ids (in the order of model.elements)
+    etypes : (nelements, ) str ndarray
+        the element types
+    element_node_offsets / element_nodes : (nelements+1, ) / (n, ) int ndarray
+        the node ids of each element; the missing nodes (e.g., the
+        midside nodes of a CQUAD8) are skipped
+    nids : (nnodes, ) int ndarray
+        the sorted ids of the nodes that are used by the elements
+    node_element_offsets / node_elements : (nnodes+1, ) / (n, ) int ndarray
+        the elements (as indices of eids) of each node
+    edges : (nedges, 2) int ndarray
+        the sorted unique (nid1, nid2) edges, where nid1 <= nid2
+    element_edge_offsets / element_edges : (nelements+1, ) / (n, ) int ndarray
+        the edges (as indices of edges) of each element, in the order of
+        element.get_edge_ids()
+    edge_element_offsets / edge_elements : (nedges+1, ) / (n, ) int ndarray
+        the elements (as indices of eids) of each edge
+    faces : (nfaces, 4) int ndarray
+        the sorted unique faces; the node ids of each face are sorted and
+        triangular faces have a leading 0 (e.g., [0, nid1, nid2, nid3])
+    element_face_offsets / element_faces : (nelements+1, ) / (n, ) int ndarray
+        the faces (as indices of faces) of each element
+    face_element_offsets / face_elements : (nfaces+1, ) / (n, ) int ndarray
+        the elements (as indices of eids) of each face
+
+    The edges (and faces) of an element are found using the corner nodes.
+    Elements without node_ids (e.g., a GENEL) have no nodes.
+
+    Examples
+    --------
+    >>> topology = model.get_topology()
+    >>> ielements = topology.get_element_index([10, 11])
+    >>> i0 = topology.element_node_offsets[ielements[0]]
+    >>> i1 = topology.element_node_offsets[ielements[0] + 1]
+    >>> nids = topology.element_nodes[i0:i1]
+    """
+    def __init__(self, model):
+        # type: (Any) -> None
+        """
+        Creates a MeshTopology
+
+        Parameters
+        ----------
+        model : BDF()
+            the BDF object with the elements
+        """
+        self._signature = _get_signature(model)
+        elements, eids, elements_node_ids = self._signature
+        nelements = len(elements)
+        self.eids = np.array(eids, dtype='int64')
+        self.etypes = np.array([elem.type for elem in elements], dtype='|U8')
+
+        # group the elements by the type and the number of nodes, so the
+        # edges/faces are built with a few operations per group
+        ielements_by_type = defaultdict(list)
+        nodes_by_type = defaultdict(list)
+        nnodes = np.zeros(nelements, dtype='int64')
+        for ielem, (elem, node_ids) in enumerate(zip(elements, elements_node_ids)):
+            if node_ids is None:
+                continue
+            node_ids = [nid if nid else 0 for nid in node_ids]
+            key = (elem.type, len(node_ids))
+            ielements_by_type[key].append(ielem)
+            nodes_by_type[key].append(node_ids)
+
+        element_nodes = [np.zeros(0, dtype='int64')]
+        element_nodes_ielement = [np.zeros(0, dtype='int64')]
+        edges = [np.zeros((0, 2), dtype='int64')]
+        edges_ielement = [np.zeros(0, dtype='int64')]
+        faces = [np.zeros((0, 4), dtype='int64')]
+        faces_ielement = [np.zeros(0, dtype='int64')]
+        for key, ielements in sorted(iteritems(ielements_by_type)):
+            etype, nnodesi = key
+            ielements = np.array(ielements, dtype='int64')
+            nids = np.array(nodes_by_type[key], dtype='int64').reshape(len(ielements), nnodesi)
+
+            is_node = nids != 0
+            nnodes[ielements] = is_node.sum(axis=1)
+            element_nodes.append(nids[is_node])
+            element_nodes_ielement.append(
+                np.repeat(ielements, nnodesi).reshape(nids.shape)[is_node])
+
+            edge_indices = EDGE_INDICES.get(etype)
+            if edge_indices is not None and nnodesi > max(max(edge) for edge in edge_indices):
+                # (nelements, nedges, 2)
+                nids_edges = np.sort(nids[:, np.array(edge_indices)], axis=2)
+                is_edge = (nids_edges[:, :, 0] != 0).ravel()
+                edges.append(nids_edges.reshape(-1, 2)[is_edge, :])
+                edges_ielement.append(np.repeat(ielements, len(edge_indices))[is_edge])
+
+            face_indices = FACE_INDICES.get(etype)
+            if face_indices is not None and nnodesi > max(max(face) for face in face_indices):
+                for face in face_indices:
+                    nids_face = np.zeros((len(ielements), 4), dtype='int64')
+                    nids_face[:, 4 - len(face):] = np.sort(nids[:, np.array(face)], axis=1)
+                    is_face = nids_face[:, 4 - len(face)] != 0
+                    faces.append(nids_face[is_face, :])
+                    faces_ielement.append(ielements[is_face])
+
+        # element -> nodes
+        element_nodes = np.hstack(element_nodes)
+        element_nodes_ielement = np.hstack(element_nodes_ielement)
+        isort = np.argsort(element_nodes_ielement, kind='mergesort')
+        self.element_node_offsets = _get_offsets(nnodes)
+        self.element_nodes = element_nodes[isort]
+        element_nodes_ielement = element_nodes_ielement[isort]
+
+        # node -> elements
+        self.nids, inode = np.unique(self.element_nodes, return_inverse=True)
+        self.node_element_offsets, self.node_elements = _invert(
+            inode.ravel(), element_nodes_ielement, len(self.nids))
+
+        # element -> edges, edge -> elements
+        (self.edges, self.element_edge_offsets, self.element_edges,
+         self.edge_element_offsets, self.edge_elements) = _get_keys(
+             np.vstack(edges), np.hstack(edges_ielement), nelements)
+
+        # element -> faces, face -> elements
+        (self.faces, self.element_face_offsets, self.element_faces,
+         self.face_element_offsets, self.face_elements) = _get_keys(
+             np.vstack(faces), np.hstack(faces_ielement), nelements)
+
+    def is_valid(self, model):
+        # type: (Any) -> bool
+        """is the topology up to date with the elements of the model"""
+        refs0, eids0, node_ids0 = self._signature
+        refs, eids, node_ids = _get_signature(model)
+        return (
+            len(refs) == len(refs0) and eids == eids0 and
+            all(ref is ref0 for ref, ref0 in zip(refs, refs0)) and
+            node_ids == node_ids0)
+
+    def get_element_index(self, eids):
+        # type: (Any) -> np.ndarray
+        """
+        Gets the index of each element id
+
+        Parameters
+        ----------
+        eids : (n, ) int ndarray
+            the element ids
+
+        Returns
+        -------
+        ielements : (n, ) int ndarray
+            the indices of the elements in eids
+        """
+        eids = np.asarray(eids, dtype='int64')
+        isort = np.argsort(self.eids)
+        eids_sorted = self.eids[isort]
+        i = np.searchsorted(eids_sorted, eids)
+        i[i == len(eids_sorted)] = 0
+        is_missing = eids_sorted[i] != eids if len(eids_sorted) else np.ones(len(eids), dtype='bool')
+        if is_missing.any():
+            raise KeyError('eids=%s not found' % np.unique(eids[is_missing]).tolist())
+        return isort[i]
+
+    def get_free_edges(self, ielements=None):
+        # type: (Optional[Any]) -> np.ndarray
+        """
+        Gets the edges that are only used by one element
+
+        Parameters
+        ----------
+        ielements : (n, ) int ndarray; default=None -> all
+            the elements (as indices of eids) to consider
+
+        Returns
+        -------
+        edges : (nfree_edges, 2) int ndarray
+            the sorted (nid1, nid2) free edges
+        """
+        iedges, iedge_elements = _get_pairs(self.edge_element_offsets, self.edge_elements)
+        if ielements is not None:
+            is_used = np.zeros(len(self.eids), dtype='bool')
+            is_used[ielements] = True
+            is_used = is_used[iedge_elements]
+            iedges = iedges[is_used]
+            iedge_elements = iedge_elements[is_used]
+
+        # an element that uses an edge twice (e.g., a collapsed element)
+        # only counts once
+        iedge_ielement = np.unique(np.column_stack([iedges, iedge_elements]), axis=0)
+        nelements = np.bincount(iedge_ielement[:, 0], minlength=len(self.edges))
+        return self.edges[nelements == 1, :]
+
+
+def _get_signature(model):
+    # type: (Any) -> Tuple[List[Any], List[int], List[Optional[List[int]]]]
+    """
+    Gets the objects (compared by identity) and the ids and node ids
+    (compared by value) that define the elements of a model
+
+    The node ids are copied, so a change to the nodes of an element
+    (e.g., ``elem.nodes = [4, 5, 6]``) is found; an element without
+    node_ids (e.g., a GENEL) has None.
+    """
+    elements = list(model.elements.values())
+    node_ids = []
+    for elem in elements:
+        try:
+            node_ids.append(list(elem.node_ids))
+        except AttributeError:
+            node_ids.append(None)
+    return elements, list(model.elements.keys()), node_ids
+
+
+def _get_offsets(counts):
+    """gets the CSR offsets from the number of values in each row"""
+    offsets = np.zeros(len(counts) + 1, dtype='int64')
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _invert(irows, icols, nrows):
+    """
+    Gets the CSR arrays of the (irow, icol) pairs; the columns are stable
+    sorted, so they're in the order of the pairs
+
+    Returns
+    -------
+    offsets : (nrows+1, ) int ndarray
+        the start of each row
+    values : (npairs, ) int ndarray
+        the columns of each row
+    """
+    isort = np.argsort(irows, kind='mergesort')
+    offsets = _get_offsets(np.bincount(irows, minlength=nrows))
+    return offsets, icols[isort]
+
+
+def _get_pairs(offsets, values):
+    """gets the (irow, value) pairs of a set of CSR arrays"""
+    irows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    return irows, values
+
+
+def _get_keys(keys, ielements, nelements):
+    """
+    Gets the unique keys (e.g., the edges) and the CSR arrays that map
+    the elements to the keys and the keys to the elements
+
+    Parameters
+    ----------
+    keys : (n, m) int ndarray
+        the sorted node ids of each edge/face
+    ielements : (n, ) int ndarray
+        the element (as indices of eids) of each key
+    nelements : int
+        the number of elements
+    """
+    nkeys = len(ielements)
+    # sort by the key and then by the element
+    isort = np.lexsort((ielements, ) + tuple(keys[:, ::-1].T))
+    sorted_keys = keys[isort, :]
+    is_new = np.ones(nkeys, dtype='bool')
+    is_new[1:] = (sorted_keys[1:, :] != sorted_keys[:-1, :]).any(axis=1)
+    ukeys = sorted_keys[is_new, :]
+    ikey = np.zeros(nkeys, dtype='int64')
+    ikey[isort] = np.cumsum(is_new) - 1
+
+    element_offsets, element_keys = _invert(ielements, ikey, nelements)
+    key_offsets = _get_offsets(np.bincount(ikey, minlength=len(ukeys)))
+    key_elements = ielements[isort]
+    return ukeys, element_offsets, element_keys, key_offsets, key_elements
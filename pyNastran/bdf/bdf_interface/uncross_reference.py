@@ -19,6 +19,7 @@ class UnXrefMesh(SafeXrefMesh):
     def uncross_reference(self):
         """uncross references the model"""
         self.log.debug("Uncross Referencing...")
+        self._stop_lazy_cross_reference()
         self._uncross_reference_nodes()
         self._uncross_reference_coords()
         self._uncross_reference_elements()
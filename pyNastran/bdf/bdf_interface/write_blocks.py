@@ -0,0 +1,1007 @@
+# coding: utf-8
+"""
+Defines the array-based writer used by ``BDF.write_bdf``:
+  - write_cards(cards, size=8, is_double=False, is_long_ids=False)
+  - write_node_arrays(nodes, size=8, is_double=False, is_long_ids=False)
+
+The GRID, CQUAD4, CTRIA3, CHEXA, CTETRA, CBAR, CONM2 and FORCE cards are
+written in blocks.  The fields of the cards of a type are collected into
+arrays and encoded as fixed-width ASCII fields into a (ncards, nchars)
+array, which is converted to a string in one pass.  The output is the
+same as the ``write_card`` methods of the cards:
+  - the integer fields are encoded from their digits
+  - the float fields are formatted once per unique value with the
+    standard field writers (e.g., ``print_float_8``)
+  - a mask removes the trailing blank fields of a card
+  - a comment is inserted in front of its card
+  - a card with a field that can't be encoded (e.g., an id that's too long
+    for its field) is written with its ``write_card`` method
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+from collections import defaultdict
+from six import string_types
+import numpy as np
+
+from pyNastran.utils import integer_types
+from pyNastran.bdf.field_writer_8 import (
+    _print_float_8_bytes, print_field_8, set_blank_if_default, set_string8_blank_if_default)
+from pyNastran.bdf.field_writer_16 import print_float_16, set_string16_blank_if_default
+from pyNastran.bdf.field_writer_double import print_scientific_double
+from pyNastran.bdf.cards.nodes import GRID
+from pyNastran.bdf.cards.elements.shell import CTRIA3, CQUAD4
+from pyNastran.bdf.cards.elements.solid import CTETRA4, CTETRA10, CHEXA8, CHEXA20
+from pyNastran.bdf.cards.elements.bars import CBAR
+from pyNastran.bdf.cards.elements.mass import CONM2
+from pyNastran.bdf.cards.loads.static_loads import FORCE
+
+SPACE = ord(' ')
+NEWLINE = ord('\n')
+ZERO = ord('0')
+MINUS = ord('-')
+
+#: the characters that are removed by str.rstrip()
+WHITESPACE = ' \t\n\r\x0b\x0c'
+
+#: the powers of 10 that are used to encode the integer fields
+POWERS_OF_10 = 10 ** np.arange(18, dtype='int64')
+
+#: the types that are formatted as a float64
+FLOAT_TYPES = (float, np.float64)
+
+#: the raw CQUAD4/CTRIA3 fields (theta_mcid, zoffset, tflag, T1, T2, ...)
+#: of a card that is written on one line
+SHELL_DEFAULTS = [0.0, 0.0, 0, 1.0, 1.0, 1.0, 1.0]
+
+
+#-------------------------------------------------------------------------
+# field encoders
+def _to_array(values):
+    """
+    Converts a list of floats/integers to an array
+
+    Returns
+    -------
+    array : ndarray / None
+        None : the values have mixed (or other) types
+    """
+    if isinstance(values, np.ndarray):
+        return values
+    types = set(map(type, values))
+    if types.issubset(FLOAT_TYPES):
+        return np.array(values, dtype='float64')
+    if types.issubset(integer_types):
+        try:
+            return np.array(values, dtype='int64')
+        except OverflowError:
+            return None
+    return None
+
+
+def _is_equal(values, value):
+    """checks if each value is equal to value"""
+    array = _to_array(values)
+    if array is None:
+        return np.array([valuei == value for valuei in values], dtype='bool')
+    return array == value
+
+
+def _encode_strings(strings, width):
+    """
+    Encodes a list of strings that should have width characters
+
+    Returns
+    -------
+    fields : (n, width) uint8 ndarray
+        the encoded strings; an invalid string is blank
+    is_valid : (n, ) bool ndarray
+        is the string an ASCII string with width characters
+    """
+    nstrings = len(strings)
+    is_valid = np.fromiter(map(len, strings), dtype='int64', count=nstrings) == width
+    if not is_valid.all():
+        strings = [string if string_is_valid else ' ' * width
+                   for string, string_is_valid in zip(strings, is_valid)]
+    try:
+        data = ''.join(strings).encode('ascii')
+    except UnicodeEncodeError:
+        for i, string in enumerate(strings):
+            try:
+                string.encode('ascii')
+            except UnicodeEncodeError:
+                strings[i] = ' ' * width
+                is_valid[i] = False
+        data = ''.join(strings).encode('ascii')
+    fields = np.frombuffer(data, dtype='uint8').reshape(nstrings, width)
+    return fields, is_valid
+
+
+def _encode_ints(values, width):
+    """
+    Encodes integers as right-justified fields (e.g., '%8i')
+
+    Parameters
+    ----------
+    values : (n, ) int ndarray
+        the integers
+    width : int
+        the width of the fields
+
+    Returns
+    -------
+    fields : (n, width) uint8 ndarray
+        the encoded integers
+    is_valid : (n, ) bool ndarray
+        does the integer fit in the field
+    """
+    values = np.asarray(values, dtype='int64')
+    is_negative = values < 0
+    abs_values = np.abs(values)[:, np.newaxis]
+    ndigits = 1 + (abs_values >= POWERS_OF_10[1:width + 1]).sum(axis=1)
+    digits = (abs_values // POWERS_OF_10[width - 1::-1]) % 10
+    fields = (digits + ZERO).astype('uint8')
+
+    istart = width - ndigits
+    fields[np.arange(width) < istart[:, np.newaxis]] = SPACE
+    irows = np.flatnonzero(is_negative & (istart > 0))
+    fields[irows, istart[irows] - 1] = MINUS
+    is_valid = ndigits + is_negative <= width
+    return fields, is_valid
+
+
+def _call(func, value):
+    """calls a field writer; an invalid value is an empty string"""
+    try:
+        return func(value)
+    except Exception:
+        return ''
+
+
+def _encode_unique(values, func, width):
+    """
+    Encodes a column of fields with a scalar field writer, which is called
+    once per unique value
+
+    Parameters
+    ----------
+    values : List[varies] / (n, ) ndarray
+        the values of the fields
+    func : function
+        the field writer (e.g., print_float_8)
+    width : int
+        the width of the fields
+
+    Returns
+    -------
+    fields : (n, width) uint8 ndarray
+        the encoded fields
+    is_valid : (n, ) bool ndarray
+        does the field have width characters
+    """
+    array = _to_array(values)
+    if array is None:
+        # mixed types; the type and the value are the key
+        keys = list(zip(map(type, values), values))
+        try:
+            unique_keys = {key : i for i, key in enumerate(dict.fromkeys(keys))}
+        except TypeError:
+            strings = [_call(func, value) for value in values]
+            return _encode_strings(strings, width)
+        strings = [_call(func, value) for unused_type, value in unique_keys]
+        inverse = np.fromiter(map(unique_keys.__getitem__, keys), dtype='int64',
+                              count=len(keys))
+        unique_fields, unique_is_valid = _encode_strings(strings, width)
+        return unique_fields[inverse], unique_is_valid[inverse]
+
+    if array.dtype.kind == 'f':
+        # -0.0 and the NaNs are unique values
+        keys = np.ascontiguousarray(array, dtype='float64').view('uint64')
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        unique_values = unique_keys.view('float64').tolist()
+    else:
+        unique_values, inverse = np.unique(array, return_inverse=True)
+        unique_values = unique_values.tolist()
+
+    strings = [_call(func, value) for value in unique_values]
+    unique_fields, unique_is_valid = _encode_strings(strings, width)
+    inverse = inverse.ravel()
+    return unique_fields[inverse], unique_is_valid[inverse]
+
+
+def _encode_floats_8(values):
+    """
+    Encodes a column of floats with print_float_8 (see print_float_8_array)
+
+    Parameters
+    ----------
+    values : (n, ) float ndarray
+        the values of the fields
+
+    Returns
+    -------
+    fields : (n, 8) uint8 ndarray
+        the encoded fields
+    is_valid : (n, ) bool ndarray
+        does the field have 8 characters
+    """
+    fields, ivalues, strings = _print_float_8_bytes(values)
+    is_valid = np.ones(len(fields), dtype='bool')
+    if len(ivalues):
+        fields[ivalues], is_valid[ivalues] = _encode_strings(strings, 8)
+    return fields, is_valid
+
+
+def _encode_fields_8(values, default=None):
+    """
+    Encodes the fields of a column with print_field_8
+
+    Parameters
+    ----------
+    values : List[int/float/str/None]
+        the values of the fields
+    default : int/float/str; default=None
+        None : the values are written as is
+        the value that is written as a blank field (see set_blank_if_default)
+
+    Returns
+    -------
+    fields : (n, 8) uint8 ndarray
+        the encoded fields
+    is_valid : (n, ) bool ndarray
+        does the field have 8 characters
+    """
+    array = _to_array(values)
+    if array is not None and array.dtype.kind == 'i':
+        fields, is_valid = _encode_ints(array, 8)
+        if default is not None:
+            is_blank = array == default
+            fields[is_blank] = SPACE
+            is_valid |= is_blank
+        return fields, is_valid
+
+    if array is not None:
+        fields, is_valid = _encode_floats_8(array)
+        if isinstance(default, (integer_types, float)):
+            is_blank = array == default
+            fields[is_blank] = SPACE
+            is_valid |= is_blank
+        return fields, is_valid
+
+    if default is None:
+        func = print_field_8
+    else:
+        func = lambda value: print_field_8(set_blank_if_default(value, default))
+    return _encode_unique(values, func, 8)
+
+
+def _encode_node_ids(cards, nnodes, nrequired, width=8):
+    """
+    Encodes the node ids of a series of elements
+
+    Parameters
+    ----------
+    cards : List[Element]
+        the elements
+    nnodes : int
+        the number of nodes of each element
+    nrequired : int
+        the number of nodes that can't be blank
+    width : int; default=8
+        the width of the fields
+
+    Returns
+    -------
+    fields : List[(n, width) uint8 ndarray] / None
+        the encoded node ids (a blank node is a blank field)
+        None : the nodes can't be encoded (e.g., the elements have a
+        different number of nodes)
+    is_valid : (n, ) bool ndarray
+        can the node ids be encoded
+    """
+    node_ids = [card.nodes if card.nodes_ref is None else card.node_ids
+                for card in cards]
+    try:
+        nids_float = np.array(node_ids, dtype='float64').reshape(len(cards), nnodes)
+    except (TypeError, ValueError):
+        return None, None
+    nids_float[np.isnan(nids_float)] = 0.
+    nids = nids_float.astype('int64')
+
+    fields = []
+    is_valid = np.ones(len(cards), dtype='bool')
+    for inode in range(nnodes):
+        nids_i = nids[:, inode]
+        fields_i, is_valid_i = _encode_ints(nids_i, width)
+        is_blank = nids_i == 0
+        if inode < nrequired:
+            is_valid_i &= ~is_blank
+        else:
+            fields_i[is_blank] = SPACE
+            is_valid_i |= is_blank
+        is_valid &= is_valid_i
+        fields.append(fields_i)
+    return fields, is_valid
+
+
+#-------------------------------------------------------------------------
+# rows
+def _stack_fields(nrows, parts):
+    """
+    Stacks the fields of the cards
+
+    Parameters
+    ----------
+    nrows : int
+        the number of cards
+    parts : List[str / (nrows, nchars) uint8 ndarray]
+        the text (which is the same for every card) and the fields
+
+    Returns
+    -------
+    block : (nrows, nchars) uint8 ndarray
+        the cards
+    starts : List[int]
+        the column of each part
+    """
+    widths = [len(part) if isinstance(part, string_types) else part.shape[1]
+              for part in parts]
+    block = np.empty((nrows, sum(widths)), dtype='uint8')
+    starts = []
+    icol = 0
+    for part, width in zip(parts, widths):
+        if isinstance(part, string_types):
+            part = np.frombuffer(part.encode('ascii'), dtype='uint8')
+        block[:, icol:icol + width] = part
+        starts.append(icol)
+        icol += width
+    return block, starts
+
+
+def _get_rstrip_lengths(block, chars=WHITESPACE):
+    """gets the length of each row after row.rstrip(chars)"""
+    is_text = np.ones(block.shape, dtype='bool')
+    for char in chars:
+        is_text &= block != ord(char)
+    nchars = block.shape[1]
+    lengths = nchars - np.argmax(is_text[:, ::-1], axis=1)
+    lengths[~is_text.any(axis=1)] = 0
+    return lengths
+
+
+def _rstrip_rows(block, lengths=None):
+    """
+    Gets the mask to write each row as ``row[:length] + '\\n'``, which
+    is ``row.rstrip() + '\\n'`` by default
+
+    The last column of the block is a newline, so the newline is written
+    in place of the first stripped character.
+    """
+    if lengths is None:
+        lengths = _get_rstrip_lengths(block)
+    block[np.arange(block.shape[0]), lengths] = NEWLINE
+    return np.arange(block.shape[1]) <= lengths[:, np.newaxis]
+
+
+def _print_card_8_rows(name, fields):
+    """
+    Writes cards with 9-16 fields (2 lines) like print_card_8
+
+    Parameters
+    ----------
+    name : str
+        the name of the card
+    fields : List[(n, 8) uint8 ndarray]
+        the fields of the cards (excluding the name)
+
+    Returns
+    -------
+    block : (n, nchars) uint8 ndarray
+        the cards
+    is_kept : (n, nchars) bool ndarray
+        the characters that are written
+    """
+    nrows = fields[0].shape[0]
+    nfields = len(fields)
+    assert 8 < nfields <= 16, nfields
+    block, starts = _stack_fields(
+        nrows, ['%-8s' % name] + fields[:8] + ['\n        '] + fields[8:] + ['\n'])
+    iline2 = starts[10]
+    icols = np.arange(block.shape[1])
+
+    # print_card_8 strips the trailing spaces of each line and then strips
+    # ' \n+' from the end of the card, so a blank second line is removed
+    length2 = _get_rstrip_lengths(block[:, iline2:-1], ' \n+')
+    is_line2 = length2 > 0
+    length1 = np.where(is_line2,
+                       _get_rstrip_lengths(block[:, :iline2 - 9], ' '),
+                       _get_rstrip_lengths(block[:, :iline2 - 9], ' \n+'))
+    is_kept = (
+        (icols < length1[:, np.newaxis]) |
+        ((icols >= iline2 - 9) & (icols < iline2) & is_line2[:, np.newaxis]) |
+        ((icols >= iline2) & (icols < iline2 + length2[:, np.newaxis])))
+    is_kept[:, -1] = True
+    return block, is_kept
+
+
+def _join_rows(block, is_kept, comments, is_valid, write_row):
+    """
+    Converts the rows of a block to a string
+
+    Parameters
+    ----------
+    block : (n, nchars) uint8 ndarray
+        the cards
+    is_kept : (n, nchars) bool ndarray / None
+        the characters that are written; None -> all
+    comments : Dict[int, str]
+        the row -> the comment of the card
+    is_valid : (n, ) bool ndarray
+        False : the card is written with write_row
+    write_row : function
+        write_row(irow) writes a card (with its comment)
+
+    Returns
+    -------
+    text : str
+        the cards
+    ends : List[int]
+        the end of each card in text
+    """
+    nrows = block.shape[0]
+    if is_kept is None:
+        text = block.tobytes().decode('ascii')
+        lengths = [block.shape[1]] * nrows
+    else:
+        text = block[is_kept].tobytes().decode('ascii')
+        lengths = is_kept.sum(axis=1).tolist()
+    irows = set(comments)
+    irows.update(np.flatnonzero(~is_valid).tolist())
+    if not irows:
+        return text, np.cumsum(lengths, dtype='int64').tolist()
+
+    ends = np.cumsum(lengths, dtype='int64').tolist()
+    chunks = []
+    istart = 0
+    for irow in sorted(irows):
+        iend = ends[irow]
+        irow_start = iend - lengths[irow]
+        chunks.append(text[istart:irow_start])
+        if is_valid[irow]:
+            row = comments[irow] + text[irow_start:iend]
+        else:
+            row = write_row(irow)
+        chunks.append(row)
+        lengths[irow] = len(row)
+        istart = iend
+    chunks.append(text[istart:])
+    return ''.join(chunks), np.cumsum(lengths, dtype='int64').tolist()
+
+
+def _get_comments(cards):
+    """gets the row -> comment of the cards with a comment"""
+    comments = [getattr(card, '_comment', '') for card in cards]
+    return {irow : '%s' % comments[irow]
+            for irow in np.flatnonzero(np.array(comments, dtype='bool')).tolist()}
+
+
+def _get_ints(cards, name):
+    """gets an int array of an attribute; None if the values aren't ints"""
+    values = _to_array([getattr(card, name) for card in cards])
+    if values is None or values.dtype.kind != 'i':
+        return None
+    return values
+
+
+#-------------------------------------------------------------------------
+# nodes
+def _write_grid_block(nid, cp, xyz, cd, ps, seid, seid_raw, comments, write_row,
+                      size=8, is_double=False, is_long_ids=False):
+    """
+    Writes a block of GRIDs (see GRID.write_card_8 and GRID.write_card_16)
+
+    Parameters
+    ----------
+    nid, cp, cd, seid : (n, ) int ndarray / List[int]
+        the node ids, the coordinate systems and the superelements
+        (cp/cd/seid are the values from Cp(), Cd() and SEid())
+    xyz : (n, 3) float ndarray
+        the locations of the nodes
+    ps : List[str] / (n, ) bytes ndarray
+        the permanent SPCs
+    seid_raw : List[int] / (n, ) int ndarray
+        the seid attribute of the nodes
+    comments : Dict[int, str]
+        the row -> the comment of the card
+    write_row : function
+        write_row(irow) writes a card with the GRID methods
+
+    Returns
+    -------
+    text : str
+        the cards
+    ends : List[int]
+        the end of each card in text
+    """
+    nrows = len(nid)
+    nid = _to_array(nid)
+    if nid is None or nid.dtype.kind != 'i':
+        return None
+    if isinstance(ps, np.ndarray):
+        ps_func = lambda ps_bytes: ps_bytes.decode('ascii')
+        ps_blank = ps == b''
+    else:
+        ps_func = lambda ps_str: ps_str
+        ps_blank = np.array([ps_str == '' for ps_str in ps], dtype='bool')
+
+    if size == 16 or is_long_ids:
+        # GRID.write_card_16 always writes the second line
+        width = 16
+        float_func = print_scientific_double if is_double else print_float_16
+        nid_fields, is_valid = _encode_ints(nid, width)
+        cp_fields, is_valid_cp = _encode_unique(
+            cp, lambda value: set_string16_blank_if_default(value, 0), width)
+        xyz_fields, is_valid_xyz = _encode_xyz(xyz, lambda value: '%16s' % float_func(value), width)
+        cd_fields, is_valid_cd = _encode_unique(
+            cd, lambda value: set_string16_blank_if_default(value, 0), width)
+        ps_fields, is_valid_ps = _encode_unique(
+            ps, lambda value: '%16s' % ps_func(value), width)
+        seid_fields, is_valid_seid = _encode_unique(
+            seid, lambda value: set_string16_blank_if_default(value, 0), width)
+        is_valid &= is_valid_cp & is_valid_xyz & is_valid_cd & is_valid_ps & is_valid_seid
+        block = _stack_fields(nrows, [
+            'GRID*   ', nid_fields, cp_fields, xyz_fields[0], xyz_fields[1], '\n',
+            '*       ', xyz_fields[2], cd_fields, ps_fields, seid_fields, '\n'])[0]
+        return _join_rows(block, None, comments, is_valid, write_row)
+
+    nid_fields, is_valid = _encode_ints(nid, 8)
+    cp_fields, is_valid_cp = _encode_unique(
+        cp, lambda value: set_string8_blank_if_default(value, 0), 8)
+    xyz_fields, is_valid_xyz = _encode_xyz(xyz, None, 8)
+    cd_fields, is_valid_cd = _encode_unique(
+        cd, lambda value: set_string8_blank_if_default(value, 0), 8)
+    ps_fields, is_valid_ps = _encode_unique(ps, lambda value: '%8s' % ps_func(value), 8)
+    seid_fields, is_valid_seid = _encode_unique(
+        seid, lambda value: set_string8_blank_if_default(value, 0), 8)
+
+    # [cd, ps, seid] == [0, '', 0] is written on a short line
+    is_short = _is_equal(cd, 0) & ps_blank & _is_equal(seid_raw, 0)
+    is_valid &= is_valid_cp & is_valid_xyz & (
+        is_short | (is_valid_cd & is_valid_ps & is_valid_seid))
+
+    block, starts = _stack_fields(nrows, [
+        'GRID    ', nid_fields, cp_fields, xyz_fields[0], xyz_fields[1], xyz_fields[2],
+        cd_fields, ps_fields, seid_fields, '\n'])
+    lengths = np.where(is_short, starts[6], starts[-1])
+    is_kept = _rstrip_rows(block, lengths)
+    return _join_rows(block, is_kept, comments, is_valid, write_row)
+
+
+def _encode_xyz(xyz, func, width):
+    """encodes the x, y, z fields; func=None uses print_float_8_array"""
+    xyz = np.asarray(xyz, dtype='float64')
+    if func is None:
+        fields, is_valid = _encode_floats_8(xyz.ravel())
+    else:
+        fields, is_valid = _encode_unique(xyz.ravel(), func, width)
+    fields = fields.reshape(xyz.shape[0], 3, width)
+    is_valid = is_valid.reshape(xyz.shape[0], 3).all(axis=1)
+    return [fields[:, 0, :], fields[:, 1, :], fields[:, 2, :]], is_valid
+
+
+def _write_grids(cards, size=8, is_double=False, is_long_ids=False):
+    """writes a block of GRIDs"""
+    xyz = [card.xyz for card in cards]
+    try:
+        xyz = np.array(xyz, dtype='float64').reshape(len(cards), 3)
+    except (TypeError, ValueError):
+        return None
+
+    write_row = _get_write_row(cards, size, is_double, is_long_ids)
+    return _write_grid_block(
+        [card.nid for card in cards],
+        [card.Cp() for card in cards],
+        xyz,
+        [card.Cd() for card in cards],
+        [card.ps for card in cards],
+        [card.SEid() for card in cards],
+        [card.seid for card in cards],
+        _get_comments(cards), write_row,
+        size=size, is_double=is_double, is_long_ids=is_long_ids)
+
+
+def _get_ref_ids(ids, refs, rows, name):
+    """gets the ids of the cross-referenced cards (e.g., cp_ref.cid)"""
+    ids = ids[rows]
+    if refs is None:
+        return ids
+    ids = ids.copy()
+    for irow, ref in enumerate(refs[rows].tolist()):
+        if ref is not None:
+            ids[irow] = getattr(ref, name)
+    return ids
+
+
+def write_node_arrays(nodes, size=8, is_double=False, is_long_ids=False):
+    """
+    Writes the GRIDs of a NodeArrayDict in a sorted order
+
+    Parameters
+    ----------
+    nodes : NodeArrayDict
+        the nodes
+    size : int; default=8
+        the field width (8/16)
+    is_double : bool; default=False
+        should the cards be written with double precision
+    is_long_ids : bool; default=False
+        should the cards be written in large field format
+
+    Returns
+    -------
+    msg : str
+        the GRID cards
+    """
+    nnodes = len(nodes)
+    if nnodes == 0:
+        return ''
+    keys = nodes.node_ids
+    rows = np.argsort(keys, kind='mergesort')
+    sorted_keys = keys[rows]
+
+    comments = {}
+    if nodes._comments:
+        comment_keys = np.array(list(nodes._comments), dtype=keys.dtype)
+        irows = np.searchsorted(sorted_keys, comment_keys)
+        for key, irow in zip(comment_keys.tolist(), irows.tolist()):
+            comments[irow] = '%s' % nodes._comments[key]
+
+    def write_row(irow):
+        """writes a node with the GRID methods"""
+        node = nodes[int(sorted_keys[irow])]
+        if is_long_ids:
+            return node.write_card_16(is_double)
+        return node.write_card(size, is_double)
+
+    seid = nodes._seid[rows]
+    out = _write_grid_block(
+        nodes._nid[rows],
+        _get_ref_ids(nodes._cp, nodes._cp_ref, rows, 'cid'),
+        nodes._xyz[rows],
+        _get_ref_ids(nodes._cd, nodes._cd_ref, rows, 'cid'),
+        nodes._ps[rows],
+        seid, seid,
+        comments, write_row,
+        size=size, is_double=is_double, is_long_ids=is_long_ids)
+    return out[0]
+
+
+#-------------------------------------------------------------------------
+# elements
+def _write_shells(cards, name, nnodes, size=8, is_double=False, is_long_ids=False):
+    """
+    Writes a block of CQUAD4s/CTRIA3s (see CQUAD4.write_card)
+
+    A CQUAD4 with the default theta_mcid, zoffset, tflag and thicknesses
+    is written on one line.  The other cards are written on 2 lines and the
+    trailing blank fields are removed.
+    """
+    if is_long_ids:
+        return None
+    nrows = len(cards)
+    eids = _get_ints(cards, 'eid')
+    pids = _to_array([card.Pid() for card in cards])
+    node_fields, is_valid_nodes = _encode_node_ids(cards, nnodes, nnodes)
+    if eids is None or pids is None or pids.dtype.kind != 'i' or node_fields is None:
+        return None
+    eid_fields, is_valid = _encode_ints(eids, 8)
+    pid_fields, is_valid_pid = _encode_ints(pids, 8)
+    is_valid &= is_valid_pid & is_valid_nodes
+
+    thickness_names = ['T1', 'T2', 'T3', 'T4'][:nnodes]
+    zoffsets = [card.zoffset for card in cards]
+    tflags = [card.tflag for card in cards]
+    thicknesses = [[getattr(card, tname) for card in cards] for tname in thickness_names]
+    row2 = [
+        ([card.Theta_mcid() for card in cards], 0.0),
+        (zoffsets, 0.0),
+        (tflags, 0),
+    ] + [(values, 1.0) for values in thicknesses]
+    row2_fields = []
+    for values, default in row2:
+        fields, is_valid_field = _encode_fields_8(values, default)
+        row2_fields.append(fields)
+        is_valid &= is_valid_field
+
+    block, starts = _stack_fields(
+        nrows, ['%-8s' % name, eid_fields, pid_fields] + node_fields + row2_fields[:2] +
+        ['\n' + ' ' * 16] + row2_fields[2:] + ['\n'])
+    lengths = _get_rstrip_lengths(block)
+    if nnodes == 4:
+        # the raw fields are compared to the defaults
+        raw_values = [[card.theta_mcid for card in cards], zoffsets, tflags] + thicknesses
+        is_short = np.ones(nrows, dtype='bool')
+        for values, default in zip(raw_values, SHELL_DEFAULTS):
+            if not is_short.any():
+                break
+            is_short &= _is_equal(values, default)
+        lengths[is_short] = starts[2 + nnodes + 1]
+    is_kept = _rstrip_rows(block, lengths)
+    write_row = _get_write_row(cards, size, is_double, is_long_ids)
+    return _join_rows(block, is_kept, _get_comments(cards), is_valid, write_row)
+
+
+def _write_cquad4s(cards, size=8, is_double=False, is_long_ids=False):
+    """writes a block of CQUAD4s"""
+    return _write_shells(cards, 'CQUAD4', 4, size, is_double, is_long_ids)
+
+
+def _write_ctria3s(cards, size=8, is_double=False, is_long_ids=False):
+    """writes a block of CTRIA3s"""
+    return _write_shells(cards, 'CTRIA3', 3, size, is_double, is_long_ids)
+
+
+def _write_solids(cards, name, nnodes, nrequired, lines, is_stripped,
+                  size=8, is_double=False, is_long_ids=False):
+    """
+    Writes a block of solid elements (see CHEXA8.write_card)
+
+    Parameters
+    ----------
+    name : str
+        the name of the card
+    nnodes : int
+        the number of nodes
+    nrequired : int
+        the number of nodes that can't be blank
+    lines : List[int]
+        the number of fields on each line (including the eid/pid)
+    is_stripped : bool
+        is the card written as msg.rstrip() + '\\n'
+    """
+    if is_long_ids:
+        return None
+    nrows = len(cards)
+    eids = _get_ints(cards, 'eid')
+    pids = _to_array([card.Pid() for card in cards])
+    node_fields, is_valid_nodes = _encode_node_ids(cards, nnodes, nrequired)
+    if eids is None or pids is None or pids.dtype.kind != 'i' or node_fields is None:
+        return None
+    eid_fields, is_valid = _encode_ints(eids, 8)
+    pid_fields, is_valid_pid = _encode_ints(pids, 8)
+    is_valid &= is_valid_pid & is_valid_nodes
+
+    fields = [eid_fields, pid_fields] + node_fields
+    parts = ['%-8s' % name]
+    ifield = 0
+    for iline, nfields in enumerate(lines):
+        if iline:
+            parts.append('\n        ')
+        parts += fields[ifield:ifield + nfields]
+        ifield += nfields
+    parts.append('\n')
+    block = _stack_fields(nrows, parts)[0]
+    is_kept = _rstrip_rows(block) if is_stripped else None
+    write_row = _get_write_row(cards, size, is_double, is_long_ids)
+    return _join_rows(block, is_kept, _get_comments(cards), is_valid, write_row)
+
+
+def _write_chexa8s(cards, size=8, is_double=False, is_long_ids=False):
+    """writes a block of CHEXA8s"""
+    return _write_solids(cards, 'CHEXA', 8, 8, [8, 2], False, size, is_double, is_long_ids)
+
+
+def _write_chexa20s(cards, size=8, is_double=False, is_long_ids=False):
+    """writes a block of CHEXA20s"""
+    return _write_solids(cards, 'CHEXA', 20, 8, [8, 8, 6], True, size, is_double, is_long_ids)
+
+
+def _write_ctetra4s(cards, size=8, is_double=False, is_long_ids=False):
+    """writes a block of CTETRA4s"""
+    return _write_solids(cards, 'CTETRA', 4, 4, [6], False, size, is_double, is_long_ids)
+
+
+def _write_ctetra10s(cards, size=8, is_double=False, is_long_ids=False):
+    """writes a block of CTETRA10s"""
+    return _write_solids(cards, 'CTETRA', 10, 4, [8, 4], True, size, is_double, is_long_ids)
+
+
+def _write_cbars(cards, size=8, is_double=False, is_long_ids=False):
+    """writes a block of CBARs in small field format (see CBAR.repr_fields)"""
+    if size != 8 or is_long_ids:
+        return None
+    x_g0 = [card.get_x_g0_defaults() for card in cards]
+    columns = [
+        ([card.eid for card in cards], None),
+        ([card.Pid() for card in cards], None),
+        ([card.Ga() for card in cards], None),
+        ([card.Gb() for card in cards], None),
+        ([x_g0i[0] for x_g0i in x_g0], None),
+        ([x_g0i[1] for x_g0i in x_g0], None),
+        ([x_g0i[2] for x_g0i in x_g0], None),
+        ([card.offt for card in cards], 'GGG'),
+        ([card.pa for card in cards], 0),
+        ([card.pb for card in cards], 0),
+    ]
+    for wname in ['wa', 'wb']:
+        for i in range(3):
+            columns.append(([getattr(card, wname)[i] for card in cards], 0.0))
+    return _write_print_card_8_rows(cards, 'CBAR', columns, size, is_double, is_long_ids)
+
+
+def _write_print_card_8_rows(cards, name, columns, size, is_double, is_long_ids):
+    """writes cards with print_card_8 given the (values, default) of each field"""
+    fields = []
+    is_valid = np.ones(len(cards), dtype='bool')
+    for values, default in columns:
+        if values is None:
+            fields.append(np.full((len(cards), 8), SPACE, dtype='uint8'))
+            continue
+        fields_i, is_valid_i = _encode_fields_8(values, default)
+        fields.append(fields_i)
+        is_valid &= is_valid_i
+    block, is_kept = _print_card_8_rows(name, fields)
+    write_row = _get_write_row(cards, size, is_double, is_long_ids)
+    return _join_rows(block, is_kept, _get_comments(cards), is_valid, write_row)
+
+
+#-------------------------------------------------------------------------
+# masses/loads
+def _write_conm2s(cards, size=8, is_double=False, is_long_ids=False):
+    """writes a block of CONM2s in small field format (see CONM2.repr_fields)"""
+    if size != 8 or is_long_ids:
+        return None
+    # repr_fields blanks an X/I that is 0.0
+    columns = [
+        ([card.eid for card in cards], None),
+        ([card.Nid() for card in cards], None),
+        ([card.Cid() for card in cards], 0),
+        ([card.mass for card in cards], None),
+    ]
+    for i in range(3):
+        columns.append(([card.X[i] for card in cards], 0.0))
+    columns.append((None, None))
+    for i in range(6):
+        columns.append(([card.I[i] for card in cards], 0.0))
+    return _write_print_card_8_rows(cards, 'CONM2', columns, size, is_double, is_long_ids)
+
+
+def _write_forces(cards, size=8, is_double=False, is_long_ids=False):
+    """writes a block of FORCEs (see FORCE.write_card)"""
+    if is_long_ids:
+        return None
+    nrows = len(cards)
+    sids = _get_ints(cards, 'sid')
+    nids = _to_array([card.node_id for card in cards])
+    if sids is None or nids is None or nids.dtype.kind != 'i':
+        return None
+    cids = [card.Cid() for card in cards]
+    mags = [card.mag for card in cards]
+    xyz = [card.xyz for card in cards]
+    try:
+        xyz = np.array(xyz, dtype='float64').reshape(nrows, 3)
+        mags_array = np.array(mags, dtype='float64')
+    except (TypeError, ValueError):
+        return None
+
+    if size == 8:
+        width = 8
+        float_func = None
+        cid_func = lambda value: set_string8_blank_if_default(value, 0)
+        mag_fields, is_valid_mag = _encode_floats_8(mags_array)
+    else:
+        width = 16
+        float_func16 = print_scientific_double if is_double else print_float_16
+        float_func = lambda value: '%16s' % float_func16(value)
+        cid_func = lambda value: set_string16_blank_if_default(value, 0)
+        mag_fields, is_valid_mag = _encode_unique(mags, float_func16, width)
+
+    sid_fields, is_valid = _encode_ints(sids, width)
+    nid_fields, is_valid_nid = _encode_ints(nids, width)
+    cid_fields, is_valid_cid = _encode_unique(cids, cid_func, width)
+    xyz_fields, is_valid_xyz = _encode_xyz(xyz, float_func, width)
+    is_valid &= is_valid_nid & is_valid_cid & is_valid_mag & is_valid_xyz
+    if size == 8:
+        parts = ['FORCE   ', sid_fields, nid_fields, cid_fields, mag_fields] + xyz_fields
+    else:
+        parts = ['FORCE*  ', sid_fields, nid_fields, cid_fields, mag_fields,
+                 '\n*       '] + xyz_fields
+    block = _stack_fields(nrows, parts + ['\n'])[0]
+    write_row = _get_write_row(cards, size, is_double, is_long_ids)
+    return _join_rows(block, None, _get_comments(cards), is_valid, write_row)
+
+
+#: the card class -> the block writer
+BLOCK_WRITERS = {
+    GRID : _write_grids,
+    CQUAD4 : _write_cquad4s,
+    CTRIA3 : _write_ctria3s,
+    CHEXA8 : _write_chexa8s,
+    CHEXA20 : _write_chexa20s,
+    CTETRA4 : _write_ctetra4s,
+    CTETRA10 : _write_ctetra10s,
+    CBAR : _write_cbars,
+    CONM2 : _write_conm2s,
+    FORCE : _write_forces,
+}
+
+
+def _get_write_row(cards, size, is_double, is_long_ids):
+    """gets a function that writes a card with its write_card method"""
+    def write_row(irow):
+        """writes a card with its write_card method"""
+        card = cards[irow]
+        try:
+            if is_long_ids:
+                return card.write_card_16(is_double)
+            return card.write_card(size, is_double)
+        except:
+            print('failed printing card...type=%s' % card.type)
+            raise
+    return write_row
+
+
+def _write_by_card(cards, size=8, is_double=False, is_long_ids=False):
+    """writes the cards with their write_card methods"""
+    write_row = _get_write_row(cards, size, is_double, is_long_ids)
+    rows = [write_row(irow) for irow in range(len(cards))]
+    ends = np.cumsum([len(row) for row in rows], dtype='int64').tolist()
+    return ''.join(rows), ends
+
+
+def write_cards(cards, size=8, is_double=False, is_long_ids=False):
+    """
+    Writes a series of cards; the supported cards are written in blocks
+
+    Parameters
+    ----------
+    cards : List[BaseCard / LazyCard]
+        the cards in the order that they're written
+    size : int; default=8
+        the field width (8/16)
+    is_double : bool; default=False
+        should the cards be written with double precision
+    is_long_ids : bool; default=False
+        should the cards be written with write_card_16
+
+    Returns
+    -------
+    msg : str
+        the cards
+    """
+    if not cards:
+        return ''
+    card_classes = [card.__class__ for card in cards]
+    class_irows = defaultdict(list)
+    for irow, card_class in enumerate(card_classes):
+        class_irows[card_class].append(irow)
+
+    blocks = {}
+    for card_class, irows in class_irows.items():
+        class_cards = [cards[irow] for irow in irows]
+        block_writer = BLOCK_WRITERS.get(card_class)
+        block = None
+        if block_writer is not None:
+            block = block_writer(class_cards, size, is_double, is_long_ids)
+        if block is None:
+            block = _write_by_card(class_cards, size, is_double, is_long_ids)
+        blocks[card_class] = block
+
+    if len(blocks) == 1:
+        return blocks[card_classes[0]][0]
+
+    # the cards of a type are consecutive in the blocks, so the runs of
+    # cards with the same type are sliced from the blocks
+    class_ids = {card_class : i for i, card_class in enumerate(blocks)}
+    icards = np.array([class_ids[card_class] for card_class in card_classes])
+    istarts = [0] + (np.flatnonzero(icards[1:] != icards[:-1]) + 1).tolist()
+    iends = istarts[1:] + [len(cards)]
+    nwritten = defaultdict(int)
+    chunks = []
+    for istart, iend in zip(istarts, iends):
+        card_class = card_classes[istart]
+        text, ends = blocks[card_class]
+        irow0 = nwritten[card_class]
+        irow1 = irow0 + iend - istart
+        chunks.append(text[ends[irow0 - 1] if irow0 else 0:ends[irow1 - 1]])
+        nwritten[card_class] = irow1
+    return ''.join(chunks)
@@ -15,6 +15,10 @@ from pyNastran.bdf.utils import print_filename
 from pyNastran.bdf.field_writer_8 import print_card_8
 from pyNastran.bdf.field_writer_16 import print_card_16
 from pyNastran.bdf.bdf_interface.attributes import BDFAttributes
+from pyNastran.bdf.bdf_interface.lazy_cards import LazyCardDict, raw_items
+from pyNastran.bdf.bdf_interface.node_array import NodeArrayDict
+from pyNastran.bdf.bdf_interface.write_blocks import write_cards, write_node_arrays
+from pyNastran.bdf.bdf_interface.write_split import write_bdf_split
 from pyNastran.bdf.cards.nodes import write_xpoints
 
 
@@ -155,8 +159,8 @@ class WriteMesh(BDFAttributes):
 
     def write_bdf(self, out_filename=None, encoding=None,
                   size=8, is_double=False,
-                  interspersed=False, enddata=None, close=True):
-        # type: (Optional[Union[str, StringIO]], Optional[str], int, bool, bool, Optional[bool], bool) -> None
+                  interspersed=False, enddata=None, close=True, split=None, nprocs=1):
+        # type: (Optional[Union[str, StringIO]], Optional[str], int, bool, bool, Optional[bool], bool, Optional[str], int) -> None
         """
         Writes the BDF.
 
@@ -164,6 +168,7 @@ class WriteMesh(BDFAttributes):
         ----------
         out_filename : varies; default=None
             str        - the name to call the output bdf
+                         (the output directory if split is used)
             file       - a file object
             StringIO() - a StringIO object
             None       - pops a dialog
@@ -186,6 +191,21 @@ class WriteMesh(BDFAttributes):
             None - depends on input BDF
         close : bool; default=True
             should the output file be closed
+        split : str; default=None
+            None : write a single file
+            by_category : write the nodes, elements, properties,
+                          materials, loads and aero cards to an include
+                          file per category (e.g., nodes.inc) and a
+                          master file (model.bdf) that includes them
+        nprocs : int; default=1
+            the number of worker processes used to write the include
+            files when split is used
+
+        .. note:: the lazy cards that were never accessed (see
+                  ``read_bdf(..., lazy=True)``) are written using their
+                  original text if it's in the same field size;
+                  otherwise (or if is_double=True and size=16), the
+                  card objects are built and written
         """
         #self.write_caero_model()
         out_filename = self._output_helper(out_filename,
@@ -193,6 +213,19 @@ class WriteMesh(BDFAttributes):
         self.log.debug('---starting BDF.write_bdf of %s---' % out_filename)
         encoding = self.get_encoding(encoding)
         #assert encoding.lower() in ['ascii', 'latin1', 'utf8'], encoding
+        for card_dict in list(itervalues(self.__dict__)):
+            if isinstance(card_dict, LazyCardDict):
+                card_dict.build_other_formats(size, is_double)
+
+        if split is not None:
+            if not isinstance(out_filename, string_types):
+                msg = 'out_filename=%r must be a directory when split=%r' % (
+                    out_filename, split)
+                raise TypeError(msg)
+            write_bdf_split(self, out_filename, split=split, nprocs=nprocs,
+                            encoding=encoding, size=size, is_double=is_double,
+                            interspersed=interspersed, enddata=enddata)
+            return
 
         if hasattr(out_filename, 'read') and hasattr(out_filename, 'write'):
             bdf_file = out_filename
@@ -280,17 +313,8 @@ class WriteMesh(BDFAttributes):
         """
         if self.elements:
             bdf_file.write('$ELEMENTS\n')
-            if self.is_long_ids:
-                for (eid, element) in sorted(iteritems(self.elements)):
-                    bdf_file.write(element.write_card_16(is_double))
-            else:
-                for (eid, element) in sorted(iteritems(self.elements)):
-                    try:
-                        bdf_file.write(element.write_card(size, is_double))
-                    except:
-                        print('failed printing element...'
-                              'type=%s eid=%s' % (element.type, eid))
-                        raise
+            elements = [element for (unused_eid, element) in sorted(raw_items(self.elements))]
+            bdf_file.write(write_cards(elements, size, is_double, self.is_long_ids))
         if self.ao_element_flags:
             for (eid, element) in sorted(iteritems(self.ao_element_flags)):
                 bdf_file.write(element.write_card(size, is_double))
@@ -668,14 +692,10 @@ class WriteMesh(BDFAttributes):
                         print('failed printing load...type=%s key=%r'
                               % (load_combination.type, key))
                         raise
-            for (key, loadcase) in sorted(iteritems(self.loads)):
-                for load in loadcase:
-                    try:
-                        msg.append(load.write_card(size, is_double))
-                    except:
-                        print('failed printing load...type=%s key=%r'
-                              % (load.type, key))
-                        raise
+            loads = []
+            for (unused_key, loadcase) in sorted(raw_items(self.loads)):
+                loads.extend(loadcase)
+            msg.append(write_cards(loads, size, is_double))
             for key, tempd in sorted(iteritems(self.tempds)):
                 msg.append(tempd.write_card(size, is_double))
             bdf_file.write(''.join(msg))
@@ -721,13 +741,8 @@ class WriteMesh(BDFAttributes):
 
         if self.masses:
             bdf_file.write('$MASSES\n')
-            for (eid, mass) in sorted(iteritems(self.masses)):
-                try:
-                    bdf_file.write(mass.write_card(size, is_double))
-                except:
-                    print('failed printing masses...'
-                          'type=%s eid=%s' % (mass.type, eid))
-                    raise
+            masses = [mass for (unused_eid, mass) in sorted(raw_items(self.masses))]
+            bdf_file.write(write_cards(masses, size, is_double))
 
     def _write_materials(self, bdf_file, size=8, is_double=False):
         # type: (Any, int, bool) -> None
@@ -738,7 +753,7 @@ class WriteMesh(BDFAttributes):
                         self.MATT8 or self.MATT9)
         if is_materials:
             msg = ['$MATERIALS\n']  # type: List[str]
-            for (unused_mid, material) in sorted(iteritems(self.materials)):
+            for (unused_mid, material) in sorted(raw_items(self.materials)):
                 msg.append(material.write_card(size, is_double))
             for (unused_mid, material) in sorted(iteritems(self.hyperelastic_materials)):
                 msg.append(material.write_card(size, is_double))
@@ -808,12 +823,11 @@ class WriteMesh(BDFAttributes):
             if self.grdset:
                 msg.append(self.grdset.print_card(size))
 
-            if self.is_long_ids:
-                for (unused_nid, node) in sorted(iteritems(self.nodes)):
-                    msg.append(node.write_card_16(is_double))
+            if isinstance(self.nodes, NodeArrayDict):
+                msg.append(write_node_arrays(self.nodes, size, is_double, self.is_long_ids))
             else:
-                for (unused_nid, node) in sorted(iteritems(self.nodes)):
-                    msg.append(node.write_card(size, is_double))
+                nodes = [node for (unused_nid, node) in sorted(raw_items(self.nodes))]
+                msg.append(write_cards(nodes, size, is_double, self.is_long_ids))
             bdf_file.write(''.join(msg))
 
     #def _write_nodes_associated(self, bdf_file, size=8, is_double=False):
@@ -924,14 +938,14 @@ class WriteMesh(BDFAttributes):
             prop_groups = (self.properties, self.pelast, self.pdampt, self.pbusht)
             if self.is_long_ids:
                 for prop_group in prop_groups:
-                    for unused_pid, prop in sorted(iteritems(prop_group)):
+                    for unused_pid, prop in sorted(raw_items(prop_group)):
                         msg.append(prop.write_card_16(is_double))
                 #except:
                     #print('failed printing property type=%s' % prop.type)
                     #raise
             else:
                 for prop_group in prop_groups:
-                    for unused_pid, prop in sorted(iteritems(prop_group)):
+                    for unused_pid, prop in sorted(raw_items(prop_group)):
                         msg.append(prop.write_card(size, is_double))
             bdf_file.write(''.join(msg))
 
@@ -980,7 +994,7 @@ class WriteMesh(BDFAttributes):
         if self.rigid_elements:
             bdf_file.write('$RIGID ELEMENTS\n')
             if self.is_long_ids:
-                for (eid, element) in sorted(iteritems(self.rigid_elements)):
+                for (eid, element) in sorted(raw_items(self.rigid_elements)):
                     try:
                         bdf_file.write(element.write_card_16(is_double))
                     except:
@@ -988,7 +1002,7 @@ class WriteMesh(BDFAttributes):
                               'type=%s eid=%s' % (element.type, eid))
                         raise
             else:
-                for (eid, element) in sorted(iteritems(self.rigid_elements)):
+                for (eid, element) in sorted(raw_items(self.rigid_elements)):
                     try:
                         bdf_file.write(element.write_card(size, is_double))
                     except:
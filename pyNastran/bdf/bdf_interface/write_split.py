@@ -0,0 +1,183 @@
+# coding: utf-8
+"""
+Defines the helper methods used to write a BDF as a master file and one
+include file per card family:
+  - write_bdf_split(model, out_dirname, split='by_category', nprocs=1, ...)
+
+The sections (e.g., the nodes) are formatted in forked worker processes,
+which inherit the model from the main process, so the model is never
+pickled.  Each worker writes its own include file and only sends the
+filename back.
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        print_function, unicode_literals)
+import os
+import sys
+import multiprocessing
+from codecs import open
+
+from six import StringIO
+
+#: the split methods
+SPLIT_METHODS = ['by_category']
+
+#: the name of the master file, which has the executive/case control decks
+MASTER_FILENAME = 'model.bdf'
+
+#: the include file sections -> the WriteMesh methods that write them
+SECTIONS = [
+    ('nodes', ['_write_nodes', '_write_coords']),
+    ('elements', ['_write_elements', '_write_rigid_elements', '_write_masses']),
+    ('properties', ['_write_properties']),
+    ('materials', ['_write_materials', '_write_thermal_materials']),
+    ('loads', ['_write_loads', '_write_dynamic', '_write_constraints']),
+    ('aero', ['_write_aero', '_write_aero_control', '_write_static_aero',
+              '_write_flutter', '_write_gust']),
+]
+
+#: the WriteMesh methods for the cards that stay in the master file
+MASTER_METHODS = [
+    '_write_dmigs', '_write_thermal', '_write_optimization', '_write_tables',
+    '_write_sets', '_write_superelements', '_write_contact', '_write_rejects',
+]
+
+#: the model that is written; set before the worker processes are forked
+_MODEL = None
+
+
+def write_bdf_split(model, out_dirname, split='by_category', nprocs=1, encoding=None,
+                    size=8, is_double=False, interspersed=False, enddata=None):
+    """
+    Writes the BDF as a master file and an include file per card family
+
+    Parameters
+    ----------
+    model : BDF()
+        the model
+    out_dirname : str
+        the directory for the files, which is created if it doesn't exist
+    split : str; default='by_category'
+        by_category : the nodes, elements, properties, materials, loads
+                      and aero cards are written to <section>.inc
+                      (e.g., nodes.inc)
+    nprocs : int; default=1
+        the number of worker processes used to write the include files;
+        the sections are written serially on platforms that can't fork
+    encoding : str; default=None -> system specified encoding
+        the unicode encoding
+    size : int; {8, 16}
+        the field size
+    is_double : bool; default=False
+        False : small field
+        True : large field
+    interspersed : bool; default=False
+        writes the elements and properties interspersed in elements.inc
+    enddata : bool; default=None
+        bool - enable/disable writing ENDDATA
+        None - depends on input BDF
+
+    Returns
+    -------
+    master_filename : str
+        the path to the master file, which has the executive/case
+        control decks, the params, the INCLUDE statements and the
+        remaining cards
+    """
+    if split not in SPLIT_METHODS:
+        raise ValueError('split=%r is not supported; split=%s' % (split, SPLIT_METHODS))
+    assert nprocs >= 1, 'nprocs=%r' % nprocs
+    if not os.path.exists(out_dirname):
+        os.makedirs(out_dirname)
+
+    sections = [section for (section, unused_methods) in SECTIONS]
+    jobs = [(section, out_dirname, encoding, size, is_double, interspersed)
+            for section in sections]
+    filenames = _write_section_files(model, jobs, nprocs)
+
+    master_filename = os.path.join(out_dirname, MASTER_FILENAME)
+    with open(master_filename, 'w', encoding=encoding) as bdf_file:
+        model._write_header(bdf_file, encoding)
+        model._write_params(bdf_file, size, is_double)
+        for filename in filenames:
+            if filename is not None:
+                bdf_file.write("INCLUDE '%s'\n" % os.path.basename(filename))
+        for method in MASTER_METHODS:
+            getattr(model, method)(bdf_file, size, is_double)
+        if (enddata is None and 'ENDDATA' in model.card_count) or enddata:
+            bdf_file.write('ENDDATA\n')
+    return master_filename
+
+
+def _write_section_files(model, jobs, nprocs):
+    """
+    Writes the include file for each job
+
+    Returns
+    -------
+    filenames : List[str/None]
+        the include file of each job; None for an empty section
+    """
+    global _MODEL
+    nprocs = min(nprocs, len(jobs))
+    context = _get_fork_context() if nprocs > 1 else None
+    model.log.debug('writing %i sections with nprocs=%i' % (
+        len(jobs), 1 if context is None else nprocs))
+
+    _MODEL = model
+    try:
+        if context is None:
+            filenames = [_write_section_file(job) for job in jobs]
+        else:
+            pool = context.Pool(processes=nprocs)
+            try:
+                filenames = pool.map(_write_section_file, jobs, chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+    finally:
+        _MODEL = None
+    return filenames
+
+
+def _get_fork_context():
+    """gets the multiprocessing context that forks the workers or None"""
+    if sys.platform == 'win32':
+        return None
+    try:
+        return multiprocessing.get_context('fork')
+    except AttributeError:  # python 2 always forks on unix
+        return multiprocessing
+    except ValueError:
+        return None
+
+
+def _write_section_file(job):
+    """writes a single include file; runs on the worker process"""
+    section, out_dirname, encoding, size, is_double, interspersed = job
+    model = _MODEL
+    bdf_file = StringIO()
+    if section == 'elements' and interspersed:
+        model._write_elements_interspersed(bdf_file, size, is_double)
+        methods = ['_write_rigid_elements', '_write_masses']
+    elif section == 'properties' and interspersed:
+        methods = []
+    else:
+        methods = dict(SECTIONS)[section]
+
+    if section == 'aero':
+        write_aero_in_flutter, write_aero_in_gust = model._find_aero_location()
+    for method in methods:
+        if method == '_write_flutter':
+            model._write_flutter(bdf_file, size, is_double, write_aero_in_flutter)
+        elif method == '_write_gust':
+            model._write_gust(bdf_file, size, is_double, write_aero_in_gust)
+        else:
+            getattr(model, method)(bdf_file, size, is_double)
+
+    msg = bdf_file.getvalue()
+    if not msg:
+        return None
+    filename = os.path.join(out_dirname, section + '.inc')
+    with open(filename, 'w', encoding=encoding) as include_file:
+        include_file.write(msg)
+    return filename
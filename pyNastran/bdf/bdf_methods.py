@@ -24,7 +24,7 @@ from pyNastran.utils import integer_types
 from pyNastran.bdf.bdf_interface.attributes import BDFAttributes
 from pyNastran.bdf.mesh_utils.mass_properties import (
     _mass_properties_elements_init, _mass_properties_no_xref, _apply_mass_symmetry,
-    _mass_properties, _mass_properties_new)
+    _mass_properties_new, mass_properties_by_group, get_breakdowns)
 from pyNastran.bdf.mesh_utils.loads import sum_forces_moments, sum_forces_moments_elements
 from pyNastran.bdf.mesh_utils.skin_solid_elements import write_skin_solid_faces
 
@@ -34,6 +34,10 @@ class BDFMethods(BDFAttributes):
     Has the following methods:
         mass_properties(element_ids=None, reference_point=None, sym_axis=None,
             scale=None)
+        mass_properties_by_group(group_by='pid', element_ids=None,
+            reference_point=None, sym_axis=None, scale=None)
+        get_breakdowns(group_by=('pid', 'mid', 'etype'),
+            quantities=('area', 'volume', 'mass', 'cg', 'inertia'))
         resolve_grids(cid=0)
         unresolve_grids(model_old)
         sum_forces_moments_elements(p0, loadcase_id, eids, nids,
@@ -274,6 +278,36 @@ class BDFMethods(BDFAttributes):
             raise RuntimeError('No elements with mass were found')
         return pids_to_mass, mass_type_to_mass
 
+    def get_breakdowns(self, group_by=('pid', 'mid', 'etype'),
+                       quantities=('area', 'volume', 'mass', 'cg', 'inertia'),
+                       element_ids=None, mass_ids=None, reference_point=None):
+        """
+        Gets a breakdown of the area, volume, length, mass, cg and
+        inertia of the model in one pass
+
+        Parameters
+        ----------
+        group_by : str / List[str]; default=('pid', 'mid', 'etype')
+            the elements/masses with the same 'pid', 'mid' and/or
+            'etype' are summed; () sums the whole model
+        quantities : List[str]; default=('area', 'volume', 'mass', 'cg', 'inertia')
+            the quantities to calculate; 'length' is also supported
+        element_ids / mass_ids / reference_point
+            see ``mass_properties``
+
+        Returns
+        -------
+        breakdown : (ngroups, ) structured ndarray
+            the group_by fields, the number of elements/masses
+            ('nelements') and the quantities, sorted by group
+
+        .. seealso:: pyNastran.bdf.mesh_utils.mass_properties.get_breakdowns
+        """
+        return get_breakdowns(
+            self, group_by=group_by, quantities=quantities,
+            element_ids=element_ids, mass_ids=mass_ids,
+            reference_point=reference_point)
+
     def mass_properties(self, element_ids=None, mass_ids=None, reference_point=None,
                         sym_axis=None, scale=None):
         """
@@ -345,19 +379,55 @@ class BDFMethods(BDFAttributes):
 
         for pid, eids in sorted(iteritems(pid_eids)):
             mass, cg, I = model.mass_properties(element_ids=eids)
-        """
-        if reference_point is None:
-            reference_point = np.array([0., 0., 0.])
-        elif isinstance(reference_point, integer_types):
-            reference_point = self.nodes[reference_point].get_position()
 
-        elements, masses = _mass_properties_elements_init(self, element_ids, mass_ids)
-        mass, cg, I = _mass_properties(
-            self, elements, masses,
-            reference_point=reference_point)
-        mass, cg, I = _apply_mass_symmetry(self, sym_axis, scale, mass, cg, I)
+        .. seealso:: mass_properties_by_group
+        """
+        mass, cg, I = _mass_properties_new(
+            self, element_ids=element_ids, mass_ids=mass_ids,
+            reference_point=reference_point,
+            sym_axis=sym_axis, scale=scale)
         return (mass, cg, I)
 
+    def mass_properties_by_group(self, group_by='pid', element_ids=None, mass_ids=None,
+                                 reference_point=None, sym_axis=None, scale=None):
+        """
+        Calculates the mass properties of each group of elements/masses
+        in one call
+
+        Parameters
+        ----------
+        group_by : str/dict; default='pid'
+            str : the elements/masses are grouped by the:
+                'pid' : property id (0 for the CONM2, CONROD, ...)
+                'mid' : material id of the property (0 for the CONM2, ...)
+                'etype' : element type
+            dict[key] : ids
+                the element/mass ids in each group (e.g., an element set)
+        element_ids / mass_ids / reference_point / sym_axis / scale
+            see ``mass_properties``; the 'cg' reference point is the
+            cg of each group
+
+        Returns
+        -------
+        group_ids : (ngroups, ) ndarray
+            the sorted pids/mids/etypes or the keys of group_by
+        mass : (ngroups, ) float ndarray
+            the mass of each group
+        cg : (ngroups, 3) float ndarray
+            the cg of each group
+        I : (ngroups, 6) float ndarray
+            the moment of inertia of each group
+            [Ixx, Iyy, Izz, Ixy, Ixz, Iyz]
+
+        Example
+        -------
+        # mass properties of model based on Property ID
+        pids, mass, cg, I = model.mass_properties_by_group(group_by='pid')
+        """
+        return mass_properties_by_group(
+            self, group_by=group_by, element_ids=element_ids, mass_ids=mass_ids,
+            reference_point=reference_point, sym_axis=sym_axis, scale=scale)
+
     def mass_properties_no_xref(self, element_ids=None, mass_ids=None, reference_point=None,
                                 sym_axis=None, scale=None):
         """
@@ -446,8 +516,8 @@ class BDFMethods(BDFAttributes):
 
     def _mass_properties_new(self, element_ids=None, mass_ids=None,
                              reference_point=None,
-                             sym_axis=None, scale=None, xyz_cid0=None):  # pragma: no cover
-        """not done"""
+                             sym_axis=None, scale=None, xyz_cid0=None):
+        """see ``mass_properties``"""
         mass, cg, I = _mass_properties_new(
             self, element_ids=element_ids, mass_ids=mass_ids,
             reference_point=reference_point,
@@ -38,6 +38,29 @@ else:
     pass
 
 
+#: class -> the names of the ``__slots__`` of the class and its bases
+_SLOT_NAMES = {}  # type: Dict[type, List[str]]
+
+
+def _get_slot_names(cls):
+    # type: (type) -> List[str]
+    """gets the names of the ``__slots__`` of a class and its bases"""
+    try:
+        return _SLOT_NAMES[cls]
+    except KeyError:
+        pass
+    slot_names = []
+    for base in cls.__mro__:
+        slots = base.__dict__.get('__slots__', ())
+        if isinstance(slots, string_types):
+            slots = (slots, )
+        slot_names.extend(name for name in slots
+                          if name not in ('__dict__', '__weakref__') and
+                          name not in slot_names)
+    _SLOT_NAMES[cls] = slot_names
+    return slot_names
+
+
 class BaseCard(object):
     """
     Defines a series of base methods for every card class
@@ -51,11 +74,36 @@ class BaseCard(object):
      - comment
      - update_field(self, n, value)
 
-
+    The high-volume cards (e.g., GRID, CQUAD4) define ``__slots__``, so
+    they don't have a per-instance ``__dict__``.  A subclass that doesn't
+    define ``__slots__`` has a ``__dict__``.
     """
+    __slots__ = ()
+
     def __init__(self):
         pass
 
+    def __getstate__(self):
+        """gets the attributes of the card for pickle/copy"""
+        slot_names = _get_slot_names(self.__class__)
+        if not slot_names:
+            return self.__dict__
+        state = {}
+        for name in slot_names:
+            if hasattr(self, name):
+                state[name] = getattr(self, name)
+        if hasattr(self, '__dict__'):
+            state.update(self.__dict__)
+        return state
+
+    def __setstate__(self, state):
+        """sets the attributes of the card for pickle/copy"""
+        if _get_slot_names(self.__class__):
+            for name, value in state.items():
+                setattr(self, name, value)
+        else:
+            self.__dict__.update(state)
+
     def __deepcopy__(self, memo_dict):
         #raw_fields = self.repr_fields()
         raw_fields = self.raw_fields()
@@ -402,6 +450,7 @@ class Material(BaseCard):
 
 class Element(BaseCard):
     """defines the Element class"""
+    __slots__ = ()
     pid = 0  # CONM2, rigid
 
     def __init__(self):
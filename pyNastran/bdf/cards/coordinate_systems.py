@@ -498,7 +498,7 @@ class Coord(BaseCard):
 
     def resolve(self):
         if not self.is_resolved:
-            if isinstance(self.rid, integer_types) and self.rid != 0:
+            if self.rid_ref is None and self.rid != 0:
                 raise RuntimeError("BDF has not been cross referenced.")
             if self.type in ['CORD2R', 'CORD2C', 'CORD2S']:
                 self.rid_ref.setup()
@@ -663,7 +663,21 @@ class Coord(BaseCard):
             return xyz
         return self.transform_vector_to_global_assuming_rectangular(xyz) + self.origin
 
-    def _transform_node_to_global_array(self, xyz):
+    def transform_node_to_global_array(self, xyz):
+        """
+        Transforms points from the local coordinate system to the global
+        coordinate system
+
+        Parameters
+        ----------
+        xyz : (n, 3) float ndarray
+            the points in the local frame to be transformed
+
+        Returns
+        -------
+        xyz_global : (n, 3) float ndarray
+            the points in the global frame
+        """
         if self.cid == 0:
             return xyz
         return self.transform_vector_to_global_array(xyz) + self.origin
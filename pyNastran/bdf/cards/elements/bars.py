@@ -25,6 +25,8 @@ from pyNastran.bdf.field_writer_16 import print_card_16
 
 
 class LineElement(Element):  # CBAR, CBEAM, CBEAM3, CBEND
+    __slots__ = ()
+
     def __init__(self):
         Element.__init__(self)
         self.pid_ref = None  # type: Optional[Any]
@@ -342,6 +344,9 @@ class CBAR(LineElement):
     |       |       | 513 |  0.0  |  0.0  |    -9. |  0.0  |  0.0  |   -9. |
     +-------+-------+-----+-------+-------+--------+-------+-------+-------+
     """
+    __slots__ = (
+        'eid', 'pid', 'ga', 'gb', 'x', 'g0', 'offt', 'pa', 'pb', 'wa', 'wb',
+        'pid_ref', 'ga_ref', 'gb_ref', '_comment')
     type = 'CBAR'
     _field_map = {
         1: 'eid', 2:'pid', 3:'ga', 4:'gb',
@@ -122,6 +122,7 @@ def _normal4(n1, n2, n3, n4, card):
 
 
 class ShellElement(Element):
+    __slots__ = ()
     type = 'ShellElement'
 
     def __init__(self):
@@ -219,6 +220,8 @@ class ShellElement(Element):
 
 
 class TriShell(ShellElement):
+    __slots__ = ()
+
     def __init__(self):
         ShellElement.__init__(self)
         self.nodes_ref = None  # type: Optional[List[Any]]
@@ -400,6 +403,9 @@ class CTRIA3(TriShell):
     |        |       | TFLAG | T1 | T2 | T3 |            |         |
     +--------+-------+-------+----+----+----+------------+---------+
     """
+    __slots__ = (
+        'eid', 'pid', 'nodes', 'theta_mcid', 'zoffset', 'tflag', 'T1', 'T2', 'T3',
+        'nodes_ref', 'pid_ref', 'theta_mcid_ref', '_comment')
     type = 'CTRIA3'
     _field_map = {
         1: 'eid', 2:'pid', 6:'theta_mcid', 7:'zoffset', 10:'tflag',
@@ -1344,6 +1350,8 @@ class CTRIAR(TriShell):
 
 
 class QuadShell(ShellElement):
+    __slots__ = ()
+
     def __init__(self):
         ShellElement.__init__(self)
         self.nodes_ref = None  # type: Optional[List[Any]]
@@ -1806,6 +1814,9 @@ class CQUAD4(QuadShell):
     |        |       | TFLAG | T1 | T2 | T3 | T4 |            |         |
     +--------+-------+-------+----+----+----+----+------------+---------+
     """
+    __slots__ = (
+        'eid', 'pid', 'nodes', 'theta_mcid', 'zoffset', 'tflag', 'T1', 'T2', 'T3', 'T4',
+        'nodes_ref', 'pid_ref', 'theta_mcid_ref', '_comment')
     type = 'CQUAD4'
     cp_name_map = {
         'T1' : 'T1',
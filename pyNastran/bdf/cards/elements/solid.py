@@ -103,7 +103,11 @@ def area_centroid(n1, n2, n3, n4):
     return(area, centroid)
 
 
+#: the attributes of the CHEXA, CPENTA, CPYRAM and CTETRA elements
+SOLID_SLOTS = ('eid', 'pid', 'nodes', 'nodes_ref', 'pid_ref', '_comment')
+
 class SolidElement(Element):
+    __slots__ = ()
     _field_map = {1: 'nid', 2:'pid'}
 
     def __init__(self):
@@ -194,6 +198,7 @@ class CHEXA8(SolidElement):
     |       | G7  | G8  |    |    |    |    |    |    |
     +-------+-----+-----+----+----+----+----+----+----+
     """
+    __slots__ = SOLID_SLOTS
     type = 'CHEXA'
     def write_card(self, size=8, is_double=False):
         data = [self.eid, self.Pid()] + self.node_ids
@@ -451,6 +456,7 @@ class CHEXA20(SolidElement):
     |       | G15 | G16 | G17 | G18 | G19 | G20 |     |     |
     +-------+-----+-----+-----+-----+-----+-----+-----+-----+
     """
+    __slots__ = SOLID_SLOTS
     type = 'CHEXA'
     def write_card(self, size=8, is_double=False):
         nodes = self.node_ids
@@ -749,6 +755,7 @@ class CPENTA6(SolidElement):
       V = (A1+A2)/2  * norm(c1-c2)
       C = (c1-c2)/2
     """
+    __slots__ = SOLID_SLOTS
     type = 'CPENTA'
     def write_card(self, size=8, is_double=False):
         nodes = self.node_ids
@@ -1131,6 +1138,7 @@ class CPENTA15(SolidElement):
     |         | G15 |     |    |     |     |     |     |     |
     +---------+-----+-----+----+-----+-----+-----+-----+-----+
     """
+    __slots__ = SOLID_SLOTS
     type = 'CPENTA'
     def __init__(self, eid, pid, nids, comment=''):
         """
@@ -1357,6 +1365,7 @@ class CPYRAM5(SolidElement):
     | CPYRAM | EID | PID | G1  | G2  | G3  | G4  | G5  |
     +--------+-----+-----+-----+-----+-----+-----+-----+
     """
+    __slots__ = SOLID_SLOTS
     type = 'CPYRAM'
     def __init__(self, eid, pid, nids, comment=''):
         SolidElement.__init__(self)
@@ -1533,6 +1542,7 @@ class CPYRAM13(SolidElement):
     |        | G7  | G8  | G9  | G10 | G11 | G12 |     |     |
     +--------+-----+-----+-----+-----+-----+-----+-----+-----+
     """
+    __slots__ = SOLID_SLOTS
     type = 'CPYRAM'
     def __init__(self, eid, pid, nids, comment=''):
         SolidElement.__init__(self)
@@ -1730,6 +1740,7 @@ class CTETRA4(SolidElement):
     | CTETRA | EID | PID | G1 | G2 | G3 | G4 |
     +--------+-----+-----+----+----+----+----+
     """
+    __slots__ = SOLID_SLOTS
     type = 'CTETRA'
     @property
     def faces(self):
@@ -1990,6 +2001,7 @@ class CTETRA10(SolidElement):
     |        | 265 | 334 | 101 | 102 |     |    |     |     |
     +--------+-----+-----+-----+-----+-----+----+-----+-----+
     """
+    __slots__ = SOLID_SLOTS
     type = 'CTETRA'
     def write_card(self, size=8, is_double=False):
         nodes = self.node_ids
@@ -862,6 +862,9 @@ class GRID(BaseCard):
     | GRID | NID | CP | X1 | X2 | X3 | CD | PS | SEID |
     +------+-----+----+----+----+----+----+----+------+
     """
+    __slots__ = (
+        'nid', 'cp', 'xyz', 'cd', 'ps', 'seid',
+        'cp_ref', 'cd_ref', 'ps_ref', 'seid_ref', 'elements_ref', '_comment')
     type = 'GRID'
 
     #: allows the get_field method and update_field methods to be used
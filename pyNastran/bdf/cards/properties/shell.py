@@ -1892,6 +1892,10 @@ class PSHELL(ShellProperty):
             self.mid3_ref = model.Material(self.mid3, msg)
         if self.mid4:
             self.mid4_ref = model.Material(self.mid4, msg)
+        self.check_z_offsets(model.log)
+
+    def check_z_offsets(self, log):
+        """warns if the midsurface offsets are not in the range -1.5t to 1.5t"""
         if self.t is not None:
             z1 = abs(self.z1)
             z2 = abs(self.z2)
@@ -1899,7 +1903,7 @@ class PSHELL(ShellProperty):
             if not ((-1.5*t <= z1 <= 1.5*t) or (-1.5*t <= z2 <= 1.5*t)):
                 msg = 'PSHELL pid=%s midsurface: z1=%s z2=%s t=%s not in range of -1.5t < zi < 1.5t' % (
                     self.pid, self.z1, self.z2, t)
-                model.log.warning(msg)
+                log.warning(msg)
 
     def uncross_reference(self):
         self.mid1 = self.Mid1()
@@ -0,0 +1,88 @@
+"""tests the memory used by the high-volume cards (__slots__)"""
+import copy
+import pickle
+import unittest
+
+import numpy as np
+
+from pyNastran.bdf.bdf import BDF
+from pyNastran.bdf.cards.elements.shell import CQUAD4
+
+
+def _build_model():
+    """creates the nodes, properties and materials that are used by the elements"""
+    model = BDF(debug=None)
+    for nid in range(1, 21):
+        model.add_grid(nid, [float(nid), 0., 0.])
+    model.add_mat1(1, 3.0e7, None, 0.3)
+    model.add_pshell(1, mid1=1, t=0.1)
+    model.add_psolid(2, 1)
+    model.add_pbar(3, 1, A=1.)
+    return model
+
+
+def _add_cards(model, card_name, ncards):
+    """adds ncards of a card type to the model"""
+    nid0 = 1000
+    nids = list(range(1, 21))
+    for i in range(ncards):
+        eid = nid0 + i
+        if card_name == 'GRID':
+            model.add_grid(eid, [float(i), 1., 2.])
+        elif card_name == 'CQUAD4':
+            model.add_cquad4(eid, 1, nids[:4])
+        elif card_name == 'CTRIA3':
+            model.add_ctria3(eid, 1, nids[:3])
+        elif card_name == 'CTETRA':
+            model.add_ctetra(eid, 2, nids[:10])
+        elif card_name == 'CPENTA':
+            model.add_cpenta(eid, 2, nids[:6])
+        elif card_name == 'CHEXA':
+            model.add_chexa(eid, 2, nids[:8])
+        elif card_name == 'CBAR':
+            model.add_cbar(eid, 3, nids[:2], [0., 1., 0.], None)
+        else:  # pragma: no cover
+            raise NotImplementedError(card_name)
+
+
+class TestCardMemory(unittest.TestCase):
+    """tests the memory used by the high-volume cards"""
+
+    def test_card_slots(self):
+        """the high-volume cards don't have a __dict__"""
+        model = _build_model()
+        for card_name in ['CQUAD4', 'CTRIA3', 'CTETRA', 'CPENTA', 'CHEXA', 'CBAR']:
+            _add_cards(model, card_name, 1)
+            elem = model.elements.pop(1000)
+            model.elements[1000] = elem
+            model.cross_reference()
+            assert not hasattr(elem, '__dict__'), card_name
+            msg = elem.write_card(size=8)
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                elem2 = pickle.loads(pickle.dumps(elem, protocol))
+                assert elem2.write_card(size=8) == msg, (card_name, protocol)
+                assert elem2.pid_ref.pid == elem.pid_ref.pid
+            assert copy.deepcopy(elem).write_card(size=8) == msg
+            del model.elements[1000]
+
+        node = model.nodes[1]
+        node.comment = 'node'
+        assert not hasattr(node, '__dict__')
+        node2 = pickle.loads(pickle.dumps(node, 0))
+        assert node2.comment == '$node\n', node2.comment
+        assert np.array_equal(node2.xyz, node.xyz)
+        assert node2.write_card() == node.write_card()
+
+        # a subclass without __slots__ has a __dict__
+        class CQUAD4B(CQUAD4):
+            """a CQUAD4 with extra attributes"""
+            pass
+        elem = CQUAD4B(1, 1, [1, 2, 3, 4])
+        elem.extra = 1
+        elem2 = copy.copy(elem)
+        assert elem2.extra == 1
+        assert elem2.nodes == [1, 2, 3, 4]
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
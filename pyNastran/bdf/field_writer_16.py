@@ -6,12 +6,15 @@ from __future__ import (nested_scopes, generators, division, absolute_import,
 from six.moves import range
 
 import sys
-from typing import List, Union, Optional, Any
+from typing import List, Dict, Union, Optional, Any
 from numpy import float32, isnan  # type: ignore
 
 from pyNastran.utils import integer_types
 from pyNastran.bdf.cards.utils import wipe_empty_fields
-from pyNastran.bdf.field_writer_8 import set_blank_if_default
+from pyNastran.bdf.field_writer_8 import set_blank_if_default, FLOAT_CACHE_SIZE
+
+#: value -> the print_float_16 field
+_FLOAT_16_CACHE = {}  # type: Dict[float, str]
 
 def set_string16_blank_if_default(value, default):
     # type: (Any, Any) -> str
@@ -66,7 +69,27 @@ def print_float_16(value):
     Prints a float in nastran 16-character width syntax
     using the highest precision possbile.
     .. seealso:: print_float_8
+
+    The fields are cached, so a repeated value is only formatted once.
     """
+    try:
+        return _FLOAT_16_CACHE[value]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable
+        return _print_float_16(value)
+
+    field = _print_float_16(value)
+    if value == value:  # NaN is never found
+        if len(_FLOAT_16_CACHE) >= FLOAT_CACHE_SIZE:
+            _FLOAT_16_CACHE.clear()
+        _FLOAT_16_CACHE[value] = field
+    return field
+
+
+def _print_float_16(value):
+    # type: (float) -> str
+    """Prints a float in nastran 16-character width syntax (see print_float_16)"""
     if isnan(value):
         return '                '
     elif value == 0.0:
@@ -6,9 +6,26 @@ from __future__ import (nested_scopes, generators, division, absolute_import,
 from six import string_types, integer_types
 from six.moves import range
 import sys
-from typing import List, Union, Any
+from typing import List, Dict, Tuple, Union, Any
+import numpy as np
 from numpy import float32, isnan
 
+#: the maximum number of values in the print_float_8/print_float_16 caches;
+#: a cache is cleared when it's full
+FLOAT_CACHE_SIZE = 100000
+
+#: value -> the print_float_8 field
+_FLOAT_8_CACHE = {}  # type: Dict[float, str]
+
+#: the fixed-point fields (e.g., '%8.7f') of print_float_8 for the values
+#: in [lower, upper) -> the number of decimals
+POSITIVE_FLOAT_8_BINS = np.array([0.001, 0.1, 1., 10., 100., 1000., 10000., 100000., 1000000.])
+POSITIVE_FLOAT_8_DECIMALS = np.array([7, 7, 6, 5, 4, 3, 2, 1])
+
+#: the fixed-point fields of print_float_8 for the values in (-upper, -lower]
+NEGATIVE_FLOAT_8_BINS = np.array([0.01, 0.1, 1., 10., 100., 1000., 10000., 100000.])
+NEGATIVE_FLOAT_8_DECIMALS = np.array([6, 6, 5, 4, 3, 2, 1])
+
 
 def set_string8_blank_if_default(value, default):
     # type: (Any, Any) -> str
@@ -101,7 +118,28 @@ def print_float_8(value):
     """
     Prints a float in nastran 8-character width syntax using the
     highest precision possbile.
+
+    The fields are cached, so a repeated value (e.g., a thickness) is
+    only formatted once.
     """
+    try:
+        return _FLOAT_8_CACHE[value]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable
+        return _print_float_8(value)
+
+    field = _print_float_8(value)
+    if value == value:  # NaN is never found
+        if len(_FLOAT_8_CACHE) >= FLOAT_CACHE_SIZE:
+            _FLOAT_8_CACHE.clear()
+        _FLOAT_8_CACHE[value] = field
+    return field
+
+
+def _print_float_8(value):
+    # type: (float) -> str
+    """Prints a float in nastran 8-character width syntax (see print_float_8)"""
     if isnan(value):
         return '        '
     elif value == 0.0:
@@ -201,6 +239,152 @@ def print_float_8(value):
     return field
 
 
+def print_float_8_array(values):
+    # type: (Any) -> np.ndarray
+    """
+    Prints an array of floats in nastran 8-character width syntax
+    (see print_float_8)
+
+    Parameters
+    ----------
+    values : (n, ...) float ndarray
+        the values
+
+    Returns
+    -------
+    fields : (n, ...) str ndarray
+        the fields (dtype='U8')
+
+    The fixed-point fields (e.g., '%8.7f' for 0.1 <= value < 1.) are
+    built from the digits of the rounded values.  The other values
+    (e.g., the fields in scientific notation) and the values that are
+    too close to a rounding tie to be rounded in floating point are
+    printed with print_float_8.
+    """
+    values = np.asarray(values, dtype='float64')
+    fields, ivalues, strings = _print_float_8_bytes(values.ravel())
+    fields = fields.view('S8').ravel().astype('U8')
+    if len(ivalues):
+        nchars = max(len(field) for field in strings)
+        if nchars > 8:
+            fields = fields.astype('U%i' % nchars)
+        fields[ivalues] = strings
+    return fields.reshape(values.shape)
+
+
+def _print_float_8_bytes(values):
+    # type: (np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[str]]
+    """
+    Prints the fixed-point fields of print_float_8_array as bytes
+
+    Parameters
+    ----------
+    values : (n, ) float ndarray
+        the values
+
+    Returns
+    -------
+    fields : (n, 8) uint8 ndarray
+        the ascii fields; the fields of values[ivalues] are blank
+    ivalues : (m, ) int ndarray
+        the values that are printed with print_float_8
+    strings : List[str]
+        the print_float_8 fields of values[ivalues]
+    """
+    nvalues = len(values)
+    fields = np.full((nvalues, 8), ord(' '), dtype='uint8')
+
+    is_zero = values == 0.0
+    fields[is_zero, 6:] = np.frombuffer(b'0.', dtype='uint8')
+    is_done = is_zero | np.isnan(values)
+
+    # the number of decimals of the fixed-point fields; -1 for the others
+    ndecimals = np.full(nvalues, -1, dtype='int64')
+    abs_values = np.abs(values)
+    for is_sign, bins, decimals in [
+            (values > 0., POSITIVE_FLOAT_8_BINS, POSITIVE_FLOAT_8_DECIMALS),
+            (values < 0., NEGATIVE_FLOAT_8_BINS, NEGATIVE_FLOAT_8_DECIMALS)]:
+        ibin = np.searchsorted(bins, abs_values, side='right') - 1
+        is_fixed = is_sign & (ibin >= 0) & (ibin < len(decimals))
+        ndecimals[is_fixed] = decimals[ibin[is_fixed]]
+
+    for ndecimal in np.unique(ndecimals[ndecimals >= 0]).tolist():
+        irows = np.flatnonzero(ndecimals == ndecimal)
+        is_done[irows] = _print_fixed_float_8(
+            values[irows], abs_values[irows], ndecimal, fields, irows)
+
+    ivalues = np.flatnonzero(~is_done)
+    strings = []  # type: List[str]
+    if len(ivalues):
+        unique_values, inverse = np.unique(values[ivalues], return_inverse=True)
+        unique_fields = [print_float_8(value) for value in unique_values.tolist()]
+        strings = [unique_fields[i] for i in inverse.ravel().tolist()]
+    return fields, ivalues, strings
+
+
+def _print_fixed_float_8(values, abs_values, ndecimal, fields, irows):
+    # type: (np.ndarray, np.ndarray, int, np.ndarray, np.ndarray) -> np.ndarray
+    """
+    Prints the fixed-point fields (e.g., '%8.7f' % value) with a
+    constant number of decimals after removing the leading/trailing zeros
+    (see print_float_8)
+
+    Parameters
+    ----------
+    values / abs_values : (n, ) float ndarray
+        the values and their absolute values
+    ndecimal : int
+        the number of decimals
+    fields : (nvalues, 8) uint8 ndarray
+        the fields, which are filled in place
+    irows : (n, ) int ndarray
+        the rows of the fields
+
+    Returns
+    -------
+    is_done : (n, ) bool ndarray
+        was the field printed
+    """
+    # '%.7f' rounds the exact value, so a value that is rounded in
+    # floating point must not be close to a tie
+    scaled_values = abs_values * 10. ** ndecimal
+    remainder = scaled_values - np.floor(scaled_values)
+    is_done = np.abs(remainder - 0.5) > 4. * np.spacing(scaled_values)
+    ints = np.rint(scaled_values).astype('int32')
+
+    # [sign, integer digits, '.', decimal digits]; the rounded values have <= 8 digits
+    nvalues = len(values)
+    nints = 8 - ndecimal
+    powers = 10 ** np.arange(7, -1, -1, dtype='int32')
+    digits = (ints[:, np.newaxis] // powers) % 10
+    chars = np.empty((nvalues, 10), dtype='uint8')
+    chars[:, 1:nints + 1] = digits[:, :nints] + ord('0')
+    chars[:, nints + 1] = ord('.')
+    chars[:, nints + 2:] = digits[:, nints:] + ord('0')
+
+    # remove the leading zeros of the integer and the trailing zeros of
+    # the decimal, so the kept characters are chars[irow, istart:iend+1]
+    is_nonzero = digits != 0
+    is_int = is_nonzero[:, :nints].any(axis=1)
+    istart = np.where(is_int, is_nonzero[:, :nints].argmax(axis=1) + 1, nints + 1)
+    is_decimal = is_nonzero[:, nints:].any(axis=1)
+    iend = np.where(is_decimal, 9 - is_nonzero[:, :nints - 1:-1].argmax(axis=1), nints + 1)
+
+    is_negative = values < 0.
+    istart[is_negative] -= 1
+    chars[np.flatnonzero(is_negative), istart[is_negative]] = ord('-')
+
+    nchars = iend - istart + 1
+    is_done &= nchars <= 8
+
+    # right justify the kept characters
+    columns = iend[:, np.newaxis] - 7 + np.arange(8)
+    fieldsi = chars[np.arange(nvalues)[:, np.newaxis], np.clip(columns, 0, 9)]
+    fieldsi[columns < istart[:, np.newaxis]] = ord(' ')
+    fields[irows[is_done]] = fieldsi[is_done]
+    return is_done
+
+
 #def print_float_or_int_8(value):
     ## type: (Union[int, float]) -> str
     #"""
@@ -0,0 +1,303 @@
+"""
+Defines:
+ - AABBTree(box_min, box_max, leaf_size=8)
+
+The tree is a bounding volume hierarchy of axis-aligned bounding boxes,
+which is stored as flat arrays.  The tree is built one level at a time by
+splitting the boxes of each node at the median of their centroids (along
+the longest axis of the centroids), so the build is O(n*log(n)) with a
+numpy sort per level.  A query (e.g., a series of rays) walks the tree one
+level at a time for all of the queries at once.
+"""
+from __future__ import print_function
+import numpy as np
+
+
+class AABBTree(object):
+    """
+    A bounding volume hierarchy of axis-aligned bounding boxes
+
+    Attributes
+    ----------
+    box_min / box_max : (nboxes, 3) float ndarray
+        the boxes
+    order : (nboxes, ) int ndarray
+        the boxes sorted by node; the boxes of node i are
+        order[node_start[i]:node_start[i] + node_count[i]]
+    node_start / node_count : (nnodes, ) int ndarray
+        the range of the boxes in each node
+    node_left : (nnodes, ) int ndarray
+        the left child of each node; the right child is node_left + 1
+        -1 : leaf
+    node_min / node_max : (nnodes, 3) float ndarray
+        the bounding box of each node
+    """
+    def __init__(self, box_min, box_max, leaf_size=8):
+        """
+        Builds the tree
+
+        Parameters
+        ----------
+        box_min / box_max : (nboxes, 3) float ndarray
+            the boxes
+        leaf_size : int; default=8
+            the maximum number of boxes in a leaf
+        """
+        self.box_min = np.asarray(box_min, dtype='float64').reshape(-1, 3)
+        self.box_max = np.asarray(box_max, dtype='float64').reshape(-1, 3)
+        assert self.box_min.shape == self.box_max.shape, (self.box_min.shape, self.box_max.shape)
+        assert leaf_size >= 1, leaf_size
+        nboxes = self.box_min.shape[0]
+        self.order = np.arange(nboxes, dtype='int64')
+        if nboxes == 0:
+            self.node_start = np.zeros(1, dtype='int64')
+            self.node_count = np.zeros(1, dtype='int64')
+            self.node_left = np.full(1, -1, dtype='int64')
+            self.node_min = np.full((1, 3), np.inf)
+            self.node_max = np.full((1, 3), -np.inf)
+            return
+
+        with np.errstate(invalid='ignore'):
+            # an empty box (inf/-inf) has a nan centroid
+            centroids = (self.box_min + self.box_max) / 2.
+        starts = np.zeros(1, dtype='int64')
+        counts = np.full(1, nboxes, dtype='int64')
+        levels = []
+        nnodes = 0
+        while True:
+            is_split = counts > leaf_size
+            levels.append((nnodes, starts, counts, is_split))
+            nnodes += len(starts)
+            if not is_split.any():
+                break
+
+            # sort the boxes of each node that's split by their centroids
+            split_starts = starts[is_split]
+            split_counts = counts[is_split]
+            ipositions = _get_ranges(split_starts, split_counts)
+            offsets = np.cumsum(split_counts) - split_counts
+            centroidsi = centroids[self.order[ipositions]]
+            extents = (np.maximum.reduceat(centroidsi, offsets, axis=0) -
+                       np.minimum.reduceat(centroidsi, offsets, axis=0))
+            inodes = np.repeat(np.arange(len(split_starts)), split_counts)
+            axes = np.argmax(extents, axis=1)[inodes]
+            isort = np.lexsort((centroidsi[np.arange(len(inodes)), axes], inodes))
+            self.order[ipositions] = self.order[ipositions[isort]]
+
+            nleft = split_counts // 2
+            starts = np.column_stack([split_starts, split_starts + nleft]).ravel()
+            counts = np.column_stack([nleft, split_counts - nleft]).ravel()
+
+        self.node_start = np.hstack([level[1] for level in levels])
+        self.node_count = np.hstack([level[2] for level in levels])
+        self.node_left = np.full(nnodes, -1, dtype='int64')
+        for (inode0, unused_starts, counts, is_split), next_level in zip(levels, levels[1:]):
+            isplit = np.flatnonzero(is_split)
+            self.node_left[inode0 + isplit] = next_level[0] + 2 * np.arange(len(isplit))
+
+        # the boxes of the leaves and then the parents (from the bottom up)
+        self.node_min = np.empty((nnodes, 3), dtype='float64')
+        self.node_max = np.empty((nnodes, 3), dtype='float64')
+        ileaves = np.flatnonzero(self.node_left < 0)
+        ileaves = ileaves[np.argsort(self.node_start[ileaves])]
+        self.node_min[ileaves] = np.minimum.reduceat(
+            self.box_min[self.order], self.node_start[ileaves], axis=0)
+        self.node_max[ileaves] = np.maximum.reduceat(
+            self.box_max[self.order], self.node_start[ileaves], axis=0)
+        for inode0, starts, unused_counts, is_split in levels[-2::-1]:
+            inodes = inode0 + np.flatnonzero(is_split)
+            ileft = self.node_left[inodes]
+            self.node_min[inodes] = np.minimum(self.node_min[ileft], self.node_min[ileft + 1])
+            self.node_max[inodes] = np.maximum(self.node_max[ileft], self.node_max[ileft + 1])
+
+    @property
+    def nboxes(self):
+        """the number of boxes"""
+        return self.box_min.shape[0]
+
+    def get_ray_pairs(self, origins, directions, tmin=0., tmax=np.inf):
+        """
+        Gets the boxes that may be hit by a series of rays
+
+        Parameters
+        ----------
+        origins : (nrays, 3) float ndarray
+            the start of the rays
+        directions : (nrays, 3) float ndarray
+            the direction of the rays
+        tmin / tmax : float / (nrays, ) float ndarray; default=0. / inf
+            the range of the rays (origin + t * direction)
+
+        Returns
+        -------
+        irays : (npairs, ) int ndarray
+            the index of the ray
+        iboxes : (npairs, ) int ndarray
+            the index of a box that's hit by the ray
+        """
+        origins = np.asarray(origins, dtype='float64').reshape(-1, 3)
+        directions = np.asarray(directions, dtype='float64').reshape(-1, 3)
+        nrays = origins.shape[0]
+        tmin = np.broadcast_to(np.asarray(tmin, dtype='float64'), (nrays, ))
+        tmax = np.broadcast_to(np.asarray(tmax, dtype='float64'), (nrays, ))
+        with np.errstate(divide='ignore'):
+            inv_directions = 1. / directions
+
+        def is_hit(irays, inodes):
+            """the slab test; a nan (0 * inf) is on the slab, so it's ignored"""
+            with np.errstate(invalid='ignore'):
+                t1 = (self.node_min[inodes] - origins[irays]) * inv_directions[irays]
+                t2 = (self.node_max[inodes] - origins[irays]) * inv_directions[irays]
+                tnear = np.fmax.reduce(np.fmin(t1, t2), axis=1)
+                tfar = np.fmin.reduce(np.fmax(t1, t2), axis=1)
+                return (tnear <= tfar) & (tfar >= tmin[irays]) & (tnear <= tmax[irays])
+        return self._get_pairs(nrays, is_hit)
+
+    def get_box_pairs(self, box_min, box_max):
+        """
+        Gets the boxes that overlap a series of boxes
+
+        Parameters
+        ----------
+        box_min / box_max : (nqueries, 3) float ndarray
+            the boxes to check
+
+        Returns
+        -------
+        iqueries : (npairs, ) int ndarray
+            the index of the query box
+        iboxes : (npairs, ) int ndarray
+            the index of a box that overlaps the query box
+        """
+        box_min = np.asarray(box_min, dtype='float64').reshape(-1, 3)
+        box_max = np.asarray(box_max, dtype='float64').reshape(-1, 3)
+
+        def is_hit(iqueries, inodes):
+            """the boxes overlap"""
+            return ((self.node_min[inodes] <= box_max[iqueries]) &
+                    (self.node_max[inodes] >= box_min[iqueries])).all(axis=1)
+        iqueries, iboxes = self._get_pairs(box_min.shape[0], is_hit)
+        is_hit = ((self.box_min[iboxes] <= box_max[iqueries]) &
+                  (self.box_max[iboxes] >= box_min[iqueries])).all(axis=1)
+        return iqueries[is_hit], iboxes[is_hit]
+
+    def get_sphere_pairs(self, centers, radii):
+        """
+        Gets the boxes that overlap a series of spheres
+
+        Parameters
+        ----------
+        centers : (nqueries, 3) float ndarray
+            the centers of the spheres
+        radii : float / (nqueries, ) float ndarray
+            the radii of the spheres
+
+        Returns
+        -------
+        iqueries : (npairs, ) int ndarray
+            the index of the sphere
+        iboxes : (npairs, ) int ndarray
+            the index of a box that overlaps the sphere
+        """
+        centers = np.asarray(centers, dtype='float64').reshape(-1, 3)
+        radii = np.broadcast_to(np.asarray(radii, dtype='float64'), (centers.shape[0], ))
+
+        def get_distance(iqueries, box_min, box_max):
+            """the distance from the center of the sphere to the box"""
+            centersi = centers[iqueries]
+            dxyz = np.maximum(np.maximum(box_min - centersi, centersi - box_max), 0.)
+            return np.sqrt((dxyz ** 2).sum(axis=1))
+
+        def is_hit(iqueries, inodes):
+            """the box is within the radius"""
+            distance = get_distance(iqueries, self.node_min[inodes], self.node_max[inodes])
+            return distance <= radii[iqueries]
+        iqueries, iboxes = self._get_pairs(centers.shape[0], is_hit)
+        distance = get_distance(iqueries, self.box_min[iboxes], self.box_max[iboxes])
+        is_hit = distance <= radii[iqueries]
+        return iqueries[is_hit], iboxes[is_hit]
+
+    def get_plane_pairs(self, origins, normals):
+        """
+        Gets the boxes that are cut by a series of planes
+
+        Parameters
+        ----------
+        origins : (nqueries, 3) float ndarray
+            a point on each plane
+        normals : (nqueries, 3) float ndarray
+            the normal of each plane
+
+        Returns
+        -------
+        iqueries : (npairs, ) int ndarray
+            the index of the plane
+        iboxes : (npairs, ) int ndarray
+            the index of a box that's cut by the plane
+        """
+        origins = np.asarray(origins, dtype='float64').reshape(-1, 3)
+        normals = np.asarray(normals, dtype='float64').reshape(-1, 3)
+
+        def is_cut(iqueries, box_min, box_max):
+            """the distance from the center of the box to the plane is within its extent"""
+            normalsi = normals[iqueries]
+            with np.errstate(invalid='ignore'):
+                centers = (box_min + box_max) / 2.
+                distance = np.einsum('ij,ij->i', centers - origins[iqueries], normalsi)
+                extent = np.einsum('ij,ij->i', (box_max - box_min) / 2., np.abs(normalsi))
+                return np.abs(distance) <= extent
+
+        def is_hit(iqueries, inodes):
+            """the plane cuts the box"""
+            return is_cut(iqueries, self.node_min[inodes], self.node_max[inodes])
+        iqueries, iboxes = self._get_pairs(origins.shape[0], is_hit)
+        is_hit = is_cut(iqueries, self.box_min[iboxes], self.box_max[iboxes])
+        return iqueries[is_hit], iboxes[is_hit]
+
+    def _get_pairs(self, nqueries, is_hit):
+        """
+        Walks the tree for a series of queries
+
+        Parameters
+        ----------
+        nqueries : int
+            the number of queries
+        is_hit : function
+            is_hit(iqueries, inodes) -> (n, ) bool ndarray
+            does the query hit the bounding box of the node
+
+        Returns
+        -------
+        iqueries : (npairs, ) int ndarray
+            the index of the query
+        iboxes : (npairs, ) int ndarray
+            the index of a box in a leaf that's hit by the query
+        """
+        iqueries = np.arange(nqueries, dtype='int64')
+        inodes = np.zeros(nqueries, dtype='int64')
+        iqueries_out = []
+        iboxes_out = []
+        while len(iqueries):
+            ihit = is_hit(iqueries, inodes)
+            iqueries = iqueries[ihit]
+            inodes = inodes[ihit]
+            ileft = self.node_left[inodes]
+            is_leaf = ileft < 0
+
+            counts = self.node_count[inodes[is_leaf]]
+            iqueries_out.append(np.repeat(iqueries[is_leaf], counts))
+            iboxes_out.append(self.order[_get_ranges(self.node_start[inodes[is_leaf]], counts)])
+
+            is_parent = ~is_leaf
+            iqueries = np.repeat(iqueries[is_parent], 2)
+            inodes = (ileft[is_parent, np.newaxis] + np.arange(2)).ravel()
+
+        if not iqueries_out:
+            return np.zeros(0, dtype='int64'), np.zeros(0, dtype='int64')
+        return np.hstack(iqueries_out), np.hstack(iboxes_out)
+
+
+def _get_ranges(starts, counts):
+    """concatenates np.arange(start, start + count) for each range"""
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(counts.sum(), dtype='int64')
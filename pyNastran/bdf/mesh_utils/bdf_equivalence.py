@@ -6,9 +6,10 @@ defines:
                                   size=8, is_double=False,
                                   remove_collapsed_elements=False,
                                   avoid_collapsed_elements=False,
-                                  crash_on_collapse=False, log=None, debug=True)
+                                  crash_on_collapse=False, log=None, debug=True,
+                                  method='grid', nprocs=1)
 """
-from __future__ import print_function
+from __future__ import print_function, division
 from six import iteritems, string_types, PY2
 
 import numpy as np
@@ -19,6 +20,23 @@ import scipy
 
 from pyNastran.utils import integer_types
 from pyNastran.bdf.bdf import BDF
+from pyNastran.bdf.bdf_interface.write_split import _get_fork_context
+from pyNastran.bdf.mesh_utils.loads import _get_xyz_array
+
+#: the equivalencing methods
+EQUIVALENCE_METHODS = ['grid', 'kdtree']
+
+#: the maximum number of cells per direction, which keeps the cell keys in an int64
+MAX_CELLS = 2 ** 20
+
+#: the (i, j, k) offsets of the neighboring cells; each cell pair is only
+#: considered once, so half of the 26 neighbors (and the cell itself) are used
+CELL_OFFSETS = [(0, 0, 0)] + [
+    (i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)
+    if (i, j, k) > (0, 0, 0)]
+
+#: the cell data that's searched; set before the worker processes are forked
+_GRID = None
 
 
 def bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
@@ -27,7 +45,8 @@ def bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
                           size=8, is_double=False,
                           remove_collapsed_elements=False,
                           avoid_collapsed_elements=False,
-                          crash_on_collapse=False, log=None, debug=True):
+                          crash_on_collapse=False, log=None, debug=True,
+                          method='grid', nprocs=1):
     """
     Equivalences nodes; keeps the lower node id; creates two nodes with the same
 
@@ -43,7 +62,7 @@ def bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
     renumber_nodes : bool
         should the nodes be renumbered (default=False)
     neq_max : int
-        the number of "close" points (default=4)
+        the number of "close" points (default=4; only used by method='kdtree')
     xref bool: bool
         does the model need to be cross_referenced
         (default=True; only applies to model option)
@@ -71,6 +90,15 @@ def bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
         bdf debugging
     log : logger(); default=None
         bdf logging
+    method : str; default='grid'
+        grid : the nodes are bucketed in a tolerance-sized grid of cells,
+               all the nodes within tol are found and chains of nodes
+               (e.g., 1-2 and 2-3) are collapsed to the lowest node id
+        kdtree : the neq_max closest nodes are found with a KD-tree
+    nprocs : int; default=1
+        the number of worker processes used to search the grid;
+        the grid is searched serially on platforms that can't fork
+        (only used by method='grid')
 
     Returns
     -------
@@ -87,16 +115,29 @@ def bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
     """
     if not isinstance(tol, float):
         tol = float(tol)
+    if method not in EQUIVALENCE_METHODS:
+        raise ValueError('method=%r is not supported; methods=%s' % (
+            method, EQUIVALENCE_METHODS))
     nodes_xyz, model, nids, inew = _eq_nodes_setup(
         bdf_filename, tol, renumber_nodes=renumber_nodes,
         xref=xref, node_set=node_set, debug=debug)
-    ieq, slots = _eq_nodes_build_tree(nodes_xyz, nids, tol,
-                                      inew=inew, node_set=node_set,
-                                      neq_max=neq_max)[1:]
+    if method == 'grid':
+        all_nids, xyz_cid0 = _get_xyz_array(model)
+        inids = np.searchsorted(all_nids, nids)
+        nodes_xyz = xyz_cid0[inids, :]
+        ipairs = _eq_nodes_find_pairs_grid(nodes_xyz, tol, nprocs=nprocs)
+        iroot = _eq_nodes_union_find(len(nids), ipairs)
+        _eq_nodes_final_grid(model, nids, iroot)
+    else:
+        ieq, slots = _eq_nodes_build_tree(nodes_xyz, nids, tol,
+                                          inew=inew, node_set=node_set,
+                                          neq_max=neq_max)[1:]
 
-    nid_pairs = _eq_nodes_find_pairs(nids, slots, ieq, node_set=node_set)
-    _eq_nodes_final(nid_pairs, model, tol, node_set=node_set)
+        nid_pairs = _eq_nodes_find_pairs(nids, slots, ieq, node_set=node_set)
+        _eq_nodes_final(nid_pairs, model, tol, node_set=node_set)
 
+    # the nodes of the elements were changed in place
+    model.clear_mesh_caches()
     if bdf_filename_out is not None:
         model.write_bdf(bdf_filename_out, size=size, is_double=is_double)
     if crash_on_collapse:
@@ -303,6 +344,201 @@ def _eq_nodes_final(nid_pairs, model, tol, node_set=None):
         #skip_nodes.append(nid2)
     return
 
+def _eq_nodes_find_pairs_grid(nodes_xyz, tol, nprocs=1, ncells_per_chunk=100000):
+    """
+    Finds the pairs of nodes that are within tol of each other by
+    bucketing the nodes in a grid of cells, which are at least tol wide
+
+    Parameters
+    ----------
+    nodes_xyz : (nnodes, 3) float ndarray
+        the locations of the nodes
+    tol : float
+        the spherical tolerance
+    nprocs : int; default=1
+        the number of worker processes used to search the chunks of cells
+    ncells_per_chunk : int; default=100000
+        the number of cells that are searched at once, which limits the
+        memory use
+
+    Returns
+    -------
+    ipairs : (npairs, 2) int ndarray
+        the (lower, higher) index of each pair of nodes
+    """
+    global _GRID
+    assert nprocs >= 1, 'nprocs=%r' % nprocs
+    nodes_xyz = np.asarray(nodes_xyz, dtype='float64')
+    nnodes = nodes_xyz.shape[0]
+    if nnodes < 2:
+        return np.zeros((0, 2), dtype='int64')
+
+    # the cells are never smaller than tol, so only the neighboring cells
+    # need to be searched; they're enlarged if there are too many of them
+    xyz_min = nodes_xyz.min(axis=0)
+    dxyz_max = (nodes_xyz.max(axis=0) - xyz_min).max()
+    cell_size = max(tol, dxyz_max / MAX_CELLS)
+    if cell_size == 0.:
+        # all the nodes are coincident
+        cell_size = 1.
+    ijk = np.floor((nodes_xyz - xyz_min) / cell_size).astype('int64')
+
+    # the offsets reach 1 cell past each side
+    ijk += 1
+    ncells = ijk.max(axis=0) + 2
+    keys = (ijk[:, 0] * ncells[1] + ijk[:, 1]) * ncells[2] + ijk[:, 2]
+
+    isort = np.argsort(keys, kind='mergesort')
+    cell_keys, istart, ncount = np.unique(keys[isort], return_index=True, return_counts=True)
+    offset_keys = [(i * ncells[1] + j) * ncells[2] + k for (i, j, k) in CELL_OFFSETS]
+
+    ncells_total = len(cell_keys)
+    jobs = [(icell, min(icell + ncells_per_chunk, ncells_total))
+            for icell in range(0, ncells_total, ncells_per_chunk)]
+    nprocs = min(nprocs, len(jobs))
+    context = _get_fork_context() if nprocs > 1 else None
+
+    _GRID = (nodes_xyz[isort, :], tol, cell_keys, istart, ncount, offset_keys)
+    try:
+        if context is None:
+            ipairs_list = [_find_cell_pairs(job) for job in jobs]
+        else:
+            pool = context.Pool(processes=nprocs)
+            try:
+                ipairs_list = pool.map(_find_cell_pairs, jobs, chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+    finally:
+        _GRID = None
+
+    # map the sorted slots back to the nodes
+    ipairs = isort[np.vstack(ipairs_list)]
+    ipairs.sort(axis=1)
+    return ipairs
+
+
+def _find_cell_pairs(job):
+    """
+    Finds the pairs of nodes in a chunk of cells and their neighbors;
+    runs on the worker process
+
+    Returns
+    -------
+    ipairs : (npairs, 2) int ndarray
+        the sorted slots of each pair of nodes
+    """
+    icell0, icell1 = job
+    xyz, tol, cell_keys, istart, ncount, offset_keys = _GRID
+    ncells = len(cell_keys)
+    ipairs_list = [np.zeros((0, 2), dtype='int64')]
+    for offset_key in offset_keys:
+        icells = np.arange(icell0, icell1)
+        if offset_key == 0:
+            jcells = icells
+        else:
+            neighbor_keys = cell_keys[icells] + offset_key
+            jcells = np.searchsorted(cell_keys, neighbor_keys)
+            is_found = jcells < ncells
+            is_found[is_found] = cell_keys[jcells[is_found]] == neighbor_keys[is_found]
+            icells = icells[is_found]
+            jcells = jcells[is_found]
+
+        # all the (inode, jnode) combinations of each (icell, jcell) pair
+        ni = ncount[icells]
+        nj = ncount[jcells]
+        npairs = ni * nj
+        if offset_key == 0:
+            is_multiple = ni > 1
+            icells, jcells = icells[is_multiple], jcells[is_multiple]
+            ni, nj, npairs = ni[is_multiple], nj[is_multiple], npairs[is_multiple]
+        if len(npairs) == 0:
+            continue
+        ipair_cell = np.repeat(np.arange(len(npairs)), npairs)
+        ipair_local = np.arange(len(ipair_cell)) - np.repeat(np.cumsum(npairs) - npairs, npairs)
+        nj_pair = nj[ipair_cell]
+        inodes = istart[icells][ipair_cell] + ipair_local // nj_pair
+        jnodes = istart[jcells][ipair_cell] + ipair_local % nj_pair
+        if offset_key == 0:
+            is_upper = inodes < jnodes
+            inodes, jnodes = inodes[is_upper], jnodes[is_upper]
+
+        dxyz = xyz[inodes, :] - xyz[jnodes, :]
+        is_close = np.einsum('ij,ij->i', dxyz, dxyz) <= tol ** 2
+        ipairs_list.append(np.column_stack([inodes[is_close], jnodes[is_close]]))
+    return np.vstack(ipairs_list)
+
+
+def _eq_nodes_union_find(nnodes, ipairs):
+    """
+    Merges the pairs of nodes into groups of coincident nodes
+
+    Parameters
+    ----------
+    nnodes : int
+        the number of nodes
+    ipairs : (npairs, 2) int ndarray
+        the index of each pair of nodes
+
+    Returns
+    -------
+    iroot : (nnodes, ) int ndarray
+        the lowest index of the group of each node
+    """
+    iroot = np.arange(nnodes)
+    if len(ipairs) == 0:
+        return iroot
+    inodes = ipairs[:, 0]
+    jnodes = ipairs[:, 1]
+    while True:
+        iroots = iroot[inodes]
+        jroots = iroot[jnodes]
+        is_split = iroots != jroots
+        if not is_split.any():
+            break
+
+        # link the higher root to the lower root...
+        iroots = iroots[is_split]
+        jroots = jroots[is_split]
+        lower_roots = np.minimum(iroots, jroots)
+        np.minimum.at(iroot, iroots, lower_roots)
+        np.minimum.at(iroot, jroots, lower_roots)
+
+        # ...and point every node at its root
+        while True:
+            iroot2 = iroot[iroot]
+            if np.array_equal(iroot2, iroot):
+                break
+            iroot = iroot2
+    return iroot
+
+
+def _eq_nodes_final_grid(model, nids, iroot):
+    """
+    Applies the nodal equivalencing to the model
+
+    Parameters
+    ----------
+    model : BDF()
+        the model
+    nids : (nnodes, ) int ndarray
+        the sorted node ids that were considered
+    iroot : (nnodes, ) int ndarray
+        the index of the node that each node is merged into
+    """
+    imerged = np.where(iroot != np.arange(len(iroot)))[0]
+    nids = np.asarray(nids)
+    for nid1, nid2 in zip(nids[iroot[imerged]].tolist(), nids[imerged].tolist()):
+        node1 = model.nodes[nid1]
+        node2 = model.nodes[nid2]
+        node2.nid = node1.nid
+        node2.xyz = node1.xyz
+        node2.cp = node1.cp
+        assert node2.cd == node1.cd
+        assert node2.ps == node1.ps
+        assert node2.seid == node1.seid
+
+
 def _eq_nodes_build_tree(nodes_xyz, nids, tol, inew=None, node_set=None, neq_max=4, msg=''):
     """
     helper function for `bdf_equivalence_nodes`
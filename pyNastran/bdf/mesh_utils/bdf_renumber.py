@@ -1,7 +1,8 @@
 """
 defines:
     bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
-                 starting_id_dict=None, round_ids=False, cards_to_skip=None)
+                 starting_id_dict=None, round_ids=False, cards_to_skip=None,
+                 subset_ids_dict=None)
 """
 from __future__ import print_function
 from itertools import chain
@@ -11,13 +12,14 @@ from six import PY2, PY3, iteritems, string_types, StringIO
 import numpy as np
 
 from pyNastran.bdf.bdf import BDF
+from pyNastran.bdf.bdf_interface.node_array import NodeArrayDict
 from pyNastran.utils import integer_types, object_attributes
 from pyNastran.utils.mathematics import roundup
 
 
 def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
                  starting_id_dict=None, round_ids=False, cards_to_skip=None,
-                 log=None, debug=False):
+                 log=None, debug=False, subset_ids_dict=None):
     """
     Renumbers a BDF
 
@@ -50,10 +52,23 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
         There are edge cases (e.g. FLUTTER analysis) where things can
         break due to uncross-referenced cards.  You need to disable
         entire classes of cards in that case (e.g. all aero cards).
+    subset_ids_dict : dict, None (default=None)
+        None : renumber all the ids
+        dict : {key : ids}
+            key : str
+                the key (nid, eid, pid, mid, cid)
+            ids : List[int]
+                the ids to renumber; the other ids aren't changed and
+                the new ids skip over them
+
+    Returns
+    -------
+    model : BDF()
+        the renumbered model
+    mapper : dict[str] = dict[int] = int
+        the old id -> new id for each type of id (e.g., 'nodes')
 
     .. todo:: bdf_model option for bdf_filename hasn't been tested
-    .. todo:: add support for subsets (e.g. renumber only a subset of nodes/elements)
-    .. todo:: doesn't support partial renumbering
     .. todo:: doesn't support element material coordinate systems
 
     ..warning :: spoints might be problematic...check
@@ -171,6 +186,15 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
     }
     bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
                  starting_ids_dict=starting_ids_dict, round_ids=False)
+
+    Example 4 - Renumber Everything, but Only a Subset of the Nodes
+    ---------------------------------------------------------------
+    # nodes 1001-1003 become the first 3 unused ids >= 1
+    subset_ids_dict = {
+        'nid' : [1001, 1002, 1003],
+    }
+    bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
+                 subset_ids_dict=subset_ids_dict)
     """
     starting_id_dict_default = {
         'cid' : 1,
@@ -205,101 +229,41 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
             if key not in starting_id_dict:
                 starting_id_dict[key] = value
 
-    nid = None
-    cid = None
-    eid = None
-    pid = None
-    mid = None
-    nsm_id = None
-    spc_id = None
-    mpc_id = None
-    load_id = None
-    dload_id = None
-    method_id = None
-    cmethod_id = None
-    spline_id = None
-    table_id = None
-    flfact_id = None
-    flutter_id = None
-    freq_id = None
-    tstep_id = None
-    tstepnl_id = None
-    suport_id = None
-    suport1_id = None
-    tf_id = None
-
-    # turn them into variables
+    # turn them into variables; None -> don't renumber this key
+    starting_ids = {}
     for key, value in sorted(iteritems(starting_id_dict)):
         #assert isinstance(key, string_types), key
         assert key in starting_id_dict_default, 'key=%r is invalid' % (key)
         #assert isidentifier(key), 'key=%s is invalid' % key
         if value is None:
-            pass
-        else:
-            if not isinstance(value, integer_types):
-                msg = 'key=%r value=%r must be an integer; type(value)=%s' % (
-                    key, value, type(value))
-                raise TypeError(msg)
-
-        if key == 'nid':
-            nid = int(value)
-        elif key == 'cid':
-            if value is None:
-                cid = None
-            else:
-                cid = int(value)
-        elif key == 'set_id':
-            if value is None:
-                set_id = None
-            else:
-                set_id = int(value)
-        elif key == 'eid':
-            eid = int(value)
-        elif key == 'pid':
-            if value is None:
-                pid = None
-            else:
-                pid = int(value)
-        elif key == 'mid':
-            if value is None:
-                mid = None
-            else:
-                mid = int(value)
-        elif key == 'spc_id':
-            spc_id = int(value)
-        elif key == 'mpc_id':
-            mpc_id = int(value)
-
-        elif key == 'load_id':
-            load_id = int(value)
-        elif key == 'dload_id':
-            dload_id = int(value)
-        elif key == 'method_id':
-            method_id = int(value)
-        elif key == 'cmethod_id':
-            cmethod_id = int(value)
-        elif key == 'spline_id':
-            spline_id = int(value)
-        elif key == 'table_id':
-            table_id = int(value)
-        elif key == 'flfact_id':
-            flfact_id = int(value)
-        elif key == 'flutter_id':
-            flutter_id = int(value)
-        elif key == 'freq_id':
-            freq_id = int(value)
-        elif key == 'tstep_id':
-            tstep_id = int(value)
-        elif key == 'tstepnl_id':
-            tstepnl_id = int(value)
-        elif key == 'suport_id':
-            suport_id = int(value)
-        elif key == 'suport1_id':
-            suport1_id = int(value)
-        elif key == 'tf_id':
-            tf_id = int(value)
-        else:
-            raise NotImplementedError('key=%r' % key)
+            starting_ids[key] = None
+            continue
+        if not isinstance(value, integer_types):
+            msg = 'key=%r value=%r must be an integer; type(value)=%s' % (
+                key, value, type(value))
+            raise TypeError(msg)
+        starting_ids[key] = int(value)
+
+    nid = starting_ids['nid']
+    cid = starting_ids['cid']
+    eid = starting_ids['eid']
+    pid = starting_ids['pid']
+    mid = starting_ids['mid']
+    set_id = starting_ids['set_id']
+    spc_id = starting_ids['spc_id']
+    mpc_id = starting_ids['mpc_id']
+    load_id = starting_ids['load_id']
+    dload_id = starting_ids['dload_id']
+    spline_id = starting_ids['spline_id']
+    table_id = starting_ids['table_id']
+    freq_id = starting_ids['freq_id']
+    tf_id = starting_ids['tf_id']
+
+    if subset_ids_dict is None:
+        subset_ids_dict = {}
+    for key in subset_ids_dict:
+        if key not in ['nid', 'eid', 'pid', 'mid', 'cid']:
+            raise NotImplementedError('subset_ids_dict key=%r is not supported' % key)
 
     # build the maps
     mass_id_map = {}
@@ -337,44 +301,19 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
     spoints = list(model.spoints.keys())
     epoints = list(model.epoints.keys())
 
-    nids = model.nodes.keys()
-
-    nids_spoints_epoints = sorted(chain(nids, spoints, epoints))
-    #spoints_nids.sort()
-    i = 1
-    #nnodes = len(spoints_nids)
-
-    i = 1
-    #j = 1
-    #print(spoints_nids)
-    #k = 0
-    #model.log.debug(starting_id_dict)
-    if 'nid' in starting_id_dict and nid is not None:
-        i = nid
-        #banned_nodes = spoints
-        for nidi in nids_spoints_epoints:
-            if nidi in spoints or nidi in epoints:
-                pass
-                #print('sid=%s -> %s' % (nid, i))
-                #i += 1
-            else:
-                while i in spoints or i in epoints:
-                    #print('*bump')
-                    i += 1
-                #print('nid=%s -> %s' % (nid, i))
-                nid_map[nidi] = i
-                reverse_nid_map[i] = nidi
-                i += 1
-        #for nid in sorted(nids):
-            #nid_map[nid] = i
-            #reverse_nid_map[i] = nid
-            #i += 1
-        #print(nid_map)
-        #print(reverse_nid_map)
+    # the old -> new ids are sorted arrays that are applied to each card
+    # family in bulk
+    if nid is not None:
+        # the SPOINTs/EPOINTs aren't renumbered, so the GRIDs skip over them
+        ((nids, nids_new), ) = _renumber_cards(
+            [(model.nodes, 'nid')], nid, subset_ids_dict.get('nid'),
+            banned_ids=spoints + epoints)
+        nid_map = dict(zip(nids.tolist(), nids_new.tolist()))
+        reverse_nid_map = dict(zip(nids_new.tolist(), nids.tolist()))
     else:
-        for nid in nids_spoints_epoints:
-            nid_map[nid] = nid
-            reverse_nid_map[nid] = nid
+        for nidi in sorted(chain(model.nodes, spoints, epoints)):
+            nid_map[nidi] = nidi
+            reverse_nid_map[nidi] = nidi
 
     all_materials = (
         model.materials,
@@ -395,73 +334,47 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
         model.MATS8,
     )
 
+    if pid is not None:
+        # properties; PMASS; PCONV; PHBDY
+        id_maps = _renumber_cards(
+            [(model.properties, 'pid'), (model.properties_mass, 'pid'),
+             (model.convection_properties, 'pid'), (model.phbdys, 'pid')],
+            pid, subset_ids_dict.get('pid'))
+        properties_map = dict(zip(*[id_array.tolist() for id_array in id_maps[0]]))
+        properties_mass_map = dict(zip(*[id_array.tolist() for id_array in id_maps[1]]))
+    else:
+        properties_map = {pidi : pidi for pidi in model.properties}
+        properties_mass_map = {pidi : pidi for pidi in model.properties_mass}
+
+    if eid is not None:
+        # elements; CONM1, CONM2, CMASSx; RBAR/RBAR1/RBE1/RBE2/RBE3/RSPLINE
+        id_maps = _renumber_cards(
+            [(model.elements, 'eid'), (model.masses, 'eid'), (model.rigid_elements, 'eid')],
+            eid, subset_ids_dict.get('eid'))
+        element_map, mass_id_map, rigid_elements_map = [
+            dict(zip(*[id_array.tolist() for id_array in id_map])) for id_map in id_maps]
+    else:
+        element_map = {eidi : eidi for eidi in model.elements}
+        mass_id_map = {eidi : eidi for eidi in model.masses}
+        rigid_elements_map = {eidi : eidi for eidi in model.rigid_elements}
+    eid_map.update(element_map)
+    eid_map.update(mass_id_map)
+    eid_map.update(rigid_elements_map)
+    #for eidi, elem in iteritems(model.caeros):
+        #pass
+
     if mid is not None:
-        mids = []
+        # the materials with the same id (e.g., MAT1/MATT1) get the same new id
+        mids = np.unique(np.hstack([
+            np.array(list(materials), dtype='int64') for materials in all_materials]))
+        mids_new = _get_new_ids(mids, mid, subset_ids_dict.get('mid'))
+        mid_map = dict(zip(mids.tolist(), mids_new.tolist()))
         for materials in all_materials:
-            mids += materials.keys()
-        mids = np.unique(mids)
-        mids.sort()
-        nmaterials = len(mids)
-
-        for i in range(nmaterials):
-            midi = mids[i]
-            mid_map[midi] = mid + i
-
-    if 'nid' in starting_id_dict and nid is not None:
-        #spoints2 = arange(1, len(spoints) + 1)
-        for nid, node in sorted(iteritems(model.nodes)):
-            nid_new = nid_map[nid]
-            #print('nid=%s -> %s' % (nid,nid_new))
-            node.nid = nid_new
-
-    if 'pid' in starting_id_dict and pid is not None:
-        # properties
-        for pidi, prop in sorted(iteritems(model.properties)):
-            prop.pid = pid
-            properties_map[pidi] = pid
-            pid += 1
-        for pidi, prop in sorted(iteritems(model.properties_mass)):
-            # PMASS
-            prop.pid = pid
-            properties_mass_map[pidi] = pid
-            pid += 1
-        for pidi, prop in sorted(iteritems(model.convection_properties)):
-            # PCONV
-            prop.pid = pid
-            pid += 1
-        for pidi, prop in sorted(iteritems(model.phbdys)):
-            # PHBDY
-            prop.pid = pid
-            pid += 1
-
-    if 'eid' in starting_id_dict and eid is not None:
-        # elements
-        for eidi, element in sorted(iteritems(model.elements)):
-            element.eid = eid
-            eid_map[eidi] = eid
-            eid += 1
-        for eidi, element in sorted(iteritems(model.masses)):
-            # CONM1, CONM2, CMASSx
-            element.eid = eid
-            eid_map[eidi] = eid
-            mass_id_map[eidi] = eid
-            eid += 1
-        for eidi, elem in sorted(iteritems(model.rigid_elements)):
-            # RBAR/RBAR1/RBE1/RBE2/RBE3/RSPLINE
-            elem.eid = eid
-            eid_map[eidi] = eid
-            rigid_elements_map[eidi] = eid
-            eid += 1
-        #for eidi, elem in iteritems(model.caeros):
-            #pass
-
-    if 'mid' in starting_id_dict and mid is not None:
-        #mid = 1
+            midsi = np.array(sorted(materials), dtype='int64')
+            _set_card_ids(materials, 'mid', midsi, mids_new[np.searchsorted(mids, midsi)])
+    else:
         for materials in all_materials:
-            for midi, material in iteritems(materials):
-                mid = mid_map[midi]
-                assert hasattr(material, 'mid')
-                material.mid = mid
+            mid_map.update((midi, midi) for midi in materials)
 
     if 'spc_id' in starting_id_dict and spc_id is not None:
         # spc
@@ -503,15 +416,16 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
         for mpc_id in model.mpcs:
             mpc_map[mpc_id] = mpc_id
 
-    if 'cid' in starting_id_dict and cid is not None:
-        # coords
-        for cidi, coord in sorted(iteritems(model.coords)):
-            if cidi == 0:
-                cid_map[0] = 0
-                continue
-            coord.cid = cid
-            cid_map[cidi] = cid
-            cid += 1
+    if cid is not None:
+        # coords; cid=0 can't be renumbered
+        cids = np.array(sorted(model.coords), dtype='int64')
+        cids = cids[cids != 0]
+        cids_new = _get_new_ids(cids, cid, subset_ids_dict.get('cid'), banned_ids=[0])
+        _set_card_ids(model.coords, 'cid', cids, cids_new)
+        cid_map[0] = 0
+        cid_map.update(zip(cids.tolist(), cids_new.tolist()))
+    else:
+        cid_map = {cidi : cidi for cidi in model.coords}
 
     if 'freq_id' in starting_id_dict and freq_id is not None:
         # frequencies
@@ -614,51 +528,64 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
             raise NotImplementedError()
         dessub_map[key] = value
 
-    # tables
-    for table_idi, table in sorted(sorted(iteritems(model.tables))):
-        assert hasattr(table, 'tid')
-        table.tid = table_id
-        table_id += 1
-    for table_idi, table in sorted(sorted(iteritems(model.random_tables))):
-        assert hasattr(table, 'tid')
-        table.tid = table_id
-        table_id += 1
-
-    # dloads
-    for dload_idi, dloads in sorted(iteritems(model.dloads)):
-        for dload in dloads:
-            assert hasattr(dload, 'sid')
-            dload.sid = dload_id
-        dload_map[dload_idi] = dload_id
-        dload_id += 1
-    for dload_idi, dloads in sorted(iteritems(model.dload_entries)):
-        for dload in dloads:
-            assert hasattr(dload, 'sid')
-            dload.sid = dload_id
-        dload_map[dload_idi] = dload_id
-        dload_id += 1
-
-    # loads
-    for load_idi, load_combinations in sorted(iteritems(model.load_combinations)):
-        for load_combination in load_combinations:
-            assert hasattr(load_combination, 'sid')
-            load_combination.sid = load_id
-        load_map[load_idi] = load_id
-        load_id += 1
-    for load_idi, loads in sorted(iteritems(model.loads)):
-        for load in loads:
-            assert hasattr(load, 'sid')
-            load.sid = load_id
-        load_map[load_idi] = load_id
-        load_id += 1
-
-    # transfer_functions
-    for tf_idi, tfs in sorted(iteritems(model.transfer_functions)):
-        for tf in tfs:
-            assert hasattr(tf, 'sid')
-            tf.sid = tf_id
-        tranfer_function_map[tf_idi] = tf_id
-        load_id += 1
+    if table_id is not None:
+        # tables
+        for table_idi, table in sorted(sorted(iteritems(model.tables))):
+            assert hasattr(table, 'tid')
+            table.tid = table_id
+            table_id += 1
+        for table_idi, table in sorted(sorted(iteritems(model.random_tables))):
+            assert hasattr(table, 'tid')
+            table.tid = table_id
+            table_id += 1
+
+    if dload_id is not None:
+        # dloads
+        for dload_idi, dloads in sorted(iteritems(model.dloads)):
+            for dload in dloads:
+                assert hasattr(dload, 'sid')
+                dload.sid = dload_id
+            dload_map[dload_idi] = dload_id
+            dload_id += 1
+        for dload_idi, dloads in sorted(iteritems(model.dload_entries)):
+            for dload in dloads:
+                assert hasattr(dload, 'sid')
+                dload.sid = dload_id
+            dload_map[dload_idi] = dload_id
+            dload_id += 1
+    else:
+        for dload_idi in chain(model.dloads, model.dload_entries):
+            dload_map[dload_idi] = dload_idi
+
+    if load_id is not None:
+        # loads
+        for load_idi, load_combinations in sorted(iteritems(model.load_combinations)):
+            for load_combination in load_combinations:
+                assert hasattr(load_combination, 'sid')
+                load_combination.sid = load_id
+            load_map[load_idi] = load_id
+            load_id += 1
+        for load_idi, loads in sorted(iteritems(model.loads)):
+            for load in loads:
+                assert hasattr(load, 'sid')
+                load.sid = load_id
+            load_map[load_idi] = load_id
+            load_id += 1
+    else:
+        for load_idi in chain(model.load_combinations, model.loads):
+            load_map[load_idi] = load_idi
+
+    if tf_id is not None:
+        # transfer_functions
+        for tf_idi, tfs in sorted(iteritems(model.transfer_functions)):
+            for tf in tfs:
+                assert hasattr(tf, 'sid')
+                tf.sid = tf_id
+            tranfer_function_map[tf_idi] = tf_id
+            tf_id += 1
+    else:
+        for tf_idi in model.transfer_functions:
+            tranfer_function_map[tf_idi] = tf_idi
 
     lseq_map = load_map # wrong???
     temp_map = load_map # wrong???
@@ -711,6 +638,9 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
     #print('****dessub_map', dessub_map)
     #print('****dresp_map', dresp_map)
     _update_case_control(model, mapper)
+
+    # the ids of the nodes/elements were changed in place
+    model.clear_mesh_caches()
     if bdf_filename_out is not None:
         close = True
         if PY2 and isinstance(bdf_filename_out, (file, StringIO)):
@@ -721,6 +651,115 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
                         interspersed=False, close=close)
     return model, mapper
 
+def _get_new_ids(old_ids, starting_id, subset_ids=None, banned_ids=None):
+    """
+    Gets the new ids of a sorted series of ids
+
+    The renumbered ids are consecutive from starting_id, but skip over
+    the banned ids and the ids that aren't renumbered.
+
+    Parameters
+    ----------
+    old_ids : (n, ) int ndarray
+        the ids in the order they are renumbered
+    starting_id : int
+        the first new id
+    subset_ids : List[int]; default=None
+        the ids to renumber; the other ids aren't changed
+        None : renumber all the ids
+    banned_ids : List[int]; default=None
+        ids that can't be used (e.g., the SPOINTs)
+
+    Returns
+    -------
+    new_ids : (n, ) int ndarray
+        the renumbered ids
+    """
+    old_ids = np.asarray(old_ids, dtype='int64')
+    banned_ids = np.asarray([] if banned_ids is None else banned_ids, dtype='int64')
+    if subset_ids is None:
+        is_renumbered = np.ones(len(old_ids), dtype='bool')
+    else:
+        is_renumbered = np.isin(old_ids, np.asarray(subset_ids, dtype='int64'))
+        banned_ids = np.hstack([banned_ids, old_ids[~is_renumbered]])
+
+    banned_ids = np.unique(banned_ids)
+    banned_ids = banned_ids[banned_ids >= starting_id]
+
+    # the i-th new id is starting_id + i plus the number of banned ids
+    # that come before it, which are the banned ids with fewer than i
+    # free ids before them
+    nfree = banned_ids - starting_id - np.arange(len(banned_ids))
+    i = np.arange(is_renumbered.sum(), dtype='int64')
+    new_ids = old_ids.copy()
+    new_ids[is_renumbered] = starting_id + i + np.searchsorted(nfree, i, side='right')
+    return new_ids
+
+
+def _set_card_ids(cards, name, old_ids, new_ids):
+    """
+    Sets the ids of the cards (e.g., ``node.nid = nid_new``)
+
+    Parameters
+    ----------
+    cards : dict[int] = card
+        the cards (e.g., model.nodes)
+    name : str
+        the name of the id (e.g., 'nid')
+    old_ids : (n, ) int ndarray
+        the keys of the cards
+    new_ids : (n, ) int ndarray
+        the new ids
+    """
+    is_changed = old_ids != new_ids
+    old_ids = old_ids[is_changed]
+    new_ids = new_ids[is_changed]
+    if isinstance(cards, NodeArrayDict):
+        # the ids are stored in an array
+        cards._nid[cards.get_index(old_ids)] = new_ids
+        return
+    for old_id, new_id in zip(old_ids.tolist(), new_ids.tolist()):
+        setattr(cards[old_id], name, new_id)
+
+
+def _renumber_cards(card_dicts, starting_id, subset_ids=None, banned_ids=None):
+    """
+    Renumbers a series of card families
+
+    The cards of each family are renumbered in a sorted order and the
+    families follow each other (e.g., the masses come after the elements).
+
+    Parameters
+    ----------
+    card_dicts : List[(dict[int] = card, str)]
+        the cards and the name of the id of each family
+        (e.g., [(model.elements, 'eid'), (model.masses, 'eid')])
+    starting_id : int
+        the first new id
+    subset_ids : List[int]; default=None
+        the ids to renumber; the other ids aren't changed
+        None : renumber all the ids
+    banned_ids : List[int]; default=None
+        ids that can't be used (e.g., the SPOINTs)
+
+    Returns
+    -------
+    id_maps : List[(old_ids, new_ids)]
+        the sorted ids and the new ids of each family
+    """
+    old_ids = [np.array(sorted(cards), dtype='int64') for cards, unused_name in card_dicts]
+    new_ids = _get_new_ids(np.hstack(old_ids), starting_id, subset_ids, banned_ids)
+
+    id_maps = []
+    i0 = 0
+    for (cards, name), old_idsi in zip(card_dicts, old_ids):
+        i1 = i0 + len(old_idsi)
+        _set_card_ids(cards, name, old_idsi, new_ids[i0:i1])
+        id_maps.append((old_idsi, new_ids[i0:i1]))
+        i0 = i1
+    return id_maps
+
+
 def _update_case_control(model, mapper):
     """
     Updates the case control deck; helper method for ``bdf_renumber``.
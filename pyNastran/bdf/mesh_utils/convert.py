@@ -36,6 +36,8 @@ def convert(model, units_to, units=None):
     _set_wtmass(model, gravity_scale)
 
     _convert_nodes(model, xyz_scale)
+    # the nodes were moved in place
+    model.clear_mesh_caches()
     #_convert_coordinates(model, xyz_scale)
 
     _convert_elements(model, xyz_scale, mass_scale, weight_scale)
@@ -57,14 +57,16 @@ def extract_bodies(bdf_filename, mpc_id=0):
 
     nid_to_eid_map = defaultdict(list)
     eid_to_nid_map = defaultdict(list)
-    for eid, elem in iteritems(model.elements):
+    topology = model.get_topology()
+    offsets = topology.element_node_offsets.tolist()
+    element_nodes = topology.element_nodes.tolist()
+    for eid, i0, i1 in zip(topology.eids.tolist(), offsets[:-1], offsets[1:]):
         if debug:  # pragma: no cover
-            print(print_card_16(elem.repr_fields()))
-        node_ids = elem.node_ids
+            print(print_card_16(model.elements[eid].repr_fields()))
+        # the missing nodes (e.g., the midside nodes of a CQUAD8) are skipped
+        node_ids = element_nodes[i0:i1]
         eid_to_nid_map[eid] = node_ids
         for nid in node_ids:
-            if nid is None:
-                continue
             nid_to_eid_map[nid].append(eid)
 
     rigid_offset = 0
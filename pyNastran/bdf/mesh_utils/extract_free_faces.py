@@ -8,13 +8,16 @@ defines:
 """
 from __future__ import print_function
 import sys
-from copy import deepcopy
-from collections import defaultdict
 
 from six import iteritems, PY2, string_types
+import numpy as np
 
 from pyNastran.bdf.field_writer_8 import print_card_8
 from pyNastran.bdf.bdf import read_bdf
+from pyNastran.bdf.bdf_interface.write_blocks import write_cards
+from pyNastran.bdf.mesh_utils.skin_solid_elements import (
+    get_solid_skin_faces as _get_solid_skin_faces, _write_skin_shells,
+    MAX_FACE_NODES, SHELL_TYPES)
 
 def get_element_faces(model, element_ids=None):
     """
@@ -72,45 +75,7 @@ def get_solid_skin_faces(model):
        key : sorted face
        value : unsorted face
     """
-    eid_faces = get_element_faces(model)
-    face_set = defaultdict(int)
-    eid_set = defaultdict(list)
-    face_map = {}
-    for eid, face in eid_faces:
-        #print(eid, face)
-        raw_face = deepcopy(face)
-        try:
-            face.sort()
-        except:
-            print('face = %s' % str(face))
-            raise
-        tface = tuple(face)
-        #print(tface)
-        face_set[tface] += 1
-        eid_set[tface].append(eid)
-        face_map[tface] = raw_face
-
-    #print('eid_set:')
-    #for tface, eidset in iteritems(eid_set):
-        #print(tface, eidset)
-
-    #print('face_set:')
-    #for tface, faceset in iteritems(face_set):
-        #print(tface, faceset)
-
-    #print('face_map:')
-    #for tface, facemap in iteritems(face_map):
-        #print(tface, facemap)
-
-    del_faces = []
-    for face, face_count in iteritems(face_set):
-        if face_count == 2:
-            del_faces.append(face)
-
-    for face in del_faces:
-        del face_set[face]
-        del eid_set[face]
-    return eid_set, face_map
+    return _get_solid_skin_faces(model)
 
 
 def write_skin_solid_faces(model, skin_filename,
@@ -266,11 +231,8 @@ def _write_skin_solid_faces(model, skin_filename, face_map,
         wb = 'w'
     with open(skin_filename, wb) as bdf_file:
         bdf_file.write('$ pyNastran: punch=True\n')
-        for nid in sorted(nids_to_write):
-            if nid is None:
-                continue
-            node = model.nodes[nid]
-            bdf_file.write(node.write_card(size=size, is_double=is_double))
+        nodes = [model.nodes[nid] for nid in sorted(nids_to_write) if nid is not None]
+        bdf_file.write(write_cards(nodes, size=size, is_double=is_double))
 
         for cid, coord in iteritems(model.coords):
             if cid == 0:
@@ -298,51 +260,29 @@ def _write_skin_solid_faces(model, skin_filename, face_map,
                 #bdf_file.write(model.materials[mid].comment)
                 bdf_file.write(print_card_8(card))
 
+            pids = []
+            faces = []
+            nface_nodes = []
             for face, eids in iteritems(eid_set):
                 face_raw = face_map[face]
                 nface = len(face)
-                #assert len(eids) == 1, eids
-                #for eid in sorted(eids):
-                    #elem = model.elements[eid]
-                    #print(elem)
-                    #break
-
-                #elem = next(itervalues(model.elements)) # old
                 elem = model.elements[eids[0]]
-                #pid = next(iterkeys(model.properties))
                 pid = elem.Pid()
                 prop = model.properties[pid]
                 try:
                     mid = prop.Mid()
                 except AttributeError:
                     continue
-                #print('mids_to_write = %s' % mids_to_write)
-                #print('mids = ', model.materials.keys())
                 imid = mids_to_write.index(mid)
-
-                if nface == 3:
-                    card = ['CTRIA3', eid_shell, pid_shell + imid] + list(face_raw)
-                elif nface == 4:
-                    card = ['CQUAD4', eid_shell, pid_shell + imid] + list(face_raw)
-                elif nface == 4:
-                    card = ['CQUAD4', eid_shell, pid_shell + imid] + list(face_raw)
-                elif nface == 6:
-                    card = ['CTRIA6', eid_shell, pid_shell + imid] + list(face_raw)
-                elif nface == 8:
-                    card = ['CQUAD8', eid_shell, pid_shell + imid] + list(face_raw)
-                else:
+                if nface not in SHELL_TYPES:
                     raise NotImplementedError('face=%s len(face)=%s' % (face, nface))
-                bdf_file.write(print_card_8(card))
-                eid_shell += 1
-
-                #elem = model.elements[eid]
-                #bdf_file.write(elem.write_card(size=size))
-            #for pid, prop in iteritems(model.properties):
-                #bdf_file.write(prop.write_card(size=size, is_double=is_double))
+                pids.append(pid_shell + imid)
+                faces.append(list(face_raw) + [0] * (MAX_FACE_NODES - nface))
+                nface_nodes.append(nface)
+            faces = np.array(faces, dtype='int64').reshape(len(pids), MAX_FACE_NODES)
+            bdf_file.write(_write_skin_shells(eid_shell, np.array(pids, dtype='int64'),
+                                              faces, np.array(nface_nodes, dtype='int64')))
         bdf_file.write('ENDDATA\n')
-    #if 0:
-        #model = model.__class__.__init__()
-        #model.read_bdf(skin_filename)
 
 
 def main():  # pragma: no cover
@@ -4,8 +4,11 @@ Defines:
       find the net force/moment on the model
   - sum_forces_moments_elements
       find the net force/moment on the model for a subset of elements
+  - sum_forces_moments_vectorized
+      find the net force/moment on the model for many load cases at once
 """
 from __future__ import print_function
+from collections import defaultdict
 from six import iteritems
 import numpy as np
 from numpy import array, cross, allclose, mean
@@ -83,15 +86,48 @@ def sum_forces_moments(model, p0, loadcase_id, include_grav=False, xyz_cid0=None
     loads, scale_factors, is_grav = model.get_reduced_loads(
         loadcase_id, skip_scale_factor0=True)
 
-    F = array([0., 0., 0.])
-    M = array([0., 0., 0.])
-
     if xyz_cid0 is None:
         xyz = {}
         for nid, node in iteritems(model.nodes):
             xyz[nid] = node.get_position()
     else:
         xyz = xyz_cid0
+    return _sum_forces_moments_loads(model, p, loads, scale_factors, xyz,
+                                     loadcase_id, include_grav=include_grav)
+
+
+def _sum_forces_moments_loads(model, p, loads, scale_factors, xyz, loadcase_id,
+                              include_grav=False):
+    """
+    Sums the forces & moments of a series of loads about a reference
+    point p (see sum_forces_moments)
+
+    Parameters
+    ----------
+    model : BDF()
+        a BDF object
+    p : (3,) float ndarray
+        the reference point
+    loads : List[load]
+        the loads (e.g., from ``model.get_reduced_loads``)
+    scale_factors : List[float]
+        the scale factor of each load
+    xyz : Dict[int] = (3, ) ndarray
+        the nodes in the global coordinate system
+    loadcase_id : int
+        the LOAD=ID to analyze; used for logging
+    include_grav : bool; default=False
+        includes gravity in the summation (not supported)
+
+    Returns
+    -------
+    forces : NUMPY.NDARRAY shape=(3,)
+        the forces
+    moments : NUMPY.NDARRAY shape=(3,)
+        the moments
+    """
+    F = array([0., 0., 0.])
+    M = array([0., 0., 0.])
 
     unsupported_types = set([])
     for load, scale in zip(loads, scale_factors):
@@ -988,3 +1024,461 @@ def sum_forces_moments_elements(model, p0, loadcase_id, eids, nids,
         model.log.debug('case=%s loadtype=%r not supported' % (loadcase_id, loadtype))
     #model.log.info("case=%s F=%s M=%s\n" % (loadcase_id, F, M))
     return (F, M)
+
+
+#: the shells that are loaded by a PLOAD2 -> the number of face nodes
+PLOAD2_SHELLS = {'CTRIA3' : 3, 'CQUAD4' : 4, 'CSHEAR' : 4}
+
+#: the shells that are loaded by a PLOAD4 -> the number of face nodes
+PLOAD4_SHELLS = {
+    'CTRIA3' : 3, 'CTRIA6' : 3, 'CTRIA' : 3, 'CTRIAR' : 3,
+    'CQUAD4' : 4, 'CQUAD8' : 4, 'CQUAD' : 4, 'CQUADR' : 4, 'CSHEAR' : 4,
+}
+
+#: the loads that are summed by _sum_forces_moments_loads
+SCALAR_LOADS = ['PLOAD1']
+
+
+def sum_forces_moments_vectorized(model, p0, loadcase_ids, eids=None, nids=None,
+                                  include_grav=False, xyz_cid0=None):
+    """
+    Sums applied forces & moments about a reference point p0 for a series
+    of load cases at once (see sum_forces_moments and
+    sum_forces_moments_elements).
+
+    The loads are grouped by type and are summed with the node locations
+    in an array, so a load that is used by many load cases (e.g., in
+    LOAD combinations) is only summed once.
+
+    Parameters
+    ----------
+    model : BDF()
+        a BDF object
+    p0 : NUMPY.NDARRAY shape=(3,) or integer (node ID)
+        the reference point
+    loadcase_ids : int / List[int]
+        the LOAD=IDs to analyze
+    eids : List[int]; default=None -> all
+        the elements to include (e.g. the loads due to a PLOAD4)
+    nids : List[int]; default=None -> all
+        the nodes to include (e.g. the loads due to a FORCE card)
+    include_grav : bool; default=False
+        includes gravity in the summation
+    xyz_cid0 : None / Dict[int] = (3, ) ndarray
+        the nodes in the global coordinate system
+
+    Returns
+    -------
+    forces : (nloadcases, 3) float ndarray
+        the forces; (3, ) for a single loadcase_id
+    moments : (nloadcases, 3) float ndarray
+        the moments; (3, ) for a single loadcase_id
+
+    Considers:
+      - FORCE, FORCE1, FORCE2
+      - MOMENT, MOMENT1, MOMENT2
+      - PLOAD, PLOAD1, PLOAD2, PLOAD4
+      - GRAV
+      - LOAD
+    """
+    is_single = isinstance(loadcase_ids, integer_types)
+    if is_single:
+        loadcase_ids = [loadcase_ids]
+
+    all_nids, xyz = _get_xyz_array(model, xyz_cid0)
+    if isinstance(p0, integer_types):
+        p = xyz[_get_index(all_nids, [p0], 'nid'), :][0, :]
+    else:
+        p = array(p0, dtype='float64')
+
+    # the loads are shared by the load cases, so they're summed once
+    ilookup = {}
+    unique_loads = []
+    loadcase_id_per_load = []
+    icases = []
+    iloads = []
+    scales = []
+    for icase, loadcase_id in enumerate(loadcase_ids):
+        if not isinstance(loadcase_id, integer_types):
+            raise RuntimeError('loadcase_id must be an integer; loadcase_id=%r' % loadcase_id)
+        loads, scale_factors, unused_is_grav = model.get_reduced_loads(
+            loadcase_id, skip_scale_factor0=True)
+        for load, scale in zip(loads, scale_factors):
+            key = id(load)
+            if key not in ilookup:
+                ilookup[key] = len(unique_loads)
+                unique_loads.append(load)
+                loadcase_id_per_load.append(loadcase_id)
+            icases.append(icase)
+            iloads.append(ilookup[key])
+            scales.append(scale)
+
+    load_forces, load_moments = _sum_unique_loads(
+        model, p, unique_loads, loadcase_id_per_load, all_nids, xyz,
+        eids, nids, include_grav)
+
+    ncases = len(loadcase_ids)
+    forces = np.zeros((ncases, 3), dtype='float64')
+    moments = np.zeros((ncases, 3), dtype='float64')
+    if iloads:
+        scales = np.array(scales, dtype='float64')[:, np.newaxis]
+        np.add.at(forces, icases, load_forces[iloads, :] * scales)
+        np.add.at(moments, icases, load_moments[iloads, :] * scales)
+    if is_single:
+        return forces[0, :], moments[0, :]
+    return forces, moments
+
+
+def _get_xyz_array(model, xyz_cid0=None):
+    """
+    Gets the sorted node ids and their locations in the global frame
+
+    Returns
+    -------
+    nids : (nnodes, ) int ndarray
+        the sorted node ids
+    xyz : (nnodes, 3) float ndarray
+        the nodes in the global frame
+    """
+    if xyz_cid0 is None:
+        nids = np.array(list(model.node_ids), dtype='int64')
+        if len(nids) == 0:
+            return nids, np.zeros((0, 3), dtype='float64')
+        xyz = model.get_xyz_in_coord(cid=0, sort_ids=False)[:len(nids), :]
+    else:
+        nids = np.array(list(xyz_cid0.keys()), dtype='int64')
+        xyz = np.array([xyz_cid0[nid] for nid in nids.tolist()],
+                       dtype='float64').reshape(len(nids), 3)
+    isort = np.argsort(nids)
+    return nids[isort], xyz[isort, :]
+
+
+def _get_index(ids, ids_to_find, name):
+    """gets the index of each id in a sorted array of ids"""
+    ids_to_find = np.asarray(ids_to_find, dtype='int64')
+    if len(ids) == 0:
+        index = np.zeros(len(ids_to_find), dtype='int64')
+        is_missing = np.ones(len(ids_to_find), dtype='bool')
+    else:
+        index = np.searchsorted(ids, ids_to_find)
+        index[index == len(ids)] = 0
+        is_missing = ids[index] != ids_to_find
+    if is_missing.any():
+        raise KeyError('%s=%s not found' % (name, np.unique(ids_to_find[is_missing]).tolist()))
+    return index
+
+
+def _get_face_area_normals(xyz, inodes):
+    """
+    Gets the area * normal and the centroid of a series of triangle
+    (inodes[:, 3]=-1) and quad faces
+
+    Returns
+    -------
+    area_normals : (nfaces, 3) float ndarray
+        the area times the unit normal (see TriShell.Normal, QuadShell.Normal)
+    centroids : (nfaces, 3) float ndarray
+        the centroids
+    """
+    n1 = xyz[inodes[:, 0], :]
+    n2 = xyz[inodes[:, 1], :]
+    n3 = xyz[inodes[:, 2], :]
+    n4 = xyz[inodes[:, 3], :]
+    is_tri = (inodes[:, 3] < 0)[:, np.newaxis]
+    axb = np.where(is_tri, cross(n1 - n2, n1 - n3), cross(n1 - n3, n2 - n4))
+    centroids = np.where(is_tri, (n1 + n2 + n3) / 3., (n1 + n2 + n3 + n4) / 4.)
+    return 0.5 * axb, centroids
+
+
+def _sum_unique_loads(model, p, loads, loadcase_ids, all_nids, xyz,
+                      eids=None, nids=None, include_grav=False):
+    """
+    Sums the force & moment of each load with a scale factor of 1.0
+
+    Parameters
+    ----------
+    loads : List[load]
+        the loads
+    loadcase_ids : List[int]
+        a load case of each load; used for logging
+    all_nids : (nnodes, ) int ndarray
+        the sorted node ids
+    xyz : (nnodes, 3) float ndarray
+        the nodes in the global frame
+
+    Returns
+    -------
+    forces : (nloads, 3) float ndarray
+        the force of each load
+    moments : (nloads, 3) float ndarray
+        the moment of each load
+    """
+    nloads = len(loads)
+    forces = np.zeros((nloads, 3), dtype='float64')
+    moments = np.zeros((nloads, 3), dtype='float64')
+    eids_set = None if eids is None else set(eids)
+    nids_set = None if nids is None else set(nids)
+
+    iloads_by_type = defaultdict(list)
+    for iload, load in enumerate(loads):
+        iloads_by_type[load.type].append(iload)
+
+    unsupported_types = set([])
+    for load_type, iloads in sorted(iteritems(iloads_by_type)):
+        loadsi = [loads[iload] for iload in iloads]
+        if load_type in ['FORCE', 'FORCE1', 'FORCE2', 'MOMENT', 'MOMENT1', 'MOMENT2']:
+            if nids_set is not None:
+                if load_type == 'FORCE':
+                    is_nodes = [load.node_id in nids_set for load in loadsi]
+                else:
+                    is_nodes = [nids_set.issuperset(load.node_ids) for load in loadsi]
+                loadsi = [load for load, is_node in zip(loadsi, is_nodes) if is_node]
+                iloads = [iload for iload, is_node in zip(iloads, is_nodes) if is_node]
+            if not loadsi:
+                continue
+            mags = np.array([load.mag for load in loadsi], dtype='float64')
+            vectors = np.array([load.xyz for load in loadsi], dtype='float64')
+            if load_type in ['FORCE', 'MOMENT']:
+                cids = np.array([load.Cid() for load in loadsi], dtype='int64')
+                if cids.any():
+                    vectors = model.get_coord_transforms().transform_vectors_to_global(
+                        vectors, cids)
+            vectors *= mags[:, np.newaxis]
+
+            if load_type.startswith('FORCE'):
+                inodes = _get_index(all_nids, [load.node_id for load in loadsi], 'nid')
+                forces[iloads, :] = vectors
+                moments[iloads, :] = cross(xyz[inodes, :] - p, vectors)
+            else:
+                moments[iloads, :] = vectors
+
+        elif load_type == 'PLOAD':
+            faces = []
+            for load in loadsi:
+                nodes = load.node_ids
+                if len(nodes) not in [3, 4]:
+                    msg = 'invalid number of nodes on PLOAD card; nodes=%s' % str(nodes)
+                    raise RuntimeError(msg)
+                faces.append(list(nodes) + [None] * (4 - len(nodes)))
+            pressures = np.array([load.pressure for load in loadsi], dtype='float64')
+            inodes, is_node = _get_face_index(all_nids, faces, nids_set)
+            area_normals, centroids = _get_face_area_normals(xyz, inodes)
+            # a face that is partially in nids is scaled by the fraction of its nodes
+            node_scales = is_node.sum(axis=1) / (inodes >= 0).sum(axis=1).astype('float64')
+            f = (pressures * node_scales)[:, np.newaxis] * area_normals
+            forces[iloads, :] = f
+            moments[iloads, :] = cross(centroids - p, f)
+
+        elif load_type in ['PLOAD2', 'PLOAD4']:
+            iface_loads, faces, pressures, normals, face_forces, face_moments = (
+                _get_pressure_faces(model, p, load_type, iloads, loadsi,
+                                    loadcase_ids, eids_set))
+            if faces:
+                inodes = _get_face_index(all_nids, faces)[0]
+                area_normals, centroids = _get_face_area_normals(xyz, inodes)
+                normals = np.array(normals, dtype='float64')
+                is_nvector = ~np.isnan(normals[:, 0])
+                area_normals[is_nvector, :] = (
+                    norm(area_normals[is_nvector, :], axis=1)[:, np.newaxis] *
+                    normals[is_nvector, :])
+                f = np.array(pressures, dtype='float64')[:, np.newaxis] * area_normals
+                np.add.at(forces, iface_loads, f)
+                np.add.at(moments, iface_loads, cross(centroids - p, f))
+            for iload, force, moment in zip(iloads, face_forces, face_moments):
+                forces[iload, :] += force
+                moments[iload, :] += moment
+
+        elif load_type == 'GRAV':
+            if include_grav:
+                mass, mass_centroid = _get_grav_mass(model, p, eids_set)
+                for iload, load in zip(iloads, loadsi):
+                    g = load.GravityVector()
+                    forces[iload, :] = mass * g
+                    moments[iload, :] = cross(mass_centroid, g)
+
+        elif load_type in SCALAR_LOADS:
+            xyz_dict = {nid : np.array(xyzi) for nid, xyzi in zip(all_nids.tolist(), xyz.tolist())}
+            for iload, load in zip(iloads, loadsi):
+                if eids_set is not None and load.eid not in eids_set:
+                    continue
+                forces[iload, :], moments[iload, :] = _sum_forces_moments_loads(
+                    model, p, [load], [1.], xyz_dict, loadcase_ids[iload])
+        else:
+            # we collect them so we only get one print
+            unsupported_types.add(load_type)
+
+    for load_type in sorted(unsupported_types):
+        model.log.debug('loadtype=%r not supported' % load_type)
+    return forces, moments
+
+
+def _get_face_index(all_nids, faces, nids_set=None):
+    """
+    Gets the node index of a series of 3/4 node faces
+
+    Parameters
+    ----------
+    all_nids : (nnodes, ) int ndarray
+        the sorted node ids
+    faces : List[List[int/None]]
+        the 4 node ids of each face; None for the 4th node of a triangle
+    nids_set : Set[int]; default=None
+        the nodes that are included
+
+    Returns
+    -------
+    inodes : (nfaces, 4) int ndarray
+        the index of each node; -1 for the 4th node of a triangle
+    is_node : (nfaces, 4) bool ndarray
+        is the node in nids_set
+    """
+    nfaces = len(faces)
+    face_nids = np.array([[0 if nid is None else nid for nid in face] for face in faces],
+                         dtype='int64').reshape(nfaces, 4)
+    is_tri = np.array([face[3] is None for face in faces], dtype='bool')
+    inodes = np.full((nfaces, 4), -1, dtype='int64')
+    inodes[:, :3] = _get_index(all_nids, face_nids[:, :3].ravel(), 'nid').reshape(nfaces, 3)
+    inodes[~is_tri, 3] = _get_index(all_nids, face_nids[~is_tri, 3], 'nid')
+
+    if nids_set is None:
+        is_node = inodes >= 0
+    else:
+        is_node = np.array([[nid in nids_set for nid in face] for face in faces],
+                           dtype='bool').reshape(nfaces, 4)
+    return inodes, is_node
+
+
+def _get_pressure_faces(model, p, load_type, iloads, loads, loadcase_ids, eids_set=None):
+    """
+    Gets the element faces that are loaded by a series of PLOAD2/PLOAD4s
+
+    Returns
+    -------
+    iface_loads : List[int]
+        the load of each shell face
+    faces : List[List[int/None]]
+        the 4 node ids of each shell face (see _get_face_index)
+    pressures : List[float]
+        the pressure on each shell face
+    normals : List[(3, ) float ndarray]
+        the PLOAD4 NVECTOR of each shell face; NaN for the element normal
+    face_forces / face_moments : List[(3, ) float ndarray]
+        the force/moment of the solid faces of each load
+    """
+    nan_normal = np.full(3, np.nan)
+    iface_loads = []
+    faces = []
+    pressures = []
+    normals = []
+    face_forces = []
+    face_moments = []
+    for iload, load in zip(iloads, loads):
+        force = np.zeros(3, dtype='float64')
+        moment = np.zeros(3, dtype='float64')
+        face_forces.append(force)
+        face_moments.append(moment)
+        if load_type == 'PLOAD2':
+            shells = PLOAD2_SHELLS
+            normal = nan_normal
+            pressures_by_nface = {3 : load.pressure, 4 : load.pressure}
+        else:
+            assert load.Cid() == 0, 'Cid() = %s' % (load.Cid())
+            assert load.line_load_dir == 'NORM', 'line_load_dir = %s' % (load.line_load_dir)
+            shells = PLOAD4_SHELLS
+            normal = _get_pload4_nvector(load, nan_normal)
+            pressures_by_nface = {}
+            for nface in [3, 4]:
+                pressuresi = load.pressures[:nface]
+                if min(pressuresi) != max(pressuresi):
+                    pressures_by_nface[nface] = mean(pressuresi)
+                else:
+                    pressures_by_nface[nface] = load.pressures[0]
+
+        for eid in load.element_ids:
+            if eids_set is not None and eid not in eids_set:
+                continue
+            elem = model.elements[eid]
+            etype = elem.type
+            if etype in shells:
+                nface = shells[etype]
+                nodes = elem.node_ids[:nface]
+                iface_loads.append(iload)
+                faces.append(list(nodes) + [None] * (4 - nface))
+                pressures.append(pressures_by_nface[nface])
+                normals.append(normal)
+            elif load_type == 'PLOAD4' and etype in ['CTETRA', 'CHEXA', 'CPENTA']:
+                area, centroid, normali, nface = _get_solid_face(load, elem)
+                if not np.isnan(normal[0]):
+                    normali = normal
+                f = pressures_by_nface[nface] * area * normali
+                force += f
+                moment += cross(centroid - p, f)
+            elif load_type == 'PLOAD2':
+                model.log.warning('case=%s etype=%r loadtype=%r not supported' % (
+                    loadcase_ids[iload], etype, load_type))
+            else:
+                msg = ('case=%s eid=%s etype=%r loadtype=%r not supported'
+                       % (loadcase_ids[iload], eid, etype, load_type))
+                model.log.debug(msg)
+    return iface_loads, faces, pressures, normals, face_forces, face_moments
+
+
+def _get_pload4_nvector(load, nan_normal):
+    """gets the unit NVECTOR of a PLOAD4; NaN for the element normal"""
+    if load.surf_or_line == 'SURF':
+        if norm(load.nvector) != 0.0 or load.Cid() != 0:
+            if load.Cid() != 0:
+                raise NotImplementedError('cid=%r on a PLOAD4 is not supported\n%s' % (
+                    load.Cid(), str(load)))
+            return load.nvector / np.linalg.norm(load.nvector)
+        return nan_normal
+    msg = 'surf_or_line=%r on PLOAD4 is not supported\n%s' % (
+        load.surf_or_line, str(load))
+    raise NotImplementedError(msg)
+
+
+def _get_solid_face(load, elem):
+    """gets the area, centroid, normal and number of nodes of a PLOAD4 solid face"""
+    etype = elem.type
+    if etype == 'CTETRA':
+        face_acn = elem.get_face_area_centroid_normal(load.g1_ref.nid, load.g34_ref.nid)
+        nface = 3
+    elif etype == 'CHEXA':
+        face_acn = elem.get_face_area_centroid_normal(load.g34_ref.nid, load.g1_ref.nid)
+        nface = 4
+    else:
+        g1 = load.g1_ref.nid
+        if load.g34 is None:
+            face_acn = elem.get_face_area_centroid_normal(g1)
+            nface = 3
+        else:
+            face_acn = elem.get_face_area_centroid_normal(g1, load.g34_ref.nid)
+            nface = 4
+    unused_face, area, centroid, normal = face_acn
+    return area, centroid, normal, nface
+
+
+def _get_grav_mass(model, p, eids_set=None):
+    """
+    Gets the mass and the mass-weighted centroid (relative to p) of the
+    elements, which are loaded by a GRAV
+
+    Returns
+    -------
+    mass : float
+        the total mass
+    mass_centroid : (3, ) float ndarray
+        sum(mass_i * (centroid_i - p))
+    """
+    masses = []
+    centroids = []
+    for eid, elem in iteritems(model.elements):
+        if eids_set is not None and eid not in eids_set:
+            continue
+        centroids.append(elem.Centroid())
+        masses.append(elem.Mass())
+    if not masses:
+        return 0., np.zeros(3, dtype='float64')
+    masses = np.array(masses, dtype='float64')
+    centroids = np.array(centroids, dtype='float64').reshape(len(masses), 3)
+    return masses.sum(), masses.dot(centroids - p)
@@ -2,14 +2,22 @@
 Defines:
   - mass_poperties
       get the mass & moment of inertia of the model
+  - mass_properties_by_group
+      get the mass & moment of inertia of each property/material/set
+  - get_mass_arrays
+      get the mass & centroid of each element with arrays
+  - get_breakdowns
+      get the area, volume, mass, cg & inertia of each pid/mid/etype
 """
 from __future__ import print_function
+from collections import defaultdict
+from itertools import chain
 from six import string_types, iteritems
-from numpy import array, cross, dot
+from numpy import array, cross
 from numpy.linalg import norm  # type: ignore
 import numpy as np
 from pyNastran.utils import integer_types
-from pyNastran.utils.mathematics import integrate_positive_unit_line
+from pyNastran.bdf.mesh_utils.loads import _get_xyz_array
 
 
 def transform_inertia(mass, xyz_cg, xyz_ref, xyz_ref2, I_ref):
@@ -324,14 +332,46 @@ def _mass_properties_no_xref(model, elements, masses, reference_point):  # pragm
         cg /= mass
     return (mass, cg, I)
 
+#: the shells, where the mass is the mass/area of the property times the area
+TRI_SHELLS = ['CTRIA3', 'CTRIA6', 'CTRIAR']
+QUAD_SHELLS = ['CQUAD4', 'CQUAD8', 'CQUADR', 'CQUAD', 'CSHEAR']
+
+#: the line elements, where the mass is the mass/length times the length
+LINE_ELEMENTS = ['CROD', 'CTUBE', 'CONROD', 'CBAR', 'CBEAM']
+
+#: the solids, where the mass is rho times the volume, and the number
+#: of nodes that use the corner node geometry (e.g., a CHEXA20 has the
+#: same volume as a CHEXA8, but the CPENTA15 has its own definition)
+SOLID_ELEMENTS = {
+    'CTETRA' : [4, 10],
+    'CPENTA' : [6],
+    'CPYRAM' : [5],
+    'CHEXA' : [8, 20],
+}
+
+#: the number of nodes that define the geometry of each element type
+NCORNER_NODES = {
+    'CTRIA3' : 3, 'CTRIA6' : 3, 'CTRIAR' : 3,
+    'CQUAD4' : 4, 'CQUAD8' : 4, 'CQUADR' : 4, 'CQUAD' : 4, 'CSHEAR' : 4,
+    'CROD' : 2, 'CTUBE' : 2, 'CONROD' : 2, 'CBAR' : 2, 'CBEAM' : 2,
+    'CTETRA' : 4, 'CPENTA' : 6, 'CPYRAM' : 5, 'CHEXA' : 8,
+    'CONM2' : 1,
+}
+
+#: the arrays returned by get_mass_arrays
+MASS_ARRAY_NAMES = ['eid', 'etype', 'pid', 'mid', 'area', 'volume', 'length',
+                    'mass', 'centroid']
+
+#: the quantities that get_breakdowns calculates
+BREAKDOWN_QUANTITIES = ['area', 'volume', 'length', 'mass', 'cg', 'inertia']
+
+
 def _mass_properties_new(model, element_ids=None, mass_ids=None, reference_point=None,
-                         sym_axis=None, scale=None, xyz_cid0=None):  # pragma: no cover
+                         sym_axis=None, scale=None, xyz_cid0=None):
     """
-    half implemented, not tested, should be faster someday...
-    don't use this
-
     Caclulates mass properties in the global system about the
-    reference point.
+    reference point.  The masses and centroids are calculated with
+    arrays (see ``get_mass_arrays``).
 
     Parameters
     ----------
@@ -396,439 +436,672 @@ def _mass_properties_new(model, element_ids=None, mass_ids=None, reference_point
     Example 2
     ---------
     # mass properties of model based on Property ID
-    pids = list(model.pids.keys())
-    pid_eids = model.get_element_ids_dict_with_pids(pids)
+    pids, mass, cg, I = mass_properties_by_group(model, group_by='pid')
+    """
+    reference_point = _get_reference_point(model, reference_point)
+    mass_arrays = get_mass_arrays(model, element_ids=element_ids, mass_ids=mass_ids,
+                                  xyz_cid0=xyz_cid0)
+    mass = mass_arrays['mass']
+    igroup = np.zeros(len(mass), dtype='int32')
+    mass, cg, I = _sum_mass_groups(igroup, 1, mass, mass_arrays['centroid'],
+                                   reference_point)
+    mass, cg, I = _apply_mass_symmetry(model, sym_axis, scale, mass[0], cg[0, :], I[0, :])
+    # Ixx, Iyy, Izz, Ixy, Ixz, Iyz = I
+    return mass, cg, I
+
+def mass_properties_by_group(model, group_by='pid', element_ids=None, mass_ids=None,
+                             reference_point=None, sym_axis=None, scale=None,
+                             xyz_cid0=None):
+    """
+    Caclulates the mass properties of each group of elements/masses
+    in one call
+
+    Parameters
+    ----------
+    model : BDF()
+        a BDF object
+    group_by : str/dict; default='pid'
+        str : the elements/masses are grouped by the:
+            'pid' : property id (0 for the CONM2, CONROD, ...)
+            'mid' : material id of the property (0 for the CONM2, ...);
+                    composites use the material of the first ply
+            'etype' : element type
+        dict[key] : ids
+            the element/mass ids in each group (e.g., an element set);
+            an element can be in multiple groups
+    element_ids / mass_ids / reference_point / sym_axis / scale / xyz_cid0
+        see ``mass_properties``; the 'cg' reference point is the cg
+        of each group
+
+    Returns
+    -------
+    group_ids : (ngroups, ) ndarray
+        the sorted pids/mids/etypes or the keys of group_by
+    mass : (ngroups, ) float ndarray
+        the mass of each group
+    cg : (ngroups, 3) float ndarray
+        the cg of each group
+    I : (ngroups, 6) float ndarray
+        the moment of inertia of each group
+        [Ixx, Iyy, Izz, Ixy, Ixz, Iyz]
+
+    Example
+    -------
+    pids, mass, cg, I = mass_properties_by_group(model, group_by='pid')
+    for pid, massi in zip(pids, mass):
+        print('pid=%s mass=%s' % (pid, massi))
+    """
+    reference_point = _get_reference_point(model, reference_point)
+    mass_arrays = get_mass_arrays(model, element_ids=element_ids, mass_ids=mass_ids,
+                                  xyz_cid0=xyz_cid0)
+    group_ids, irows, igroup = _get_groups(mass_arrays, group_by)
+    mass, cg, I = _sum_mass_groups(
+        igroup, len(group_ids), mass_arrays['mass'][irows],
+        mass_arrays['centroid'][irows, :], reference_point)
+    mass, cg, I = _apply_mass_symmetry(model, sym_axis, scale, mass, cg, I)
+    return group_ids, mass, cg, I
+
+def get_breakdowns(model, group_by=('pid', 'mid', 'etype'),
+                   quantities=('area', 'volume', 'mass', 'cg', 'inertia'),
+                   element_ids=None, mass_ids=None, reference_point=None,
+                   xyz_cid0=None, mass_arrays=None):
+    """
+    Gets a breakdown of the area, volume, length, mass, cg and inertia
+    of the model in one pass
+
+    Parameters
+    ----------
+    model : BDF()
+        a BDF object
+    group_by : str / List[str]; default=('pid', 'mid', 'etype')
+        the elements/masses with the same 'pid', 'mid' and/or 'etype'
+        are summed (see ``get_mass_arrays``); () sums the whole model
+    quantities : List[str]; default=('area', 'volume', 'mass', 'cg', 'inertia')
+        the quantities to calculate
+        area : the area of the shells and the cross-sectional area of
+               the line elements (see ``BDF.get_area_breakdown``)
+        volume : the volume of the solids, the area * thickness of the
+                 shells and the length * area of the line elements
+        length : the length of the line elements
+        mass : the mass
+        cg : the cg
+        inertia : the moment of inertia about the reference point
+                  [Ixx, Iyy, Izz, Ixy, Ixz, Iyz]
+    element_ids / mass_ids / reference_point / xyz_cid0
+        see ``mass_properties``; the 'cg' reference point is the cg
+        of each group
+    mass_arrays : dict[name] : ndarray; default=None -> calculate
+        the arrays from ``get_mass_arrays``, so multiple breakdowns
+        (e.g., by property and by material) can share the geometry
+
+    Returns
+    -------
+    breakdown : (ngroups, ) structured ndarray
+        the group_by fields, the number of elements/masses
+        ('nelements') and the quantities, sorted by group
+
+    .. note:: the symmetry (AERO/AEROS) and WTMASS aren't applied
+
+    Example
+    -------
+    breakdown = get_breakdowns(model, group_by='pid', quantities=['mass', 'cg'])
+    for pid, mass, cg in breakdown[['pid', 'mass', 'cg']]:
+        print('pid=%s mass=%s cg=%s' % (pid, mass, cg))
+    """
+    if isinstance(group_by, string_types):
+        group_by = [group_by]
+    if isinstance(quantities, string_types):
+        quantities = [quantities]
+    for name in group_by:
+        if name not in ['pid', 'mid', 'etype']:
+            raise ValueError("group_by=%s and must be 'pid', 'mid', 'etype'" % str(group_by))
+    for name in quantities:
+        if name not in BREAKDOWN_QUANTITIES:
+            raise ValueError('quantities=%s; allowed=%s' % (
+                str(quantities), BREAKDOWN_QUANTITIES))
+
+    reference_point = _get_reference_point(model, reference_point)
+    if mass_arrays is None:
+        mass_arrays = get_mass_arrays(model, element_ids=element_ids, mass_ids=mass_ids,
+                                      xyz_cid0=xyz_cid0)
+    nrows = len(mass_arrays['eid'])
+    if group_by:
+        keys = np.empty(nrows, dtype=[(name, mass_arrays[name].dtype) for name in group_by])
+        for name in group_by:
+            keys[name] = mass_arrays[name]
+        group_keys, igroup = np.unique(keys, return_inverse=True)
+        igroup = igroup.ravel()
+        ngroups = len(group_keys)
+    else:
+        igroup = np.zeros(nrows, dtype='int32')
+        ngroups = 1
+
+    dtype = [(name, mass_arrays[name].dtype) for name in group_by]
+    dtype.append(('nelements', 'int32'))
+    for name in quantities:
+        if name == 'cg':
+            dtype.append(('cg', 'float64', (3, )))
+        elif name == 'inertia':
+            dtype.append(('inertia', 'float64', (6, )))
+        else:
+            dtype.append((name, 'float64'))
+
+    breakdown = np.zeros(ngroups, dtype=dtype)
+    for name in group_by:
+        breakdown[name] = group_keys[name]
+    breakdown['nelements'] = np.bincount(igroup, minlength=ngroups)
+    for name in ['area', 'volume', 'length']:
+        if name in quantities:
+            values = np.nan_to_num(mass_arrays[name])
+            breakdown[name] = np.bincount(igroup, weights=values, minlength=ngroups)
+
+    if 'mass' in quantities or 'cg' in quantities or 'inertia' in quantities:
+        mass, cg, I = _sum_mass_groups(igroup, ngroups, mass_arrays['mass'],
+                                       mass_arrays['centroid'], reference_point)
+        for name, values in [('mass', mass), ('cg', cg), ('inertia', I)]:
+            if name in quantities:
+                breakdown[name] = values
+    return breakdown
+
+def _get_reference_point(model, reference_point):
+    """gets the reference point as an array or 'cg'"""
+    if reference_point is None:
+        reference_point = np.zeros(3, dtype='float64')
+    elif isinstance(reference_point, integer_types):
+        reference_point = model.nodes[reference_point].get_position()
+    elif isinstance(reference_point, string_types):
+        if reference_point != 'cg':
+            raise ValueError("reference_point=%r and must be 'cg'" % reference_point)
+    else:
+        reference_point = np.asarray(reference_point, dtype='float64')
+    return reference_point
+
+def _get_groups(mass_arrays, group_by):
+    """
+    Gets the rows of the mass arrays in each group
+
+    Returns
+    -------
+    group_ids : (ngroups, ) ndarray
+        the name of each group
+    irows : (nrows, ) int ndarray
+        the rows of the mass arrays; a row may be used more than once
+    igroup : (nrows, ) int ndarray
+        the group of each row
+    """
+    if isinstance(group_by, dict):
+        group_ids = np.array(list(group_by.keys()))
+        irows = []
+        igroups = []
+        eids = mass_arrays['eid']
+        for igroup, key in enumerate(group_ids.tolist()):
+            ids = group_by[key]
+            if isinstance(ids, integer_types):
+                ids = [ids]
+            irow = np.where(np.isin(eids, np.asarray(list(ids), dtype=eids.dtype)))[0]
+            irows.append(irow)
+            igroups.append(np.full(len(irow), igroup, dtype='int32'))
+        if irows:
+            irows = np.hstack(irows)
+            igroup = np.hstack(igroups)
+        else:
+            irows = igroup = np.zeros(0, dtype='int32')
+        return group_ids, irows, igroup
+
+    if group_by not in ['pid', 'mid', 'etype']:
+        raise ValueError("group_by=%r and must be 'pid', 'mid', 'etype' or a "
+                         "dictionary of ids" % group_by)
+    group_ids, igroup = np.unique(mass_arrays[group_by], return_inverse=True)
+    irows = np.arange(len(igroup))
+    return group_ids, irows, igroup.ravel()
 
-    for pid, eids in sorted(iteritems(pid_eids)):
-        mass, cg, I = mass_properties(model, element_ids=eids)
+def _sum_mass_groups(igroup, ngroups, mass, centroid, reference_point):
     """
-    #if reference_point is None:
-    reference_point = array([0., 0., 0.])
+    Sums the mass, cg and inertia of each group about the reference
+    point (or the cg of the group)
+    """
+    mass_group = np.zeros(ngroups, dtype='float64')
+    mass_group += np.bincount(igroup, weights=mass, minlength=ngroups)
+    cg = np.zeros((ngroups, 3), dtype='float64')
+    for i in range(3):
+        cg[:, i] = np.bincount(igroup, weights=mass * centroid[:, i], minlength=ngroups)
+    is_mass = mass_group != 0.
+    cg[is_mass, :] /= mass_group[is_mass, np.newaxis]
 
-    if xyz_cid0 is None:
-        xyz = {}
-        for nid, node in iteritems(model.nodes):
-            xyz[nid] = node.get_position()
+    if isinstance(reference_point, string_types):
+        dxyz = centroid - cg[igroup, :]
     else:
-        xyz = xyz_cid0
-
-    elements, masses = _mass_properties_elements_init(model, element_ids, mass_ids)
-
-    #mass = 0.
-    #cg = array([0., 0., 0.])
-    #I = array([0., 0., 0., 0., 0., 0., ])
-    #if isinstance(reference_point, string_types):
-        #if reference_point == 'cg':
-            #mass = 0.
-            #for pack in [elements, masses]:
-                #for element in pack:
-                    #try:
-                        #p = element.Centroid()
-                        #m = element.Mass()
-                        #mass += m
-                        #cg += m * p
-                    #except:
-                        #pass
-            #if mass == 0.0:
-                #return mass, cg, I
+        dxyz = centroid - reference_point
+    x = dxyz[:, 0]
+    y = dxyz[:, 1]
+    z = dxyz[:, 2]
+    x2 = x * x
+    y2 = y * y
+    z2 = z * z
+    I = np.zeros((ngroups, 6), dtype='float64')
+    for i, r2 in enumerate([y2 + z2, x2 + z2, x2 + y2, x * y, x * z, y * z]):
+        I[:, i] = np.bincount(igroup, weights=mass * r2, minlength=ngroups)
+    return mass_group, cg, I
+
+def get_mass_arrays(model, element_ids=None, mass_ids=None, xyz_cid0=None):
+    """
+    Gets the mass and centroid of each element/mass with arrays.
 
-            #reference_point = cg / mass
-        #else:
-            ## reference_point = [0.,0.,0.] or user-defined array
-            #pass
+    The shells, solids, rods, bars, beams and CONM2s (cid=0) are
+    gathered by type and their geometry is calculated with arrays.
+    The remaining elements use their Mass() and Centroid() methods.
+    The elements with a failed centroid are skipped and the elements
+    with a failed mass (e.g., a PLPLANE) have a mass of 0, which
+    doesn't change the mass properties.
 
-    mass = 0.
-    cg = array([0., 0., 0.])
-    I = array([0., 0., 0., 0., 0., 0., ])
+    Parameters
+    ----------
+    model : BDF()
+        a cross-referenced BDF object
+    element_ids : list[int]; (n, ) ndarray, optional
+        An array of element ids.
+    mass_ids : list[int]; (n, ) ndarray, optional
+        An array of mass ids.
+    xyz_cid0 : dict[nid] : xyz; default=None -> auto-calculate
+        mapping of the node id to the global position
+
+    Returns
+    -------
+    mass_arrays : dict[name] : ndarray
+        eid : (n, ) int ndarray
+            the element/mass id
+        etype : (n, ) str ndarray
+            the card type
+        pid : (n, ) int ndarray
+            the property id (0 for the CONM2, CONROD, ...)
+        mid : (n, ) int ndarray
+            the material id of the property (0 for the CONM2, ...);
+            composites use the material of the first ply
+        area : (n, ) float ndarray
+            the area of the shells and the cross-sectional area of the
+            line elements (nan for the other elements)
+        volume : (n, ) float ndarray
+            the volume of the solids, the area * thickness of the
+            shells and the length * area of the line elements (nan
+            for the other elements)
+        length : (n, ) float ndarray
+            the length of the line elements (nan for the other elements)
+        mass : (n, ) float ndarray
+            the mass
+        centroid : (n, 3) float ndarray
+            the centroid in the global frame
+    """
+    elements, masses = _get_mass_cards(model, element_ids, mass_ids)
+    nids, xyz = _get_xyz_array(model, xyz_cid0)
+
+    cards_by_type = defaultdict(list)
+    for card in chain(elements, masses):
+        cards_by_type[card.type].append(card)
+
+    arrays = []
+    cards_by_method = []
+    for etype, cards in sorted(iteritems(cards_by_type)):
+        if etype in NCORNER_NODES:
+            arraysi, cards = _get_type_mass_arrays(etype, cards, nids, xyz)
+            if arraysi is not None:
+                arrays.append(arraysi)
+        cards_by_method.extend(cards)
+    if cards_by_method:
+        arrays.append(_get_card_mass_arrays(model, cards_by_method))
+
+    if not arrays:
+        mass_arrays = {
+            'eid' : np.zeros(0, dtype='int32'),
+            'etype' : np.zeros(0, dtype='|U8'),
+            'pid' : np.zeros(0, dtype='int32'),
+            'mid' : np.zeros(0, dtype='int32'),
+            'area' : np.zeros(0, dtype='float64'),
+            'volume' : np.zeros(0, dtype='float64'),
+            'length' : np.zeros(0, dtype='float64'),
+            'mass' : np.zeros(0, dtype='float64'),
+            'centroid' : np.zeros((0, 3), dtype='float64'),
+        }
+        return mass_arrays
+
+    mass_arrays = {}
+    for i, name in enumerate(MASS_ARRAY_NAMES):
+        mass_arrays[name] = np.concatenate([arraysi[i] for arraysi in arrays])
+    return mass_arrays
+
+def _get_mass_cards(model, element_ids, mass_ids):
+    """
+    Gets the elements and masses to consider, which is the same as
+    ``_mass_properties_elements_init``, but faster for long lists
+    """
+    if isinstance(element_ids, integer_types):
+        element_ids = [element_ids]
+    if isinstance(mass_ids, integer_types):
+        mass_ids = [mass_ids]
+
+    if element_ids is None and mass_ids is None:
+        return list(model.elements.values()), list(model.masses.values())
+
+    elements = []
+    masses = []
+    if element_ids is not None:
+        elements = [model.elements[eid] for eid in sorted(set(element_ids))
+                    if eid in model.elements]
+    if mass_ids is not None:
+        masses = [model.masses[eid] for eid in sorted(set(mass_ids))
+                  if eid in model.masses]
+    return elements, masses
+
+def _get_type_mass_arrays(etype, cards, nids, xyz):
+    """
+    Gets the mass arrays for a single element type
 
-    no_mass = [
-        'CELAS1', 'CELAS2', 'CELAS3', 'CELAS4', #'CLEAS5',
-        'CDAMP1', 'CDAMP2', 'CDAMP3', 'CDAMP4', 'CDAMP5',
-        'CBUSH', 'CBUSH1D', 'CBUSH2D', 'CVISC', 'CGAP', # is this right?
-        'CFAST',
-        'CRAC2D', 'CRAC3D',
-
-        'CSSCHD', 'CAERO1', 'CAERO2', 'CAERO3', 'CAERO4', 'CAERO5',
-        'CBARAO', 'CORD1R', 'CORD2R', 'CORD1C', 'CORD2C', 'CORD1S', 'CORD2S',
-        'CORD3G', 'CONV', 'CONVM', 'CSET', 'CSET1', 'CLOAD',
-        'CHBDYG', 'CHBDYE', 'CHBDYP',
-
-        'CTRAX3', 'CTRAX6', 'CQUADX8', 'CQUADX4',
-        'CPLSTN3', 'CPLSTN6', 'CPLSTN4', 'CPLSTN8',
-    ]
-    all_eids = np.array(list(model.elements.keys()), dtype='int32')
-    all_eids.sort()
-
-    all_mass_ids = np.array(list(model.masses.keys()), dtype='int32')
-    all_mass_ids.sort()
-
-    #def _increment_inertia0(centroid, reference_point, m, mass, cg, I):
-        #"""helper method"""
-        #(x, y, z) = centroid - reference_point
-        #mass += m
-        #cg += m * centroid
-        #return mass
-
-    def _increment_inertia(centroid, reference_point, m, mass, cg, I):
-        """helper method"""
-        (x, y, z) = centroid - reference_point
-        x2 = x * x
-        y2 = y * y
-        z2 = z * z
-        I[0] += m * (y2 + z2)  # Ixx
-        I[1] += m * (x2 + z2)  # Iyy
-        I[2] += m * (x2 + y2)  # Izz
-        I[3] += m * x * y      # Ixy
-        I[4] += m * x * z      # Ixz
-        I[5] += m * y * z      # Iyz
-        mass += m
-        cg += m * centroid
-        return mass
-
-    def get_sub_eids(all_eids, eids):
-        """supports limiting the element/mass ids"""
-        eids = np.array(eids)
-        ieids = np.searchsorted(all_eids, eids)
-        eids2 = eids[all_eids[ieids] == eids]
-        return eids2
-
-    etypes_skipped = set([])
-    for etype, eids in iteritems(model._type_to_id_map):
-        if etype in no_mass:
+    Returns
+    -------
+    arrays : tuple(eid, etype, pid, mid, area, volume, length, mass, centroid)
+        the mass arrays; None if no cards were calculated
+    cards_by_method : List[card]
+        the cards that use their Mass() and Centroid() methods (e.g., a
+        CPENTA15 or a PLPLANE CQUAD4)
+    """
+    nnodes = NCORNER_NODES[etype]
+    properties = {}
+    cards_by_method = []
+    eids = []
+    pids = []
+    mids = []
+    values = []
+    sections = []
+    node_ids = []
+    offsets = []
+    for card in cards:
+        try:
+            pid, mid, value, section = _get_mass_per_unit(card, etype, properties)
+            nidsi = card.node_ids
+        except Exception:
+            value = None
+        if value is None or (
+                etype in SOLID_ELEMENTS and len(nidsi) not in SOLID_ELEMENTS[etype]):
+            cards_by_method.append(card)
             continue
-        elif len(eids) == 0:
+        nidsi = nidsi[:nnodes]
+        if None in nidsi:
+            cards_by_method.append(card)
             continue
-        elif etype in ['CROD', 'CONROD']:
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2 = elem.node_ids
-                length = norm(xyz[n2] - xyz[n1])
-                centroid = (xyz[n1] + xyz[n2]) / 2.
-                mpl = elem.MassPerLength()
-                m = mpl * length
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-        elif etype == 'CTUBE':
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2 = elem.node_ids
-                length = norm(xyz[n2] - xyz[n1])
-                centroid = (xyz[n1] + xyz[n2]) / 2.
-                mpl = elem.pid_ref.MassPerLength()
-                m = mpl * length
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-        elif etype == 'CBAR':
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2 = elem.node_ids
-                centroid = (xyz[n1] + xyz[n2]) / 2.
-                length = norm(xyz[n2] - xyz[n1])
-                mpl = elem.pid_ref.MassPerLength()
-                m = mpl * length
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-        elif etype == 'CBEAM':
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                prop = elem.pid_ref
-                n1, n2 = elem.node_ids
-                node1 = xyz[n1]
-                node2 = xyz[n2]
-                centroid = (node1 + node2) / 2.
-                length = norm(node2 - node1)
-                #cda = model.nodes[n1].cid_ref
-                #cdb = model.nodes[n2].cid_ref
-
-                is_failed, out = elem.get_axes(model)
-                if is_failed:
-                    model.log.error(out)
-                    raise RuntimeError(out)
-                wa, wb, _ihat, jhat, khat = out
-                p1 = node1 + wa
-                p2 = node2 + wb
-                if prop.type == 'PBEAM':
-                    rho = prop.Rho()
-                    mass_per_lengths = []
-                    nsm_per_lengths = []
-                    for (area, nsm) in zip(prop.A, prop.nsm):
-                        mass_per_lengths.append(area * rho)
-                        nsm_per_lengths.append(nsm)
-                    mass_per_length = integrate_positive_unit_line(prop.xxb, mass_per_lengths)
-                    nsm_per_length = integrate_positive_unit_line(prop.xxb, nsm_per_lengths)
-                    #nsm = np.mean(prop.nsm)
-                    nsm = nsm_per_length * length
-                    m = mass_per_length * length
-                    nsm_n1 = (p1 + jhat * prop.m1a + khat * prop.m2a)
-                    nsm_n2 = (p2 + jhat * prop.m1b + khat * prop.m2b)
-                    nsm_centroid = (nsm_n1 + nsm_n2) / 2.
-                    #if nsm != 0.:
-                        #p1_nsm = p1 + prop.ma
-                        #p2_nsm = p2 + prop.mb
-                elif prop.type == 'PBEAML':
-                    #mass_per_lengths = elem.get_mass_per_lengths()
-                    mass_per_length = prop.MassPerLength() # includes simplified nsm
-                    m = mass_per_length * length
-                    nsm_centroid = np.zeros(3)
-                    nsm = prop.nsm[0]  # TODO: simplified
-                elif prop.type == 'PBCOMP':
-                    mass_per_length = prop.MassPerLength()
-                    m = mass_per_length * length
-                    nsm = prop.nsm
-                    nsm_n1 = (p1 + jhat * prop.m1 + khat * prop.m2)
-                    nsm_n2 = (p2 + jhat * prop.m1 + khat * prop.m2)
-                    nsm_centroid = (nsm_n1 + nsm_n2) / 2.
-                elif prop.type == 'PBMSECT':
-                    continue
-                    #mass_per_length = prop.MassPerLength()
-                    #m = mass_per_length * length
-                    #nsm = prop.nsm
-                else:
-                    raise NotImplementedError(prop.type)
-
-                #mpl = elem.pid_ref.MassPerLength()
-                #m = mpl * length
-
-                (x, y, z) = centroid - reference_point
-                (xm, ym, zm) = nsm_centroid - reference_point
-                x2 = x * x
-                y2 = y * y
-                z2 = z * z
-                xm2 = xm * xm
-                ym2 = ym * ym
-                zm2 = zm * zm
-
-                # Ixx, Iyy, Izz, Ixy, Ixz, Iyz
-                I[0] += m * (y2 + z2) + nsm * (ym2 + zm2)
-                I[1] += m * (x2 + z2) + nsm * (xm2 + zm2)
-                I[2] += m * (x2 + y2) + nsm * (xm2 + ym2)
-                I[3] += m * x * y + nsm * xm * ym
-                I[4] += m * x * z + nsm * xm * zm
-                I[5] += m * y * z + nsm * ym * zm
-                mass += m + nsm
-                cg += m * centroid + nsm * nsm_centroid
-
-        elif etype in ['CTRIA3', 'CTRIA6', 'CTRIAR']:
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2, n3 = elem.node_ids[:3]
-                prop = elem.pid_ref
-                centroid = (xyz[n1] + xyz[n2] + xyz[n3]) / 3.
-                area = 0.5 * norm(cross(xyz[n1] - xyz[n2], xyz[n1] - xyz[n3]))
-                if prop.type == 'PSHELL':
-                    tflag = elem.tflag
-                    ti = prop.Thickness()
-                    if tflag == 0:
-                        # absolute
-                        t1 = elem.T1 if elem.T1 else ti
-                        t2 = elem.T2 if elem.T2 else ti
-                        t3 = elem.T3 if elem.T3 else ti
-                    elif tflag == 1:
-                        # relative
-                        t1 = elem.T1 * ti if elem.T1 else ti
-                        t2 = elem.T2 * ti if elem.T2 else ti
-                        t3 = elem.T3 * ti if elem.T3 else ti
-                    else:
-                        raise RuntimeError('tflag=%r' % tflag)
-                    assert t1 + t2 + t3 > 0., 't1=%s t2=%s t3=%s' % (t1, t2, t3)
-                    t = (t1 + t2 + t3) / 3.
-
-                    # m/A = rho * A * t + nsm
-                    #mass_per_area = elem.nsm + rho * elem.t
-
-                    mpa = prop.nsm + prop.Rho() * t
-                    #mpa = elem.pid_ref.MassPerArea()
-                    m = mpa * area
-                elif prop.type in ['PCOMP', 'PCOMPG']:
-                    # PCOMP, PCOMPG
-                    #rho_t = prop.get_rho_t()
-                    #nsm = prop.nsm
-                    #rho_t = [mat.Rho() * t for (mat, t) in zip(prop.mids_ref, prop.ts)]
-                    #mpa = sum(rho_t) + nsm
-
-                    # works for PCOMP
-                    # F:\Program Files\Siemens\NXNastran\nxn10p1\nxn10p1\nast\tpl\cqr3compbuck.dat
-                    mpa = prop.get_mass_per_area()
-                elif prop.type == 'PLPLANE':
-                    continue
-                else:
-                    raise NotImplementedError(prop.type)
-                m = area * mpa
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-        elif etype in ['CQUAD4', 'CQUAD8', 'CQUADR']:
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2, n3, n4 = elem.node_ids[:4]
-                prop = elem.pid_ref
-                centroid = (xyz[n1] + xyz[n2] + xyz[n3] + xyz[n4]) / 4.
-                area = 0.5 * norm(cross(xyz[n3] - xyz[n1], xyz[n4] - xyz[n2]))
-
-                if prop.type == 'PSHELL':
-                    tflag = elem.tflag
-                    ti = prop.Thickness()
-                    if tflag == 0:
-                        # absolute
-                        t1 = elem.T1 if elem.T1 else ti
-                        t2 = elem.T2 if elem.T2 else ti
-                        t3 = elem.T3 if elem.T3 else ti
-                        t4 = elem.T4 if elem.T4 else ti
-                    elif tflag == 1:
-                        # relative
-                        t1 = elem.T1 * ti if elem.T1 else ti
-                        t2 = elem.T2 * ti if elem.T2 else ti
-                        t3 = elem.T3 * ti if elem.T3 else ti
-                        t4 = elem.T4 * ti if elem.T4 else ti
-                    else:
-                        raise RuntimeError('tflag=%r' % tflag)
-                    assert t1 + t2 + t3 + t4 > 0., 't1=%s t2=%s t3=%s t4=%s' % (t1, t2, t3, t4)
-                    t = (t1 + t2 + t3 + t4) / 4.
-
-                    # m/A = rho * A * t + nsm
-                    #mass_per_area = model.nsm + rho * model.t
-
-                    mpa = prop.nsm + prop.Rho() * t
-                    #mpa = elem.pid_ref.MassPerArea()
-                    #m = mpa * area
-                elif prop.type in ['PCOMP', 'PCOMPG']:
-                    # PCOMP, PCOMPG
-                    #rho_t = prop.get_rho_t()
-                    #nsm = prop.nsm
-                    #rho_t = [mat.Rho() * t for (mat, t) in zip(prop.mids_ref, prop.ts)]
-                    #mpa = sum(rho_t) + nsm
-                    mpa = prop.get_mass_per_area()
-                elif prop.type == 'PLPLANE':
-                    continue
-                    #raise NotImplementedError(prop.type)
-                else:
-                    raise NotImplementedError(prop.type)
-                m = area * mpa
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-        elif etype == 'CQUAD':
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2, n3, n4 = elem.node_ids[:4]
-                prop = elem.pid_ref
-                centroid = (xyz[n1] + xyz[n2] + xyz[n3] + xyz[n4]) / 4.
-                area = 0.5 * norm(cross(xyz[n3] - xyz[n1], xyz[n4] - xyz[n2]))
-
-                if prop.type == 'PSHELL':
-                    t = prop.Thickness()
-                    mpa = prop.nsm + prop.Rho() * t
-                elif prop.type in ['PCOMP', 'PCOMPG']:
-                    mpa = prop.get_mass_per_area()
-                elif prop.type == 'PLPLANE':
-                    continue
-                    #raise NotImplementedError(prop.type)
-                else:
-                    raise NotImplementedError(prop.type)
-                m = area * mpa
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-
-        elif etype == 'CSHEAR':
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2, n3, n4 = elem.node_ids
-                prop = elem.pid_ref
-                centroid = (xyz[n1] + xyz[n2] + xyz[n3] + xyz[n4]) / 4.
-                area = 0.5 * norm(cross(xyz[n3] - xyz[n1], xyz[n4] - xyz[n2]))
-                mpa = prop.MassPerArea()
-                m = area * mpa
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-        elif etype in ['CONM1', 'CONM2', 'CMASS1', 'CMASS2', 'CMASS3', 'CMASS4']:
-            eids2 = get_sub_eids(all_mass_ids, eids)
-            for eid in eids2:
-                elem = model.masses[eid]
-                m = elem.Mass()
-                centroid = elem.Centroid()
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-        elif etype == 'CTETRA':
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2, n3, n4 = elem.node_ids[:4]
-                centroid = (xyz[n1] + xyz[n2] + xyz[n3] + xyz[n4]) / 4.
-                #V = -dot(n1 - n4, cross(n2 - n4, n3 - n4)) / 6.
-                volume = -dot(xyz[n1] - xyz[n4], cross(xyz[n2] - xyz[n4], xyz[n3] - xyz[n4])) / 6.
-                m = elem.Rho() * volume
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-        elif etype == 'CPYRAM':
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2, n3, n4, n5 = elem.node_ids[:5]
-                centroid1 = (xyz[n1] + xyz[n2] + xyz[n3] + xyz[n4]) / 4.
-                area1 = 0.5 * norm(cross(xyz[n3]-xyz[n1], xyz[n4]-xyz[n2]))
-                centroid5 = xyz[n5]
-                centroid = (centroid1 + centroid5) / 2.
-                volume = area1 / 3. * norm(centroid1 - centroid5)
-                m = elem.Rho() * volume
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-        elif etype == 'CPENTA':
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2, n3, n4, n5, n6 = elem.node_ids[:6]
-                area1 = 0.5 * norm(cross(xyz[n3] - xyz[n1], xyz[n2] - xyz[n1]))
-                area2 = 0.5 * norm(cross(xyz[n6] - xyz[n4], xyz[n5] - xyz[n4]))
-                centroid1 = (xyz[n1] + xyz[n2] + xyz[n3]) / 3.
-                centroid2 = (xyz[n4] + xyz[n5] + xyz[n6]) / 3.
-                centroid = (centroid1 + centroid2) / 2.
-                volume = (area1 + area2) / 2. * norm(centroid1 - centroid2)
-                m = elem.Rho() * volume
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-
-        elif etype == 'CHEXA':
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-                n1, n2, n3, n4, n5, n6, n7, n8 = elem.node_ids[:8]
-                #(A1, c1) = area_centroid(n1, n2, n3, n4)
-                centroid1 = (xyz[n1] + xyz[n2] + xyz[n3] + xyz[n4]) / 4.
-                area1 = 0.5 * norm(cross(xyz[n3] - xyz[n1], xyz[n4] - xyz[n2]))
-                #(A2, c2) = area_centroid(n5, n6, n7, n8)
-                centroid2 = (xyz[n5] + xyz[n6] + xyz[n7] + xyz[n8]) / 4.
-                area2 = 0.5 * norm(cross(xyz[n7] - xyz[n5], xyz[n8] - xyz[n6]))
-
-                volume = (area1 + area2) / 2. * norm(centroid1 - centroid2)
-                m = elem.Rho() * volume
-                centroid = (centroid1 + centroid2) / 2.
-                mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-
-        elif etype == 'CBEND':
-            model.log.info('elem.type=%s doesnt have mass' % etype)
+        eids.append(card.eid)
+        pids.append(pid)
+        mids.append(mid)
+        values.append(value)
+        sections.append(section)
+        node_ids.append(nidsi)
+        if etype == 'CONM2':
+            offsets.append(card.X)
+
+    if len(eids) == 0:
+        return None, cards_by_method
+
+    eids = np.array(eids, dtype='int32')
+    node_ids = np.array(node_ids, dtype='int64').reshape(len(eids), nnodes)
+    inodes = np.searchsorted(nids, node_ids)
+    inodes[inodes == len(nids)] = 0
+    is_valid = (nids[inodes] == node_ids).all(axis=1) if len(nids) else (
+        np.zeros(len(eids), dtype='bool'))
+    if not is_valid.all():
+        # missing nodes are handled by the Mass()/Centroid() methods
+        missing_eids = set(eids[~is_valid].tolist())
+        cards_by_method += [card for card in cards if card.eid in missing_eids]
+        eids = eids[is_valid]
+        inodes = inodes[is_valid, :]
+        if len(eids) == 0:
+            return None, cards_by_method
+    pids = np.array(pids, dtype='int32')[is_valid]
+    mids = np.array(mids, dtype='int32')[is_valid]
+    values = np.array(values, dtype='float64')[is_valid]
+    sections = np.array(sections, dtype='float64')[is_valid]
+
+    neids = len(eids)
+    area = np.full(neids, np.nan, dtype='float64')
+    volume = np.full(neids, np.nan, dtype='float64')
+    length = np.full(neids, np.nan, dtype='float64')
+    positions = [xyz[inodes[:, i], :] for i in range(nnodes)]
+    if etype in TRI_SHELLS:
+        n1, n2, n3 = positions
+        area = 0.5 * norm(cross(n1 - n2, n1 - n3), axis=1)
+        centroid = (n1 + n2 + n3) / 3.
+        volume = area * sections
+        mass = values * area
+    elif etype in QUAD_SHELLS:
+        n1, n2, n3, n4 = positions
+        area = 0.5 * norm(cross(n3 - n1, n4 - n2), axis=1)
+        centroid = (n1 + n2 + n3 + n4) / 4.
+        volume = area * sections
+        mass = values * area
+    elif etype in LINE_ELEMENTS:
+        n1, n2 = positions
+        length = norm(n2 - n1, axis=1)
+        centroid = (n1 + n2) / 2.
+        area = sections
+        volume = length * sections
+        mass = values * length
+    elif etype == 'CONM2':
+        offsets = np.array(offsets, dtype='float64').reshape(len(values), 3)[is_valid, :]
+        centroid = positions[0] + offsets
+        mass = values
+    else:
+        volume, centroid = _get_solid_volume_centroid(etype, positions)
+        mass = values * volume
+    etypes = np.full(neids, etype, dtype='|U8')
+    return (eids, etypes, pids, mids, area, volume, length, mass, centroid), cards_by_method
+
+def _get_mass_per_unit(card, etype, properties):
+    """
+    Gets the mass per unit area/volume/length (or the mass of a CONM2)
+
+    Parameters
+    ----------
+    card : Element()
+        the element/mass
+    etype : str
+        the card type
+    properties : dict[pid] = (mid, value, section)
+        the values of the properties that have been found
+
+    Returns
+    -------
+    pid : int
+        the property id (0 for CONROD/CONM2)
+    mid : int
+        the material id of the property
+    value : float / None
+        the mass/area, rho, mass/length (or mass);
+        None if the Mass() method should be used
+    section : float
+        the thickness of a shell or the cross-sectional area of a line
+        element; nan for the other elements or if it's not defined
+    """
+    if etype == 'CONROD':
+        return 0, _get_mid(card), card.MassPerLength(), _get_section(card, etype)
+    elif etype == 'CONM2':
+        if card.Cid() != 0:
+            return 0, 0, None, np.nan
+        return 0, 0, card.Mass(), np.nan
+
+    pid = card.Pid()
+    if pid in properties:
+        mid, value, section = properties[pid]
+        return pid, mid, value, section
+
+    prop = card.pid_ref
+    if etype in TRI_SHELLS or etype in QUAD_SHELLS:
+        value = prop.MassPerArea()
+    elif etype in SOLID_ELEMENTS:
+        value = card.Rho()
+    elif etype == 'CROD':
+        value = card.Rho() * card.Area() + card.Nsm()
+    else:
+        # CTUBE, CBAR, CBEAM
+        value = prop.MassPerLength()
+
+    mid = _get_mid(card)
+    section = _get_section(card, etype)
+    properties[pid] = (mid, value, section)
+    return pid, mid, value, section
+
+def _get_section(card, etype):
+    """
+    Gets the thickness of a shell or the cross-sectional area of a line
+    element; nan for a solid or if it's not defined
+    """
+    try:
+        if etype in LINE_ELEMENTS:
+            section = card.Area()
+        elif etype in TRI_SHELLS or etype in QUAD_SHELLS:
+            prop = card.pid_ref
+            section = prop.Thickness() if hasattr(prop, 'Thickness') else prop.t
+        else:
+            section = np.nan
+        section = float(section)
+    except Exception:
+        section = np.nan
+    return section
+
+def _get_solid_volume_centroid(etype, positions):
+    """
+    Gets the volume and centroid of the CTETRA, CPENTA, CPYRAM and
+    CHEXA elements (see the Volume() and Centroid() methods)
+    """
+    if etype == 'CTETRA':
+        n1, n2, n3, n4 = positions
+        volume = -(np.einsum('ij,ij->i', n1 - n4, cross(n2 - n4, n3 - n4))) / 6.
+        centroid = (n1 + n2 + n3 + n4) / 4.
+    elif etype == 'CPENTA':
+        n1, n2, n3, n4, n5, n6 = positions
+        area1 = 0.5 * norm(cross(n3 - n1, n2 - n1), axis=1)
+        area2 = 0.5 * norm(cross(n6 - n4, n5 - n4), axis=1)
+        c1 = (n1 + n2 + n3) / 3.
+        c2 = (n4 + n5 + n6) / 3.
+        volume = np.abs((area1 + area2) / 2. * norm(c1 - c2, axis=1))
+        centroid = (c1 + c2) / 2.
+    elif etype == 'CPYRAM':
+        n1, n2, n3, n4, n5 = positions
+        area1, c1 = _quad_area_centroid(n1, n2, n3, n4)
+        volume = np.abs(area1 / 3. * norm(c1 - n5, axis=1))
+        centroid = (c1 + n5) / 2.
+    elif etype == 'CHEXA':
+        n1, n2, n3, n4, n5, n6, n7, n8 = positions
+        area1, c1 = _quad_area_centroid(n1, n2, n3, n4)
+        area2, c2 = _quad_area_centroid(n5, n6, n7, n8)
+        volume = np.abs((area1 + area2) / 2. * norm(c1 - c2, axis=1))
+        centroid = (c1 + c2) / 2.
+    else:  # pragma: no cover
+        raise NotImplementedError(etype)
+    return volume, centroid
+
+def _quad_area_centroid(n1, n2, n3, n4):
+    """vectorized version of ``solid.area_centroid``"""
+    area1 = 0.5 * norm(cross(n1 - n2, n2 - n4), axis=1)
+    c1 = (n1 + n2 + n4) / 3.
+    area2 = 0.5 * norm(cross(n2 - n4, n2 - n3), axis=1)
+    c2 = (n2 + n3 + n4) / 3.
+    area = area1 + area2
+    centroid = (c1 * area1[:, np.newaxis] + c2 * area2[:, np.newaxis]) / area[:, np.newaxis]
+    return area, centroid
+
+def _get_card_mass_arrays(model, cards):
+    """
+    Gets the mass arrays with the Mass() and Centroid() methods for the
+    cards that aren't vectorized
+    """
+    eids = []
+    etypes = []
+    pids = []
+    mids = []
+    geometry = []
+    masses = []
+    centroids = []
+    for card in cards:
+        try:
+            centroid = card.Centroid()
+        except:
             continue
-        elif etype.startswith('C'):
-            eids2 = get_sub_eids(all_eids, eids)
-            for eid in eids2:
-                elem = model.elements[eid]
-
-                #if elem.pid_ref.type in ['PPLANE']:
-                try:
-                    m = elem.Mass()
-                except:
-                    model.log.error('etype = %r' % etype)
-                    print(elem)
-                    print(elem.pid_ref)
-                    raise
-                centroid = elem.Centroid()
-                if m > 0.0:
-                    model.log.info('elem.type=%s is not supported in new '
-                                   'mass properties method' % elem.type)
-                    mass = _increment_inertia(centroid, reference_point, m, mass, cg, I)
-                elif etype not in etypes_skipped:
-                    model.log.info('elem.type=%s doesnt have mass' % elem.type)
-                    etypes_skipped.add(etype)
 
-    if mass:
-        cg /= mass
-    mass, cg, I = _apply_mass_symmetry(model, sym_axis, scale, mass, cg, I)
-    # Ixx, Iyy, Izz, Ixy, Ixz, Iyz = I
-    return mass, cg, I
+        try:
+            mass = card.Mass()
+            mass + 0.  # a mass of None is skipped
+        except:
+            # PLPLANE
+            pid_ref = getattr(card, 'pid_ref', None)
+            if pid_ref is not None and pid_ref.type == 'PSHELL':
+                model.log.warning('p=%s' % centroid)
+                raise
+            model.log.warning("could not get the inertia for element/property\n%s%s" % (
+                card, pid_ref))
+            mass = 0.
+        eids.append(card.eid)
+        etypes.append(card.type)
+        pids.append(_get_pid(card))
+        mids.append(_get_mid(card))
+        geometry.append(_get_card_geometry(card))
+        masses.append(mass)
+        centroids.append(centroid)
+
+    neids = len(eids)
+    geometry = np.array(geometry, dtype='float64').reshape(neids, 3)
+    arrays = (
+        np.array(eids, dtype='int32'),
+        np.array(etypes, dtype='|U8'),
+        np.array(pids, dtype='int32'),
+        np.array(mids, dtype='int32'),
+        geometry[:, 0], geometry[:, 1], geometry[:, 2],
+        np.array(masses, dtype='float64'),
+        np.array(centroids, dtype='float64').reshape(neids, 3),
+    )
+    return arrays
+
+def _get_card_geometry(card):
+    """
+    Gets the area, volume and length of a card that isn't vectorized
+    (e.g., a CPENTA15); nan if they're not defined
+    """
+    etype = card.type
+    area = volume = length = np.nan
+    try:
+        if etype in TRI_SHELLS or etype in QUAD_SHELLS:
+            area = card.Area()
+            volume = area * _get_section(card, etype)
+        elif etype in SOLID_ELEMENTS:
+            volume = card.Volume()
+        elif etype in LINE_ELEMENTS:
+            length = card.Length()
+            area = _get_section(card, etype)
+            volume = length * area
+    except Exception:
+        pass
+    return area, volume, length
+
+def _get_pid(card):
+    """gets the property id of an element/mass; 0 if there isn't one"""
+    try:
+        pid = card.Pid()
+    except Exception:
+        return 0
+    return pid if isinstance(pid, integer_types) else 0
+
+def _get_mid(card):
+    """
+    gets the material id of the property of an element; 0 if there
+    isn't one and the first ply for a composite
+    """
+    prop = getattr(card, 'pid_ref', None)
+    try:
+        if prop is None:
+            mid = card.Mid()
+        elif prop.type in ['PCOMP', 'PCOMPG']:
+            mid = prop.Mid(0)
+        else:
+            mid = prop.Mid()
+    except Exception:
+        return 0
+    return mid if isinstance(mid, integer_types) else 0
 
 def _apply_mass_symmetry(model, sym_axis, scale, mass, cg, I):
     """
@@ -891,36 +1164,36 @@ def _apply_mass_symmetry(model, sym_axis, scale, mass, cg, I):
 
         if 'xz' in sym_axis:
             # y intertias are 0
-            cg[1] = 0.0
+            cg[..., 1] = 0.0
             mass *= 2.0
-            I[0] *= 2.0
-            I[1] *= 2.0
-            I[2] *= 2.0
-            I[3] *= 0.0  # Ixy
-            I[4] *= 2.0  # Ixz; no y
-            I[5] *= 0.0  # Iyz
+            I[..., 0] *= 2.0
+            I[..., 1] *= 2.0
+            I[..., 2] *= 2.0
+            I[..., 3] *= 0.0  # Ixy
+            I[..., 4] *= 2.0  # Ixz; no y
+            I[..., 5] *= 0.0  # Iyz
 
         if 'xy' in sym_axis:
             # z intertias are 0
-            cg[2] = 0.0
+            cg[..., 2] = 0.0
             mass *= 2.0
-            I[0] *= 2.0
-            I[1] *= 2.0
-            I[2] *= 2.0
-            I[3] *= 2.0  # Ixy; no z
-            I[4] *= 0.0  # Ixz
-            I[5] *= 0.0  # Iyz
+            I[..., 0] *= 2.0
+            I[..., 1] *= 2.0
+            I[..., 2] *= 2.0
+            I[..., 3] *= 2.0  # Ixy; no z
+            I[..., 4] *= 0.0  # Ixz
+            I[..., 5] *= 0.0  # Iyz
 
         if 'yz' in sym_axis:
             # x intertias are 0
-            cg[0] = 0.0
+            cg[..., 0] = 0.0
             mass *= 2.0
-            I[0] *= 2.0
-            I[1] *= 2.0
-            I[2] *= 2.0
-            I[3] *= 0.0  # Ixy
-            I[4] *= 0.0  # Ixz
-            I[5] *= 2.0  # Iyz; no x
+            I[..., 0] *= 2.0
+            I[..., 1] *= 2.0
+            I[..., 2] *= 2.0
+            I[..., 3] *= 0.0  # Ixy
+            I[..., 4] *= 0.0  # Ixz
+            I[..., 5] *= 2.0  # Iyz; no x
 
     if scale is None and 'WTMASS' in model.params:
         param = model.params['WTMASS']
@@ -1,14 +1,26 @@
 """
 Defines:
  - pierce_shell_model(bdf_filename, xyz_points, tol=1.0)
+ - ShellBVH(model, eids=None, leaf_size=8)
+ - triangle_intersections(origins, directions, v0, v1, v2, tmin=0., tmax=inf)
 """
-from itertools import count
 from typing import List, Optional
 from six import iteritems
-from six.moves import zip
 import numpy as np
 from pyNastran.bdf.bdf import BDF, read_bdf
-from pyNastran.bdf.mesh_utils.bdf_equivalence import _get_tree
+from pyNastran.bdf.mesh_utils.aabb_tree import AABBTree
+from pyNastran.bdf.mesh_utils.loads import _get_xyz_array, _get_index
+
+#: the corner nodes of the triangles of each shell element
+SHELL_TRIANGLES = {
+    'CTRIA3' : [[0, 1, 2]],
+    'CTRIA6' : [[0, 1, 2]],
+    'CTRIAR' : [[0, 1, 2]],
+    'CQUAD4' : [[0, 1, 2], [0, 2, 3]],
+    'CQUAD8' : [[0, 1, 2], [0, 2, 3]],
+    'CQUADR' : [[0, 1, 2], [0, 2, 3]],
+    'CQUAD' : [[0, 1, 2], [0, 2, 3]],
+}
 
 
 def quad_intersection(orig, direction, v0, v1, v2, v3):
@@ -78,6 +90,166 @@ def triangle_intersection(orig, direction, v0, v1, v2):
     return orig + direction * (e2.dot(qvec) * inv_det)
 
 
+def triangle_intersections(origins, directions, v0, v1, v2, tmin=0., tmax=np.inf):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, Any, Any) -> np.ndarray
+    """
+    Pierces a series of triangles with a series of rays
+    (the vectorized version of triangle_intersection)
+
+    Parameters
+    ----------
+    origins : (n, 3) float ndarray
+        the points to pierce
+    directions : (n, 3) float ndarray
+        the pierce vectors
+    v0, v1, v2 : (n, 3) float ndarray
+        the xyz points of the triangles
+    tmin / tmax : float / (n, ) float ndarray; default=0. / inf
+        the range of the rays (origin + t * direction)
+
+    Returns
+    -------
+    t : (n, ) float ndarray
+        the pierce point is origin + t * direction
+        nan : failed pierce
+    """
+    e1 = v1 - v0
+    e2 = v2 - v0
+    pvec = np.cross(directions, e2)
+    det = np.einsum('ij,ij->i', e1, pvec)
+
+    # the ray is parallel to the plane
+    is_valid = np.abs(det) >= 1e-8
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_det = 1. / det
+        tvec = origins - v0
+        u = np.einsum('ij,ij->i', tvec, pvec) * inv_det
+        qvec = np.cross(tvec, e1)
+        v = np.einsum('ij,ij->i', directions, qvec) * inv_det
+        t = np.einsum('ij,ij->i', e2, qvec) * inv_det
+    is_valid &= (u >= 0.) & (u <= 1.) & (v >= 0.) & (u + v <= 1.)
+    is_valid &= (t >= tmin) & (t <= tmax)
+    t[~is_valid] = np.nan
+    return t
+
+
+class ShellBVH(object):
+    """
+    A bounding volume hierarchy over the triangles of the shell elements,
+    which is used to pierce the shells with a series of rays.  The
+    hierarchy is built once and may be reused for any number of rays.
+
+    Attributes
+    ----------
+    eids : (nelements, ) int ndarray
+        the element ids
+    itriangle_element : (ntriangles, ) int ndarray
+        the index of the element of each triangle
+    triangles : (ntriangles, 3, 3) float ndarray
+        the xyz points of the triangles in the global frame
+    tree : AABBTree
+        the bounding boxes of the triangles
+    """
+    def __init__(self, model, eids=None, leaf_size=8):
+        """
+        Builds the hierarchy
+
+        Parameters
+        ----------
+        model : BDF()
+            the model
+        eids : List[int]; default=None -> all the shells
+            the elements; a quad is split into 2 triangles
+        leaf_size : int; default=8
+            the maximum number of triangles in a leaf
+        """
+        if eids is None:
+            eids = [eid for eid, elem in iteritems(model.elements)
+                    if elem.type in SHELL_TRIANGLES]
+
+        ielements = []
+        triangle_nids = []
+        for ielement, eid in enumerate(eids):
+            elem = model.elements[eid]
+            node_ids = elem.node_ids
+            for inodes in SHELL_TRIANGLES[elem.type]:
+                ielements.append(ielement)
+                triangle_nids.append([node_ids[inode] for inode in inodes])
+        self.eids = np.array(eids, dtype='int64')
+        self.itriangle_element = np.array(ielements, dtype='int64')
+
+        nids, xyz = _get_xyz_array(model)
+        triangle_nids = np.array(triangle_nids, dtype='int64').reshape(len(ielements), 3)
+        inodes = _get_index(nids, triangle_nids.ravel(), 'nid').reshape(triangle_nids.shape)
+        self.triangles = xyz[inodes]
+        self.tree = AABBTree(self.triangles.min(axis=1), self.triangles.max(axis=1),
+                             leaf_size=leaf_size)
+
+    def pierce(self, origins, directions, tmin=0., tmax=np.inf, nrays_per_chunk=100000):
+        """
+        Gets the nearest triangle that's pierced by each ray
+
+        Parameters
+        ----------
+        origins : (nrays, 3) float ndarray
+            the start of the rays
+        directions : (nrays, 3) / (3, ) float ndarray
+            the direction of the rays
+        tmin / tmax : float / (nrays, ) float ndarray; default=0. / inf
+            the range of the rays (origin + t * direction)
+        nrays_per_chunk : int; default=100000
+            the number of rays that are pierced at once, which limits the
+            memory
+
+        Returns
+        -------
+        ielements : (nrays, ) int ndarray
+            the index of the pierced element (eid = self.eids[ielement])
+            -1 : failed pierce
+        t : (nrays, ) float ndarray
+            the pierce point is origin + t * direction, where t is the
+            minimum t of the pierced triangles
+            nan : failed pierce
+        xyz_pierces : (nrays, 3) float ndarray
+            the pierce points
+            nan : failed pierce
+        """
+        origins = np.asarray(origins, dtype='float64').reshape(-1, 3)
+        nrays = origins.shape[0]
+        directions = np.broadcast_to(
+            np.asarray(directions, dtype='float64'), (nrays, 3))
+        tmin = np.broadcast_to(np.asarray(tmin, dtype='float64'), (nrays, ))
+        tmax = np.broadcast_to(np.asarray(tmax, dtype='float64'), (nrays, ))
+
+        ielements = np.full(nrays, -1, dtype='int64')
+        t = np.full(nrays, np.nan)
+        for i0 in range(0, nrays, nrays_per_chunk):
+            i1 = min(i0 + nrays_per_chunk, nrays)
+            irays, itriangles = self.tree.get_ray_pairs(
+                origins[i0:i1], directions[i0:i1], tmin[i0:i1], tmax[i0:i1])
+            irays += i0
+            triangles = self.triangles[itriangles]
+            ti = triangle_intersections(
+                origins[irays], directions[irays],
+                triangles[:, 0, :], triangles[:, 1, :], triangles[:, 2, :],
+                tmin[irays], tmax[irays])
+            is_hit = ~np.isnan(ti)
+            irays = irays[is_hit]
+            itriangles = itriangles[is_hit]
+            ti = ti[is_hit]
+
+            # the nearest triangle of each ray (the first triangle for a tie)
+            isort = np.lexsort((itriangles, ti, irays))
+            irays = irays[isort]
+            is_first = np.ones(len(irays), dtype='bool')
+            is_first[1:] = irays[1:] != irays[:-1]
+            ifirst = isort[is_first]
+            ielements[irays[is_first]] = self.itriangle_element[itriangles[ifirst]]
+            t[irays[is_first]] = ti[ifirst]
+        xyz_pierces = origins + directions * t[:, np.newaxis]
+        return ielements, t, xyz_pierces
+
+
 def pierce_shell_model(bdf_filename, xyz_points, tol=1.0):
     # type: (Union[BDF, str], Any, float) -> List[int], np.ndarray, List[List[int]]
     """
@@ -91,8 +263,8 @@ def pierce_shell_model(bdf_filename, xyz_points, tol=1.0):
     xyz_points : (npoints, 3) float ndarray
         the xyz_points to pierce
     tol : float; default=1.0
-        the pierce tolerance
-        pick a value that is ~3x the max local element edge length
+        unused; the shells are found with a bounding volume hierarchy
+        (see ShellBVH), so all the shells are considered
 
     Returns
     -------
@@ -108,125 +280,45 @@ def pierce_shell_model(bdf_filename, xyz_points, tol=1.0):
         ndarray : pierced element's nodes
         None : invalid pierce
     """
-    xyz_points = np.asarray(xyz_points)
+    xyz_points = np.asarray(xyz_points, dtype='float64')
     assert xyz_points.shape[1] == 3, xyz_points.shape
-    xy_points = xyz_points[:, :2]
-    assert xy_points.shape[1] == 2, xy_points.shape
 
     if isinstance(bdf_filename, BDF):
         model = bdf_filename
     else:
         model = read_bdf(bdf_filename)
 
-    eids = []
-    centroids = []
-    etypes_to_skip = [
-        'CHEXA', 'CPENTA', 'CTETRA', 'CPYRAM',
-        'CBUSH', 'CBUSH1D', 'CBUSH2D',
-        'CBEAM', 'CROD', 'CONROD',
-        'CELAS1', 'CELAS2', 'CELAS3', 'CELAS4',
-        'CDAMP1', 'CDAMP2', 'CDAMP3', 'CDAMP4', 'CDAMP5',
-    ]
-    for eid, elem in iteritems(model.elements):
-        if elem.type in ['CQUAD4', 'CTRIA3']:
-            centroid = elem.Centroid()
-        elif elem.type in etypes_to_skip:
-            continue
-        else:
-            print(elem.type)
-            #raise NotImplementedError(elem)
-            continue
-        eids.append(eid)
-        centroids.append(centroid)
-    eids = np.array(eids, dtype='int32')
-    assert len(eids) > 0, 'eids=%s\n' % eids
-    centroids_xy = np.array(centroids, dtype='float64')[:, :2]
-
-    #print('centroids:\n%s\n' % str(centroids_xy))
-    assert centroids_xy.shape[1] == 2, centroids_xy.shape
-
-
-    msg = 'which is required by pierce_shell_model'
-    kdt = _get_tree(centroids_xy, msg=msg)
-    results = kdt.query_ball_point(xy_points, tol)
-    nresults = len(results)
-    iresults = np.arange(nresults)
-    #print(results)
-    #print(iresults)
-
-    direction = np.array([0., 0., 1.])
-    ipoints = []
+    bvh = ShellBVH(model)
+    assert len(bvh.eids) > 0, 'eids=%s\n' % bvh.eids
+
+    # the nearest pierce along the -z axis is the largest z value
+    ielements, unused_t, xyz_pierces = bvh.pierce(
+        xyz_points, np.array([0., 0., -1.]), tmin=-np.inf, tmax=np.inf)
+
     eids_pierce = []
     xyz_pierces_max = []
     node_ids = []
-    for i, xyz_point, eidsi in zip(count(), xyz_points, results):
-        model.log.debug('eidsi = [%s]' % ', '.join([str(eidii).rstrip('L') for eidii in eidsi]))
-        if not eidsi:
-            ipoints.append(i)
-            eids_pierce.append(None)
-            xyz_pierces_max.append(None)
-            node_ids.append(None)
-            model.log.warning('skipping %s because it failed tolerancing (tol=%s)' % (xyz_point, tol))
-            continue
-
-        model.log.debug('xyz_point = %s' % xyz_point)
-        eidsi2 = eids[eidsi]
-        eids_newi = []
-        piercesi = []
-        zpiercesi = []
-        for eid in eidsi2:
-            elem = model.elements[eid]
-            if elem.type == 'CQUAD4':
-                v0 = elem.nodes_ref[0].get_position()
-                v1 = elem.nodes_ref[1].get_position()
-                v2 = elem.nodes_ref[2].get_position()
-                v3 = elem.nodes_ref[3].get_position()
-                xyz_pierce = quad_intersection(xyz_point, direction, v0, v1, v2, v3)
-            elif elem.type == 'CTRIA3':
-                v0 = elem.nodes_ref[0].get_position()
-                v1 = elem.nodes_ref[1].get_position()
-                v2 = elem.nodes_ref[2].get_position()
-                xyz_pierce = triangle_intersection(xyz_point, direction, v0, v1, v2)
-            else:
-                raise NotImplementedError(elem)
-
-            if xyz_pierce is None:
-                #model.log.warning('failed to pierce eid=%s' % eid)
-                continue
-
-            zpierce = xyz_pierce[2]
-            model.log.debug('  eid=%s xyz_pierce=%s zpierce=%s' % (eid, xyz_pierce, zpierce))
-            eids_newi.append(eid)
-            piercesi.append(xyz_pierce)
-            zpiercesi.append(zpierce)
-
-        if len(zpiercesi) == 0:
-            ipoints.append(i)
+    for xyz_point, ielement, xyz_pierce in zip(xyz_points, ielements.tolist(), xyz_pierces):
+        if ielement == -1:
             eids_pierce.append(None)
             xyz_pierces_max.append(None)
             node_ids.append(None)
-            model.log.warning('skipping %s because no pierces found (tol=%s)' % (xyz_point, tol))
+            model.log.warning('skipping %s because no pierces found' % xyz_point)
             continue
+        eid = bvh.eids[ielement].item()
+        eids_pierce.append(eid)
+        xyz_pierces_max.append(xyz_pierce)
+        node_ids.append(model.elements[eid].node_ids)
 
-        #print('zpiercesi = %s' % zpiercesi)
-        zpiercesi_max = max(zpiercesi)
-        ipierce_max = zpiercesi.index(zpiercesi_max)
-        eid_max = eids_newi[ipierce_max]
-        xyz_piercei_max = piercesi[ipierce_max]
-        model.log.debug('i=%s xyz_point=%s xyz_piercei_max=%s zpiercesi=%s zmax=%s eid_max=%s' % (
-            i, xyz_point, xyz_piercei_max,
-            zpiercesi, zpiercesi_max, eid_max))
-
-        ipoints.append(i)
-        eids_pierce.append(eid_max)
-        xyz_pierces_max.append(xyz_piercei_max)
-        #print(model.elements[eid_max])
-        node_ids.append(model.elements[eid_max].node_ids)
-
-    xyz_pierces_max = np.array(xyz_pierces_max)
-    model.log.debug('ipoints=%s' % ipoints)
+    if len(ielements) and ielements.min() == -1:
+        # an object array of the pierce points and Nones
+        xyz_pierces_max_array = np.empty(len(xyz_pierces_max), dtype='object')
+        for i, xyz_pierce in enumerate(xyz_pierces_max):
+            xyz_pierces_max_array[i] = xyz_pierce
+        xyz_pierces_max = xyz_pierces_max_array
+    else:
+        xyz_pierces_max = np.array(xyz_pierces_max).reshape(len(xyz_pierces_max), 3)
     model.log.info('eids_pierce=%s' % eids_pierce)
     model.log.info('xyz_pierces_max:\n%s' % xyz_pierces_max)
     model.log.info('node_ids=%s' % node_ids)
-
     return eids_pierce, xyz_pierces_max, node_ids
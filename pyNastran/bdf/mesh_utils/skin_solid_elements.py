@@ -1,15 +1,51 @@
 """
 defines:
+ - write_skin_solid_faces(model, skin_filename,
+                          write_solids=False, write_shells=True,
+                          size=8, is_double=False, encoding=None)
+ - get_solid_face_arrays(model)
  - get_solid_skin_faces(model)
 """
 from __future__ import print_function
 from collections import defaultdict
-from copy import deepcopy
 from six import PY2, iteritems
 from codecs import open
+import numpy as np
 
 from pyNastran.bdf.field_writer_8 import print_card_8
 from pyNastran.bdf.field_writer_16 import print_card_16
+from pyNastran.bdf.bdf_interface.write_blocks import (
+    write_cards, _encode_ints, _stack_fields, _print_card_8_rows, _join_rows)
+
+#: the nodes of the faces of the solid elements in the order of
+#: ``elem.faces``; (element type, number of nodes) -> faces
+SOLID_FACE_INDICES = {
+    ('CTETRA', 4) : [[0, 1, 3], [0, 3, 2], [1, 2, 3], [0, 2, 1]],
+    ('CTETRA', 10) : [[0, 1, 2, 4, 5, 6], [0, 1, 3, 4, 8, 7],
+                      [1, 2, 3, 5, 9, 8], [2, 0, 3, 6, 7, 9]],
+    ('CPYRAM', 5) : [[0, 1, 2, 3], [0, 1, 4], [1, 2, 4], [2, 3, 4], [3, 0, 4]],
+    ('CPYRAM', 13) : [[0, 1, 2, 3, 5, 6, 7, 8], [0, 1, 4, 5, 10, 9],
+                      [1, 2, 4, 6, 11, 10], [2, 3, 4, 7, 12, 11],
+                      [3, 0, 4, 8, 9, 12]],
+    ('CPENTA', 6) : [[0, 1, 2], [3, 4, 5], [0, 1, 4, 3], [1, 2, 5, 4], [2, 0, 3, 5]],
+    ('CPENTA', 15) : [[0, 1, 2, 6, 7, 8], [3, 4, 5, 9, 10, 11],
+                      [0, 1, 4, 3, 6, 13, 9, 12], [1, 2, 5, 4, 7, 14, 10, 13],
+                      [2, 0, 3, 5, 8, 12, 11, 14]],
+    ('CHEXA', 8) : [[0, 1, 2, 3], [0, 1, 5, 4], [1, 2, 6, 5],
+                    [2, 3, 7, 6], [3, 0, 4, 7], [4, 5, 6, 7]],
+    ('CHEXA', 20) : [[0, 1, 2, 3, 8, 9, 10, 11], [0, 1, 5, 4, 8, 17, 12, 16],
+                     [1, 2, 6, 5, 9, 18, 13, 17], [2, 3, 7, 6, 10, 9, 14, 18],
+                     [3, 0, 4, 7, 11, 16, 15, 19], [4, 5, 6, 7, 12, 13, 14, 15]],
+}
+
+#: the maximum number of nodes on a face
+MAX_FACE_NODES = 8
+
+#: the maximum number of faces of an element
+MAX_FACES = 6
+
+#: the shell that's written for a face with n nodes
+SHELL_TYPES = {3 : 'CTRIA3', 4 : 'CQUAD4', 6 : 'CTRIA6', 8 : 'CQUAD8'}
 
 
 def write_skin_solid_faces(model, skin_filename,
@@ -40,66 +76,195 @@ def write_skin_solid_faces(model, skin_filename,
     if(len(model.element_ids) == 0 or len(model.material_ids) == 0 or
        len(model.property_ids) == 0):
         return
-    eid_set, face_map = get_solid_skin_faces(model)
-    if len(eid_set) == 0:
+    unused_sorted_faces, faces, nface_nodes, counts, face_eid_offsets, face_eids = (
+        get_solid_face_arrays(model))
+    is_skin = counts != 2
+    iskin = np.flatnonzero(is_skin)
+    if len(iskin) == 0:
         return
 
-    eid_set_to_write = set([])
+    # the elements of the skinned faces
+    eids_to_write = np.unique(face_eids[np.repeat(is_skin, counts)])
     nid_set_to_write = set([])
-    mid_set_to_write = set([])
+    mids = []
     if write_solids:
-        for face, eids in iteritems(eid_set):
-            eid_set_to_write.update(eids)
-            for eid in eids:
-                elem = model.elements[eid]
-                pid = elem.Pid()
-                prop = model.properties[pid] # PSOLID
-                mid = prop.Mid()
-                #print(prop)
-                nid_set_to_write.update(elem.node_ids)
-                mid_set_to_write.add(mid)
-                #print('added_mid (a) =', mid)
+        for eid in eids_to_write.tolist():
+            elem = model.elements[eid]
+            pid = elem.Pid()
+            prop = model.properties[pid] # PSOLID
+            mids.append(prop.Mid())
+            nid_set_to_write.update(elem.node_ids)
+        nid_set_to_write.discard(None)
     elif write_shells:
-        for face, eids in iteritems(eid_set):
-            eid_set_to_write.update(eids)
-            nid_set_to_write.update(face)
-            for eid in eids:
-                elem = model.elements[eid]
-                pid = elem.Pid()
-                prop = model.properties[pid] # PSOLID
-                if prop.type in ['PSOLID', 'PLSOLID']:
-                    mid = prop.Mid()
-                elif prop.type in ['PCOMPS', 'PCOMP', 'PCOMPG']:
-                    mid = prop.mids[0]
-                else:
-                    raise NotImplementedError(prop)
-                #except TypeError:
-                    #model.log.warning('TypeError: skipping:%s' % prop)
-                    #raise
-                #except AttributeError:
-                    #model.log.warning('skipping:%s' % prop)
-                    #continue
-                mid_set_to_write.add(mid)
-                #print('added eid=%s pid=%s mid=%s (b)' % (eid, pid, mid))
+        nids = np.unique(faces[iskin])
+        nid_set_to_write.update(nids[nids > 0].tolist())
+        for eid in eids_to_write.tolist():
+            elem = model.elements[eid]
+            pid = elem.Pid()
+            prop = model.properties[pid] # PSOLID
+            if prop.type in ['PSOLID', 'PLSOLID']:
+                mid = prop.Mid()
+            elif prop.type in ['PCOMPS', 'PCOMP', 'PCOMPG']:
+                mid = prop.mids[0]
+            else:
+                raise NotImplementedError(prop)
+            mids.append(mid)
     else:
         raise RuntimeError('write_solids=False write_shells=False')
 
-    eids_to_write = list(eid_set_to_write)
-    nids_to_write = list(nid_set_to_write)
-    mids_to_write = list(mid_set_to_write)
-
-    #element_ids_to_delete = set(model.element_ids) - eids_to_write
+    mids_to_write = sorted(set(mids))
+    shell_pids = None
+    if write_shells:
+        ifaces = iskin[counts[iskin] != 1]
+        if len(ifaces):
+            iface = ifaces[0]
+            eids = face_eids[face_eid_offsets[iface]:face_eid_offsets[iface + 1]]
+            raise AssertionError(eids.tolist())
+
+        # the shell property of each element, which depends on its material
+        imids = []
+        for eid in eids_to_write.tolist():
+            elem = model.elements[eid]
+            prop = model.properties[elem.Pid()]
+            if prop.type not in ['PSOLID']: # 'PSHELL',
+                raise NotImplementedError(prop)
+            imids.append(mids_to_write.index(prop.Mid()))
+        ielements = np.searchsorted(eids_to_write, face_eids[face_eid_offsets[iskin]])
+        shell_pids = np.array(imids, dtype='int64')[ielements]
 
     eid_shell = max(model.elements) + 1
     pid_shell = max(model.properties) + 1
     mid_shell = max(model.materials) + 1
-    _write_skin_solid_faces(model, skin_filename, face_map,
-                            nids_to_write, eids_to_write, mids_to_write, eid_set,
+    _write_skin_solid_faces(model, skin_filename, faces[iskin], nface_nodes[iskin],
+                            shell_pids, sorted(nid_set_to_write), eids_to_write.tolist(),
+                            mids_to_write,
                             eid_shell, pid_shell, mid_shell,
                             write_solids=write_solids, write_shells=write_shells,
                             size=size, is_double=is_double, encoding=encoding)
 
 
+def get_solid_face_arrays(model):
+    """
+    Gets the unique faces of the solid elements (CTETRA, CPENTA, CHEXA,
+    CPYRAM) and the elements that use them.
+
+    The faces of each element type are gathered from a face connectivity
+    table, so a face is found by sorting its nodes and counting the
+    occurrences of the sorted faces.
+
+    Parameters
+    ----------
+    model : BDF()
+        the BDF object
+
+    Returns
+    -------
+    sorted_faces : (nfaces, 8) int ndarray
+        the face nids in sorted order, which are padded with leading 0s
+    faces : (nfaces, 8) int ndarray
+        the face nids of the last element with the face, which are
+        padded with trailing 0s
+    nface_nodes : (nfaces, ) int ndarray
+        the number of nodes of each face
+    counts : (nfaces, ) int ndarray
+        the number of times that the face is used
+    face_eid_offsets : (nfaces + 1, ) int ndarray
+        face_eids[face_eid_offsets[i]:face_eid_offsets[i+1]] are the
+        element ids of the i-th face
+    face_eids : (counts.sum(), ) int ndarray
+        the element ids of the faces
+
+    The faces are in the order that they're first found (by element and
+    then by face).
+    """
+    group_ielements = defaultdict(list)
+    group_eids = defaultdict(list)
+    group_nids = defaultdict(list)
+    for ielement, (eid, elem) in enumerate(iteritems(model.elements)):
+        if elem.type in ['CTETRA', 'CPENTA', 'CHEXA', 'CPYRAM']:
+            nids = elem.node_ids
+            key = (elem.type, len(nids))
+            group_ielements[key].append(ielement)
+            group_eids[key].append(eid)
+            group_nids[key].append(nids)
+
+    orders = []
+    eids = []
+    faces = []
+    nface_nodes = []
+    for key, nids in iteritems(group_nids):
+        if key not in SOLID_FACE_INDICES:
+            raise NotImplementedError('element type=%r nnodes=%s' % key)
+        nnodes = key[1]
+        try:
+            nids = np.array(nids, dtype='int64')
+        except TypeError:
+            nids = np.array([[0 if nid is None else nid for nid in nidsi] for nidsi in nids],
+                            dtype='int64')
+        nelements = nids.shape[0]
+
+        # the padded nodes are the appended 0 column
+        element_faces = SOLID_FACE_INDICES[key]
+        nfaces = len(element_faces)
+        inodes = np.full((nfaces, MAX_FACE_NODES), nnodes, dtype='int64')
+        for iface, face in enumerate(element_faces):
+            inodes[iface, :len(face)] = face
+        nids = np.hstack([nids, np.zeros((nelements, 1), dtype='int64')])
+        facesi = nids[:, inodes]
+        is_missing = ((facesi == 0) & (inodes < nnodes)).any(axis=2)
+        if is_missing.any():
+            ielement, iface = np.argwhere(is_missing)[0]
+            elem = model.elements[group_eids[key][ielement]]
+            face = [nid if nid else None
+                    for nid in facesi[ielement, iface, :len(element_faces[iface])].tolist()]
+            msg = 'There is a None in the face.\n'
+            msg += 'face_id=%s face=%s\n%s' % (iface + 1, str(face), str(elem))
+            raise RuntimeError(msg)
+
+        ielements = np.array(group_ielements[key], dtype='int64')
+        orders.append((ielements[:, np.newaxis] * MAX_FACES + np.arange(nfaces)).ravel())
+        eids.append(np.repeat(np.array(group_eids[key], dtype='int64'), nfaces))
+        faces.append(facesi.reshape(nelements * nfaces, MAX_FACE_NODES))
+        nface_nodes.append(np.tile([len(face) for face in element_faces], nelements))
+
+    if not orders:
+        empty = np.zeros(0, dtype='int64')
+        empty_faces = np.zeros((0, MAX_FACE_NODES), dtype='int64')
+        return empty_faces, empty_faces, empty, empty, np.zeros(1, dtype='int64'), empty
+
+    # the faces in the order of the elements
+    iorder = np.argsort(np.hstack(orders))
+    eids = np.hstack(eids)[iorder]
+    faces = np.vstack(faces)[iorder]
+    nface_nodes = np.hstack(nface_nodes)[iorder]
+
+    # the padded 0s are sorted to the front, so a face is unique by its
+    # sorted nodes; the sort is stable, so the occurrences of a face are
+    # in element order
+    sorted_faces = np.sort(faces, axis=1)
+    isort = np.lexsort(sorted_faces.T[::-1])
+    sorted_faces_sorted = sorted_faces[isort]
+    is_new = np.ones(len(isort), dtype='bool')
+    is_new[1:] = (sorted_faces_sorted[1:] != sorted_faces_sorted[:-1]).any(axis=1)
+    istarts = np.flatnonzero(is_new)
+    iends = np.append(istarts[1:], len(isort))
+    counts = iends - istarts
+    ifirst = isort[istarts]
+    ilast = isort[iends - 1]
+
+    # the unique faces in the order that they're first found
+    iunique = np.argsort(ifirst)
+    rank = np.empty(len(iunique), dtype='int64')
+    rank[iunique] = np.arange(len(iunique))
+    ioccurrences = isort[np.argsort(rank[np.cumsum(is_new) - 1], kind='stable')]
+
+    counts = counts[iunique]
+    face_eid_offsets = np.zeros(len(counts) + 1, dtype='int64')
+    face_eid_offsets[1:] = np.cumsum(counts)
+    return (sorted_faces_sorted[istarts[iunique]], faces[ilast[iunique]],
+            nface_nodes[ifirst[iunique]], counts, face_eid_offsets, eids[ioccurrences])
+
+
 def get_solid_skin_faces(model):
     """
     Gets the elements and faces that are skinned from solid elements.
@@ -123,49 +288,88 @@ def get_solid_skin_faces(model):
        face : List(int, int, ...)
            the face nids
     """
-    eid_faces = model.get_element_faces()
-    face_set = defaultdict(int)
+    sorted_faces, faces, nface_nodes, counts, face_eid_offsets, face_eids = (
+        get_solid_face_arrays(model))
+    face_eids = face_eids.tolist()
     eid_set = defaultdict(list)
     face_map = {}
-    for eid, face in eid_faces:
-        #print(eid, face)
-        raw_face = deepcopy(face)
-        try:
-            face.sort()
-        except:
-            print('face = %s' % str(face))
-            raise
-        tface = tuple(face)
-        #print(tface)
-        face_set[tface] += 1
-        eid_set[tface].append(eid)
-        face_map[tface] = raw_face
-
-    #print('eid_set:')
-    #for tface, eidset in iteritems(eid_set):
-        #print(tface, eidset)
-
-    #print('face_set:')
-    #for tface, faceset in iteritems(face_set):
-        #print(tface, faceset)
-
-    #print('face_map:')
-    #for tface, facemap in iteritems(face_map):
-        #print(tface, facemap)
-
-    del_faces = []
-    for face, face_count in iteritems(face_set):
-        if face_count == 2:
-            del_faces.append(face)
-
-    for face in del_faces:
-        del face_set[face]
-        del eid_set[face]
+    for sorted_face, face, nnodes, count, i0, i1 in zip(
+            sorted_faces.tolist(), faces.tolist(), nface_nodes.tolist(), counts.tolist(),
+            face_eid_offsets[:-1].tolist(), face_eid_offsets[1:].tolist()):
+        tface = tuple(sorted_face[MAX_FACE_NODES - nnodes:])
+        face_map[tface] = face[:nnodes]
+        if count != 2:
+            eid_set[tface] = face_eids[i0:i1]
     return eid_set, face_map
 
 
-def _write_skin_solid_faces(model, skin_filename, face_map,
-                            nids_to_write, eids_to_write, mids_to_write, eid_set,
+def _write_skin_shells(eid_shell, pids, faces, nface_nodes):
+    """
+    Writes a CTRIA3/CQUAD4/CTRIA6/CQUAD8 for each face like print_card_8
+    (print_card_16 if an id doesn't fit in the field)
+
+    Parameters
+    ----------
+    eid_shell : int
+        the id of the first shell
+    pids : (nshells, ) int ndarray
+        the property ids
+    faces : (nshells, 8) int ndarray
+        the face nids, which are padded with trailing 0s
+    nface_nodes : (nshells, ) int ndarray
+        the number of nodes of each face
+
+    Returns
+    -------
+    msg : str
+        the shells
+    """
+    nshells = len(pids)
+    ids = np.column_stack([eid_shell + np.arange(nshells, dtype='int64'), pids, faces])
+    cards = []
+    for nnodes in np.unique(nface_nodes).tolist():
+        if nnodes not in SHELL_TYPES:
+            iface = np.flatnonzero(nface_nodes == nnodes)[0]
+            raise NotImplementedError('face=%s len(face)=%s' % (
+                faces[iface, :nnodes].tolist(), nnodes))
+        name = SHELL_TYPES[nnodes]
+        irows = np.flatnonzero(nface_nodes == nnodes)
+        nrows = len(irows)
+        nfields = nnodes + 2
+        idsi = ids[irows, :nfields]
+        fields, is_valid = _encode_ints(idsi.ravel(), 8)
+        fields = fields.reshape(nrows, nfields, 8)
+        is_valid = is_valid.reshape(nrows, nfields).all(axis=1)
+        if nfields <= 8:
+            block = _stack_fields(
+                nrows, ['%-8s' % name, fields.reshape(nrows, nfields * 8), '\n'])[0]
+            is_kept = None
+        else:
+            block, is_kept = _print_card_8_rows(
+                name, [fields[:, ifield] for ifield in range(nfields)])
+
+        def write_row(irow):
+            """writes a shell with print_card_8/print_card_16"""
+            card = [name] + idsi[irow].tolist()
+            try:
+                return print_card_8(card)
+            except RuntimeError:
+                return print_card_16(card)
+        text, ends = _join_rows(block, is_kept, {}, is_valid, write_row)
+        cards.append((irows, text, ends))
+
+    if len(cards) == 1:
+        return cards[0][1]
+    rows = [None] * nshells
+    for irows, text, ends in cards:
+        starts = [0] + ends[:-1]
+        for irow, istart, iend in zip(irows.tolist(), starts, ends):
+            rows[irow] = text[istart:iend]
+    return ''.join(rows)
+
+
+def _write_skin_solid_faces(model, skin_filename, faces, nface_nodes, shell_pids,
+                            nids_to_write, eids_to_write, mids_to_write,
                             eid_shell, pid_shell, mid_shell,
                             write_solids=False, write_shells=True,
                             size=8, is_double=False, encoding=None):
@@ -178,18 +382,20 @@ def _write_skin_solid_faces(model, skin_filename, face_map,
         the BDF object
     skin_filename : str
         the file to write
-    face_map : dict[sorted_face] : face
-        sorted_face : List[int, int, int] / List[int, int, int, int]
-        face : List[int, int, int] / List[int, int, int, int]
+    faces : (nfaces, 8) int ndarray
+        the skinned face nids, which are padded with trailing 0s
+    nface_nodes : (nfaces, ) int ndarray
+        the number of nodes of each face
+    shell_pids : (nfaces, ) int ndarray / None
+        the index of the shell property of each face
+        None : write_shells=False
 
     nids_to_write : List[int, int, ...]
         list of node ids to write
     eids_to_write : List[int, int, ...]
         list of element ids to write
     mids_to_write : List[int, int, ...]
-        list of material ids to write
-    eid_set : dict[face] : eids
-        ???
+        sorted list of material ids to write
 
     eid_shell : int
         the next id to use for the shell id
@@ -216,11 +422,8 @@ def _write_skin_solid_faces(model, skin_filename, face_map,
         wb = 'w'
     with open(skin_filename, wb, encoding=encoding) as bdf_file:
         bdf_file.write('$ pyNastran: punch=True\n')
-        for nid in sorted(nids_to_write):
-            if nid is None:
-                continue
-            node = model.nodes[nid]
-            bdf_file.write(node.write_card(size=size, is_double=is_double))
+        bdf_file.write(write_cards([model.nodes[nid] for nid in nids_to_write],
+                                   size=size, is_double=is_double))
 
         for cid, coord in iteritems(model.coords):
             if cid == 0:
@@ -228,18 +431,15 @@ def _write_skin_solid_faces(model, skin_filename, face_map,
             bdf_file.write(coord.write_card(size=size, is_double=is_double))
 
         if write_solids:
-            for eid in sorted(eids_to_write):
-                elem = model.elements[eid]
-                bdf_file.write(elem.write_card(size=size))
+            bdf_file.write(write_cards([model.elements[eid] for eid in sorted(eids_to_write)],
+                                       size=size))
             for pid, prop in iteritems(model.properties):
                 bdf_file.write(prop.write_card(size=size, is_double=is_double))
-            for mid in sorted(mids_to_write):
+            for mid in mids_to_write:
                 material = model.materials[mid]
                 bdf_file.write(material.write_card(size=size, is_double=is_double))
-            del eid, pid, mid
 
         if write_shells:
-            mids_to_write.sort()
             for imid, mid in enumerate(mids_to_write):
                 card = ['PSHELL', pid_shell + imid, mid_shell + imid, 0.1]
                 try:
@@ -249,64 +449,11 @@ def _write_skin_solid_faces(model, skin_filename, face_map,
                 bdf_file.write(msg)
 
                 card = ['MAT1', mid_shell + imid, 3.e7, None, 0.3]
-                #bdf_file.write(model.materials[mid].comment)
-                try:
-                    msg = print_card_8(card)
-                except RuntimeError:
-                    msg = print_card_16(card)
-                bdf_file.write(msg)
-
-            for face, eids in iteritems(eid_set):
-                face_raw = face_map[face]
-                nface = len(face)
-                #print("eids =", eids)
-                #assert len(eids) == 1, eids
-                #for eid in sorted(eids):
-                    #elem = model.elements[eid]
-                    #print(elem)
-                    #break
-
-                #elem = next(itervalues(model.elements)) # old
-                assert len(eids) == 1, eids
-                elem = model.elements[eids[0]]
-                #pid = next(iterkeys(model.properties))
-                pid = elem.Pid()
-                prop = model.properties[pid]
-                if prop.type in ['PSOLID']: # 'PSHELL',
-                    mid = prop.Mid()
-                #elif prop.type in ['PCOMP', 'PCOMPG']:
-                    #mid = prop.mids[0]
-                else:
-                    raise NotImplementedError(prop)
-
-                #print('mids_to_write = %s' % mids_to_write)
-                #print('mids = ', model.materials.keys())
-                imid = mids_to_write.index(mid)
-
-                if nface == 3:
-                    card = ['CTRIA3', eid_shell, pid_shell + imid] + list(face_raw)
-                elif nface == 4:
-                    card = ['CQUAD4', eid_shell, pid_shell + imid] + list(face_raw)
-                elif nface == 4:
-                    card = ['CQUAD4', eid_shell, pid_shell + imid] + list(face_raw)
-                elif nface == 6:
-                    card = ['CTRIA6', eid_shell, pid_shell + imid] + list(face_raw)
-                elif nface == 8:
-                    card = ['CQUAD8', eid_shell, pid_shell + imid] + list(face_raw)
-                else:
-                    raise NotImplementedError('face=%s len(face)=%s' % (face, nface))
                 try:
                     msg = print_card_8(card)
                 except RuntimeError:
                     msg = print_card_16(card)
                 bdf_file.write(msg)
-                eid_shell += 1
-
-                #elem = model.elements[eid]
-                #bdf_file.write(elem.write_card(size=size))
-            #for pid, prop in iteritems(model.properties):
-                #bdf_file.write(prop.write_card(size=size, is_double=is_double))
+            bdf_file.write(_write_skin_shells(eid_shell, pid_shell + shell_pids,
+                                              faces, nface_nodes))
         bdf_file.write('ENDDATA\n')
-    #if 0:
-        #model = model.__class__.__init__()
-        #model.read_bdf(skin_filename)
@@ -3,11 +3,14 @@ import unittest
 import os
 import numpy as np
 import pyNastran
-from pyNastran.bdf.bdf import BDF
+from pyNastran.bdf.bdf import BDF, read_bdf
+from pyNastran.bdf.mesh_utils.mass_properties import (
+    _mass_properties, _mass_properties_elements_init, get_mass_arrays, get_breakdowns)
 from pyNastran.utils import object_methods
 
 rootpath = pyNastran.__path__[0]
 mesh_utils_path = os.path.join(rootpath, 'bdf', 'mesh_utils', 'test')
+model_path = os.path.join(rootpath, '..', 'models')
 
 
 class TestMass(unittest.TestCase):
@@ -162,5 +165,197 @@ class TestMass(unittest.TestCase):
         assert np.allclose(mass, 0.005311658333), 'mass=%s' % mass
         assert np.allclose(mass2, 2.050833333), 'mass2=%s' % mass2
 
+    def test_mass_vectorized(self):
+        """the vectorized mass properties match the Mass()/Centroid() methods"""
+        model = _build_mass_model()
+        eids = list(model.elements.keys())
+        mass_ids = list(model.masses.keys())
+        for reference_point in [None, 'cg', 3, np.array([1., 2., 3.])]:
+            for element_ids, mass_idsi in [(None, None), (eids[::2], None), (None, mass_ids),
+                                           (eids[1::3], mass_ids[:2])]:
+                mass1, cg1, I1 = _legacy_mass_properties(
+                    model, element_ids, mass_idsi, reference_point)
+                mass2, cg2, I2 = model.mass_properties(
+                    element_ids=element_ids, mass_ids=mass_idsi,
+                    reference_point=reference_point, sym_axis='no', scale=1.)
+                assert np.allclose(mass1, mass2), 'mass1=%s mass2=%s' % (mass1, mass2)
+                assert np.allclose(cg1, cg2), 'cg1=%s cg2=%s' % (cg1, cg2)
+                assert np.allclose(I1, I2), 'I1=%s I2=%s' % (I1, I2)
+
+        mass_arrays = get_mass_arrays(model)
+        assert len(mass_arrays['eid']) == len(model.elements) + len(model.masses)
+        i = np.where(mass_arrays['eid'] == 10)[0][0]
+        assert mass_arrays['etype'][i] == 'CPLSTN4', mass_arrays['etype'][i]
+        assert mass_arrays['mass'][i] == 0.  # PLPLANE
+        i = np.where(mass_arrays['eid'] == 20)[0][0]
+        assert mass_arrays['etype'][i] == 'CHEXA', mass_arrays['etype'][i]
+        assert np.allclose(mass_arrays['volume'][i], model.elements[20].Volume())
+        assert np.isnan(mass_arrays['area'][i])
+
+        mass, cg, I = model.mass_properties(reference_point='cg', sym_axis='no')
+        for group_by in ['pid', 'mid', 'etype']:
+            group_ids, massg, cgg, Ig = model.mass_properties_by_group(
+                group_by=group_by, reference_point=[0., 0., 0.], sym_axis='no')
+            assert len(group_ids) == len(np.unique(mass_arrays[group_by]))
+            assert np.allclose(massg.sum(), mass)
+            assert np.allclose((massg[:, np.newaxis] * cgg).sum(axis=0) / mass, cg)
+
+        # the 'cg' reference point is the cg of each group
+        pids, massg, cgg, Ig = model.mass_properties_by_group(reference_point='cg', sym_axis='no')
+        for pid, massi, cgi, Ii in zip(pids, massg, cgg, Ig):
+            ids = mass_arrays['eid'][mass_arrays['pid'] == pid]
+            element_ids = [eid for eid in ids if eid in model.elements]
+            mass_idsi = [eid for eid in ids if eid in model.masses]
+            mass1, cg1, I1 = _legacy_mass_properties(model, element_ids, mass_idsi, 'cg')
+            assert np.allclose(mass1, massi), 'pid=%s mass1=%s mass2=%s' % (pid, mass1, massi)
+            assert np.allclose(cg1, cgi), 'pid=%s cg1=%s cg2=%s' % (pid, cg1, cgi)
+            assert np.allclose(I1, Ii), 'pid=%s I1=%s I2=%s' % (pid, I1, Ii)
+
+        # element sets with symmetry/scaling
+        sets = {'shells' : [1, 2, 3, 4, 5], 'solids' : [20, 21, 22, 23, 24, 25],
+                'all' : eids + mass_ids, 'empty' : []}
+        names, massg, cgg, Ig = model.mass_properties_by_group(
+            group_by=sets, sym_axis='xz', scale=2.)
+        assert names.tolist() == ['shells', 'solids', 'all', 'empty'], names
+        mass2, cg2, I2 = model.mass_properties(
+            element_ids=sets['solids'], sym_axis='xz', scale=2.)
+        assert np.allclose(massg[1], mass2)
+        assert np.allclose(cgg[1, :], cg2)
+        assert np.allclose(Ig[1, :], I2)
+        mass2, cg2, I2 = model.mass_properties(
+            element_ids=eids, mass_ids=mass_ids, sym_axis='xz', scale=2.)
+        assert np.allclose(massg[2], mass2)
+        assert np.allclose(Ig[2, :], I2)
+        assert massg[3] == 0.
+        assert np.allclose(cgg[3, :], 0.)
+
+        with self.assertRaises(ValueError):
+            model.mass_properties_by_group(group_by='cat')
+
+    def test_breakdowns(self):
+        """the breakdowns match the area/volume/mass breakdowns"""
+        model = _build_mass_model()
+        breakdown = model.get_breakdowns(
+            group_by='pid', quantities=['area', 'volume', 'length', 'mass', 'cg', 'inertia'])
+        assert breakdown.dtype.names == (
+            'pid', 'nelements', 'area', 'volume', 'length', 'mass', 'cg', 'inertia')
+        rows = {pid : i for i, pid in enumerate(breakdown['pid'].tolist())}
+
+        # the line elements use the cross-sectional area
+        pids_to_area = model.get_area_breakdown(property_ids=[1, 2, 3, 7, 8, 9, 10])
+        for pid, area in sorted(pids_to_area.items()):
+            assert np.allclose(breakdown['area'][rows[pid]], area), pid
+
+        # the old breakdown skips the CPYRAMs
+        pids_to_volume = model.get_volume_breakdown(property_ids=[1, 2, 3, 7, 8, 9, 10])
+        for pid, volume in sorted(pids_to_volume.items()):
+            assert np.allclose(breakdown['volume'][rows[pid]], volume), pid
+        assert np.allclose(breakdown['length'][rows[7]], model.elements[30].Length())
+
+        pids, mass, cg, I = model.mass_properties_by_group(group_by='pid', sym_axis='no')
+        assert np.array_equal(breakdown['pid'], pids)
+        assert np.allclose(breakdown['mass'], mass)
+        assert np.allclose(breakdown['cg'], cg)
+        assert np.allclose(breakdown['inertia'], I)
+        assert breakdown['nelements'].sum() == len(model.elements) + len(model.masses)
+
+        # the finer breakdown sums to the same model
+        mass_arrays = get_mass_arrays(model)
+        breakdown2 = get_breakdowns(model, mass_arrays=mass_arrays)
+        assert breakdown2.dtype.names == (
+            'pid', 'mid', 'etype', 'nelements', 'area', 'volume', 'mass', 'cg', 'inertia')
+        assert len(breakdown2) > len(breakdown)
+        total = get_breakdowns(model, group_by=(), mass_arrays=mass_arrays)
+        assert len(total) == 1
+        for name in ['area', 'volume', 'mass']:
+            assert np.allclose(breakdown2[name].sum(), total[name][0]), name
+        assert np.allclose(breakdown2['inertia'].sum(axis=0), total['inertia'][0])
+        mass, cg, I = model.mass_properties(sym_axis='no')
+        assert np.allclose(total['mass'][0], mass)
+        assert np.allclose(total['cg'][0], cg)
+
+        breakdown3 = model.get_breakdowns(group_by=['mid', 'etype'], quantities='mass')
+        i = np.where((breakdown3['mid'] == 2) & (breakdown3['etype'] == 'CTRIA3'))[0][0]
+        mass, unused_cg, unused_I = model.mass_properties(element_ids=3, sym_axis='no')
+        assert np.allclose(breakdown3['mass'][i], mass)
+
+        with self.assertRaises(ValueError):
+            model.get_breakdowns(group_by='cat')
+        with self.assertRaises(ValueError):
+            model.get_breakdowns(quantities='cat')
+
+    def test_breakdowns_bars(self):
+        """the area breakdown of the bars/beams matches get_area_breakdown"""
+        bdf_filename = os.path.join(model_path, 'aero', 'aerobeam.bdf')
+        model = read_bdf(bdf_filename, debug=None)
+        breakdown = model.get_breakdowns(group_by='pid', quantities='area')
+        rows = {pid : i for i, pid in enumerate(breakdown['pid'].tolist())}
+
+        pids_to_area = model.get_area_breakdown()
+        assert np.allclose(pids_to_area[100], 8.0), pids_to_area
+        for pid, area in sorted(pids_to_area.items()):
+            assert np.allclose(breakdown['area'][rows[pid]], area), pid
+
+
+def _legacy_mass_properties(model, element_ids, mass_ids, reference_point):
+    """the mass properties with the Mass()/Centroid() methods"""
+    if reference_point is None:
+        reference_point = np.zeros(3)
+    elif isinstance(reference_point, int):
+        reference_point = model.nodes[reference_point].get_position()
+    elements, masses = _mass_properties_elements_init(model, element_ids, mass_ids)
+    return _mass_properties(model, elements, masses, reference_point)
+
+
+def _build_mass_model():
+    """creates a model with the vectorized and the non-vectorized elements"""
+    model = BDF(debug=False, log=None)
+    nids = list(range(1, 29))
+    for nid in nids:
+        model.add_grid(nid, [0.3 * nid, (nid % 5) ** 1.5, 0.1 * nid ** 2])
+    model.add_cord2r(1, origin=[1., 2., 3.], zaxis=[1., 2., 4.], xzplane=[2., 3., 3.])
+    model.add_mat1(1, 3.0e7, None, 0.3, rho=0.1)
+    model.add_mat1(2, 1.0e7, None, 0.3, rho=0.2)
+
+    model.add_pshell(1, mid1=1, t=0.1, nsm=0.5)
+    model.add_pshell(2, mid1=2, t=0.3)
+    model.add_pcomp(3, [1, 2, 1], [0.1, 0.2, 0.1], nsm=0.1)
+    model.add_plplane(4, 1)
+    model.add_psolid(5, 1)
+    model.add_psolid(6, 2)
+    model.add_prod(7, 1, 0.5, nsm=0.2)
+    model.add_ptube(8, 2, 1.0, t=0.1)
+    model.add_pbar(9, 1, A=0.3, nsm=0.1)
+    model.add_pshear(10, 1, 0.1)
+    model.add_cquad4(1, 1, [1, 2, 3, 4])
+    model.add_cquad4(2, 3, [2, 3, 4, 5])
+    model.add_ctria3(3, 2, [5, 6, 7])
+    model.add_ctria3(4, 3, [6, 7, 8])
+    model.add_cquad8(5, 1, [1, 2, 3, 4, 5, 6, 7, 8])
+    model.add_ctria6(6, 2, [1, 2, 3, 4, 5, 6])
+    model.add_cquadr(7, 2, [4, 5, 6, 7])
+    model.add_ctriar(8, 3, [4, 5, 6])
+    model.add_cshear(9, 10, [7, 8, 9, 10])
+    model.add_cplstn4(10, 4, [1, 2, 3, 4])
+    model.add_chexa(20, 5, [1, 2, 3, 4, 5, 6, 7, 8])
+    model.add_chexa(21, 6, list(range(1, 21)))
+    model.add_ctetra(22, 5, [1, 2, 3, 9])
+    model.add_cpenta(23, 6, [1, 2, 3, 4, 5, 6])
+    model.add_cpenta(24, 5, list(range(1, 16)))
+    model.add_cpyram(25, 6, [1, 2, 3, 4, 5])
+    model.add_cpyram(26, 5, list(range(1, 14)))
+    model.add_crod(30, 7, [1, 2])
+    model.add_ctube(31, 8, [2, 3])
+    model.add_conrod(32, 2, [3, 4], A=0.4, nsm=0.3)
+    model.add_cbar(33, 9, [4, 5], [0., 0., 1.], None)
+    model.add_celas2(34, 1.0, [1, 2], c1=1, c2=1)
+    model.add_conm2(40, 1, 2.0, X=[0.1, 0.2, 0.3])
+    model.add_conm2(41, 2, 3.0, cid=1, X=[0.1, 0.2, 0.3])
+    model.add_conm2(42, 3, 4.0, cid=-1, X=[1.1, 2.2, 3.3])
+    model.add_conm1(43, 4, np.zeros((6, 6)))
+    model.cross_reference()
+    return model
+
+
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
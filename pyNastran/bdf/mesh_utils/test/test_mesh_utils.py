@@ -14,13 +14,17 @@ import numpy as np
 
 import pyNastran
 from pyNastran.bdf.bdf import BDF, read_bdf
-from pyNastran.bdf.mesh_utils.bdf_equivalence import bdf_equivalence_nodes
+from pyNastran.bdf.mesh_utils.bdf_equivalence import (
+    bdf_equivalence_nodes, _eq_nodes_find_pairs_grid, _eq_nodes_union_find)
 from pyNastran.bdf.mesh_utils.collapse_bad_quads import convert_bad_quads_to_tris
 from pyNastran.bdf.mesh_utils.delete_bad_elements import get_bad_shells
 from pyNastran.bdf.mesh_utils.export_mcids import export_mcids
 from pyNastran.bdf.mesh_utils.split_cbars_by_pin_flag import split_cbars_by_pin_flag
 from pyNastran.bdf.mesh_utils.split_elements import split_line_elements
-from pyNastran.bdf.mesh_utils.pierce_shells import pierce_shell_model, quad_intersection, triangle_intersection
+from pyNastran.bdf.mesh_utils.pierce_shells import (
+    pierce_shell_model, quad_intersection, triangle_intersection, triangle_intersections,
+    ShellBVH)
+from pyNastran.bdf.mesh_utils.aabb_tree import AABBTree
 from pyNastran.utils.log import SimpleLogger
 
 # testing these imports are up to date
@@ -351,6 +355,62 @@ class TestMeshUtils(unittest.TestCase):
         os.remove(bdf_filename)
         os.remove(bdf_filename_out)
 
+    def test_eq_grid(self):
+        """the grid search finds the same pairs as a brute force search"""
+        np.random.seed(42)
+        nnodes = 2000
+        xyz = np.random.uniform(-1., 1., size=(nnodes, 3))
+        xyz[nnodes // 2:, :] = xyz[:nnodes // 2, :] + np.random.uniform(
+            -0.01, 0.01, size=(nnodes // 2, 3))
+        xyz[-10:, :] = xyz[0, :]
+        tol = 0.01
+
+        dxyz = np.linalg.norm(xyz[:, np.newaxis, :] - xyz[np.newaxis, :, :], axis=2)
+        ipairs_expected = np.column_stack(np.where(np.triu(dxyz <= tol, k=1)))
+        for nprocs in [1, 2]:
+            for ncells_per_chunk in [7, 100000]:
+                ipairs = _eq_nodes_find_pairs_grid(xyz, tol, nprocs=nprocs,
+                                                   ncells_per_chunk=ncells_per_chunk)
+                ipairs = ipairs[np.lexsort((ipairs[:, 1], ipairs[:, 0]))]
+                assert np.array_equal(ipairs, ipairs_expected), (nprocs, ncells_per_chunk)
+        assert len(_eq_nodes_find_pairs_grid(np.zeros((1, 3)), tol)) == 0
+        assert len(_eq_nodes_find_pairs_grid(np.zeros((3, 3)), 0.)) == 3
+
+        # the chain 1-2-3-4 is collapsed to 1 and 5-6 to 5
+        ipairs = np.array([[2, 3], [1, 2], [0, 1], [4, 5]])
+        iroot = _eq_nodes_union_find(7, ipairs)
+        assert np.array_equal(iroot, [0, 0, 0, 0, 4, 4, 6]), iroot
+
+    def test_eq_chain(self):
+        """the grid method collapses chains of nodes to the lowest id"""
+        model = BDF(log=log, debug=False)
+        model.add_grid(10, [0., 0., 0.])
+        model.add_grid(3, [0.15, 0., 0.])
+        model.add_grid(7, [0.3, 0., 0.])
+        model.add_grid(1, [0.45, 0., 0.])
+        model.add_grid(20, [5., 0., 0.])
+        model.add_grid(21, [5., 0., 0.])
+        model.add_ctria3(1, 1, [10, 7, 20])
+        model.add_ctria3(2, 1, [3, 1, 21])
+        model.add_pshell(1, mid1=1, t=0.1)
+        model.add_mat1(1, 3.0e7, None, 0.3)
+        model = bdf_equivalence_nodes(model, None, 0.2, xref=True,
+                                      log=log, debug=False)
+        assert model.elements[1].node_ids == [1, 1, 20], model.elements[1].node_ids
+        assert model.elements[2].node_ids == [1, 1, 20], model.elements[2].node_ids
+        assert np.allclose(model.nodes[10].xyz, [0.45, 0., 0.])
+
+        model = BDF(log=log, debug=False)
+        model.add_grid(1, [0., 0., 0.])
+        model.add_grid(2, [0., 0., 0.])
+        model.add_grid(3, [0., 0., 0.])
+        model.add_ctria3(1, 1, [1, 2, 3])
+        model.add_pshell(1, mid1=1, t=0.1)
+        model.add_mat1(1, 3.0e7, None, 0.3)
+        model = bdf_equivalence_nodes(model, None, 0.2, xref=True, node_set=[2, 3],
+                                      log=log, debug=False)
+        assert model.elements[1].node_ids == [1, 2, 2], model.elements[1].node_ids
+
     def test_fix_bad_quads(self):
         """split high interior angle quads"""
         msg = [
@@ -746,7 +806,117 @@ class TestMeshUtils(unittest.TestCase):
             [0.4, 0.6, 0.],
             [-1., -1, 0.],
         ]
-        pierce_shell_model(model, xyz_points)
+        eids_pierce, xyz_pierces, node_ids = pierce_shell_model(model, xyz_points)
+        assert eids_pierce == [2, None], eids_pierce
+        assert np.allclose(xyz_pierces[0], [0.4, 0.6, 1.]), xyz_pierces
+        assert xyz_pierces[1] is None, xyz_pierces
+        assert node_ids == [[5, 6, 7, 8], None], node_ids
+
+        eids_pierce, xyz_pierces, node_ids = pierce_shell_model(model, xyz_points[:1])
+        assert xyz_pierces.shape == (1, 3), xyz_pierces.shape
+
+    def test_pierce_bvh(self):
+        """pierces a wavy surface with arbitrary rays and checks the nearest pierce"""
+        model = BDF(log=log)
+        nx = 12
+        for j in range(nx + 1):
+            for i in range(nx + 1):
+                nid = j * (nx + 1) + i + 1
+                model.add_grid(nid, [float(i), float(j), 0.3 * np.sin(i) * np.cos(j)])
+        eid = 1
+        for j in range(nx):
+            for i in range(nx):
+                n1 = j * (nx + 1) + i + 1
+                if (i + j) % 3:
+                    model.add_cquad4(eid, 1, [n1, n1 + 1, n1 + nx + 2, n1 + nx + 1])
+                    eid += 1
+                else:
+                    model.add_ctria3(eid, 1, [n1, n1 + 1, n1 + nx + 2])
+                    model.add_ctria3(eid + 1, 1, [n1, n1 + nx + 2, n1 + nx + 1])
+                    eid += 2
+        model.add_conrod(eid, 1, [1, 2], A=1.0)
+
+        np.random.seed(42)
+        nrays = 500
+        origins = np.random.uniform(-1., nx + 1., size=(nrays, 3))
+        origins[:, 2] = np.random.uniform(-2., 2., size=nrays)
+        directions = np.random.uniform(-1., 1., size=(nrays, 3))
+        directions[:50, :] = [0., 0., 1.]
+
+        # the nearest pierce of all the triangles
+        bvh = ShellBVH(model, leaf_size=1)
+        ntriangles = bvh.triangles.shape[0]
+        irays = np.repeat(np.arange(nrays), ntriangles)
+        itriangles = np.tile(np.arange(ntriangles), nrays)
+        triangles = bvh.triangles[itriangles]
+        t = triangle_intersections(
+            origins[irays], directions[irays],
+            triangles[:, 0], triangles[:, 1], triangles[:, 2]).reshape(nrays, ntriangles)
+        is_hit = ~np.isnan(t).all(axis=1)
+        t_expected = np.where(is_hit, np.nanmin(np.where(np.isnan(t), np.inf, t), axis=1),
+                              np.nan)
+        assert is_hit.sum() > 100, is_hit.sum()
+
+        for leaf_size, nrays_per_chunk in [(1, 100000), (8, 100000), (8, 37), (1000, 100)]:
+            bvh = ShellBVH(model, leaf_size=leaf_size)
+            ielements, ti, xyz_pierces = bvh.pierce(
+                origins, directions, nrays_per_chunk=nrays_per_chunk)
+            assert np.array_equal(ielements >= 0, is_hit), leaf_size
+            assert np.allclose(ti[is_hit], t_expected[is_hit]), leaf_size
+            assert np.allclose(xyz_pierces[is_hit],
+                               origins[is_hit] + directions[is_hit] * ti[is_hit, np.newaxis])
+            assert np.isnan(xyz_pierces[~is_hit]).all()
+
+            # the pierced element has the pierced triangle
+            for iray in np.flatnonzero(is_hit)[:20]:
+                itri = np.flatnonzero(bvh.itriangle_element == ielements[iray])
+                assert np.nanmin(t[iray, itri]) == t_expected[iray], iray
+
+        # a ray that starts past the surface doesn't pierce it
+        ielements, ti, xyz_pierces = bvh.pierce(
+            [[3.2, 4.7, 5.], [3.2, 4.7, -5.]], [0., 0., 1.])
+        assert ielements[0] == -1 and ielements[1] >= 0, ielements
+        ielements, ti, xyz_pierces = bvh.pierce(
+            [[3.2, 4.7, 5.]], [0., 0., 1.], tmin=-np.inf)
+        assert ielements[0] >= 0 and ti[0] < 0., (ielements, ti)
+
+        bvh = ShellBVH(model, eids=[])
+        ielements, ti, xyz_pierces = bvh.pierce(origins, directions)
+        assert (ielements == -1).all()
+
+    def test_aabb_tree(self):
+        """the boxes that are hit by a series of rays"""
+        np.random.seed(1)
+        nboxes = 300
+        box_min = np.random.uniform(0., 10., size=(nboxes, 3))
+        box_max = box_min + np.random.uniform(0., 1., size=(nboxes, 3))
+        box_max[:10, 2] = box_min[:10, 2]
+        origins = np.random.uniform(-1., 11., size=(60, 3))
+        directions = np.random.uniform(-1., 1., size=(60, 3))
+        directions[:10, :2] = 0.
+        for leaf_size in [1, 4, 300]:
+            tree = AABBTree(box_min, box_max, leaf_size=leaf_size)
+            assert sorted(tree.order.tolist()) == list(range(nboxes))
+            ileaves = tree.node_left < 0
+            assert tree.node_count[ileaves].sum() == nboxes
+            assert tree.node_count[ileaves].max() <= leaf_size
+
+            irays, iboxes = tree.get_ray_pairs(origins, directions, tmax=20.)
+            pairs = set(zip(irays.tolist(), iboxes.tolist()))
+            assert len(pairs) == len(irays)
+            if leaf_size == 1:
+                assert len(pairs) < len(origins) * nboxes // 4, len(pairs)
+            for iray, (origin, direction) in enumerate(zip(origins, directions)):
+                # the box is hit if a point on the ray is in the box
+                points = origin + direction * np.linspace(0., 20., 1001)[:, np.newaxis]
+                is_inside = ((points[:, np.newaxis, :] >= box_min - 1e-8) &
+                             (points[:, np.newaxis, :] <= box_max + 1e-8)).all(axis=2)
+                for ibox in np.flatnonzero(is_inside.any(axis=0)):
+                    assert (iray, ibox) in pairs, (leaf_size, iray, ibox)
+
+        tree = AABBTree(np.zeros((0, 3)), np.zeros((0, 3)))
+        irays, iboxes = tree.get_ray_pairs(origins, directions)
+        assert len(irays) == 0 and len(iboxes) == 0
 
     #def test_intersect(self):
         #p0 = np.array([0,0,0], 'd')
@@ -1,8 +1,11 @@
 from __future__ import print_function
 import os
 import unittest
+from six import StringIO
+import numpy as np
+
 from pyNastran.bdf.bdf import BDF, get_logger2
-from pyNastran.bdf.mesh_utils.bdf_renumber import bdf_renumber
+from pyNastran.bdf.mesh_utils.bdf_renumber import bdf_renumber, _get_new_ids
 #from pyNastran.utils.dev import get_files_of_type
 
 import pyNastran
@@ -110,6 +113,129 @@ class TestRenumber(unittest.TestCase):
             #bdf_filename_check = os.path.join(dirname, base + '_check.bdf_test')
             #check_renumber(bdf_filename, bdf_filename_renumber, bdf_filename_check)
 
+    def test_renumber_new_ids(self):
+        """the new ids skip over the banned ids and the ids that aren't renumbered"""
+        new_ids = _get_new_ids([10, 20, 30, 40], 1, banned_ids=[1, 2, 5])
+        assert new_ids.tolist() == [3, 4, 6, 7], new_ids
+        new_ids = _get_new_ids([10, 20, 30, 40], 100, banned_ids=[1, 2, 5])
+        assert new_ids.tolist() == [100, 101, 102, 103], new_ids
+        new_ids = _get_new_ids([1, 2, 3, 4, 5], 1, subset_ids=[4, 5], banned_ids=[4])
+        assert new_ids.tolist() == [1, 2, 3, 5, 6], new_ids
+        new_ids = _get_new_ids([], 1, banned_ids=[1])
+        assert new_ids.tolist() == [], new_ids
+
+    def test_renumber_subset(self):
+        """renumbers a subset of the nodes/elements"""
+        model = _build_model(nx=2)
+        model.add_spoint([1, 5])
+        model.cross_reference()
+        starting_id_dict = {'nid' : 1, 'eid' : 1, 'pid' : None, 'mid' : None}
+        subset_ids_dict = {
+            'nid' : [4, 200000],
+            'eid' : [300, 600],
+        }
+        unused_model, mapper = bdf_renumber(
+            model, None, starting_id_dict=starting_id_dict,
+            subset_ids_dict=subset_ids_dict)
+
+        # the nodes skip over the SPOINTs and the nodes that aren't renumbered
+        nid_map = mapper['nodes']
+        assert nid_map[4] == 3, nid_map
+        assert nid_map[200000] == 4, nid_map
+        assert all(nid_map[nid] == nid for nid in nid_map if nid not in [4, 200000])
+        assert len(set(nid_map.values())) == len(nid_map)
+        assert model.nodes[200000].nid == 4
+        assert model.nodes[6].nid == 6
+
+        eid_map = mapper['elements']
+        assert eid_map[300] == 1 and eid_map[600] == 2, eid_map
+        assert model.elements[300].eid == 1
+        assert model.elements[300].node_ids[1] == 3, model.elements[300].node_ids
+        assert mapper['properties'] == {1 : 1, 2 : 2}, mapper['properties']
+
+        with self.assertRaises(NotImplementedError):
+            bdf_renumber(model, None, subset_ids_dict={'spc_id' : [1]})
+
+    def test_renumber_node_arrays(self):
+        """the nodes of a NodeArrayDict are renumbered in bulk"""
+        model = _build_model(nx=3)
+        model.cross_reference()
+        bdf_file = StringIO()
+        unused_model, mapper = bdf_renumber(model, bdf_file)
+
+        model2 = _build_model(nx=3)
+        model2.set_node_arrays()
+        model2.cross_reference()
+        bdf_file2 = StringIO()
+        unused_model, mapper2 = bdf_renumber(model2, bdf_file2)
+        assert mapper['nodes'] == mapper2['nodes']
+        assert bdf_file.getvalue() == bdf_file2.getvalue()
+        assert model2.nodes[300000].nid == 64
+
+    def test_renumber_maps(self):
+        """the node/element maps match the per-card loop"""
+        model = _build_model(nx=5, nspoints=100)
+        model.cross_reference()
+        nid_map, eid_map = _renumber_by_card(model)
+
+        starting_id_dict = {key : None for key in [
+            'cid', 'pid', 'mid', 'spc_id', 'mpc_id', 'load_id', 'dload_id', 'table_id', 'tf_id']}
+        unused_model, mapper = bdf_renumber(model, None, starting_id_dict=starting_id_dict)
+        assert mapper['nodes'] == nid_map
+        assert mapper['elements'] == eid_map
+
+
+def _build_model(nx=2, nspoints=0):
+    """
+    creates a block of CHEXAs with ids that have gaps, a CQUAD4,
+    a CONM2 and optionally some SPOINTs
+    """
+    model = BDF(debug=None)
+    nids = 2 * np.arange(1, (nx + 1) ** 3 + 1).reshape(nx + 1, nx + 1, nx + 1)
+    nids[-1, -1, -1] = 100000 * nx
+    for k in range(nx + 1):
+        for j in range(nx + 1):
+            for i in range(nx + 1):
+                model.add_grid(int(nids[k, j, i]), [float(i), float(j), float(k)])
+
+    eid = 300
+    for k in range(nx):
+        for j in range(nx):
+            for i in range(nx):
+                model.add_chexa(eid, 1, [
+                    nids[k, j, i], nids[k, j, i + 1], nids[k, j + 1, i + 1], nids[k, j + 1, i],
+                    nids[k + 1, j, i], nids[k + 1, j, i + 1],
+                    nids[k + 1, j + 1, i + 1], nids[k + 1, j + 1, i]])
+                eid += 300
+    model.add_cquad4(eid, 2, [nids[0, 0, 0], nids[0, 0, 1], nids[0, 1, 1], nids[0, 1, 0]])
+    model.add_conm2(eid + 1, nids[0, 0, 0], 1.0)
+    model.add_psolid(1, 10)
+    model.add_pshell(2, 10, t=0.1)
+    model.add_mat1(10, 3.0e7, None, 0.3)
+    if nspoints:
+        model.add_spoint(list(range(1, 2 * nspoints, 2)))
+    return model
+
+
+def _renumber_by_card(model):
+    """builds the node/element maps with a per-card loop"""
+    spoints = list(model.spoints.keys())
+    nid_map = {}
+    i = 1
+    for nid in sorted(model.nodes):
+        while i in spoints:
+            i += 1
+        nid_map[nid] = i
+        i += 1
+
+    eid_map = {}
+    i = 1
+    for cards in [model.elements, model.masses]:
+        for eid in sorted(cards):
+            eid_map[eid] = i
+            i += 1
+    return nid_map, eid_map
+
 
 def check_renumber(bdf_filename, bdf_filename_renumber, bdf_filename_check,
                    log=None):
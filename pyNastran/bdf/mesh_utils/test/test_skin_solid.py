@@ -0,0 +1,177 @@
+"""tests the skinning of the solid elements"""
+import os
+import unittest
+from collections import defaultdict
+from copy import deepcopy
+
+from pyNastran.bdf.bdf import BDF, read_bdf
+from pyNastran.bdf.mesh_utils.skin_solid_elements import (
+    SOLID_FACE_INDICES, get_solid_face_arrays, get_solid_skin_faces, write_skin_solid_faces)
+
+
+def _build_model(nx=2, ny=2, nz=1):
+    """creates a block of CHEXAs and a series of quadratic solids"""
+    model = BDF(debug=None)
+    nid = 1
+    nids = {}
+    for k in range(nz + 1):
+        for j in range(ny + 1):
+            for i in range(nx + 1):
+                model.add_grid(nid, [float(i), float(j), float(k)])
+                nids[(i, j, k)] = nid
+                nid += 1
+
+    eid = 1
+    for k in range(nz):
+        for j in range(ny):
+            for i in range(nx):
+                model.add_chexa(eid, 1, [
+                    nids[(i, j, k)], nids[(i + 1, j, k)],
+                    nids[(i + 1, j + 1, k)], nids[(i, j + 1, k)],
+                    nids[(i, j, k + 1)], nids[(i + 1, j, k + 1)],
+                    nids[(i + 1, j + 1, k + 1)], nids[(i, j + 1, k + 1)]])
+                eid += 1
+
+    # a CTETRA and a CPYRAM on the top of the block
+    model.add_ctetra(eid, 1, [nids[(0, 0, nz)], nids[(1, 0, nz)], nids[(0, 1, nz)], nid])
+    model.add_grid(nid, [0., 0., nz + 1.])
+    model.add_cpyram(eid + 1, 1, [nids[(1, 0, nz)], nids[(2, 0, nz)], nids[(2, 1, nz)],
+                                  nids[(1, 1, nz)], nid])
+    nid += 1
+    eid += 2
+
+    # the quadratic solids don't share nodes
+    for etype, nnodes in [('CTETRA', 10), ('CPYRAM', 13), ('CPENTA', 15), ('CHEXA', 20)]:
+        nidsi = list(range(nid, nid + nnodes))
+        for nidi in nidsi:
+            model.add_grid(nidi, [float(nidi), 0., 0.])
+        getattr(model, 'add_' + etype.lower())(eid, 2, nidsi)
+        nid += nnodes
+        eid += 1
+
+    # a CPENTA under hexa 1
+    model.add_grid(nid, [0.5, 0., -1.])
+    model.add_grid(nid + 1, [0.5, 1., -1.])
+    model.add_cpenta(eid, 2, [1, 2, nid, 4, 5, nid + 1])
+    model.add_cquad4(eid + 1, 3, [1, 2, 5, 4])
+    model.add_psolid(1, 1)
+    model.add_psolid(2, 2)
+    model.add_pshell(3, 1, t=0.1)
+    model.add_mat1(1, 3.0e7, None, 0.3)
+    model.add_mat1(2, 1.0e7, None, 0.3)
+    return model
+
+
+def _get_solid_skin_faces_by_face(model):
+    """gets the skinned faces with a per-face loop"""
+    face_set = defaultdict(int)
+    eid_set = defaultdict(list)
+    face_map = {}
+    for eid, face in model.get_element_faces():
+        raw_face = deepcopy(face)
+        face.sort()
+        tface = tuple(face)
+        face_set[tface] += 1
+        eid_set[tface].append(eid)
+        face_map[tface] = raw_face
+
+    for face, face_count in list(face_set.items()):
+        if face_count == 2:
+            del eid_set[face]
+    return eid_set, face_map
+
+
+class TestSkinSolid(unittest.TestCase):
+    """tests the skinning of the solid elements"""
+
+    def test_face_indices(self):
+        """the face tables are the same as elem.faces"""
+        model = _build_model()
+        keys = set()
+        for elem in model.elements.values():
+            if elem.type not in ['CTETRA', 'CPENTA', 'CHEXA', 'CPYRAM']:
+                continue
+            key = (elem.type, len(elem.node_ids))
+            keys.add(key)
+            faces = [[elem.node_ids[inode] for inode in face]
+                     for face in SOLID_FACE_INDICES[key]]
+            assert faces == list(elem.faces.values()), key
+        assert keys == set(SOLID_FACE_INDICES), keys
+
+    def test_skin_faces(self):
+        """the faces are the same as the per-face loop (including the order)"""
+        model = _build_model()
+        eid_set, face_map = get_solid_skin_faces(model)
+        eid_set_expected, face_map_expected = _get_solid_skin_faces_by_face(model)
+        assert list(eid_set.items()) == list(eid_set_expected.items())
+        assert list(face_map.items()) == list(face_map_expected.items())
+
+        # the bottom of hexa 1 is shared with the CPENTA
+        assert (1, 2, 4, 5) not in eid_set
+        assert face_map[(1, 2, 4, 5)] == [1, 2, 5, 4], face_map[(1, 2, 4, 5)]
+        assert eid_set[(1, 2, 78)] == [11], eid_set[(1, 2, 78)]
+        assert eid_set[(1, 2, 10, 11)] == [1], eid_set[(1, 2, 10, 11)]
+
+        sorted_faces, faces, nface_nodes, counts, face_eid_offsets, face_eids = (
+            get_solid_face_arrays(model))
+        assert sorted_faces.shape == faces.shape == (len(face_map), 8)
+        assert counts.sum() == len(face_eids) == face_eid_offsets[-1]
+        assert sorted(nface_nodes.tolist()) == sorted(len(face) for face in face_map)
+
+        # a face that's used by 3 elements is a skinned face
+        model.add_ctetra(100, 1, [1, 2, 78, 3])
+        model.add_ctetra(101, 1, [1, 2, 78, 6])
+        eid_set, face_map = get_solid_skin_faces(model)
+        eid_set_expected, face_map_expected = _get_solid_skin_faces_by_face(model)
+        assert list(eid_set.items()) == list(eid_set_expected.items())
+        assert list(face_map.items()) == list(face_map_expected.items())
+        assert eid_set[(1, 2, 78)] == [11, 100, 101], eid_set[(1, 2, 78)]
+
+        model = BDF(debug=None)
+        eid_set, face_map = get_solid_skin_faces(model)
+        assert len(eid_set) == 0 and len(face_map) == 0
+
+    def test_missing_node(self):
+        """a face with a blank node can't be skinned"""
+        model = BDF(debug=None)
+        model.add_ctetra(1, 1, [1, 2, 3, 4, 5, None, 7, 8, 9, 10])
+        with self.assertRaises(RuntimeError):
+            get_solid_skin_faces(model)
+
+    def test_write_skin(self):
+        """writes the skinned shells/solids"""
+        model = _build_model()
+        eid_set, face_map = _get_solid_skin_faces_by_face(model)
+        skin_filename = 'skin_solid.bdf'
+        write_skin_solid_faces(model, skin_filename, write_solids=False, write_shells=True)
+        model2 = read_bdf(skin_filename, debug=None)
+        assert len(model2.elements) == len(eid_set), len(model2.elements)
+        assert sorted(model2.card_count) == [
+            'CQUAD4', 'CQUAD8', 'CTRIA3', 'CTRIA6', 'ENDDATA', 'GRID', 'MAT1', 'PSHELL']
+        assert min(model2.elements) == max(model.elements) + 1
+
+        # the shells have the orientation of the faces
+        for face, shell in zip(eid_set, model2.elements.values()):
+            assert shell.node_ids == face_map[face], shell
+            assert model2.properties[shell.Pid()].Mid() in model2.materials
+
+        # the solids
+        write_skin_solid_faces(model, skin_filename, write_solids=True, write_shells=True)
+        model2 = read_bdf(skin_filename, debug=None)
+        assert model2.card_count['CHEXA'] == 5, model2.card_count
+        assert model2.card_count['MAT1'] == 4, model2.card_count
+
+        # the ids that don't fit in 8 characters are written in large field
+        model.elements[123456789] = model.elements.pop(1)
+        model.elements[123456789].eid = 123456789
+        write_skin_solid_faces(model, skin_filename, write_solids=False, write_shells=True)
+        with open(skin_filename, 'r') as skin_file:
+            msg = skin_file.read()
+        assert '123456790' in msg and 'CQUAD4* ' in msg, msg
+        model2 = read_bdf(skin_filename, debug=None)
+        assert len(model2.elements) == len(eid_set), len(model2.elements)
+        os.remove(skin_filename)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
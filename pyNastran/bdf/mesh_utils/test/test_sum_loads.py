@@ -8,6 +8,8 @@ import numpy as np
 import pyNastran
 from pyNastran.bdf.bdf import BDF
 from pyNastran.bdf.bdf import CORD2C, GRID, FORCE
+from pyNastran.bdf.mesh_utils.loads import (
+    sum_forces_moments, sum_forces_moments_elements, sum_forces_moments_vectorized)
 model_path = os.path.join(pyNastran.__path__[0], '..', 'models')
 
 log = None
@@ -482,6 +484,88 @@ class TestLoadSum(unittest.TestCase):
         self.assertTrue(allclose(F2_expected, F), 'loadcase_id=%s F_expected=%s F=%s' % (loadcase_id, F2_expected, F))
         self.assertTrue(allclose(M2_expected, M), 'loadcase_id=%s M_expected=%s M=%s' % (loadcase_id, M2_expected, M))
 
+    def test_loads_sum_vectorized_01(self):
+        """tests the vectorized summation against the models"""
+        filenames = [
+            ('solid_bending', 'solid_bending.bdf'),
+            ('sol_101_elements', 'static_solid_shell_bar_pload1.bdf'),
+            ('plate', 'plate.bdf'),
+            ('real', 'loads', 'loads.bdf'),
+            ('pload4', 'cpenta.bdf'),
+            ('pload4', 'chexa.bdf'),
+            ('pload4', 'ctetra.bdf'),
+            ('pload4', 'pload1.bdf'),
+        ]
+        p0 = array([1., 2., 3.])
+        for filename in filenames:
+            model = BDF(log=log, debug=False)
+            model.read_bdf(os.path.join(model_path, *filename))
+            load_ids = sorted(set(model.loads) | set(model.load_combinations))
+            eids = list(model.elements)[::2]
+            nids = list(model.nodes)[::3]
+            forces, moments = sum_forces_moments_vectorized(
+                model, p0, load_ids, include_grav=True)
+            forces2, moments2 = sum_forces_moments_vectorized(
+                model, p0, load_ids, eids=eids, nids=nids)
+            for i, load_id in enumerate(load_ids):
+                F, M = sum_forces_moments(model, p0, load_id, include_grav=True)
+                assert np.allclose(F, forces[i, :]), 'F=%s F2=%s' % (F, forces[i, :])
+                assert np.allclose(M, moments[i, :]), 'M=%s M2=%s' % (M, moments[i, :])
+                F, M = sum_forces_moments_elements(model, p0, load_id, eids, nids)
+                assert np.allclose(F, forces2[i, :]), 'F=%s F2=%s' % (F, forces2[i, :])
+                assert np.allclose(M, moments2[i, :]), 'M=%s M2=%s' % (M, moments2[i, :])
+
+    def test_loads_sum_vectorized_02(self):
+        """tests the vectorized summation of many load cases"""
+        model = _build_load_model(nforces=200, ncases=5)
+        load_ids = sorted(model.load_combinations) + [1, 2, 3, 4]
+        p0 = 3
+        forces, moments = sum_forces_moments_vectorized(
+            model, p0, load_ids, include_grav=True)
+        for i, load_id in enumerate(load_ids):
+            F, M = sum_forces_moments(model, p0, load_id, include_grav=True)
+            assert np.allclose(F, forces[i, :]), 'F=%s F2=%s' % (F, forces[i, :])
+            assert np.allclose(M, moments[i, :]), 'M=%s M2=%s' % (M, moments[i, :])
+
+        F, M = sum_forces_moments_vectorized(model, p0, 3)
+        assert F.shape == (3, ), F.shape
+        assert np.allclose(F, forces[-2, :])
+        assert np.allclose(M, moments[-2, :])
+
+
+def _build_load_model(nforces=2000, ncases=20):
+    """creates a plate with FORCE/MOMENT/PLOADx/GRAV cards and LOAD combinations"""
+    model = BDF(log=log, debug=False)
+    model.add_cord2c(1, origin=[1., 0., 0.], zaxis=[0., 0., 1.], xzplane=[2., 1., 0.])
+    nx = 50
+    for nid in range(1, nforces + nx + 1):
+        model.add_grid(nid, [0.1 * (nid % nx), 0.2 * (nid // nx), 0.01 * (nid % 7)])
+    model.add_mat1(1, 3.0e7, None, 0.3, rho=0.1)
+    model.add_pshell(1, mid1=1, t=0.1)
+    for eid in range(1, nforces + 1):
+        if eid % nx == 0:
+            continue
+        nids = [eid, eid + 1, eid + nx + 1, eid + nx]
+        if eid % 3:
+            model.add_cquad4(eid, 1, nids)
+        else:
+            model.add_ctria3(eid, 1, nids[:3])
+
+    for nid in range(1, nforces + 1):
+        model.add_force(1, nid, 1.5 * nid, [1., 0.5, -0.2], cid=nid % 2)
+        model.add_moment(2, nid, 0.5, [0., 1., 2.], cid=nid % 2)
+    eids = sorted(model.elements)
+    model.add_pload2(3, 2.0, eids[::2])
+    model.add_pload4(3, eids[1::2], [3., 3., 3., 3.])
+    model.add_pload4(3, eids[:10], [1., 2., 3., 4.], nvector=[0., 1., 1.])
+    model.add_pload(3, 4.0, [1, 2, 3])
+    model.add_pload(3, 5.0, [4, 5, nx + 5, nx + 4])
+    model.add_grav(4, 9.81, [0., 0., -1.])
+    for sid in range(10, ncases + 10):
+        model.add_load(sid, 1.0, [1.0 + sid, -1.0, 0.5, 2.0], [1, 2, 3, 4])
+    model.cross_reference()
+    return model
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
@@ -462,6 +462,76 @@ def _lines_to_decks(lines, punch):
                           if _clean_comment(line) is not None]
     return system_lines, executive_control_lines, case_control_lines, bulk_data_lines
 
+def _stream_lines_to_decks(lines, punch):
+    """
+    Splits the BDF lines into the system, executive control, case control
+    and bulk data decks without storing the bulk data lines.
+
+    Parameters
+    ----------
+    lines : iterator
+        all the active lines in the deck
+    punch : bool
+        True : starts from the bulk data deck
+        False : read the entire deck
+
+    Returns
+    -------
+    system_lines : List[str]
+        the system control lines (typically empty; used for alters)
+    executive_control_lines : List[str]
+        the executive control lines (stores SOL 101)
+    case_control_lines : List[str]
+        the case control lines (stores subcases)
+    bulk_data_lines : iterator
+        the bulk data lines (stores geometry, boundary conditions, loads, etc.)
+
+    .. seealso:: _lines_to_decks
+    """
+    executive_control_lines = []
+    case_control_lines = []
+
+    lines = iter(lines)
+    if punch:
+        bulk_data_lines = lines
+    else:
+        flag = 1
+        first_bulk_line = None
+        for line in lines:
+            if flag == 1:
+                if line.upper().startswith('CEND'):
+                    flag = 2
+                executive_control_lines.append(line.rstrip())
+            elif flag == 2:
+                uline = line.upper()
+                if 'BEGIN' in uline and ('BULK' in uline or 'SUPER' in uline):
+                    flag = 3
+                case_control_lines.append(line.rstrip())
+            else:
+                first_bulk_line = line
+                break
+        _check_valid_deck(flag)
+        bulk_data_lines = _iter_bulk_data_lines(first_bulk_line, lines)
+
+    # break out system commands
+    system_lines, executive_control_lines = _break_system_lines(executive_control_lines)
+
+    # clean comments
+    system_lines = [_clean_comment(line) for line in system_lines
+                    if _clean_comment(line) is not None]
+    executive_control_lines = [_clean_comment(line) for line in executive_control_lines
+                               if _clean_comment(line) is not None]
+    case_control_lines = [_clean_comment(line) for line in case_control_lines
+                          if _clean_comment(line) is not None]
+    return system_lines, executive_control_lines, case_control_lines, bulk_data_lines
+
+def _iter_bulk_data_lines(first_line, lines):
+    """yields the stripped bulk data lines"""
+    if first_line is not None:
+        yield first_line.rstrip()
+    for line in lines:
+        yield line.rstrip()
+
 def _break_system_lines(executive_control_lines):
     """
     Extracts the Nastran system lines
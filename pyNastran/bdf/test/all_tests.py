@@ -12,6 +12,7 @@ from pyNastran.bdf.mesh_utils.test.test_renumber import TestRenumber
 from pyNastran.bdf.mesh_utils.test.test_remove_unused import TestRemoveUnused
 from pyNastran.bdf.mesh_utils.test.test_mass import TestMass
 from pyNastran.bdf.mesh_utils.test.test_sum_loads import TestLoadSum
+from pyNastran.bdf.mesh_utils.test.test_skin_solid import TestSkinSolid
 
 from pyNastran.bdf.patran_utils.test_patran import TestPatran
 
@@ -22,6 +23,13 @@ from pyNastran.bdf.test.test_openmdao import TestOpenMDAO
 # bdf_interface
 from pyNastran.bdf.bdf_interface.test.test_assign_type import TestAssignType
 from pyNastran.bdf.bdf_interface.test.test_dev_utils import DevUtils
+from pyNastran.bdf.bdf_interface.test.test_fast_cards import TestFastCards
+from pyNastran.bdf.bdf_interface.test.test_node_array import TestNodeArray
+from pyNastran.bdf.bdf_interface.test.test_bulk_xref import TestBulkXref
+from pyNastran.bdf.bdf_interface.test.test_coord_transforms import TestCoordTransforms
+from pyNastran.bdf.bdf_interface.test.test_write_blocks import TestWriteBlocks
+from pyNastran.bdf.bdf_interface.test.test_topology import TestTopology
+from pyNastran.bdf.bdf_interface.test.test_spatial_index import TestSpatialIndex
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -4,7 +4,10 @@ from six.moves import zip, range
 import random
 import unittest
 
-from pyNastran.bdf.field_writer_8 import (print_field_8, print_float_8,
+import numpy as np
+
+from pyNastran.bdf import field_writer_8, field_writer_16
+from pyNastran.bdf.field_writer_8 import (print_field_8, print_float_8, print_float_8_array,
                                           set_default_if_blank,
                                           set_blank_if_default, is_same, print_card_8)
 from pyNastran.bdf.field_writer_16 import print_field_16, print_card_16, print_float_16, print_scientific_16
@@ -441,6 +444,57 @@ class Testfield_writer_8(unittest.TestCase):
             positive_output = [print_float_16(x) for x in nums]
             negative_output = [print_float_16(-x) for x in nums]
 
+    def test_float_8_array(self):
+        """fuzzes print_float_8_array against the scalar print_float_8"""
+        rand = np.random.RandomState(42)
+        values = [
+            np.array([0., -0., np.nan, 1e-300, 1., -1., 0.1, -0.1,
+                      0.001, -0.01, 1e6, -1e5, 1e7, 9999999.5, 9.99999999, 0.99999999,
+                      -0.9999999, 99999.95, -99999.95, 0.0009999999, 1234.5625,
+                      -1234.5625, 0.5, 0.25, 2.5e-8, 123456.75]),
+            # exact and near ties of the rounded digits
+            np.round(rand.uniform(-1e6, 1e6, 2000) * 16.) / 16.,
+            np.round(rand.uniform(-1000., 1000., 2000), 4) + 0.00005,
+            np.round(rand.uniform(-1., 1., 2000), 7),
+        ]
+        for exponent in range(-12, 12):
+            values.append(rand.uniform(-1., 1., 1000) * 10. ** exponent)
+        values = np.hstack(values)
+
+        fields = print_float_8_array(values)
+        for value, field in zip(values.tolist(), fields.tolist()):
+            self.assertEqual(field, field_writer_8._print_float_8(value), value)
+
+        fields2 = print_float_8_array(values.reshape(-1, 2))
+        self.assertEqual(fields2.shape, (len(values) // 2, 2))
+        self.assertTrue(np.array_equal(fields2.ravel(), fields))
+        self.assertEqual(print_float_8_array([]).shape, (0, ))
+
+    def test_float_cache(self):
+        """the fields are cached up to FLOAT_CACHE_SIZE values"""
+        cache8 = field_writer_8._FLOAT_8_CACHE
+        cache16 = field_writer_16._FLOAT_16_CACHE
+        cache8.clear()
+        cache16.clear()
+        self.assertEqual(print_float_8(0.123456789), '.1234568')
+        self.assertEqual(print_float_8(0.123456789), '.1234568')
+        self.assertEqual(cache8, {0.123456789 : '.1234568'})
+        self.assertEqual(print_float_16(0.123456789), print_float_16(0.123456789))
+        self.assertEqual(len(cache16), 1)
+
+        # NaN is never found, so it's not cached
+        self.assertEqual(print_float_8(np.nan), '        ')
+        self.assertEqual(print_float_16(np.nan), '                ')
+        self.assertEqual(len(cache8), 1)
+        self.assertEqual(len(cache16), 1)
+
+        # the full cache is cleared
+        nvalues = field_writer_8.FLOAT_CACHE_SIZE
+        for value in np.linspace(1., 2., nvalues).tolist():
+            self.assertEqual(print_float_8(value), field_writer_8._print_float_8(value))
+        self.assertEqual(len(cache8), 1)
+
+
 def compare(value_in):
     field = print_field_8(value_in)
 
@@ -450,5 +504,6 @@ def compare(value_in):
         if p > 0.01:
             raise ValueError('val=%s value_in=%s' % (val, value_in))
 
+
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
@@ -1,16 +1,23 @@
 from __future__ import unicode_literals, print_function
 import os
+import shutil
 from codecs import open as codec_open
 import unittest
 from six import PY2, StringIO
+import numpy as np
+from six.moves.cPickle import load  # type: ignore
 
 import pyNastran
 from pyNastran.bdf.bdf import BDF, read_bdf, get_logger2
+from pyNastran.bdf.errors import DuplicateIDsError
 from pyNastran.bdf.test.test_case_control_deck import compare_lines
 from pyNastran.bdf.bdf_interface.include_file import (
     split_filename_into_tokens, get_include_filename,
     PurePosixPath, PureWindowsPath,
 ) # ,_split_to_tokens
+from pyNastran.bdf.bdf_interface.model_cache import (
+    get_cache_filename, evict_model_cache, CACHE_PREFIX)
+from pyNastran.bdf.bdf_interface.lazy_cards import LazyCard, LazyCardDict
 from pyNastran.utils import print_bad_path
 
 root_path = pyNastran.__path__[0]
@@ -69,6 +76,30 @@ class TestReadWrite(unittest.TestCase):
             bdf_filename = os.path.join(test_path, 'test_include.bdf')
         model2.read_bdf(bdf_filename, xref=True, punch=False)
 
+    def test_include_tree(self):
+        """tests the include tree and the source line ranges"""
+        model = BDF(log=log, debug=False)
+        bdf_filename = os.path.join(test_path, 'test_include.bdf')
+        all_lines = model.include_zip(bdf_filename)
+
+        main_filename = os.path.abspath(bdf_filename)
+        include_filename = os.path.join(test_path, 'include_dir', 'include.inc')
+        include_filename2 = os.path.join(test_path, 'include_dir', 'include2.inc')
+        assert model.include_tree[main_filename] == [include_filename], model.include_tree
+        assert model.include_tree[include_filename] == [include_filename2], model.include_tree
+
+        nlines = 0
+        for line_ranges in model.include_line_ranges.values():
+            for iline_start, iline_end in line_ranges:
+                nlines += iline_end - iline_start
+        assert nlines == len(all_lines), 'nlines=%s len(all_lines)=%s' % (nlines, len(all_lines))
+        assert model.get_include_filename_by_line(0) == main_filename
+        assert model.get_include_filename_by_line(len(all_lines) - 1) == main_filename
+        for filename, line_ranges in model.include_line_ranges.items():
+            for iline_start, iline_end in line_ranges:
+                assert model.get_include_filename_by_line(iline_start) == filename
+                assert model.get_include_filename_by_line(iline_end - 1) == filename
+
     def test_read_include_dir_2(self):
         full_path = os.path.join(test_path)
         model = BDF(log=log, debug=False)
@@ -406,6 +437,585 @@ class TestReadWrite(unittest.TestCase):
         model.read_bdf(bdf_filename)
         assert len(model.elements) == 0, len(model.elements)
 
+    def test_read_nprocs(self):
+        """tests parsing the bulk data cards in a process pool"""
+        bdf_filename = os.path.join(root_path, '..', 'models',
+                                    'sol_101_elements', 'static_solid_shell_bar.bdf')
+        model = read_bdf(bdf_filename, log=log, debug=False)
+        model2 = read_bdf(bdf_filename, log=log, debug=False, nprocs=2)
+        assert model.card_count == model2.card_count
+        assert sorted(model.elements) == sorted(model2.elements)
+        assert sorted(model.properties) == sorted(model2.properties)
+
+        bdf_file = StringIO()
+        bdf_file2 = StringIO()
+        model.write_bdf(bdf_file, close=False)
+        model2.write_bdf(bdf_file2, close=False)
+        assert bdf_file.getvalue() == bdf_file2.getvalue()
+
+        bdf_filename = os.path.join(test_path, 'duplicates.bdf')
+        with self.assertRaises(DuplicateIDsError):
+            read_bdf(bdf_filename, xref=False, log=log, debug=False, nprocs=2)
+
+    def test_write_split(self):
+        """tests writing a master file and an include file per card family"""
+        bdf_filename = os.path.join(model_path, 'aero', 'bah_plane', 'bah_plane.bdf')
+        model = read_bdf(bdf_filename, log=log, debug=False)
+        split_dirname = os.path.join(test_path, 'split_bah_plane')
+        split_dirname2 = os.path.join(test_path, 'split_bah_plane2')
+        try:
+            model.write_bdf(split_dirname, split='by_category', nprocs=2)
+            model.write_bdf(split_dirname2, split='by_category')
+            filenames = sorted(os.listdir(split_dirname))
+            assert filenames == ['aero.inc', 'elements.inc', 'loads.inc', 'materials.inc',
+                                 'model.bdf', 'nodes.inc', 'properties.inc'], filenames
+            for filename in filenames:
+                with open(os.path.join(split_dirname, filename), 'r') as bdf_file:
+                    msg = bdf_file.read()
+                with open(os.path.join(split_dirname2, filename), 'r') as bdf_file:
+                    assert msg == bdf_file.read(), filename
+
+            model2 = read_bdf(os.path.join(split_dirname, 'model.bdf'), log=log, debug=False)
+            assert model.card_count == model2.card_count
+            bdf_file = StringIO()
+            bdf_file2 = StringIO()
+            model.write_bdf(bdf_file, close=False)
+            model2.write_bdf(bdf_file2, close=False)
+
+            # the INCLUDE processed comments are added
+            lines = [line for line in bdf_file.getvalue().split('\n')
+                     if not line.startswith('$')]
+            lines2 = [line for line in bdf_file2.getvalue().split('\n')
+                      if not line.startswith('$')]
+            assert lines == lines2
+
+            with self.assertRaises(ValueError):
+                model.write_bdf(split_dirname, split='by_card')
+        finally:
+            for dirname in [split_dirname, split_dirname2]:
+                if os.path.exists(dirname):
+                    shutil.rmtree(dirname)
+
+    def test_read_streaming(self):
+        """tests reading a deck without storing the lines"""
+        bdf_filename = os.path.join(test_path, 'test_include.bdf')
+        model = read_bdf(bdf_filename, xref=False, log=log, debug=False)
+        model2 = read_bdf(bdf_filename, xref=False, log=log, debug=False, streaming=True)
+        assert model.card_count == model2.card_count
+        assert model.case_control_lines == model2.case_control_lines
+        assert model.include_line_ranges == model2.include_line_ranges
+
+        bdf_file = StringIO()
+        bdf_file2 = StringIO()
+        model.write_bdf(bdf_file, close=False)
+        model2.write_bdf(bdf_file2, close=False)
+        assert bdf_file.getvalue() == bdf_file2.getvalue()
+
+        bdf_file.seek(0)
+        model3 = read_bdf(bdf_file, xref=False, log=log, debug=False, streaming=True)
+        assert sorted(model.nodes) == sorted(model3.nodes)
+
+    def test_read_lazy(self):
+        """tests building the cards when they're accessed"""
+        bdf_filename = os.path.join(root_path, '..', 'models',
+                                    'sol_101_elements', 'static_solid_shell_bar.bdf')
+        model = read_bdf(bdf_filename, xref=False, log=log, debug=False)
+        model2 = read_bdf(bdf_filename, xref=False, validate=False,
+                          log=log, debug=False, lazy=True)
+        assert model.card_count == model2.card_count
+        assert sorted(model.elements) == sorted(model2.elements)
+        nlazy = model2.elements.nlazy
+        assert nlazy > 0, nlazy
+
+        eid = [eid for eid in model2.elements if not model2.elements.is_built(eid)][0]
+        elem = model2.elements[eid]
+        assert elem.type == model.elements[eid].type
+        assert model2.elements.nlazy == nlazy - 1
+        assert model2.elements[eid] is elem
+
+        # the unbuilt cards are written with their original text
+        bdf_file = StringIO()
+        model2.write_bdf(bdf_file, close=False)
+        bdf_file.seek(0)
+        model3 = read_bdf(bdf_file, xref=False, log=log, debug=False)
+        assert model.card_count == model3.card_count
+
+        # the cards that aren't in the field size/precision are built
+        for size, is_double in [(16, False), (16, True)]:
+            model2 = read_bdf(bdf_filename, xref=False, validate=False,
+                              log=log, debug=False, lazy=True)
+            bdf_file = StringIO()
+            bdf_file2 = StringIO()
+            model.write_bdf(bdf_file, size=size, is_double=is_double, close=False)
+            model2.write_bdf(bdf_file2, size=size, is_double=is_double, close=False)
+            assert model2.elements.nlazy == 0
+            assert bdf_file.getvalue() == bdf_file2.getvalue()
+
+        lazy_card = LazyCard('GRID', '', ['GRID*,1,,0.,0.', '*,0.'])
+        assert lazy_card.has_format(size=16) and not lazy_card.has_format(size=8)
+        assert not lazy_card.has_format(size=16, is_double=True)
+        lazy_card = LazyCard('GRID', '', ['GRID           1               0.      0.      0.'])
+        assert lazy_card.has_format(size=8, is_double=True)
+        assert not lazy_card.has_format(size=16)
+
+        bdf_file = StringIO()
+        bdf_file2 = StringIO()
+        model.cross_reference()
+        model.uncross_reference()
+        model.write_bdf(bdf_file, close=False)
+        model2.cross_reference()
+        model2.uncross_reference()
+        assert model2.elements.nlazy == 0
+        model2.write_bdf(bdf_file2, close=False)
+        assert bdf_file.getvalue() == bdf_file2.getvalue()
+
+    def test_read_lazy_xref(self):
+        """tests cross-referencing the cards when they're accessed"""
+        import pickle
+        from pyNastran.bdf.errors import CrossReferenceError
+        bdf_filename = os.path.join(root_path, '..', 'models',
+                                    'sol_101_elements', 'static_solid_shell_bar.bdf')
+        model = read_bdf(bdf_filename, log=log, debug=False)
+        model2 = read_bdf(bdf_filename, log=log, debug=False, lazy_xref=True)
+        eid = [eid for eid, elem in model.elements.items() if elem.type == 'CQUAD4'][0]
+        assert dict.__getitem__(model2.elements, eid).pid_ref is None
+
+        elem = model2.elements[eid]
+        elem0 = model.elements[eid]
+        assert elem.pid_ref is model2.properties[elem.pid]
+        assert elem.pid_ref.mid1_ref is model2.materials[elem0.pid_ref.mid1]
+        assert [node.nid for node in elem.nodes_ref] == elem0.node_ids
+        assert elem.nodes_ref[0].cp_ref is not None
+        assert elem.Area() == elem0.Area()
+
+        mass, cg, inertia = model.mass_properties()
+        mass2, cg2, inertia2 = model2.mass_properties()
+        assert mass == mass2
+        assert all(cg == cg2)
+        assert all(inertia == inertia2)
+
+        # save uncross-references the model
+        import shutil
+        import tempfile
+        dirname = tempfile.mkdtemp()
+        try:
+            obj_filename = os.path.join(dirname, 'model.obj')
+            model2.save(obj_filename)
+            model3 = BDF(log=log, debug=False)
+            model3.load(obj_filename)
+        finally:
+            shutil.rmtree(dirname)
+        assert pickle.loads(model2.saves()).card_count == model.card_count
+        assert elem.pid_ref is None
+        assert model2.elements[eid].pid_ref is None
+        bdf_file = StringIO()
+        bdf_file2 = StringIO()
+        model.uncross_reference()
+        model.write_bdf(bdf_file, close=False)
+        model3.write_bdf(bdf_file2, close=False)
+        assert bdf_file.getvalue() == bdf_file2.getvalue()
+
+        # the errors are raised when the card is accessed
+        model = BDF(log=log, debug=False)
+        model.add_grid(1, [0., 0., 0.])
+        model.add_grid(2, [1., 0., 0.])
+        model.add_grid(3, [1., 1., 0.])
+        model.add_ctria3(1, 1, [1, 2, 3])
+        model.add_ctria3(2, 2, [1, 2, 3])
+        model.add_pshell(1, mid1=1, t=0.1)
+        model.add_mat1(1, 3.0e7, None, 0.3)
+        model.lazy_cross_reference()
+        assert model.elements[1].Area() == 0.5
+        with self.assertRaises(CrossReferenceError):
+            model.elements[2]
+        with self.assertRaises(CrossReferenceError):
+            list(model.elements.values())
+        model.add_pshell(2, mid1=1, t=0.2)
+        assert model.elements[2].pid_ref.t == 0.2
+        model.add_ctria3(3, 1, [1, 2, 3])
+        assert model.elements[3].pid_ref.pid == 1
+
+        # the cards that are never accessed aren't built
+        model2 = read_bdf(bdf_filename, log=log, debug=False, validate=False,
+                          lazy=True, lazy_xref=True)
+        nlazy = model2.elements.nlazy
+        assert nlazy > 0, nlazy
+        assert model2.elements[eid].pid_ref.mid1_ref is not None
+        assert model2.elements.nlazy == nlazy - 1
+
+    def test_read_cache(self):
+        """tests loading the parsed model from the cache"""
+        import shutil
+        import tempfile
+        dirname = tempfile.mkdtemp()
+        cache_dir = os.path.join(dirname, 'cache')
+        bdf_filename = os.path.join(dirname, 'cache.bdf')
+        include_filename = os.path.join(dirname, 'cache_include.bdf')
+        try:
+            with open(bdf_filename, 'w') as bdf_file:
+                bdf_file.write(
+                    'SOL 101\nCEND\nBEGIN BULK\n'
+                    'GRID,1,,0.,0.,0.\n'
+                    "INCLUDE 'cache_include.bdf'\n"
+                    'ENDDATA\n')
+            with open(include_filename, 'w') as include_file:
+                include_file.write('GRID,2,,1.,0.,0.\n')
+
+            model = read_bdf(bdf_filename, xref=False, log=log, cache_dir=cache_dir)
+            assert sorted(model.nodes) == [1, 2]
+            cache_filenames = os.listdir(cache_dir)
+            assert len(cache_filenames) == 1, cache_filenames
+            cache_filename = os.path.join(cache_dir, cache_filenames[0])
+
+            # the model is loaded from the cache
+            model2 = BDF(log=log)
+            model2._parse_bdf = None
+            model2.read_bdf(bdf_filename, xref=True, cache_dir=cache_dir)
+            assert sorted(model2.nodes) == [1, 2]
+            assert model2.card_count == model.card_count
+            assert model2.case_control_deck.get_subcase_list() == [0]
+            assert model2.include_tree == model.include_tree
+
+            # touching a file doesn't invalidate the cache
+            stat = os.stat(include_filename)
+            os.utime(include_filename, (stat.st_atime, stat.st_mtime + 10.))
+            model3 = BDF(log=log)
+            model3._parse_bdf = None
+            model3.read_bdf(bdf_filename, xref=False, cache_dir=cache_dir)
+
+            # the new mtime is saved, so the sha1 isn't recalculated
+            with open(cache_filename, 'rb') as cache_file:
+                header = load(cache_file)
+            mtimes = {filename : mtime for filename, mtime, unused_size, unused_sha1
+                      in header['fingerprints']}
+            assert mtimes[include_filename] == os.stat(include_filename).st_mtime
+            model3 = BDF(log=log)
+            model3._parse_bdf = None
+            model3.read_bdf(bdf_filename, xref=False, cache_dir=cache_dir)
+            assert sorted(model3.nodes) == [1, 2]
+
+            # different reader options use a different cache file
+            model4 = read_bdf(bdf_filename, xref=False, log=log, cache_dir=cache_dir,
+                              skip_cards=['SPC'])
+            assert len(os.listdir(cache_dir)) == 2
+
+            # changing an INCLUDE file invalidates the cache
+            with open(include_filename, 'w') as include_file:
+                include_file.write('GRID,2,,1.,0.,0.\nGRID,3,,2.,0.,0.\n')
+            model5 = read_bdf(bdf_filename, xref=False, log=log, cache_dir=cache_dir)
+            assert sorted(model5.nodes) == [1, 2, 3]
+            model6 = BDF(log=log)
+            model6._parse_bdf = None
+            model6.read_bdf(bdf_filename, xref=False, cache_dir=cache_dir)
+            assert sorted(model6.nodes) == [1, 2, 3]
+
+            # a corrupt cache file is ignored
+            with open(cache_filename, 'wb') as cache_file:
+                cache_file.write(b'corrupt')
+            model7 = read_bdf(bdf_filename, xref=False, log=log, cache_dir=cache_dir)
+            assert sorted(model7.nodes) == [1, 2, 3]
+
+            # the least recently used files are deleted first
+            cache_filenames = sorted(
+                os.path.join(cache_dir, basename) for basename in os.listdir(cache_dir))
+            assert all(os.path.basename(filename).startswith(CACHE_PREFIX)
+                       for filename in cache_filenames)
+            os.utime(cache_filenames[0], (0., 0.))
+            size = os.path.getsize(cache_filenames[1])
+            deleted_filenames = evict_model_cache(cache_dir, max_size=size)
+            assert deleted_filenames == [cache_filenames[0]], deleted_filenames
+            assert evict_model_cache(cache_dir, max_size=0, keep=cache_filenames[1]) == []
+            assert os.listdir(cache_dir) == [os.path.basename(cache_filenames[1])]
+            assert get_cache_filename(cache_dir, 'key') == os.path.join(
+                cache_dir, CACHE_PREFIX + 'key.pkl')
+            del model4
+        finally:
+            shutil.rmtree(dirname)
+
+    def test_read_cache_changed(self):
+        """a file that changes while the model is read isn't cached"""
+        import shutil
+        import tempfile
+        dirname = tempfile.mkdtemp()
+        cache_dir = os.path.join(dirname, 'cache')
+        bdf_filename = os.path.join(dirname, 'cache_changed.bdf')
+        include_filename = os.path.join(dirname, 'cache_changed_include.bdf')
+        try:
+            with open(bdf_filename, 'w') as bdf_file:
+                bdf_file.write(
+                    'SOL 101\nCEND\nBEGIN BULK\n'
+                    'GRID,1,,0.,0.,0.\n'
+                    "INCLUDE 'cache_changed_include.bdf'\n"
+                    'ENDDATA\n')
+            with open(include_filename, 'w') as include_file:
+                include_file.write('GRID,2,,1.,0.,0.\n')
+
+            model = BDF(log=log)
+            parse_cards = model._parse_cards
+            def parse_cards_edit(*args, **kwargs):
+                """the INCLUDE file is edited after it's read"""
+                del model._parse_cards
+                with open(include_filename, 'w') as include_file:
+                    include_file.write('GRID,2,,1.,0.,0.\nGRID,3,,2.,0.,0.\n')
+                parse_cards(*args, **kwargs)
+            model._parse_cards = parse_cards_edit
+            model.read_bdf(bdf_filename, xref=False, cache_dir=cache_dir)
+            assert sorted(model.nodes) == [1, 2]
+            assert not os.path.exists(cache_dir) or os.listdir(cache_dir) == []
+
+            # the edit is found by refresh
+            assert model.refresh() == [include_filename]
+            assert sorted(model.nodes) == [1, 2, 3]
+        finally:
+            shutil.rmtree(dirname)
+
+    def test_read_cache_lazy(self):
+        """tests that the lazy cards are cached without being built"""
+        import shutil
+        import tempfile
+        dirname = tempfile.mkdtemp()
+        cache_dir = os.path.join(dirname, 'cache')
+        bdf_filename = os.path.join(dirname, 'cache_lazy.bdf')
+        try:
+            with open(bdf_filename, 'w') as bdf_file:
+                bdf_file.write(
+                    'SOL 101\nCEND\nBEGIN BULK\n'
+                    'GRID,1,,0.,0.,0.\n'
+                    'GRID,2,,1.,0.,0.\n'
+                    'CROD,10,100,1,2\n'
+                    'CROD,11,100,1,2\n'
+                    'PROD,100,1000,0.1\n'
+                    'MAT1,1000,3.0e7,,0.3\n'
+                    'FORCE,1,2,,1.,1.,0.,0.\n'
+                    'ENDDATA\n')
+
+            model = read_bdf(bdf_filename, xref=False, log=log, cache_dir=cache_dir,
+                             validate=False, lazy=True)
+            assert model.elements.nlazy == 2, model.elements.nlazy
+            assert model.loads.nlazy == 1, model.loads.nlazy
+
+            model2 = BDF(log=log)
+            model2._parse_bdf = None
+            model2.read_bdf(bdf_filename, xref=False, validate=False, cache_dir=cache_dir,
+                            lazy=True)
+            assert isinstance(model2.elements, LazyCardDict)
+            assert model2.elements.nlazy == 2, model2.elements.nlazy
+            assert model2.loads.nlazy == 1, model2.loads.nlazy
+            assert model2.elements[10].pid == 100
+            assert model2.elements.nlazy == 1, model2.elements.nlazy
+            assert model2.loads[1][0].node == 2
+            model2.cross_reference()
+            assert model2.elements[11].pid_ref.mid_ref.mid == 1000
+
+            # lazy=False uses a different cache file
+            model3 = read_bdf(bdf_filename, xref=False, log=log, cache_dir=cache_dir)
+            assert not isinstance(model3.elements, LazyCardDict)
+            assert len(os.listdir(cache_dir)) == 2
+        finally:
+            shutil.rmtree(dirname)
+
+    def test_read_refresh(self):
+        """tests re-reading the INCLUDE files that changed"""
+        import shutil
+        import tempfile
+        dirname = tempfile.mkdtemp()
+        bdf_filename = os.path.join(dirname, 'refresh.bdf')
+
+        def write_file(basename, lines):
+            """writes a file with a new mtime"""
+            filename = os.path.join(dirname, basename)
+            with open(filename, 'w') as bdf_file:
+                bdf_file.write(lines)
+            stat = os.stat(filename)
+            os.utime(filename, (stat.st_atime, stat.st_mtime + 10.))
+
+        def compare_models(model):
+            """the model is the same as a model that was read from scratch"""
+            model2 = read_bdf(bdf_filename, log=log)
+            assert model.card_count == model2.card_count, model.card_count
+            assert model.include_tree == model2.include_tree
+            assert model.include_line_ranges == model2.include_line_ranges
+            bdf_file1 = StringIO()
+            bdf_file2 = StringIO()
+            model.write_bdf(bdf_file1, close=False)
+            model2.write_bdf(bdf_file2, close=False)
+            assert bdf_file1.getvalue() == bdf_file2.getvalue()
+
+        def reread_bdf():  # pragma: no cover
+            """only the changed files may be read"""
+            raise AssertionError('the model was re-read')
+
+        try:
+            write_file('refresh.bdf',
+                       'SOL 101\nCEND\nSUBCASE 1\n  LOAD = 10\n  SPC = 1\nBEGIN BULK\n'
+                       'GRID,1,,0.,0.,0.\nGRID,2,,1.,0.,0.\n'
+                       'GRID,3,,1.,1.,0.\nGRID,4,,0.,1.,0.\n'
+                       'CQUAD4,1,1,1,2,3,4\n'
+                       '$ properties\n'
+                       "INCLUDE 'refresh_props.inc'\n"
+                       'SPC1,1,123456,1,2\n'
+                       "INCLUDE 'refresh_loads.inc'\n"
+                       'FORCE,10,4,,1.,0.,0.,1.\n'
+                       'ENDDATA\n')
+            write_file('refresh_props.inc',
+                       "PSHELL,1,100,0.1,100\nINCLUDE 'refresh_mats.inc'\n$ end\n")
+            write_file('refresh_mats.inc', 'MAT1,100,3.0e7,,0.3\n')
+            write_file('refresh_loads.inc', 'FORCE,10,3,,1.,0.,0.,1.\nPLOAD4,10,1,5.\n')
+            model = read_bdf(bdf_filename, log=log)
+            assert model.refresh() == []
+            model._reread_bdf = reread_bdf
+
+            # the loads in the file are replaced in the same order
+            write_file('refresh_loads.inc',
+                       'FORCE,10,3,,2.,0.,0.,1.\nMOMENT,10,2,,1.,0.,0.,1.\nPLOAD4,10,1,7.\n')
+            assert model.refresh() == [os.path.join(dirname, 'refresh_loads.inc')]
+            compare_models(model)
+            assert [load.type for load in model.loads[10]] == [
+                'FORCE', 'MOMENT', 'PLOAD4', 'FORCE']
+            assert model.loads[10][1].node_ref is model.nodes[2]
+
+            # a nested INCLUDE file
+            write_file('refresh_mats.inc', 'MAT1,100,1.0e7,,0.3\nMAT1,101,1.0e7,,0.3\n')
+            write_file('refresh_props.inc',
+                       "PSHELL,1,101,0.2,101\nINCLUDE 'refresh_mats.inc'\n$ end\n")
+            assert len(model.refresh()) == 2
+            compare_models(model)
+            assert model.elements[1].pid_ref.mid1_ref is model.materials[101]
+            assert 100 in model.materials
+
+            # cards that can't be tracked (a CORD1R with 2 coordinate
+            # systems) and a change to the main file re-read the model
+            del model._reread_bdf
+            write_file('refresh_mats.inc',
+                       'MAT1,100,1.0e7,,0.3\nMAT1,101,1.0e7,,0.3\n'
+                       'CORD1R,10,1,2,3,11,1,2,4\n')
+            model.refresh()
+            compare_models(model)
+            assert sorted(model.coords) == [0, 10, 11]
+            write_file('refresh.bdf',
+                       'SOL 101\nCEND\nBEGIN BULK\nGRID,1,,0.,0.,0.\nENDDATA\n')
+            model.refresh()
+            compare_models(model)
+            assert model.include_tree == {bdf_filename: []}, model.include_tree
+        finally:
+            shutil.rmtree(dirname)
+
+    def test_read_refresh_xref(self):
+        """tests that refresh only links the new cards and the cards that reference them"""
+        import shutil
+        import tempfile
+        dirname = tempfile.mkdtemp()
+        bdf_filename = os.path.join(dirname, 'refresh.bdf')
+
+        def write_file(basename, lines):
+            """writes a file with a new mtime"""
+            filename = os.path.join(dirname, basename)
+            with open(filename, 'w') as bdf_file:
+                bdf_file.write(lines)
+            stat = os.stat(filename)
+            os.utime(filename, (stat.st_atime, stat.st_mtime + 10.))
+
+        def reread_bdf():  # pragma: no cover
+            """only the changed files may be read"""
+            raise AssertionError('the model was re-read')
+
+        def compare_centroid(eid):
+            """the element is the same as an element that was read from scratch"""
+            model2 = read_bdf(bdf_filename, log=log)
+            centroid = model.elements[eid].Centroid()
+            assert np.allclose(centroid, model2.elements[eid].Centroid()), centroid
+
+        try:
+            write_file('refresh.bdf',
+                       'SOL 101\nCEND\nBEGIN BULK\n'
+                       'GRID,1,,0.,0.,0.\nGRID,2,,1.,0.,0.\n'
+                       'GRID,3,,1.,1.,0.\nGRID,4,,0.,1.,0.\n'
+                       'GRID,6,7,0.,2.,0.\n'
+                       'CQUAD4,1,1,1,2,3,4\nCQUAD4,2,2,4,3,5,6\n'
+                       'PSHELL,2,100,0.1,100\nMAT1,100,3.0e7,,0.3\n'
+                       "INCLUDE 'refresh_props.inc'\n"
+                       "INCLUDE 'refresh_nodes.inc'\n"
+                       "INCLUDE 'refresh_coords.inc'\n"
+                       'ENDDATA\n')
+            write_file('refresh_props.inc', 'PSHELL,1,100,0.1,100\n')
+            write_file('refresh_nodes.inc', 'GRID,5,,1.,2.,0.\n')
+            write_file('refresh_coords.inc', 'CORD2R,7,,0.,0.,0.,0.,0.,1.\n,1.,0.,0.\n')
+            model = read_bdf(bdf_filename, log=log)
+            model._reread_bdf = reread_bdf
+            elem1 = model.elements[1]
+            elem2 = model.elements[2]
+
+            # the elements that don't reference the property aren't linked again
+            nodes_ref1 = elem1.nodes_ref
+            nodes_ref2 = elem2.nodes_ref
+            write_file('refresh_props.inc', 'PSHELL,1,100,0.2,100\n')
+            model.refresh()
+            assert elem1.pid_ref is model.properties[1]
+            assert elem1.pid_ref.t == 0.2
+            assert elem1.nodes_ref is not nodes_ref1
+            assert elem2.nodes_ref is nodes_ref2
+
+            # a moved node
+            nodes_ref1 = elem1.nodes_ref
+            write_file('refresh_nodes.inc', 'GRID,5,,1.,3.,0.\n')
+            model.refresh()
+            node5 = model.nodes[5]
+            assert elem2.nodes_ref[2] is node5
+            assert elem1.nodes_ref is nodes_ref1
+            assert node5.elements_ref == [elem2]
+            assert model.nodes[3].elements_ref == [elem1, elem2]
+            compare_centroid(2)
+
+            # the nodes that reference a coordinate system
+            write_file('refresh_coords.inc', 'CORD2R,7,,1.,0.,0.,1.,0.,1.\n,2.,0.,0.\n')
+            model.refresh()
+            assert model.nodes[6].cp_ref is model.coords[7]
+            assert np.allclose(model.nodes[6].get_position(), [1., 2., 0.])
+            compare_centroid(2)
+        finally:
+            shutil.rmtree(dirname)
+
+    def test_read_card_types(self):
+        """tests skipping the cards that aren't in card_types"""
+        lines = [
+            'SOL 101',
+            'CEND',
+            'BEGIN BULK',
+            '$ grid 1',
+            'GRID,1,,0.,0.,0.',
+            '$ conm2',
+            'CONM2,1,1,,1.',
+            '+,1.,,1.',
+            ',,1.',
+            '$ grid 2',
+            'GRID*,2,,1.,0.',
+            '*,0.',
+            'PSHELL         1     100      .1',
+            '$ inside the pshell',
+            '                      1.',
+            '',
+            '$ quad',
+            'CQUAD4,10,1,1,2,2,1',
+            'ENDDATA',
+        ]
+        bdf_file = StringIO()
+        bdf_file.write('\n'.join(lines))
+        bdf_file.seek(0)
+        model = read_bdf(bdf_file, validate=False, xref=False, log=log,
+                         card_types=['grid', 'CQUAD4'])
+        assert dict(model.card_count) == {'GRID' : 2, 'CQUAD4' : 1, 'ENDDATA' : 1}, \
+            model.card_count
+        assert model.reject_lines == []
+        assert model.rejects == []
+        assert sorted(model.nodes) == [1, 2]
+        assert model.nodes[1].comment == '$ grid 1\n'
+        assert model.nodes[2].comment == '$ grid 2\n'
+        assert model.elements[10].comment == '$ quad\n'
+
+        bdf_file.seek(0)
+        model = read_bdf(bdf_file, validate=False, xref=False, log=log, card_types='GRID')
+        assert dict(model.card_count) == {'GRID' : 2, 'ENDDATA' : 1}, model.card_count
+
     def test_solid_shell_bar_buckling(self):
         bdf_filename = os.path.join(root_path, '..', 'models',
                                     'sol_101_elements', 'buckling_solid_shell_bar.bdf')
@@ -61,9 +61,9 @@ else:
         #if ver < '1.11.0':
             #print("np.__version__ = %r < '1.11.0'" % np.__version__)
             #py_packages.append('numpy >= 1.11.0')
-        py_packages.append('numpy >= 1.11.0') # ,<1.13.0
+        py_packages.append('numpy >= 1.13.0')
     except ImportError:
-        py_packages.append('numpy >= 1.11.0') # ,<1.13.0
+        py_packages.append('numpy >= 1.13.0')
 
 try:
     import scipy
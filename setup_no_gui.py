@@ -23,11 +23,11 @@ py_packages = []
 try:
     import numpy as np
     ver = np.lib.NumpyVersion(np.__version__)
-    if ver < '1.11.0':
-        print("np.__version__ = %r < '1.11.0'" % np.__version__)
-        py_packages.append('numpy >= 1.11.0,<1.13.0')
+    if ver < '1.13.0':
+        print("np.__version__ = %r < '1.13.0'" % np.__version__)
+        py_packages.append('numpy >= 1.13.0')
 except ImportError:
-    py_packages.append('numpy >= 1.11.0,<1.13.0')
+    py_packages.append('numpy >= 1.13.0')
 
 try:
     import scipy